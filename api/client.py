@@ -0,0 +1,173 @@
+# -*- coding: utf-8 -*-
+"""
+Cliente del servidor POS para los terminales
+
+``service_for(VentaService)`` devuelve el servicio local si no hay
+``Config.API_URL`` configurada, o un adaptador remoto con los mismos métodos
+publicados (ver api/protocol.py) que delega cada llamada en el servidor.
+"""
+import http.client
+import json
+import threading
+import time
+from urllib.parse import urlsplit
+from core.config import Config
+from core.event_bus import get_event_bus
+from core.logger import logger
+from api.protocol import OPERATIONS, SERVICE_NAMES, READ, encode, decode, decode_event
+
+
+class ApiError(Exception):
+    """El servidor no respondió o rechazó la operación"""
+
+
+class ApiClient:
+    """Cliente HTTP/JSON con una conexión keep-alive por hilo"""
+
+    def __init__(self, base_url=None, token=None, timeout=None):
+        url = urlsplit(base_url or Config.API_URL)
+        self.host = url.hostname
+        self.port = url.port or Config.API_PORT
+        self.token = token if token is not None else Config.API_TOKEN
+        self.timeout = timeout or Config.API_TIMEOUT
+        self._local = threading.local()
+
+    def _connection(self):
+        conn = getattr(self._local, 'conn', None)
+        # El servidor cierra conexiones inactivas: se reabre antes de que pase
+        if conn is not None and time.monotonic() - self._local.last_used > Config.API_IDLE_TIMEOUT / 2:
+            conn.close()
+            conn = None
+        if conn is None:
+            conn = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+            self._local.conn = conn
+        self._local.last_used = time.monotonic()
+        return conn
+
+    def _discard_connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.close()
+        self._local.conn = None
+
+    def call(self, servicio, metodo, *args, **kwargs):
+        """
+        Ejecuta una operación publicada en el servidor.
+
+        Las lecturas se reintentan una vez ante un corte de conexión; las
+        escrituras no (podrían haberse aplicado).
+
+        Args:
+            servicio: Nombre publicado (ej: 'venta')
+            metodo: Método del servicio (ej: 'procesar_venta')
+
+        Returns:
+            Any: Lo mismo que devolvería el servicio local
+
+        Raises:
+            ApiError: Servidor inalcanzable o error en la operación
+        """
+        cuerpo = json.dumps({'args': encode(args), 'kwargs': encode(kwargs)}, ensure_ascii=False)
+        headers = {'Content-Type': 'application/json; charset=utf-8'}
+        if self.token:
+            headers['X-Gym-Token'] = self.token
+
+        intentos = 2 if OPERATIONS[servicio][1].get(metodo) == READ else 1
+        for intento in range(intentos):
+            try:
+                conn = self._connection()
+                conn.request('POST', f'/rpc/{servicio}/{metodo}', cuerpo.encode('utf-8'), headers)
+                respuesta = conn.getresponse()
+                datos = respuesta.read()
+                break
+            except (http.client.HTTPException, OSError) as e:
+                self._discard_connection()
+                if intento == intentos - 1:
+                    raise ApiError(f"Servidor POS no disponible ({self.host}:{self.port}): {e}")
+
+        try:
+            payload = json.loads(datos)
+        except ValueError:
+            raise ApiError(f"Respuesta inválida del servidor (HTTP {respuesta.status})")
+        if not payload.get('ok'):
+            raise ApiError(payload.get('error') or f"HTTP {respuesta.status}")
+        resultado = decode(payload.get('result'))
+        self._publish_events(payload.get('events'))
+        return resultado
+
+    @staticmethod
+    def _publish_events(eventos):
+        # 🔥 Los eventos de la operación llegan con la respuesta: las vistas de
+        # esta terminal se enteran igual que con el servicio local
+        if not eventos:
+            return
+        bus = get_event_bus()
+        for datos in eventos:
+            try:
+                evento = decode_event(datos)
+            except (TypeError, ValueError) as e:
+                logger.warning(f"Evento del servidor POS descartado {datos!r}: {e}")
+                continue
+            if evento is not None:
+                bus.publish(evento)
+
+    def health(self):
+        """True si el servidor responde."""
+        try:
+            conn = self._connection()
+            conn.request('GET', '/health')
+            respuesta = conn.getresponse()
+            respuesta.read()
+            return respuesta.status == 200
+        except (http.client.HTTPException, OSError):
+            self._discard_connection()
+            return False
+
+
+class RemoteService:
+    """Adaptador con los métodos publicados de un servicio, ejecutados en el servidor"""
+
+    def __init__(self, nombre, client=None):
+        self._nombre = nombre
+        self._operaciones = OPERATIONS[nombre][1]
+        self._client = client or get_client()
+
+    def __getattr__(self, metodo):
+        if metodo.startswith('_') or metodo not in self._operaciones:
+            raise AttributeError(f"'{self._nombre}' no publica '{metodo}' en el servidor POS")
+
+        def llamada(*args, **kwargs):
+            return self._client.call(self._nombre, metodo, *args, **kwargs)
+
+        llamada.__name__ = metodo
+        setattr(self, metodo, llamada)
+        return llamada
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client():
+    """Devuelve el cliente compartido del proceso (requiere Config.API_URL)."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = ApiClient()
+        return _client
+
+
+def service_for(service_cls):
+    """
+    Servicio a usar desde las vistas: local o remoto según Config.API_URL.
+
+    Args:
+        service_cls: Clase del servicio local (ej: VentaService)
+
+    Returns:
+        Instancia local o RemoteService con la misma interfaz publicada
+    """
+    nombre = SERVICE_NAMES.get(service_cls)
+    if not Config.API_URL or nombre is None:
+        return service_cls()
+    return RemoteService(nombre)
@@ -0,0 +1,251 @@
+# -*- coding: utf-8 -*-
+"""
+Protocolo compartido entre el servidor POS y los terminales
+
+Define qué operaciones de servicio se publican (y si leen o escriben) y cómo
+viajan los valores de retorno en JSON sin perder su forma: ``Result`` se
+reconstruye como Result y las filas con nombre (namedtuple de BaseModel)
+como filas con los mismos campos, así las vistas no notan la diferencia
+entre el servicio local y el remoto.
+
+Los eventos del dominio (core/events.py) que publicó una operación viajan en
+la respuesta junto al resultado, para que la terminal los publique en su
+propio bus.
+"""
+import base64
+from datetime import date, datetime
+from core.base_model import row_type
+from core.events import EVENT_TYPES
+from core.response import Result
+from services.venta_service import VentaService
+from services.attendance_service import AttendanceService
+from services.payment_service import PaymentService
+from services.caja_service import CajaService
+from services.gasto_service import GastoService
+from services.producto_service import ProductoService
+from services.member_service import MemberService
+from services.benefit_service import BenefitService
+from services.plan_service import PlanService
+from services.category_service import CategoryService
+from services.combo_service import ComboService
+from services.note_service import NoteService
+from services.measurement_service import MeasurementService
+from services.proveedor_service import ProveedorService
+from services.inventario_service import InventarioService
+
+READ = 'read'
+WRITE = 'write'      # Serializada en el hilo escritor del servidor
+QUEUED = 'queued'    # Escribe vía core/write_queue (commit agrupado): corre en paralelo
+
+# nombre publicado → (clase de servicio, {método: READ | WRITE | QUEUED})
+OPERATIONS = {
+    'venta': (VentaService, {
+        'procesar_venta': QUEUED,
+        'extornar_venta': QUEUED,
+        'get_ventas': READ,
+        'get_venta_detalle': READ,
+        'get_productos_mas_vendidos': READ,
+        'get_total_ventas_periodo': READ,
+    }),
+    'attendance': (AttendanceService, {
+        'register_check_in': QUEUED,
+        'delete_last_check_in_by_code': WRITE,
+        'get_todays_log': READ,
+        'get_log_by_member_and_range': READ,
+    }),
+    'payment': (PaymentService, {
+        'process_payment': WRITE,
+        'delete_payment_by_id': WRITE,
+        'validate_membership_status': READ,
+        'get_member_payments': READ,
+        'get_payments_by_member_id': READ,
+        'get_payments_by_codigo': READ,
+        'get_payment_id_by_fecha_plan_monto': READ,
+    }),
+    'caja': (CajaService, {
+        'abrir_caja': WRITE,
+        'cerrar_caja': WRITE,
+        'registrar_movimiento': QUEUED,
+        'registrar_remesa': QUEUED,
+        'get_sesion_abierta': READ,
+        'get_totales_sesion': READ,
+        'get_saldos_actuales': READ,
+        'get_movimientos_hoy': READ,
+        'get_movimientos': READ,
+    }),
+    'gasto': (GastoService, {
+        'registrar_gasto': WRITE,
+        'anular_gasto': WRITE,
+        'get_gastos': READ,
+        'get_gastos_hoy': READ,
+        'get_total_periodo': READ,
+        'get_tipos_gasto': READ,
+    }),
+    'producto': (ProductoService, {
+        'get_all_productos': READ,
+        'get_productos_by_ids': READ,
+        'get_producto': READ,
+        'search_productos': READ,
+        'get_categorias': READ,
+        'create_producto': WRITE,
+        'update_producto': WRITE,
+    }),
+    'proveedor': (ProveedorService, {
+        'get_all': READ,
+        'guardar_proveedor': WRITE,
+        'eliminar_proveedor': WRITE,
+    }),
+    'inventario': (InventarioService, {
+        'registrar_movimiento': QUEUED,
+        'get_movimientos_producto': READ,
+    }),
+    'member': (MemberService, {
+        'find_member_by_identifier': READ,
+        'get_members_page': READ,
+        'count_members': READ,
+        'search': READ,
+        'register_member': WRITE,
+        'update_member_profile': WRITE,
+        'update_member_photo': WRITE,
+        'delete_member': WRITE,
+    }),
+    'plan': (PlanService, {
+        'get_all_plans': READ,
+        'get_plan': READ,
+        'create_plan': WRITE,
+        'update_plan': WRITE,
+        'delete_plan': WRITE,
+    }),
+    'combo': (ComboService, {
+        'register_combo_payment': WRITE,
+    }),
+    'category': (CategoryService, {
+        'get_all_categories': READ,
+        'get_category_by_id': READ,
+        'get_category_stats': READ,
+        'create_category': WRITE,
+        'update_category': WRITE,
+    }),
+    'benefit': (BenefitService, {
+        'get_member_benefits': READ,
+        'get_member_category': READ,
+        'get_all_benefit_types': READ,
+        'get_category_benefits': READ,
+        'get_next_benefit_code': READ,
+        'configure_benefit': WRITE,
+        'create_benefit_type': WRITE,
+        'update_benefit_type': WRITE,
+        'delete_benefit_type': WRITE,
+    }),
+    'note': (NoteService, {
+        'add_note': WRITE,
+        'get_notes': READ,
+        'delete_note': WRITE,
+    }),
+    'measurement': (MeasurementService, {
+        'add_measurement': WRITE,
+        'get_measurements': READ,
+        'delete_measurement': WRITE,
+    }),
+}
+
+SERVICE_NAMES = {cls: nombre for nombre, (cls, _) in OPERATIONS.items()}
+
+
+def _is_row(obj):
+    return isinstance(obj, tuple) and hasattr(obj, '_fields')
+
+
+def encode(obj):
+    """
+    Convierte un valor de retorno de servicio a algo serializable en JSON.
+
+    Args:
+        obj: Result, filas, dict, list, escalares, fechas o bytes
+
+    Returns:
+        Any: Estructura JSON (ver decode para la operación inversa)
+    """
+    if obj is None or isinstance(obj, (str, int, float, bool)):
+        return obj
+    if isinstance(obj, Result):
+        return {'__result__': encode(obj.to_dict())}
+    if _is_row(obj):
+        return {'__row__': list(obj._fields), 'values': [encode(v) for v in obj]}
+    if isinstance(obj, list) and obj and _is_row(obj[0]) \
+            and all(type(fila) is type(obj[0]) for fila in obj):
+        # Lista de filas de la misma consulta: los campos viajan una sola vez
+        return {'__rows__': list(obj[0]._fields),
+                'values': [[encode(v) for v in fila] for fila in obj]}
+    if isinstance(obj, (list, tuple)):
+        return [encode(v) for v in obj]
+    if isinstance(obj, dict):
+        if all(isinstance(k, str) for k in obj):
+            return {k: encode(v) for k, v in obj.items()}
+        # JSON solo admite claves str: se conservan las claves int (ej: ids)
+        return {'__dict__': [[encode(k), encode(v)] for k, v in obj.items()]}
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    if isinstance(obj, bytes):
+        return {'__bytes__': base64.b64encode(obj).decode('ascii')}
+    return str(obj)
+
+
+def decode(obj):
+    """
+    Reconstruye un valor codificado con encode.
+
+    Args:
+        obj: Estructura JSON recibida
+
+    Returns:
+        Any: Valor equivalente al original
+    """
+    if isinstance(obj, list):
+        return [decode(v) for v in obj]
+    if not isinstance(obj, dict):
+        return obj
+    if '__result__' in obj:
+        return Result(**decode(obj['__result__']))
+    if '__row__' in obj:
+        return row_type(tuple(obj['__row__']))._make(decode(v) for v in obj['values'])
+    if '__rows__' in obj:
+        make = row_type(tuple(obj['__rows__']))._make
+        return [make(decode(v) for v in fila) for fila in obj['values']]
+    if '__dict__' in obj:
+        return {decode(k): decode(v) for k, v in obj['__dict__']}
+    if '__bytes__' in obj:
+        return base64.b64decode(obj['__bytes__'])
+    return {k: decode(v) for k, v in obj.items()}
+
+
+def encode_event(event):
+    """
+    Codifica un evento del dominio como {'type': nombre, 'fields': {...}}.
+
+    Args:
+        event: Instancia de una clase de core.events.EVENT_TYPES
+
+    Returns:
+        dict: Estructura JSON (ver decode_event)
+    """
+    return {
+        'type': type(event).__name__,
+        'fields': {k: encode(getattr(event, k)) for k in event.__slots__},
+    }
+
+
+def decode_event(obj):
+    """
+    Reconstruye un evento codificado con encode_event.
+
+    Args:
+        obj: Estructura JSON recibida
+
+    Returns:
+        Event o None si el tipo no se conoce (servidor más nuevo que la terminal)
+    """
+    cls = EVENT_TYPES.get(obj.get('type'))
+    if cls is None:
+        return None
+    return cls(**decode(obj.get('fields', {})))
@@ -0,0 +1,263 @@
+# -*- coding: utf-8 -*-
+"""
+Servidor POS local para varios terminales de recepción
+
+Corre en la PC que tiene ``gym_db.sqlite`` en su disco local y es el único
+proceso que abre la BD. Los demás terminales (recepción, Market, check-in)
+hablan con él por HTTP/JSON en la red del gimnasio en lugar de abrir la BD
+en una carpeta compartida, que es lo que la bloquea y la corrompe.
+
+- Las lecturas corren en un grupo de hilos (cada uno toma una conexión del
+  pool, en WAL leen en paralelo).
+- Las escrituras que ya pasan por la cola de escritura (QUEUED: ventas,
+  check-ins, caja) se encolan desde varios hilos a la vez, así las de
+  distintos terminales comparten commit (ver core/write_queue.py).
+- El resto de las escrituras van a un único hilo escritor: nunca hay dos
+  de ellas compitiendo por el lock de escritura de SQLite.
+
+Protocolo:
+    GET  /health
+    POST /rpc/<servicio>/<metodo>   {"args": [...], "kwargs": {...}}
+    →    {"ok": true, "result": ..., "events": [...]} | {"ok": false, "error": "..."}
+
+"events" lleva los eventos del dominio que publicó la operación (ver
+core/events.py); la terminal los publica en su bus local.
+
+Fuera de localhost el servidor exige Config.API_TOKEN: sin él cualquier
+equipo de la red podría anular ventas o borrar pagos.
+
+Uso:
+    python -m api.server [puerto]
+"""
+import asyncio
+import hmac
+import ipaddress
+import json
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from core.config import Config
+from core.logger import logger
+from core.event_bus import get_event_bus
+from api.protocol import OPERATIONS, READ, WRITE, encode, decode, encode_event
+
+MAX_BODY = 1024 * 1024
+REASONS = {200: 'OK', 400: 'Bad Request', 401: 'Unauthorized', 404: 'Not Found',
+           405: 'Method Not Allowed', 413: 'Payload Too Large', 500: 'Internal Server Error'}
+
+
+def _es_local(host):
+    """True si el host solo escucha en la propia PC (loopback)."""
+    if host == 'localhost':
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+class _BadRequest(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class PosServer:
+    """Servidor HTTP/JSON asyncio que publica los servicios de OPERATIONS"""
+
+    def __init__(self, host=None, port=None, token=None, readers=None):
+        self.host = host or Config.API_HOST
+        self.port = port or Config.API_PORT
+        self.token = token if token is not None else Config.API_TOKEN
+        self._readers = ThreadPoolExecutor(
+            max_workers=readers or Config.API_READERS, thread_name_prefix='ApiReader'
+        )
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix='ApiWriter')
+        self._submitters = ThreadPoolExecutor(
+            max_workers=readers or Config.API_READERS, thread_name_prefix='ApiQueued'
+        )
+        self._services = {nombre: cls() for nombre, (cls, _) in OPERATIONS.items()}
+        self._server = None
+        self.stats = {'requests': 0, 'reads': 0, 'writes': 0, 'errors': 0}
+
+    # ------------------------------------------------------------------
+    # Ciclo de vida
+    # ------------------------------------------------------------------
+
+    async def start(self):
+        """
+        Abre el socket de escucha.
+
+        Raises:
+            RuntimeError: Host accesible desde la red sin API_TOKEN
+        """
+        if not self.token and not _es_local(self.host):
+            raise RuntimeError(
+                f"El servidor POS no escucha en {self.host} sin API_TOKEN: "
+                f"defina Config.API_TOKEN o use API_HOST = '127.0.0.1'"
+            )
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        puertos = ', '.join(str(s.getsockname()[:2]) for s in self._server.sockets)
+        logger.info(f"Servidor POS escuchando en {puertos}")
+
+    async def serve_forever(self):
+        await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def stop(self):
+        """Deja de aceptar conexiones y espera a que terminen las operaciones en curso."""
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        self._readers.shutdown(wait=True)
+        self._writer.shutdown(wait=True)
+        self._submitters.shutdown(wait=True)
+        logger.info(f"Servidor POS detenido: {self.stats}")
+
+    # ------------------------------------------------------------------
+    # HTTP
+    # ------------------------------------------------------------------
+
+    async def _handle(self, reader, writer):
+        try:
+            while True:
+                try:
+                    request_line = await asyncio.wait_for(
+                        reader.readline(), timeout=Config.API_IDLE_TIMEOUT
+                    )
+                except asyncio.TimeoutError:
+                    break
+                if not request_line:
+                    break
+
+                metodo, ruta, version = request_line.decode('latin-1').split()
+                headers = {}
+                while True:
+                    linea = await reader.readline()
+                    if linea in (b'\r\n', b'\n', b''):
+                        break
+                    clave, _, valor = linea.decode('latin-1').partition(':')
+                    headers[clave.strip().lower()] = valor.strip()
+
+                largo = int(headers.get('content-length') or 0)
+                if largo > MAX_BODY:
+                    await self._respond(writer, 413, {'ok': False, 'error': 'Cuerpo demasiado grande'}, False)
+                    break
+                cuerpo = await reader.readexactly(largo) if largo else b''
+
+                status, payload = await self._dispatch(metodo, ruta, headers, cuerpo)
+                keep_alive = (version == 'HTTP/1.1'
+                              and headers.get('connection', '').lower() != 'close')
+                await self._respond(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def _respond(self, writer, status, payload, keep_alive):
+        cuerpo = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        cabecera = (
+            f"HTTP/1.1 {status} {REASONS[status]}\r\n"
+            f"Content-Type: application/json; charset=utf-8\r\n"
+            f"Content-Length: {len(cuerpo)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+        )
+        writer.write(cabecera.encode('latin-1') + cuerpo)
+        await writer.drain()
+
+    async def _dispatch(self, metodo, ruta, headers, cuerpo):
+        self.stats['requests'] += 1
+        try:
+            if ruta == '/health':
+                return 200, {'ok': True}
+
+            if self.token and not hmac.compare_digest(
+                    headers.get('x-gym-token', ''), self.token):
+                raise _BadRequest(401, 'Token inválido')
+
+            partes = ruta.strip('/').split('/')
+            if len(partes) != 3 or partes[0] != 'rpc':
+                raise _BadRequest(404, f'Ruta desconocida: {ruta}')
+            if metodo != 'POST':
+                raise _BadRequest(405, 'Use POST')
+
+            _, servicio, operacion = partes
+            tipo = OPERATIONS.get(servicio, (None, {}))[1].get(operacion)
+            if tipo is None:
+                raise _BadRequest(404, f'Operación no publicada: {servicio}.{operacion}')
+
+            try:
+                peticion = json.loads(cuerpo or b'{}')
+                args = decode(peticion.get('args', []))
+                kwargs = decode(peticion.get('kwargs', {}))
+            except (ValueError, AttributeError) as e:
+                raise _BadRequest(400, f'JSON inválido: {e}')
+
+            funcion = getattr(self._services[servicio], operacion)
+            if tipo == READ:
+                self.stats['reads'] += 1
+                executor = self._readers
+            else:
+                self.stats['writes'] += 1
+                executor = self._writer if tipo == WRITE else self._submitters
+
+            loop = asyncio.get_running_loop()
+            if tipo == READ:
+                resultado = await loop.run_in_executor(executor, lambda: funcion(*args, **kwargs))
+                return 200, {'ok': True, 'result': encode(resultado)}
+
+            def _escribir():
+                # Los eventos se capturan en el hilo que ejecuta la operación
+                with get_event_bus().capture() as eventos:
+                    return funcion(*args, **kwargs), eventos
+
+            resultado, eventos = await loop.run_in_executor(executor, _escribir)
+            return 200, {'ok': True, 'result': encode(resultado),
+                         'events': [encode_event(e) for e in eventos]}
+
+        except _BadRequest as e:
+            self.stats['errors'] += 1
+            return e.status, {'ok': False, 'error': str(e)}
+        except Exception as e:
+            self.stats['errors'] += 1
+            logger.error(f"Error en {ruta}: {e}")
+            return 500, {'ok': False, 'error': str(e)}
+
+
+def main(argv=None):
+    from core.database_manager import (
+        create_initial_tables, close_pool, start_maintenance, stop_maintenance
+    )
+    from core.write_queue import stop_write_queue
+
+    argv = sys.argv[1:] if argv is None else argv
+    servidor = PosServer(port=int(argv[0]) if argv else None)
+
+    create_initial_tables()
+    start_maintenance()
+
+    async def _run():
+        try:
+            await servidor.serve_forever()
+        finally:
+            await servidor.stop()
+
+    try:
+        asyncio.run(_run())
+    except KeyboardInterrupt:
+        pass
+    except RuntimeError as e:
+        logger.error(str(e))
+        return 1
+    finally:
+        stop_maintenance()
+        stop_write_queue()
+        close_pool()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,9 +1,43 @@
 # -*- coding: utf-8 -*-
 import sqlite3
-from typing import Any, List, Optional, Tuple
+from collections import namedtuple
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+from itertools import chain, islice
+from operator import itemgetter
+from typing import Any, Iterable, List, Optional, Tuple
 from contextlib import contextmanager
-from core.database_manager import get_connection
+from core.config import Config
+from core.database_manager import get_pool
 from core.logger import logger
+from core.query_stats import get_query_stats
+from core.write_queue import after_commit, run_write
+
+
+@lru_cache(maxsize=512)
+def row_type(columns: Tuple[str, ...]):
+    # 🔥 Una clase de fila por forma de consulta (tupla de nombres de columna).
+    # namedtuple no tiene __dict__ por instancia: ocupa lo mismo que la tupla
+    # cruda y sigue admitiendo acceso por posición, así que el código que
+    # indexa por número sigue funcionando. Columnas sin alias válido
+    # (ej: COUNT(*)) quedan como _0, _1...
+    return namedtuple('Row', columns, rename=True)
+
+
+def fetch_rows(cursor: sqlite3.Cursor, one: bool = False) -> Any:
+    # Convierte el resultado del cursor en filas con nombre de campo
+    if one:
+        row = cursor.fetchone()
+        if row is None:
+            return None
+        return row_type(tuple(d[0] for d in cursor.description))._make(row)
+
+    rows = cursor.fetchall()
+    if not rows:
+        return rows
+    make = row_type(tuple(d[0] for d in cursor.description))._make
+    return list(map(make, rows))
+
 
 class BaseModel:
     # Whitelist de tablas permitidas
@@ -19,10 +53,12 @@ class BaseModel:
     
     def __init__(self):
         self.logger = logger
+        self.query_stats = get_query_stats()
     
     @contextmanager
     def get_db_connection(self):
-        conn = get_connection()
+        pool = get_pool()
+        conn = pool.acquire()
         try:
             yield conn
         except Exception as e:
@@ -30,7 +66,28 @@ class BaseModel:
             self.logger.error(f"Error en transacción BD: {e}")
             raise
         finally:
-            conn.close()
+            pool.release(conn)
+    
+    def run_write(self, job):
+        # 🔥 Escritura vía la cola de commit agrupado: job(conn) escribe con la
+        # conexión que recibe y no hace commit; ver core/write_queue.py
+        return run_write(job)
+    
+    @staticmethod
+    def day_range(desde, hasta=None) -> Tuple[str, str]:
+        # 🔥 Rango de días cerrado [desde, hasta] → límites semiabiertos
+        # [desde, hasta + 1 día) para comparar la columna de fecha/hora sin
+        # envolverla en DATE(), de modo que SQLite use el índice por rango.
+        def _dia(valor):
+            if isinstance(valor, datetime):
+                return valor.date()
+            if isinstance(valor, date):
+                return valor
+            return datetime.strptime(str(valor)[:10], "%Y-%m-%d").date()
+
+        inicio = _dia(desde)
+        fin = _dia(hasta) if hasta is not None else inicio
+        return inicio.isoformat(), (fin + timedelta(days=1)).isoformat()
     
     def _validate_table(self, table: str) -> None:
         if table not in self.ALLOWED_TABLES:
@@ -45,29 +102,45 @@ class BaseModel:
         commit: bool = False,
         connection: sqlite3.Connection = None
     ) -> Any:
+        # 🔥 Cada sentencia se mide completa (execute + fetch/commit) junto con
+        # las filas devueltas; ver core/query_stats.py
         # Modo Transacción Externa
         if connection:
-            cursor = connection.cursor()
-            cursor.execute(query, params or ())
-            if fetch_one:
-                return cursor.fetchone()
-            if fetch_all:
-                return cursor.fetchall()
-            return cursor.lastrowid if cursor.lastrowid else True
+            with self.query_stats.track(query, params, connection) as medicion:
+                cursor = connection.cursor()
+                cursor.execute(query, params or ())
+                if fetch_one:
+                    row = fetch_rows(cursor, one=True)
+                    medicion.rows = 0 if row is None else 1
+                    return row
+                if fetch_all:
+                    rows = fetch_rows(cursor)
+                    medicion.rows = len(rows)
+                    return rows
+                medicion.rows = cursor.rowcount
+                return cursor.lastrowid if cursor.lastrowid else True
 
-        # Modo Autoconsumo
+        # Modo Autoconsumo con commit: la escritura es un trabajo de la cola
+        # de escritura (core/write_queue.py), no una transacción propia
+        if commit:
+            return self.run_write(lambda conn: self.execute_query(
+                query, params, fetch_all=False, connection=conn
+            ))
+        
+        # Modo Autoconsumo (lectura)
         with self.get_db_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute(query, params or ())
-            
-            if commit:
-                conn.commit()
-                return cursor.lastrowid if cursor.lastrowid else True
-            
-            if fetch_one:
-                return cursor.fetchone()
-            if fetch_all:
-                return cursor.fetchall()
+            with self.query_stats.track(query, params, conn) as medicion:
+                cursor = conn.cursor()
+                cursor.execute(query, params or ())
+                
+                if fetch_one:
+                    row = fetch_rows(cursor, one=True)
+                    medicion.rows = 0 if row is None else 1
+                    return row
+                if fetch_all:
+                    rows = fetch_rows(cursor)
+                    medicion.rows = len(rows)
+                    return rows
             
             return cursor
     
@@ -82,6 +155,7 @@ class BaseModel:
             return self.execute_query(
                 query, 
                 tuple(data.values()),
+                fetch_all=False,
                 commit=(connection is None),
                 connection=connection
             )
@@ -98,16 +172,7 @@ class BaseModel:
         
         params = tuple(data.values()) + tuple(where.values())
         
-        if connection:
-            cursor = connection.cursor()
-            cursor.execute(query, params)
-            return cursor.rowcount > 0
-        
-        with self.get_db_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute(query, params)
-            conn.commit()
-            return cursor.rowcount > 0
+        return self._execute_write(query, params, connection)
     
     def delete(self, table: str, where: dict, connection: sqlite3.Connection = None) -> bool:
         self._validate_table(table)
@@ -115,44 +180,82 @@ class BaseModel:
         where_clause = ' AND '.join([f"{k} = ?" for k in where.keys()])
         query = f"DELETE FROM {table} WHERE {where_clause}"
         
+        return self._execute_write(query, tuple(where.values()), connection)
+
+    def _execute_write(self, query: str, params: Tuple, connection: sqlite3.Connection = None) -> bool:
+        # UPDATE / DELETE medidos con las filas afectadas
         if connection:
-            cursor = connection.cursor()
-            cursor.execute(query, tuple(where.values()))
+            with self.query_stats.track(query, params, connection) as medicion:
+                cursor = connection.cursor()
+                cursor.execute(query, params)
+                medicion.rows = cursor.rowcount
             return cursor.rowcount > 0
 
-        with self.get_db_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute(query, tuple(where.values()))
-            conn.commit()
-            return cursor.rowcount > 0
+        return self.run_write(lambda conn: self._execute_write(query, params, conn))
 
-    def bulk_insert(self, table: str, records: List[dict], connection: sqlite3.Connection = None) -> List[int]:
-        if not records:
-            raise ValueError("La lista de registros no puede estar vacía")
-        
+    def bulk_insert(self, table: str, records: Iterable[dict], connection: sqlite3.Connection = None,
+                    chunk_size: int = None) -> List[int]:
+        # 🔥 executemany por bloques en una sola transacción. Acepta generadores:
+        # solo se tiene en memoria un bloque de registros a la vez.
+        # executemany no devuelve lastrowid (ni filas de RETURNING), así que los
+        # ids se infieren: dentro de la transacción nadie más puede insertar y
+        # SQLite asigna rowids consecutivos, por lo que el bloque ocupa
+        # (last_insert_rowid() - n + 1 .. last_insert_rowid()).
+        # Invariante: sin 'id' explícito y con la transacción abierta (trabajo
+        # de run_write o transacción del llamador); se verifica en cada bloque.
+        # Si los registros traen 'id' explícito se devuelven esos.
         self._validate_table(table)
         
-        columns = list(records[0].keys())
+        records = iter(records)
+        first = next(records, None)
+        if first is None:
+            raise ValueError("La lista de registros no puede estar vacía")
+        
+        columns = list(first.keys())
         placeholders = ', '.join(['?'] * len(columns))
         query = f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({placeholders})"
         
-        inserted_ids = []
+        values_of = itemgetter(*columns)
+        if len(columns) == 1:
+            values_of = lambda record, _get=values_of: (_get(record),)
+        explicit_ids = 'id' in columns
+        chunk_size = chunk_size or Config.DB_BULK_CHUNK_SIZE
         
-        # Lógica unificada para transacción externa o interna
-        if connection:
-            cursor = connection.cursor()
-            for record in records:
-                values = tuple(record[col] for col in columns)
-                cursor.execute(query, values)
-                inserted_ids.append(cursor.lastrowid)
-        else:
-            with self.get_db_connection() as conn:
-                cursor = conn.cursor()
-                for record in records:
-                    values = tuple(record[col] for col in columns)
-                    cursor.execute(query, values)
-                    inserted_ids.append(cursor.lastrowid)
-                conn.commit()
+        def _run(conn, medicion):
+            inserted_ids = []
+            cursor = conn.cursor()
+            pending = chain((first,), records)
+            while True:
+                chunk = list(islice(pending, chunk_size))
+                if not chunk:
+                    break
+                cursor.executemany(query, map(values_of, chunk))
+                if explicit_ids:
+                    inserted_ids.extend(record['id'] for record in chunk)
+                else:
+                    if not conn.in_transaction:
+                        # Cada fila confirmó por su cuenta: otro escritor pudo intercalarse
+                        raise sqlite3.ProgrammingError(
+                            f"bulk_insert en {table} fuera de una transacción: no se pueden inferir los ids"
+                        )
+                    last_id = conn.execute("SELECT last_insert_rowid()").fetchone()[0]
+                    inserted_ids.extend(range(last_id - len(chunk) + 1, last_id + 1))
+            medicion.rows = len(inserted_ids)
+            return inserted_ids
+        
+        def _tracked(conn):
+            with self.query_stats.track(query, values_of(first), conn) as medicion:
+                return _run(conn, medicion)
+        
+        try:
+            if connection:
+                inserted_ids = _tracked(connection)
+            else:
+                inserted_ids = self.run_write(_tracked)
+        except sqlite3.IntegrityError as e:
+            self.logger.error(f"Error de integridad en bulk insert en {table}: {e}")
+            raise ValueError(f"Error de integridad: {e}")
         
-        self.logger.info(f"Bulk insert: {len(inserted_ids)} registros en {table}")
-        return inserted_ids
\ No newline at end of file
+        # Con transacción del llamador, recién se loguea si llega a confirmarse
+        after_commit(lambda: self.logger.info(f"Bulk insert: {len(inserted_ids)} registros en {table}"))
+        return inserted_ids
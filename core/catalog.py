@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+"""
+Caché en memoria de catálogos (planes, categorías, matriz de beneficios)
+
+Los catálogos casi no cambian pero se leen en cada pago y al abrir cada
+diálogo. Cada catálogo se carga una vez con la función del modelo dueño de
+la tabla (las tablas simples se indexan por id y por nombre) y se invalida
+desde las escrituras del mismo modelo. El caché es único por proceso y lo
+comparten todos los servicios.
+"""
+import threading
+from core.logger import logger
+
+
+class CatalogTable:
+    """Instantánea inmutable de un catálogo con índices por id y nombre"""
+
+    __slots__ = ('rows', 'by_id', 'by_name')
+
+    def __init__(self, rows):
+        # Convención de los catálogos: columna 0 = id, columna 1 = nombre
+        self.rows = tuple(rows)
+        self.by_id = {row[0]: row for row in self.rows}
+        self.by_name = {row[1]: row for row in self.rows}
+
+
+class CatalogCache:
+    """Caché versionado de catálogos con invalidación explícita"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._tables = {}
+        self._versions = {}
+
+    def get(self, name, builder):
+        """
+        Devuelve el catálogo, construyéndolo con ``builder`` si no está en caché.
+
+        Args:
+            name: Nombre del catálogo (ej: 'benefit_matrix')
+            builder: Función sin argumentos que construye el objeto a cachear
+
+        Returns:
+            Any: Objeto construido por ``builder`` (tratarlo como inmutable)
+        """
+        with self._lock:
+            valor = self._tables.get(name)
+            version = self._versions.get(name, 0)
+        if valor is not None:
+            return valor
+
+        # La carga va fuera del lock (usa una conexión del pool); si hubo una
+        # invalidación mientras tanto, la instantánea se usa pero no se guarda
+        valor = builder()
+        with self._lock:
+            if self._versions.get(name, 0) == version:
+                self._tables[name] = valor
+        return valor
+
+    def table(self, name, loader):
+        """
+        Devuelve un catálogo de filas indexado por id y nombre.
+
+        Args:
+            name: Nombre del catálogo (ej: 'plans')
+            loader: Función sin argumentos que devuelve todas las filas
+
+        Returns:
+            CatalogTable: Instantánea del catálogo
+        """
+        return self.get(name, lambda: CatalogTable(loader()))
+
+    def invalidate(self, name):
+        """
+        Descarta un catálogo; la próxima lectura lo recarga.
+
+        Args:
+            name: Nombre del catálogo
+        """
+        with self._lock:
+            self._tables.pop(name, None)
+            self._versions[name] = self._versions.get(name, 0) + 1
+        logger.debug(f"Catálogo invalidado: {name}")
+
+    def version(self, name):
+        """
+        Versión actual de un catálogo (aumenta con cada invalidación).
+
+        Args:
+            name: Nombre del catálogo
+
+        Returns:
+            int: Versión
+        """
+        with self._lock:
+            return self._versions.get(name, 0)
+
+    def clear(self):
+        """Descarta todos los catálogos."""
+        with self._lock:
+            for name in list(self._tables):
+                self._versions[name] = self._versions.get(name, 0) + 1
+            self._tables.clear()
+
+
+_catalog = CatalogCache()
+
+
+def get_catalog():
+    """Devuelve el caché de catálogos compartido del proceso."""
+    return _catalog
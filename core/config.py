@@ -9,6 +9,84 @@ class Config:
     # Base de datos
     DB_NAME = 'gym_db.sqlite'
     
+    # Pool de conexiones
+    DB_POOL_SIZE = 8                  # Conexiones simultáneas máximas
+    DB_POOL_TIMEOUT = 5.0             # Segundos de espera por una conexión libre
+    DB_POOL_MAX_AGE = 600             # Segundos antes de reciclar una conexión
+    DB_POOL_HEALTH_CHECK_AFTER = 30   # Segundos inactiva antes de verificarla
+    DB_BULK_CHUNK_SIZE = 500          # Registros por executemany en bulk_insert
+    
+    # Cola de escritura con commit agrupado (core/write_queue.py)
+    DB_WRITE_QUEUE = True             # False: cada escritura confirma por su cuenta
+    DB_GROUP_COMMIT_MS = 3            # Ventana para juntar trabajos en una transacción
+    DB_GROUP_COMMIT_MAX = 64          # Trabajos máximos por transacción
+    
+    # Perfil de almacenamiento (PRAGMA aplicados a cada conexión)
+    DB_STORAGE_PROFILE = 'desktop'
+    STORAGE_PROFILES = {
+        # PC de recepción con disco local: WAL permite leer mientras se escribe
+        'desktop': {
+            'journal_mode': 'WAL',
+            'synchronous': 'NORMAL',
+            'cache_size': -16000,       # KiB (negativo) → ~16 MB de caché
+            'mmap_size': 134217728,     # 128 MB
+            'temp_store': 'MEMORY',
+            'busy_timeout': 5000,       # ms
+        },
+        # Máxima durabilidad ante cortes de luz
+        'safe': {
+            'journal_mode': 'WAL',
+            'synchronous': 'FULL',
+            'cache_size': -8000,
+            'mmap_size': 0,
+            'temp_store': 'MEMORY',
+            'busy_timeout': 5000,
+        },
+        # BD en carpeta de red: WAL no funciona sobre sistemas de archivos remotos
+        'network_share': {
+            'journal_mode': 'DELETE',
+            'synchronous': 'FULL',
+            'cache_size': -8000,
+            'mmap_size': 0,
+            'temp_store': 'MEMORY',
+            'busy_timeout': 10000,
+        },
+    }
+    
+    # Mantenimiento en segundo plano
+    DB_CHECKPOINT_INTERVAL = 60       # Segundos entre wal_checkpoint
+    DB_OPTIMIZE_INTERVAL = 3600       # Segundos entre PRAGMA optimize
+    
+    # Instrumentación de consultas
+    DB_QUERY_STATS = True             # Medir cada sentencia (histogramas en memoria)
+    DB_SLOW_QUERY_MS = 100            # Umbral del log de consultas lentas
+    DB_SLOW_QUERY_LOG = 'slow_queries.log'
+    DB_QUERY_STATS_TOP = 20           # Sentencias listadas en el resumen / panel
+    
+    # Modo kiosco / torniquete
+    KIOSK_FLUSH_INTERVAL_MS = 500        # Cada cuánto se escriben las entradas en lote
+    KIOSK_SNAPSHOT_TTL = 60              # Segundos de validez de la instantánea de membresías
+    KIOSK_SPILL_FILE = 'kiosk_spill.jsonl'
+    KIOSK_SPILL_FSYNC = False            # True: fsync por marcación (sobrevive cortes de luz)
+    
+    # Servidor POS multi-terminal (python -m api.server en la PC de la BD)
+    API_URL = None                       # En terminales: ej 'http://192.168.1.10:8765'
+    API_HOST = '127.0.0.1'               # Para atender terminales: '0.0.0.0' (exige API_TOKEN)
+    API_PORT = 8765
+    API_TOKEN = None                     # Clientes y servidor deben coincidir
+    API_TIMEOUT = 10                     # Segundos de espera por respuesta
+    API_IDLE_TIMEOUT = 30                # Segundos antes de cerrar conexiones inactivas
+    API_READERS = 4                      # Hilos de lectura del servidor
+    
+    # Vistas: consultas en segundo plano (ui/async_bridge.py)
+    UI_WORKER_THREADS = 4                # Hilos para llamadas de servicio desde la GUI
+    UI_SEARCH_DEBOUNCE_MS = 150          # Espera tras la última tecla antes de buscar
+    UI_CAJA_POLL_MS = 2000               # Sondeo de caja en el Market (solo con API_URL)
+    UI_FETCH_BATCH = 500                 # Filas por lote al hacer scroll en las grillas
+    UI_EVENT_DEBOUNCE_MS = 200           # Junta ráfagas de eventos (kiosco) en una recarga
+    CATALOG_INDEX_TTL = 300              # Segundos antes de recargar completo el índice del Market
+    STARTUP_BENCH_LOG = 'startup_bench.jsonl'  # Historial de python main.py --bench-startup
+
     # Formatos de fecha
     DATE_FORMAT = '%Y-%m-%d'
     DATETIME_FORMAT = '%Y-%m-%d %H:%M:%S'
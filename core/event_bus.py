@@ -0,0 +1,199 @@
+# -*- coding: utf-8 -*-
+"""
+Bus de eventos del proceso
+
+Los modelos y servicios publican un evento cuando una escritura quedó
+confirmada; las vistas y cachés se suscriben por tipo de evento en lugar de
+consultar la BD periódicamente. Los eventos del dominio están en
+core/events.py.
+
+Entrega:
+    - 'sync': el manejador corre en el hilo que publica, antes de que
+      publish() retorne (cachés que deben quedar al día de inmediato).
+    - 'queued': el manejador corre en el hilo despachador del bus, en orden
+      de publicación; quien publica no espera.
+    - Hilo de la GUI (Qt): ver ui/event_relay.py.
+
+Desde un trabajo de escritura (run_write) se usa publish_after_commit: el
+evento sale solo si la transacción se confirma.
+
+Uso:
+    get_event_bus().subscribe(CashBalanceChanged, on_saldos)
+    get_event_bus().publish(CashBalanceChanged(sesion, saldos))
+"""
+import queue
+import threading
+from contextlib import contextmanager
+from core.logger import logger
+
+
+class Event:
+    """Base de los eventos del dominio"""
+
+    __slots__ = ()
+
+    def __repr__(self):
+        campos = ', '.join(f"{k}={getattr(self, k)!r}" for k in self.__slots__)
+        return f"{type(self).__name__}({campos})"
+
+
+class EventBus:
+    """Publicación/suscripción por tipo de evento, segura entre hilos"""
+
+    MODES = ('sync', 'queued')
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._handlers = {}     # tipo de evento → tupla de (manejador, modo) (copia al modificar)
+        self._pendientes = queue.Queue()
+        self._despachador = None
+        self._local = threading.local()
+        self.stats = {'published': 0, 'delivered': 0, 'errors': 0}
+
+    def subscribe(self, event_type, handler, mode='sync'):
+        """
+        Registra un manejador para un tipo de evento (y sus subclases).
+
+        Args:
+            event_type: Clase del evento (Event recibe todos)
+            handler: ``handler(evento)``
+            mode: 'sync' (en el hilo que publica) o 'queued' (en el hilo
+                  despachador del bus)
+
+        Returns:
+            callable: El mismo handler (para unsubscribe)
+        """
+        if mode not in self.MODES:
+            raise ValueError(f"Modo de entrega inválido: {mode}")
+        with self._lock:
+            self._handlers[event_type] = self._handlers.get(event_type, ()) + ((handler, mode),)
+            if mode == 'queued' and self._despachador is None:
+                self._despachador = threading.Thread(
+                    target=self._despachar, name="EventBus", daemon=True
+                )
+                self._despachador.start()
+        return handler
+
+    def unsubscribe(self, event_type, handler):
+        """Quita un manejador (no falla si no estaba registrado)."""
+        with self._lock:
+            actuales = self._handlers.get(event_type, ())
+            restantes = tuple(par for par in actuales if par[0] is not handler)
+            if restantes:
+                self._handlers[event_type] = restantes
+            else:
+                self._handlers.pop(event_type, None)
+
+    def has_subscribers(self, event_type):
+        """
+        True si alguien recibiría un evento de este tipo.
+
+        Sirve para no armar el evento (ni consultar la BD) cuando nadie escucha.
+        """
+        if getattr(self._local, 'capturados', None) is not None:
+            return True
+        handlers = self._handlers
+        return any(t in handlers for t in event_type.__mro__)
+
+    def publish(self, event):
+        """
+        Entrega el evento a los manejadores de su tipo y de sus clases base.
+
+        El error de un manejador se registra en el log y no afecta a los demás
+        ni a quien publica (la escritura ya está confirmada).
+
+        Args:
+            event: Instancia de Event
+        """
+        capturados = getattr(self._local, 'capturados', None)
+        if capturados is not None:
+            capturados.append(event)
+        handlers = self._handlers
+        self.stats['published'] += 1
+        encolar = False
+        for tipo in type(event).__mro__:
+            for handler, mode in handlers.get(tipo, ()):
+                if mode == 'queued':
+                    encolar = True
+                else:
+                    self._entregar(handler, event)
+        if encolar:
+            self._pendientes.put(event)
+
+    def publish_after_commit(self, event):
+        """
+        Publica el evento cuando se confirme la escritura en curso.
+
+        Dentro de un trabajo de run_write espera al COMMIT (y se descarta si
+        el trabajo se revierte); fuera de una escritura publica de inmediato.
+
+        Args:
+            event: Instancia de Event
+        """
+        from core.write_queue import after_commit
+        after_commit(lambda: self.publish(event))
+
+    @contextmanager
+    def capture(self):
+        """
+        Junta los eventos publicados en este hilo mientras dura el bloque.
+
+        Los usa el servidor POS para reenviar a la terminal los eventos de la
+        operación que pidió. Mientras se captura, has_subscribers es True.
+
+        Yields:
+            list: Eventos publicados (se completa al salir del bloque)
+        """
+        anteriores = getattr(self._local, 'capturados', None)
+        capturados = self._local.capturados = []
+        try:
+            yield capturados
+        finally:
+            self._local.capturados = anteriores
+            if anteriores is not None:
+                anteriores.extend(capturados)
+
+    def join(self, timeout=None):
+        """
+        Espera a que el despachador entregue los eventos encolados.
+
+        Args:
+            timeout: Segundos máximos de espera (None = sin límite)
+
+        Returns:
+            bool: True si no quedó nada pendiente
+        """
+        if self._despachador is None:
+            return True
+        listo = threading.Event()
+        self._pendientes.put(listo)
+        return listo.wait(timeout)
+
+    def _entregar(self, handler, event):
+        try:
+            handler(event)
+            self.stats['delivered'] += 1
+        except Exception as e:
+            self.stats['errors'] += 1
+            logger.error(f"Error en manejador de {type(event).__name__}: {e}")
+
+    def _despachar(self):
+        while True:
+            event = self._pendientes.get()
+            if isinstance(event, threading.Event):
+                event.set()
+                continue
+            # Los manejadores se leen al entregar: una baja posterior ya no recibe
+            handlers = self._handlers
+            for tipo in type(event).__mro__:
+                for handler, mode in handlers.get(tipo, ()):
+                    if mode == 'queued':
+                        self._entregar(handler, event)
+
+
+_bus = EventBus()
+
+
+def get_event_bus():
+    """Devuelve el bus de eventos del proceso."""
+    return _bus
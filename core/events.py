@@ -0,0 +1,136 @@
+# -*- coding: utf-8 -*-
+"""
+Eventos del dominio publicados en el bus (core/event_bus.py)
+
+Cada evento se publica una vez confirmada la escritura que lo origina y lleva
+solo los identificadores y datos mínimos para que quien escucha decida qué
+invalidar (no la fila completa: para eso consulta su servicio).
+"""
+from core.event_bus import Event
+
+
+class CashBalanceChanged(Event):
+    """Cambió el saldo o el estado de la caja (movimiento, extorno, apertura o cierre)"""
+
+    __slots__ = ('sesion', 'saldos')
+
+    def __init__(self, sesion, saldos):
+        """
+        Args:
+            sesion: Fila de la sesión abierta o None si la caja quedó cerrada
+            saldos: Saldos por método (ver CajaModel.get_saldos_actuales) o None
+        """
+        self.sesion = sesion
+        self.saldos = saldos
+
+
+class CashMovementRecorded(Event):
+    """Se registró un movimiento de caja (ingreso o egreso)"""
+
+    __slots__ = ('movement_id', 'tipo_movimiento', 'categoria', 'metodo_pago', 'monto')
+
+    def __init__(self, movement_id, tipo_movimiento, categoria, metodo_pago, monto):
+        self.movement_id = movement_id
+        self.tipo_movimiento = tipo_movimiento
+        self.categoria = categoria
+        self.metodo_pago = metodo_pago
+        self.monto = monto
+
+
+class PaymentRegistered(Event):
+    """Se registró un pago de membresía"""
+
+    __slots__ = ('payment_id', 'miembro_id', 'plan_id', 'monto', 'fecha_vencimiento')
+
+    def __init__(self, payment_id, miembro_id, plan_id, monto, fecha_vencimiento):
+        self.payment_id = payment_id
+        self.miembro_id = miembro_id
+        self.plan_id = plan_id
+        self.monto = monto
+        self.fecha_vencimiento = fecha_vencimiento
+
+
+class PaymentDeleted(Event):
+    """Se eliminó un pago (miembro_id puede ser None si no se conoce)"""
+
+    __slots__ = ('payment_id', 'miembro_id')
+
+    def __init__(self, payment_id, miembro_id=None):
+        self.payment_id = payment_id
+        self.miembro_id = miembro_id
+
+
+class CheckInRecorded(Event):
+    """Se registró una entrada (recepción o kiosco)"""
+
+    __slots__ = ('miembro_id', 'fecha_hora')
+
+    def __init__(self, miembro_id, fecha_hora):
+        self.miembro_id = miembro_id
+        self.fecha_hora = fecha_hora
+
+
+class CheckInDeleted(Event):
+    """Se eliminó la última entrada de un miembro"""
+
+    __slots__ = ('miembro_id',)
+
+    def __init__(self, miembro_id):
+        self.miembro_id = miembro_id
+
+
+class SaleCompleted(Event):
+    """Se procesó una venta del Market"""
+
+    __slots__ = ('venta_id', 'total', 'metodo_pago', 'producto_ids')
+
+    def __init__(self, venta_id, total, metodo_pago, producto_ids):
+        self.venta_id = venta_id
+        self.total = total
+        self.metodo_pago = metodo_pago
+        self.producto_ids = tuple(producto_ids)
+
+
+class SaleCancelled(Event):
+    """Se extornó (anuló) una venta"""
+
+    __slots__ = ('venta_id',)
+
+    def __init__(self, venta_id):
+        self.venta_id = venta_id
+
+
+class StockChanged(Event):
+    """Cambió el stock de uno o más productos (venta, extorno, compra o ajuste)"""
+
+    __slots__ = ('producto_ids', 'stock')
+
+    def __init__(self, producto_ids, stock=None):
+        """
+        Args:
+            producto_ids: IDs de los productos afectados
+            stock: {producto_id: stock_nuevo} si se conoce (evita releerlo)
+        """
+        self.producto_ids = tuple(producto_ids)
+        self.stock = stock
+
+
+class ProductChanged(Event):
+    """Se creó, editó o activó/desactivó uno o más productos"""
+
+    __slots__ = ('producto_ids',)
+
+    def __init__(self, producto_ids):
+        self.producto_ids = tuple(producto_ids)
+
+
+# 🔥 Por nombre: el servidor POS los envía así a las terminales (api/)
+EVENT_TYPES = {
+    cls.__name__: cls for cls in (
+        CashBalanceChanged, CashMovementRecorded,
+        PaymentRegistered, PaymentDeleted,
+        CheckInRecorded, CheckInDeleted,
+        SaleCompleted, SaleCancelled,
+        StockChanged, ProductChanged,
+    )
+}
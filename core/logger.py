@@ -55,3 +55,31 @@ def setup_logger(name: str = 'GymManager') -> logging.Logger:
 
 # Logger global por defecto
 logger = setup_logger()
+
+
+def setup_slow_query_logger() -> logging.Logger:
+    """
+    Logger del registro de consultas lentas (archivo propio, no va a consola
+    ni al log principal)
+
+    Returns:
+        Logger configurado
+    """
+    slow_logger = logging.getLogger('GymManager.slow')
+    if slow_logger.handlers:
+        return slow_logger
+
+    slow_logger.setLevel(logging.WARNING)
+    slow_logger.propagate = False
+    try:
+        handler = logging.FileHandler(Config.DB_SLOW_QUERY_LOG, encoding='utf-8')
+        handler.setFormatter(logging.Formatter(
+            '%(asctime)s | %(message)s',
+            datefmt='%Y-%m-%d %H:%M:%S'
+        ))
+        slow_logger.addHandler(handler)
+    except Exception as e:
+        print(f"No se pudo crear el log de consultas lentas: {e}", file=sys.stderr)
+        slow_logger.addHandler(logging.NullHandler())
+
+    return slow_logger
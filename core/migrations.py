@@ -0,0 +1,928 @@
+# -*- coding: utf-8 -*-
+"""
+Migraciones versionadas del esquema de la base de datos
+
+Cada migración es una función numerada que recibe un cursor. La versión
+aplicada se guarda en ``PRAGMA user_version``: al iniciar solo se ejecutan
+las migraciones pendientes, todas dentro de una única transacción, y si la
+BD ya está al día no se ejecuta ningún DDL ni dato inicial.
+"""
+import sqlite3
+import json
+from core.config import Config
+from core.logger import logger
+
+
+def _m001_esquema_base(cursor):
+    """Tablas CORE + FASE 1 + FASE 2, índices y datos iniciales."""
+    # ==================== TABLAS CORE ====================
+
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS members (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            nombre TEXT NOT NULL,
+            dni TEXT UNIQUE NOT NULL,
+            contacto TEXT,
+            email TEXT,
+            direccion TEXT,
+            fecha_registro DATE NOT NULL,
+            codigo_membresia TEXT UNIQUE NOT NULL,
+            foto_path TEXT
+        )
+    """)
+
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS measurements (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            miembro_id INTEGER NOT NULL,
+            fecha_medicion DATE NOT NULL,
+            peso REAL,
+            talla REAL,
+            grasa_corporal REAL,
+            resistencia_fisica TEXT,
+            pecho REAL,
+            hombros REAL,
+            cintura REAL,
+            cadera REAL,
+            biceps REAL,
+            antebrazo REAL,
+            muslo REAL,
+            gemelos REAL,
+            cuello REAL,
+            comentarios TEXT,
+            FOREIGN KEY(miembro_id) REFERENCES members(id) ON DELETE CASCADE
+        )
+    """)
+
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS plans (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            nombre_plan TEXT NOT NULL UNIQUE,
+            precio REAL NOT NULL CHECK(precio > 0),
+            duracion_dias INTEGER NOT NULL CHECK(duracion_dias > 0),
+            cantidad_personas INTEGER NOT NULL DEFAULT 1 CHECK(cantidad_personas > 0),
+            fecha_inicio_venta DATE,
+            fecha_fin_venta DATE,
+            descripcion TEXT,
+            estado BOOLEAN NOT NULL DEFAULT 1,
+            categoria_id INTEGER,
+            FOREIGN KEY(categoria_id) REFERENCES membership_categories(id)
+        )
+    """)
+
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS payments (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            miembro_id INTEGER NOT NULL,
+            plan_id INTEGER NOT NULL,
+            monto_pagado REAL NOT NULL CHECK(monto_pagado > 0),
+            fecha_pago DATE NOT NULL,
+            fecha_vencimiento DATE NOT NULL,
+            FOREIGN KEY(miembro_id) REFERENCES members(id) ON DELETE CASCADE,
+            FOREIGN KEY(plan_id) REFERENCES plans(id)
+        )
+    """)
+
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS attendance (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            miembro_id INTEGER NOT NULL,
+            fecha_hora_entrada TEXT NOT NULL,
+            FOREIGN KEY(miembro_id) REFERENCES members(id) ON DELETE CASCADE
+        )
+    """)
+
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS notes (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            miembro_id INTEGER NOT NULL,
+            fecha_hora TEXT NOT NULL,
+            nota TEXT NOT NULL,
+            FOREIGN KEY(miembro_id) REFERENCES members(id) ON DELETE CASCADE
+        )
+    """)
+
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS inventory (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            nombre_producto TEXT NOT NULL UNIQUE,
+            stock INTEGER NOT NULL CHECK(stock >= 0),
+            precio_venta REAL NOT NULL CHECK(precio_venta >= 0),
+            stock_minimo INTEGER NOT NULL CHECK(stock_minimo >= 0)
+        )
+    """)
+
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS trainers (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            nombre TEXT NOT NULL,
+            contacto TEXT
+        )
+    """)
+
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS classes (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            nombre_clase TEXT NOT NULL,
+            horario TEXT,
+            entrenador_id INTEGER,
+            FOREIGN KEY(entrenador_id) REFERENCES trainers(id)
+        )
+    """)
+
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS registrations (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            miembro_id INTEGER NOT NULL,
+            clase_id INTEGER NOT NULL,
+            fecha_inscripcion TEXT NOT NULL,
+            FOREIGN KEY(miembro_id) REFERENCES members(id) ON DELETE CASCADE,
+            FOREIGN KEY(clase_id) REFERENCES classes(id) ON DELETE CASCADE,
+            UNIQUE(miembro_id, clase_id)
+        )
+    """)
+
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS members_eliminados (
+            id INTEGER PRIMARY KEY,
+            nombre TEXT,
+            dni TEXT,
+            contacto TEXT,
+            email TEXT,
+            direccion TEXT,
+            fecha_registro DATE,
+            codigo_membresia TEXT,
+            foto_path TEXT,
+            eliminado_en TEXT NOT NULL
+        )
+    """)
+
+    # ==================== TABLAS FASE 1 ====================
+
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS membership_categories (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            nombre TEXT NOT NULL UNIQUE,
+            color_hex TEXT DEFAULT '#3b82f6',
+            orden INTEGER DEFAULT 0,
+            descripcion TEXT,
+            activo BOOLEAN DEFAULT 1,
+            created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS benefit_types (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            nombre TEXT NOT NULL UNIQUE,
+            codigo TEXT NOT NULL,
+            tipo_valor TEXT NOT NULL CHECK(tipo_valor IN ('boolean', 'numeric', 'percentage')),
+            descripcion TEXT,
+            icono TEXT,
+            activo BOOLEAN DEFAULT 1,
+            created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS category_benefits (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            categoria_id INTEGER NOT NULL,
+            benefit_type_id INTEGER NOT NULL,
+            valor_configurado TEXT NOT NULL,
+            created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY(categoria_id) REFERENCES membership_categories(id) ON DELETE CASCADE,
+            FOREIGN KEY(benefit_type_id) REFERENCES benefit_types(id) ON DELETE CASCADE,
+            UNIQUE(categoria_id, benefit_type_id)
+        )
+    """)
+
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS payment_members (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            payment_id INTEGER NOT NULL,
+            miembro_id INTEGER NOT NULL,
+            es_titular BOOLEAN DEFAULT 0,
+            fecha_asignacion DATETIME DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY(payment_id) REFERENCES payments(id) ON DELETE CASCADE,
+            FOREIGN KEY(miembro_id) REFERENCES members(id) ON DELETE CASCADE,
+            UNIQUE(payment_id, miembro_id)
+        )
+    """)
+
+    # ==================== TABLAS FASE 2: MARKET & CAJA ====================
+
+    # 1. Tabla Proveedores (NUEVA)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS proveedores (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            empresa TEXT NOT NULL,
+            ruc TEXT,
+            contacto_nombre TEXT,
+            telefono TEXT,
+            email TEXT,
+            direccion TEXT,
+            categoria_producto TEXT,
+            activo BOOLEAN DEFAULT 1,
+            created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+
+    # 2. Tabla Categorías de Producto
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS categorias_producto (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            nombre TEXT NOT NULL UNIQUE,
+            prefijo TEXT NOT NULL UNIQUE,
+            activo BOOLEAN DEFAULT 1,
+            created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+
+    # 3. Tabla Productos - ORDEN LÓGICO MEJORADO
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS productos (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+
+            -- IDENTIFICACIÓN
+            sku TEXT NOT NULL UNIQUE,
+            codigo_barras TEXT UNIQUE,
+            nombre TEXT NOT NULL,
+
+            -- CATEGORIZACIÓN
+            categoria_id INTEGER NOT NULL,
+            proveedor_id INTEGER,
+
+            -- PRECIOS (orden lógico: compra → venta)
+            precio_compra REAL DEFAULT 0 CHECK(precio_compra >= 0),
+            precio_venta REAL NOT NULL CHECK(precio_venta >= 0),
+
+            -- INVENTARIO
+            stock_actual INTEGER NOT NULL DEFAULT 0 CHECK(stock_actual >= 0),
+            stock_minimo INTEGER NOT NULL DEFAULT 0 CHECK(stock_minimo >= 0),
+
+            -- METADATOS
+            foto_path TEXT,
+            activo BOOLEAN DEFAULT 1,
+            fecha_registro DATETIME DEFAULT CURRENT_TIMESTAMP,
+            fecha_actualizacion DATETIME DEFAULT CURRENT_TIMESTAMP,
+
+            FOREIGN KEY(categoria_id) REFERENCES categorias_producto(id),
+            FOREIGN KEY(proveedor_id) REFERENCES proveedores(id) ON DELETE SET NULL
+        )
+    """)
+
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS inventario_movimientos (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            producto_id INTEGER NOT NULL,
+            tipo_movimiento TEXT NOT NULL CHECK(tipo_movimiento IN ('entrada', 'salida', 'ajuste', 'venta')),
+            cantidad INTEGER NOT NULL,
+            stock_anterior INTEGER NOT NULL,
+            stock_nuevo INTEGER NOT NULL,
+            motivo TEXT,
+            usuario_id INTEGER,
+            fecha_hora DATETIME DEFAULT CURRENT_TIMESTAMP,
+            referencia_tipo TEXT,
+            referencia_id INTEGER,
+            FOREIGN KEY(producto_id) REFERENCES productos(id)
+        )
+    """)
+
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS ventas (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            fecha_hora DATETIME DEFAULT CURRENT_TIMESTAMP,
+            cliente_tipo TEXT NOT NULL CHECK(cliente_tipo IN ('miembro', 'visitante')),
+            cliente_id INTEGER,
+            total REAL NOT NULL CHECK(total >= 0),
+            metodo_pago TEXT NOT NULL CHECK(metodo_pago IN ('efectivo', 'yape', 'plin', 'pos_banco')),
+            usuario_id INTEGER,
+            estado TEXT DEFAULT 'completada' CHECK(estado IN ('completada', 'cancelada'))
+        )
+    """)
+
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS ventas_detalle (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            venta_id INTEGER NOT NULL,
+            producto_id INTEGER NOT NULL,
+            cantidad INTEGER NOT NULL CHECK(cantidad > 0),
+            precio_unitario REAL NOT NULL CHECK(precio_unitario >= 0),
+            descuento_porcentaje REAL DEFAULT 0 CHECK(descuento_porcentaje >= 0 AND descuento_porcentaje <= 100),
+            subtotal REAL NOT NULL CHECK(subtotal >= 0),
+            FOREIGN KEY(venta_id) REFERENCES ventas(id) ON DELETE CASCADE,
+            FOREIGN KEY(producto_id) REFERENCES productos(id)
+        )
+    """)
+
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS caja_sesiones (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            fecha_apertura DATETIME DEFAULT CURRENT_TIMESTAMP,
+            fecha_cierre DATETIME,
+            usuario_apertura_id INTEGER,
+            usuario_cierre_id INTEGER,
+            efectivo_inicial REAL DEFAULT 0,
+            yape_inicial REAL DEFAULT 0,
+            plin_inicial REAL DEFAULT 0,
+            pos_banco_inicial REAL DEFAULT 0,
+            efectivo_cierre REAL,
+            yape_cierre REAL,
+            plin_cierre REAL,
+            pos_banco_cierre REAL,
+            total_ingresos_sistema REAL,
+            total_egresos_sistema REAL,
+            diferencia_efectivo REAL,
+            diferencia_yape REAL,
+            diferencia_plin REAL,
+            diferencia_pos_banco REAL,
+            observaciones TEXT,
+            estado TEXT DEFAULT 'abierta' CHECK(estado IN ('abierta', 'cerrada', 'con_diferencias'))
+        )
+    """)
+
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS cash_movements (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            fecha_hora DATETIME DEFAULT CURRENT_TIMESTAMP,
+            tipo_movimiento TEXT NOT NULL CHECK(tipo_movimiento IN ('ingreso', 'egreso')),
+            categoria TEXT NOT NULL CHECK(categoria IN ('membresia', 'clase', 'market', 'gasto', 'ajuste', 'remesa')),
+            metodo_pago TEXT NOT NULL CHECK(metodo_pago IN ('efectivo', 'yape', 'plin', 'pos_banco')),
+            monto REAL NOT NULL CHECK(monto > 0),
+            referencia_tipo TEXT,
+            referencia_id INTEGER,
+            descripcion TEXT,
+            glosa TEXT,
+            usuario_id INTEGER,
+            caja_sesion_id INTEGER,
+            estado TEXT DEFAULT 'activo' CHECK(estado IN ('activo', 'extornado')),
+            FOREIGN KEY(caja_sesion_id) REFERENCES caja_sesiones(id)
+        )
+    """)
+
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS gastos (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            fecha_hora DATETIME DEFAULT CURRENT_TIMESTAMP,
+            tipo_gasto TEXT NOT NULL CHECK(tipo_gasto IN ('servicio', 'compra', 'sueldo', 'alquiler', 'tributo', 'mantenimiento', 'otro')),
+            monto REAL NOT NULL CHECK(monto > 0),
+            metodo_pago TEXT NOT NULL CHECK(metodo_pago IN ('efectivo', 'yape', 'plin', 'pos_banco')),
+            proveedor_id INTEGER,
+            personal_id INTEGER,
+            descripcion TEXT NOT NULL,
+            glosa TEXT,
+            usuario_id INTEGER,
+            estado TEXT DEFAULT 'activo' CHECK(estado IN ('activo', 'anulado'))
+        )
+    """)
+
+    # ==================== ÍNDICES ====================
+
+    indices = [
+        "CREATE INDEX IF NOT EXISTS idx_members_dni ON members(dni)",
+        "CREATE INDEX IF NOT EXISTS idx_members_codigo ON members(codigo_membresia)",
+        "CREATE INDEX IF NOT EXISTS idx_payments_miembro ON payments(miembro_id)",
+        "CREATE INDEX IF NOT EXISTS idx_payments_vencimiento ON payments(fecha_vencimiento)",
+        "CREATE INDEX IF NOT EXISTS idx_payments_miembro_venc ON payments(miembro_id, fecha_vencimiento)",
+        "CREATE INDEX IF NOT EXISTS idx_attendance_miembro ON attendance(miembro_id)",
+        "CREATE INDEX IF NOT EXISTS idx_attendance_fecha ON attendance(fecha_hora_entrada)",
+        "CREATE INDEX IF NOT EXISTS idx_measurements_miembro ON measurements(miembro_id)",
+        "CREATE INDEX IF NOT EXISTS idx_notes_miembro ON notes(miembro_id)",
+        "CREATE INDEX IF NOT EXISTS idx_category_benefits_categoria ON category_benefits(categoria_id)",
+        "CREATE INDEX IF NOT EXISTS idx_category_benefits_benefit ON category_benefits(benefit_type_id)",
+        "CREATE INDEX IF NOT EXISTS idx_payment_members_payment ON payment_members(payment_id)",
+        "CREATE INDEX IF NOT EXISTS idx_payment_members_miembro ON payment_members(miembro_id)",
+        "CREATE INDEX IF NOT EXISTS idx_plans_categoria ON plans(categoria_id)",
+        # FASE 2 indices
+        "CREATE INDEX IF NOT EXISTS idx_productos_categoria ON productos(categoria_id)",
+        "CREATE INDEX IF NOT EXISTS idx_productos_sku ON productos(sku)",
+        "CREATE INDEX IF NOT EXISTS idx_productos_barcode ON productos(codigo_barras)",
+        "CREATE INDEX IF NOT EXISTS idx_inventario_producto ON inventario_movimientos(producto_id)",
+        "CREATE INDEX IF NOT EXISTS idx_inventario_fecha ON inventario_movimientos(fecha_hora)",
+        "CREATE INDEX IF NOT EXISTS idx_ventas_fecha ON ventas(fecha_hora)",
+        "CREATE INDEX IF NOT EXISTS idx_ventas_cliente ON ventas(cliente_id)",
+        "CREATE INDEX IF NOT EXISTS idx_ventas_detalle_venta ON ventas_detalle(venta_id)",
+        "CREATE INDEX IF NOT EXISTS idx_ventas_detalle_producto ON ventas_detalle(producto_id)",
+        "CREATE INDEX IF NOT EXISTS idx_caja_sesiones_estado ON caja_sesiones(estado)",
+        "CREATE INDEX IF NOT EXISTS idx_cash_movements_sesion ON cash_movements(caja_sesion_id)",
+        "CREATE INDEX IF NOT EXISTS idx_cash_movements_fecha ON cash_movements(fecha_hora)",
+        "CREATE INDEX IF NOT EXISTS idx_cash_movements_categoria ON cash_movements(categoria)",
+        "CREATE INDEX IF NOT EXISTS idx_cash_movements_metodo ON cash_movements(metodo_pago)",
+        "CREATE INDEX IF NOT EXISTS idx_gastos_fecha ON gastos(fecha_hora)",
+        "CREATE INDEX IF NOT EXISTS idx_gastos_tipo ON gastos(tipo_gasto)"
+    ]
+
+    for index_sql in indices:
+        cursor.execute(index_sql)
+
+    # ==================== DATOS INICIALES ====================
+
+    # Planes por defecto
+    for plan_data in Config.DEFAULT_PLANS:
+        try:
+            cursor.execute(
+                "INSERT INTO plans (nombre_plan, precio, duracion_dias, cantidad_personas) VALUES (?, ?, ?, ?)",
+                plan_data
+            )
+        except sqlite3.IntegrityError:
+            pass
+
+    # Categorías de membresía
+    categorias = [
+        ("Básico", "#22c55e", 1, "Categoría básica con acceso estándar"),
+        ("Pro", "#3b82f6", 2, "Categoría intermedia con beneficios adicionales"),
+        ("Premium", "#f59e0b", 3, "Categoría premium con todos los beneficios")
+    ]
+
+    for nombre, color, orden, desc in categorias:
+        try:
+            cursor.execute(
+                "INSERT INTO membership_categories (nombre, color_hex, orden, descripcion, activo) VALUES (?, ?, ?, ?, 1)",
+                (nombre, color, orden, desc)
+            )
+        except sqlite3.IntegrityError:
+            pass
+
+    # Tipos de beneficios (código AUTO-GENERADO)
+    cursor.execute("SELECT MAX(CAST(SUBSTR(codigo, 4) AS INTEGER)) FROM benefit_types WHERE codigo LIKE 'BEN%'")
+    max_code = cursor.fetchone()[0] or 0
+
+    beneficios = [
+        ("Sesión de Entrenamiento", "boolean", "Acceso a sesiones de entrenamiento con máquinas y pesas", "🏋️"),
+        ("Clases Grupales", "percentage", "Descuento en clases grupales (yoga, spinning, zumba, etc)", "🧘"),
+        ("Invitados Permitidos", "numeric", "Cantidad de invitados que puede traer el miembro al gimnasio", "👥"),
+        ("Servicios Personalizados", "boolean", "Acceso a dietas personalizadas, rutinas y asesorías nutricionales", "⭐")
+    ]
+
+    for idx, (nombre, tipo, desc, icono) in enumerate(beneficios, start=1):
+        codigo_auto = f"BEN{str(max_code + idx).zfill(3)}"
+        try:
+            cursor.execute(
+                "INSERT INTO benefit_types (nombre, codigo, tipo_valor, descripcion, icono, activo) VALUES (?, ?, ?, ?, ?, 1)",
+                (nombre, codigo_auto, tipo, desc, icono)
+            )
+        except sqlite3.IntegrityError:
+            pass
+
+    # Configuración de beneficios por categoría
+    cursor.execute("SELECT id, nombre FROM membership_categories ORDER BY orden")
+    categorias_db = cursor.fetchall()
+    categorias_map = {nombre: id for id, nombre in categorias_db}
+
+    cursor.execute("SELECT id, nombre FROM benefit_types")
+    beneficios_db = cursor.fetchall()
+    beneficios_map = {nombre: id for id, nombre in beneficios_db}
+
+    configs = {
+        "Básico": {
+            "Sesión de Entrenamiento": {"enabled": True},
+            "Clases Grupales": {"enabled": False, "descuento_porcentaje": 0},
+            "Invitados Permitidos": {"enabled": False, "cantidad": 0},
+            "Servicios Personalizados": {"enabled": False}
+        },
+        "Pro": {
+            "Sesión de Entrenamiento": {"enabled": True},
+            "Clases Grupales": {"enabled": True, "descuento_porcentaje": 50},
+            "Invitados Permitidos": {"enabled": True, "cantidad": 2},
+            "Servicios Personalizados": {"enabled": False}
+        },
+        "Premium": {
+            "Sesión de Entrenamiento": {"enabled": True},
+            "Clases Grupales": {"enabled": True, "descuento_porcentaje": 100},
+            "Invitados Permitidos": {"enabled": True, "cantidad": 4},
+            "Servicios Personalizados": {"enabled": True}
+        }
+    }
+
+    for categoria_nombre, beneficios_config in configs.items():
+        if categoria_nombre not in categorias_map:
+            continue
+
+        categoria_id = categorias_map[categoria_nombre]
+
+        for beneficio_nombre, config in beneficios_config.items():
+            if beneficio_nombre not in beneficios_map:
+                continue
+
+            beneficio_id = beneficios_map[beneficio_nombre]
+            valor_json = json.dumps(config)
+
+            try:
+                cursor.execute(
+                    "INSERT INTO category_benefits (categoria_id, benefit_type_id, valor_configurado) VALUES (?, ?, ?)",
+                    (categoria_id, beneficio_id, valor_json)
+                )
+            except sqlite3.IntegrityError:
+                pass
+
+    # ==================== DATOS INICIALES FASE 2 ====================
+
+    # Categorías de productos
+    categorias_productos = [
+        ("Nutrición", "NUT"),
+        ("Ropa", "ROP"),
+        ("Bebidas", "BEB"),
+        ("Otros", "OTR")
+    ]
+
+    for nombre, prefijo in categorias_productos:
+        try:
+            cursor.execute(
+                "INSERT INTO categorias_producto (nombre, prefijo, activo) VALUES (?, ?, 1)",
+                (nombre, prefijo)
+            )
+        except sqlite3.IntegrityError:
+            pass
+
+    # Agregar beneficio de descuento Market a benefit_types si no existe
+    try:
+        cursor.execute(
+            "SELECT MAX(CAST(SUBSTR(codigo, 4) AS INTEGER)) FROM benefit_types WHERE codigo LIKE 'BEN%'"
+        )
+        max_code = cursor.fetchone()[0] or 4  # Ya hay 4 beneficios base
+
+        codigo_market = f"BEN{str(max_code + 1).zfill(3)}"
+
+        cursor.execute(
+            "INSERT INTO benefit_types (nombre, codigo, tipo_valor, descripcion, icono, activo) VALUES (?, ?, ?, ?, ?, 1)",
+            ("Descuento Market", codigo_market, "percentage", "Descuento porcentual en compras del Market", "🛒")
+        )
+
+        benefit_market_id = cursor.lastrowid
+
+        # Configurar descuentos por categoría
+        cursor.execute("SELECT id, nombre FROM membership_categories")
+        categorias_db = cursor.fetchall()
+
+        descuentos_market = {
+            "Básico": 0,    # Sin descuento
+            "Pro": 10,      # 10% descuento
+            "Premium": 20   # 20% descuento
+        }
+
+        for cat_id, cat_nombre in categorias_db:
+            if cat_nombre in descuentos_market:
+                config_market = {
+                    "enabled": True,
+                    "descuento_porcentaje": descuentos_market[cat_nombre]
+                }
+
+                try:
+                    cursor.execute(
+                        "INSERT INTO category_benefits (categoria_id, benefit_type_id, valor_configurado) VALUES (?, ?, ?)",
+                        (cat_id, benefit_market_id, json.dumps(config_market))
+                    )
+                except sqlite3.IntegrityError:
+                    pass
+
+    except sqlite3.IntegrityError:
+        # El beneficio ya existe
+        pass
+
+
+def _m002_member_status(cursor):
+    """Proyección materializada del estado de membresía por miembro."""
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS member_status (
+            miembro_id INTEGER PRIMARY KEY,
+            latest_expiry DATE NOT NULL,
+            plan_id INTEGER,
+            categoria_id INTEGER,
+            FOREIGN KEY(miembro_id) REFERENCES members(id) ON DELETE CASCADE
+        )
+    """)
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_member_status_expiry ON member_status(latest_expiry)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_member_status_plan ON member_status(plan_id)")
+
+    # Recalcula la fila del miembro a partir de su pago con vencimiento más
+    # lejano (usa idx_payments_miembro_venc). Si ya no tiene pagos, la fila
+    # queda eliminada por el DELETE previo.
+    refresh = """
+        DELETE FROM member_status WHERE miembro_id = {ref}.miembro_id;
+        INSERT INTO member_status (miembro_id, latest_expiry, plan_id, categoria_id)
+        SELECT p.miembro_id, p.fecha_vencimiento, p.plan_id, pl.categoria_id
+        FROM payments p
+        LEFT JOIN plans pl ON pl.id = p.plan_id
+        WHERE p.miembro_id = {ref}.miembro_id
+        ORDER BY p.fecha_vencimiento DESC, p.id DESC
+        LIMIT 1;
+    """
+
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_member_status_payment_insert
+        AFTER INSERT ON payments
+        BEGIN
+            {refresh.format(ref='NEW')}
+        END
+    """)
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_member_status_payment_delete
+        AFTER DELETE ON payments
+        BEGIN
+            {refresh.format(ref='OLD')}
+        END
+    """)
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_member_status_payment_update
+        AFTER UPDATE OF miembro_id, plan_id, fecha_vencimiento ON payments
+        BEGIN
+            {refresh.format(ref='OLD')}
+            {refresh.format(ref='NEW')}
+        END
+    """)
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_member_status_plan_categoria
+        AFTER UPDATE OF categoria_id ON plans
+        BEGIN
+            UPDATE member_status SET categoria_id = NEW.categoria_id
+            WHERE plan_id = NEW.id;
+        END
+    """)
+
+    # Carga inicial desde los pagos existentes
+    cursor.execute("DELETE FROM member_status")
+    cursor.execute("""
+        INSERT INTO member_status (miembro_id, latest_expiry, plan_id, categoria_id)
+        SELECT p.miembro_id, p.fecha_vencimiento, p.plan_id, pl.categoria_id
+        FROM payments p
+        LEFT JOIN plans pl ON pl.id = p.plan_id
+        WHERE p.id = (
+            SELECT p2.id FROM payments p2
+            WHERE p2.miembro_id = p.miembro_id
+            ORDER BY p2.fecha_vencimiento DESC, p2.id DESC
+            LIMIT 1
+        )
+    """)
+
+
+def _m003_members_keyset(cursor):
+    """Índice para la paginación por keyset (nombre, id) del listado de miembros."""
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_members_nombre_id ON members(nombre, id)")
+
+
+def _m004_members_fts(cursor):
+    """Índice FTS5 de búsqueda de miembros sincronizado por triggers."""
+    try:
+        cursor.execute("""
+            CREATE VIRTUAL TABLE IF NOT EXISTS members_fts USING fts5(
+                nombre, dni, codigo_membresia, contacto, email,
+                content = 'members',
+                content_rowid = 'id',
+                tokenize = 'unicode61 remove_diacritics 2',
+                prefix = '2 3'
+            )
+        """)
+    except sqlite3.OperationalError as e:
+        # SQLite compilado sin FTS5: la búsqueda usa LIKE como respaldo
+        logger.warning(f"FTS5 no disponible, búsqueda de miembros sin índice: {e}")
+        return
+
+    columns = "nombre, dni, codigo_membresia, contacto, email"
+
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_members_fts_insert
+        AFTER INSERT ON members
+        BEGIN
+            INSERT INTO members_fts (rowid, {columns})
+            VALUES (NEW.id, NEW.nombre, NEW.dni, NEW.codigo_membresia, NEW.contacto, NEW.email);
+        END
+    """)
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_members_fts_delete
+        AFTER DELETE ON members
+        BEGIN
+            INSERT INTO members_fts (members_fts, rowid, {columns})
+            VALUES ('delete', OLD.id, OLD.nombre, OLD.dni, OLD.codigo_membresia, OLD.contacto, OLD.email);
+        END
+    """)
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_members_fts_update
+        AFTER UPDATE OF {columns} ON members
+        BEGIN
+            INSERT INTO members_fts (members_fts, rowid, {columns})
+            VALUES ('delete', OLD.id, OLD.nombre, OLD.dni, OLD.codigo_membresia, OLD.contacto, OLD.email);
+            INSERT INTO members_fts (rowid, {columns})
+            VALUES (NEW.id, NEW.nombre, NEW.dni, NEW.codigo_membresia, NEW.contacto, NEW.email);
+        END
+    """)
+
+    cursor.execute("INSERT INTO members_fts (members_fts) VALUES ('rebuild')")
+
+
+def _m005_codigo_canonico(cursor):
+    """Normaliza codigo_membresia a mayúsculas para búsquedas por índice."""
+    # OR IGNORE: si dos códigos solo difieren en mayúsculas no se fusionan
+    cursor.execute("""
+        UPDATE OR IGNORE members
+        SET codigo_membresia = UPPER(TRIM(codigo_membresia))
+        WHERE codigo_membresia <> UPPER(TRIM(codigo_membresia))
+    """)
+    pendientes = cursor.execute("""
+        SELECT COUNT(*) FROM members
+        WHERE codigo_membresia <> UPPER(TRIM(codigo_membresia))
+    """).fetchone()[0]
+    if pendientes:
+        logger.warning(
+            f"{pendientes} código(s) de membresía no se normalizaron por colisión de mayúsculas"
+        )
+
+    # Invariante para escrituras que no pasan por MemberModel. Se rechaza en
+    # lugar de corregir: un UPDATE dentro de un AFTER INSERT se dispararía
+    # antes que el trigger FTS y desincronizaría members_fts.
+    for evento in ("INSERT", "UPDATE OF codigo_membresia"):
+        sufijo = evento.split()[0].lower()
+        cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_members_codigo_{sufijo}
+            BEFORE {evento} ON members
+            WHEN NEW.codigo_membresia <> UPPER(TRIM(NEW.codigo_membresia))
+            BEGIN
+                SELECT RAISE(ABORT, 'codigo_membresia debe estar en mayúsculas');
+            END
+        """)
+
+
+def _m006_indices_fecha(cursor):
+    """Índices compuestos para filtros de fecha por rango semiabierto."""
+    # (miembro_id, fecha) cubre también las búsquedas solo por miembro
+    cursor.execute("DROP INDEX IF EXISTS idx_attendance_miembro")
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_attendance_miembro_fecha "
+        "ON attendance(miembro_id, fecha_hora_entrada)"
+    )
+    # Los reportes siempre filtran por estado y luego por rango de fecha
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_ventas_estado_fecha ON ventas(estado, fecha_hora)")
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_cash_movements_estado_fecha "
+        "ON cash_movements(estado, fecha_hora)"
+    )
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_gastos_estado_fecha ON gastos(estado, fecha_hora)")
+
+
+def _m007_asistencia_unica_dia(cursor):
+    """Índice único parcial: una entrada por miembro y día."""
+    # Si una BD antigua ya tiene duplicados no se borra historial: el índice
+    # solo aplica a las filas posteriores al último duplicado existente.
+    ultimo_duplicado = cursor.execute("""
+        SELECT COALESCE(MAX(a.id), 0)
+        FROM attendance a
+        WHERE EXISTS (
+            SELECT 1 FROM attendance b
+            WHERE b.miembro_id = a.miembro_id
+              AND substr(b.fecha_hora_entrada, 1, 10) = substr(a.fecha_hora_entrada, 1, 10)
+              AND b.id < a.id
+        )
+    """).fetchone()[0]
+    if ultimo_duplicado:
+        logger.warning(
+            f"Asistencias duplicadas previas conservadas (hasta id={ultimo_duplicado})"
+        )
+
+    cursor.execute(f"""
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_attendance_miembro_dia
+        ON attendance(miembro_id, substr(fecha_hora_entrada, 1, 10))
+        WHERE id > {int(ultimo_duplicado)}
+    """)
+
+
+def _m008_caja_saldos(cursor):
+    """Saldo acumulado de la caja abierta por método de pago, mantenido por triggers."""
+    # Los movimientos se vinculan a su sesión recién al cerrar la caja: los
+    # activos con caja_sesion_id NULL son los de la sesión abierta. Cada
+    # INSERT/UPDATE/DELETE de cash_movements ajusta su fila en la misma
+    # transacción, así leer los saldos no recorre los movimientos.
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS caja_saldos (
+            metodo_pago TEXT PRIMARY KEY,
+            ingresos REAL NOT NULL DEFAULT 0,
+            egresos REAL NOT NULL DEFAULT 0,
+            movimientos INTEGER NOT NULL DEFAULT 0
+        )
+    """)
+    cursor.executemany(
+        "INSERT OR IGNORE INTO caja_saldos (metodo_pago) VALUES (?)",
+        [('efectivo',), ('yape',), ('plin',), ('pos_banco',)]
+    )
+
+    # signo = 1 suma la fila, -1 la descuenta
+    ajuste = """
+        UPDATE caja_saldos SET
+            ingresos = ROUND(ingresos + {signo} * CASE WHEN {ref}.tipo_movimiento = 'ingreso' THEN {ref}.monto ELSE 0 END, 2),
+            egresos = ROUND(egresos + {signo} * CASE WHEN {ref}.tipo_movimiento = 'egreso' THEN {ref}.monto ELSE 0 END, 2),
+            movimientos = movimientos + {signo}
+        WHERE metodo_pago = {ref}.metodo_pago
+          AND {ref}.estado = 'activo' AND {ref}.caja_sesion_id IS NULL;
+    """
+
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_caja_saldos_insert
+        AFTER INSERT ON cash_movements
+        BEGIN
+            {ajuste.format(signo=1, ref='NEW')}
+        END
+    """)
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_caja_saldos_delete
+        AFTER DELETE ON cash_movements
+        BEGIN
+            {ajuste.format(signo=-1, ref='OLD')}
+        END
+    """)
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_caja_saldos_update
+        AFTER UPDATE OF estado, caja_sesion_id, monto, metodo_pago, tipo_movimiento ON cash_movements
+        BEGIN
+            {ajuste.format(signo=-1, ref='OLD')}
+            {ajuste.format(signo=1, ref='NEW')}
+        END
+    """)
+
+    # Carga inicial desde los movimientos aún no vinculados
+    cursor.execute("""
+        UPDATE caja_saldos SET
+            ingresos = COALESCE((
+                SELECT ROUND(SUM(monto), 2) FROM cash_movements
+                WHERE metodo_pago = caja_saldos.metodo_pago AND tipo_movimiento = 'ingreso'
+                  AND estado = 'activo' AND caja_sesion_id IS NULL
+            ), 0),
+            egresos = COALESCE((
+                SELECT ROUND(SUM(monto), 2) FROM cash_movements
+                WHERE metodo_pago = caja_saldos.metodo_pago AND tipo_movimiento = 'egreso'
+                  AND estado = 'activo' AND caja_sesion_id IS NULL
+            ), 0),
+            movimientos = (
+                SELECT COUNT(*) FROM cash_movements
+                WHERE metodo_pago = caja_saldos.metodo_pago
+                  AND estado = 'activo' AND caja_sesion_id IS NULL
+            )
+    """)
+
+
+# (versión, descripción, función). Solo se agregan al final: nunca
+# modificar ni reordenar una migración ya publicada.
+MIGRATIONS = [
+    (1, "Esquema base: tablas CORE + FASE 1 + FASE 2 y datos iniciales", _m001_esquema_base),
+    (2, "Proyección member_status mantenida por triggers de payments", _m002_member_status),
+    (3, "Índice de paginación por keyset en members", _m003_members_keyset),
+    (4, "Índice FTS5 de búsqueda de miembros", _m004_members_fts),
+    (5, "Código de membresía en mayúsculas canónicas", _m005_codigo_canonico),
+    (6, "Índices compuestos de fecha para asistencia, ventas, caja y gastos", _m006_indices_fecha),
+    (7, "Índice único parcial de asistencia por miembro y día", _m007_asistencia_unica_dia),
+    (8, "Saldos de la caja abierta por método de pago mantenidos por triggers", _m008_caja_saldos),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+
+def get_schema_version(conn):
+    """
+    Obtiene la versión de esquema aplicada.
+
+    Args:
+        conn: Conexión SQLite
+
+    Returns:
+        int: Versión guardada en PRAGMA user_version (0 = sin migrar)
+    """
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def migrate(conn):
+    """
+    Aplica las migraciones pendientes en una sola transacción.
+
+    Args:
+        conn: Conexión SQLite
+
+    Returns:
+        list: Versiones aplicadas (vacía si el esquema ya estaba al día)
+
+    Raises:
+        sqlite3.Error: Si alguna migración falla (se revierte todo)
+    """
+    current = get_schema_version(conn)
+    pending = [m for m in MIGRATIONS if m[0] > current]
+
+    if not pending:
+        return []
+
+    if current > LATEST_VERSION:
+        logger.warning(
+            f"La BD tiene esquema v{current}, más nuevo que esta versión de la app (v{LATEST_VERSION})"
+        )
+        return []
+
+    cursor = conn.cursor()
+    cursor.execute("BEGIN IMMEDIATE")
+    try:
+        for version, descripcion, migration in pending:
+            logger.info(f"Aplicando migración {version:03d}: {descripcion}")
+            migration(cursor)
+        # PRAGMA no admite parámetros; la versión es un entero controlado
+        cursor.execute(f"PRAGMA user_version = {int(pending[-1][0])}")
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+
+    return [m[0] for m in pending]
@@ -0,0 +1,400 @@
+# -*- coding: utf-8 -*-
+"""
+Instrumentación de consultas SQL y registro de consultas lentas
+
+Toda conexión de la app se abre con ``StatsConnection``: cada ``execute`` /
+``executemany`` (de BaseModel o de cursores crudos en los modelos) se mide y
+se acumula por sentencia normalizada (literales → ?, espacios colapsados) con
+un histograma de duraciones. Las sentencias que superan
+``Config.DB_SLOW_QUERY_MS`` se escriben, junto a su EXPLAIN QUERY PLAN, en un
+log aparte (``Config.DB_SLOW_QUERY_LOG``).
+
+BaseModel mide por su cuenta con ``QueryStats.track`` para incluir la lectura de
+filas (fetch) y contarlas; mientras tanto la medición del cursor queda en
+pausa para no contar dos veces la misma sentencia.
+
+Uso por línea de comandos (resume el log de lentas de ejecuciones previas):
+    python -m core.query_stats [top_n]
+"""
+import re
+import sys
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from functools import lru_cache
+from core.config import Config
+from core.logger import logger, setup_slow_query_logger
+
+# Límites superiores (ms) de cada cubeta del histograma; la última es abierta
+HISTOGRAM_BOUNDS_MS = (1, 5, 20, 100, 500)
+HISTOGRAM_LABELS = ('<1ms', '<5ms', '<20ms', '<100ms', '<500ms', '>=500ms')
+
+# Módulos que no cuentan como "quien llamó" al buscar el método del modelo
+_INTERNAL_MODULES = ('core.query_stats', 'core.base_model', 'contextlib')
+
+_RE_STRING = re.compile(r"'(?:[^']|'')*'")
+_RE_NUMBER = re.compile(r"(?<![\w.])-?\d+(?:\.\d+)?\b")
+_RE_IN_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_RE_SPACES = re.compile(r"\s+")
+_RE_EXPLAINABLE = re.compile(r"\s*(SELECT|WITH|INSERT|UPDATE|DELETE|REPLACE)\b", re.IGNORECASE)
+
+
+@lru_cache(maxsize=2048)
+def normalize_sql(sql):
+    """
+    Normaliza una sentencia para agrupar sus ejecuciones.
+
+    Args:
+        sql: Texto SQL tal como se ejecutó
+
+    Returns:
+        str: SQL en una línea, con literales y listas IN (?, ?, ...) colapsados
+    """
+    texto = _RE_STRING.sub('?', sql)
+    texto = _RE_NUMBER.sub('?', texto)
+    texto = _RE_SPACES.sub(' ', texto).strip()
+    return _RE_IN_LIST.sub('(?, ...)', texto)
+
+
+def _find_caller():
+    # Primer marco fuera de la capa de BD → "Clase.metodo" del modelo o servicio
+    frame = sys._getframe(2)
+    while frame is not None:
+        modulo = frame.f_globals.get('__name__', '')
+        if modulo not in _INTERNAL_MODULES:
+            funcion = frame.f_code.co_name
+            instancia = frame.f_locals.get('self')
+            if instancia is not None:
+                return f"{type(instancia).__name__}.{funcion}"
+            return f"{modulo}.{funcion}"
+        frame = frame.f_back
+    return '?'
+
+
+class StatementStats:
+    """Acumulado de una sentencia normalizada"""
+
+    __slots__ = ('sql', 'count', 'total', 'max', 'rows', 'histogram',
+                 'callers', 'slow', 'plan')
+
+    def __init__(self, sql):
+        self.sql = sql
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.rows = 0
+        self.histogram = [0] * (len(HISTOGRAM_BOUNDS_MS) + 1)
+        self.callers = {}
+        self.slow = 0
+        self.plan = None
+
+    @property
+    def avg(self):
+        return self.total / self.count if self.count else 0.0
+
+    def to_dict(self):
+        return {
+            'sql': self.sql,
+            'count': self.count,
+            'total_ms': self.total * 1000,
+            'avg_ms': self.avg * 1000,
+            'max_ms': self.max * 1000,
+            'rows': self.rows,
+            'slow': self.slow,
+            'histogram': dict(zip(HISTOGRAM_LABELS, self.histogram)),
+            'callers': dict(self.callers),
+        }
+
+
+class QueryStats:
+    """Histogramas en memoria por sentencia y registro de consultas lentas"""
+
+    def __init__(self, slow_ms=None):
+        self.enabled = Config.DB_QUERY_STATS
+        self.slow_ms = slow_ms if slow_ms is not None else Config.DB_SLOW_QUERY_MS
+        self._lock = threading.Lock()
+        self._stats = {}
+        self._local = threading.local()
+        self._slow_logger = None
+
+    # ---------- Medición ----------
+
+    @property
+    def paused(self):
+        return getattr(self._local, 'paused', False)
+
+    @contextmanager
+    def pause(self):
+        """Suspende la medición de cursores en el hilo actual."""
+        anterior = self.paused
+        self._local.paused = True
+        try:
+            yield
+        finally:
+            self._local.paused = anterior
+
+    def record(self, sql, seconds, rows=None, caller=None, conn=None, params=None):
+        """
+        Acumula una ejecución y la manda al log de lentas si supera el umbral.
+
+        Args:
+            sql: Texto SQL ejecutado
+            seconds: Duración en segundos
+            rows: Filas devueltas o afectadas (None si no se conoce)
+            caller: "Clase.metodo" que originó la consulta (se detecta si falta)
+            conn: Conexión usada (para el EXPLAIN QUERY PLAN de las lentas)
+            params: Parámetros de la consulta (para el EXPLAIN QUERY PLAN)
+        """
+        normalizada = normalize_sql(sql)
+        caller = caller or _find_caller()
+        ms = seconds * 1000
+
+        cubeta = len(HISTOGRAM_BOUNDS_MS)
+        for i, limite in enumerate(HISTOGRAM_BOUNDS_MS):
+            if ms < limite:
+                cubeta = i
+                break
+
+        es_lenta = self.slow_ms is not None and ms >= self.slow_ms
+        with self._lock:
+            stat = self._stats.get(normalizada)
+            if stat is None:
+                stat = self._stats[normalizada] = StatementStats(normalizada)
+            stat.count += 1
+            stat.total += seconds
+            if seconds > stat.max:
+                stat.max = seconds
+            if rows is not None and rows > 0:
+                stat.rows += rows
+            stat.histogram[cubeta] += 1
+            stat.callers[caller] = stat.callers.get(caller, 0) + 1
+            if es_lenta:
+                stat.slow += 1
+            plan = stat.plan
+
+        if es_lenta:
+            if plan is None and conn is not None:
+                plan = self._explain(conn, sql, params)
+                with self._lock:
+                    stat.plan = plan
+            self._log_slow(normalizada, ms, rows, caller, plan)
+
+    @contextmanager
+    def track(self, sql, params=None, conn=None):
+        """
+        Mide un bloque (execute + fetch/commit) como una sola ejecución.
+
+        Dentro del bloque la medición de cursores queda en pausa. El bloque
+        puede asignar ``medicion.rows`` con las filas devueltas o afectadas.
+
+        Args:
+            sql: Texto SQL que se ejecuta en el bloque
+            params: Parámetros de la consulta
+            conn: Conexión usada
+
+        Yields:
+            _Measurement: Objeto con el atributo ``rows``
+        """
+        medicion = _Measurement()
+        if not self.enabled or self.paused:
+            yield medicion
+            return
+
+        self._local.paused = True
+        inicio = time.perf_counter()
+        try:
+            yield medicion
+        finally:
+            duracion = time.perf_counter() - inicio
+            self._local.paused = False
+            self.record(sql, duracion, medicion.rows, conn=conn, params=params)
+
+    # ---------- Consultas lentas ----------
+
+    def _explain(self, conn, sql, params):
+        if not _RE_EXPLAINABLE.match(sql):
+            return ()
+        if isinstance(params, (list, tuple)) and params and isinstance(params[0], (list, tuple, dict)):
+            params = params[0]   # executemany: el plan es el mismo para todas las filas
+        try:
+            with self.pause():
+                cursor = conn.execute(f"EXPLAIN QUERY PLAN {sql}", params or ())
+                return tuple(fila[3] for fila in cursor.fetchall())
+        except sqlite3.Error as e:
+            return (f"(sin plan: {e})",)
+
+    def _log_slow(self, sql, ms, rows, caller, plan):
+        if self._slow_logger is None:
+            self._slow_logger = setup_slow_query_logger()
+        lineas = [f"{ms:.1f} ms | filas={rows if rows is not None else '-'} | {caller} | {sql}"]
+        lineas.extend(f"    {paso}" for paso in plan or ())
+        self._slow_logger.warning("\n".join(lineas))
+
+    # ---------- Consulta de estadísticas ----------
+
+    def top(self, n=None, by='total'):
+        """
+        Sentencias con mayor costo acumulado.
+
+        Args:
+            n: Cantidad a devolver (por defecto Config.DB_QUERY_STATS_TOP)
+            by: Criterio: 'total', 'avg', 'max', 'count' o 'slow'
+
+        Returns:
+            list[dict]: Estadísticas por sentencia (ver StatementStats.to_dict)
+        """
+        n = n or Config.DB_QUERY_STATS_TOP
+        if by not in ('total', 'avg', 'max', 'count', 'slow'):
+            raise ValueError(f"Criterio de orden no válido: {by}")
+        with self._lock:
+            ordenadas = sorted(self._stats.values(),
+                               key=lambda s: getattr(s, by), reverse=True)
+            return [s.to_dict() for s in ordenadas[:n]]
+
+    def format_top(self, n=None, by='total'):
+        """
+        Tabla de texto con el top-N (para el log o el panel de diagnóstico).
+
+        Args:
+            n: Cantidad de sentencias
+            by: Criterio de orden (ver top)
+
+        Returns:
+            str: Tabla formateada
+        """
+        filas = self.top(n, by)
+        if not filas:
+            return "Sin consultas registradas"
+
+        lineas = [f"{'total ms':>10} {'n':>7} {'prom ms':>8} {'máx ms':>8} {'lentas':>6}  sentencia"]
+        for s in filas:
+            lineas.append(
+                f"{s['total_ms']:>10.1f} {s['count']:>7} {s['avg_ms']:>8.2f} "
+                f"{s['max_ms']:>8.1f} {s['slow']:>6}  {s['sql'][:160]}"
+            )
+            llamadores = sorted(s['callers'].items(), key=lambda c: c[1], reverse=True)
+            lineas.append(
+                f"{'':>44}  ← " + ", ".join(f"{c} ({k})" for c, k in llamadores[:3])
+            )
+        return "\n".join(lineas)
+
+    def log_summary(self, n=None):
+        """Escribe el top-N en el log principal (al cerrar la aplicación)."""
+        if self.enabled and self._stats:
+            logger.info(f"Top de consultas por tiempo total:\n{self.format_top(n)}")
+
+    def reset(self):
+        """Descarta las estadísticas acumuladas."""
+        with self._lock:
+            self._stats.clear()
+
+
+class _Measurement:
+    __slots__ = ('rows',)
+
+    def __init__(self):
+        self.rows = None
+
+
+_query_stats = QueryStats()
+
+
+def get_query_stats():
+    """Devuelve el registro de estadísticas de consultas del proceso."""
+    return _query_stats
+
+
+class StatsCursor(sqlite3.Cursor):
+    """Cursor que mide cada execute / executemany"""
+
+    def execute(self, sql, parameters=()):
+        stats = _query_stats
+        if not stats.enabled or stats.paused:
+            return super().execute(sql, parameters)
+        inicio = time.perf_counter()
+        try:
+            return super().execute(sql, parameters)
+        finally:
+            filas = self.rowcount   # -1 en SELECT: se cuentan al leer (BaseModel)
+            stats.record(sql, time.perf_counter() - inicio, filas if filas >= 0 else None,
+                         conn=self.connection, params=parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        stats = _query_stats
+        if not stats.enabled or stats.paused:
+            return super().executemany(sql, seq_of_parameters)
+        if not isinstance(seq_of_parameters, (list, tuple)):
+            seq_of_parameters = list(seq_of_parameters)
+        inicio = time.perf_counter()
+        try:
+            return super().executemany(sql, seq_of_parameters)
+        finally:
+            filas = self.rowcount
+            stats.record(sql, time.perf_counter() - inicio, filas if filas >= 0 else None,
+                         conn=self.connection, params=seq_of_parameters)
+
+
+class StatsConnection(sqlite3.Connection):
+    """Conexión cuyos cursores (incluido conn.execute) están instrumentados"""
+
+    def cursor(self, factory=StatsCursor):
+        return super().cursor(factory)
+
+    # Connection.execute de sqlite3 crea su cursor sin pasar por cursor()
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+
+def summarize_slow_log(path=None, n=None):
+    """
+    Agrupa el log de consultas lentas por sentencia.
+
+    Args:
+        path: Archivo de log (por defecto Config.DB_SLOW_QUERY_LOG)
+        n: Cantidad de sentencias a devolver
+
+    Returns:
+        list[tuple]: (sentencia, veces, total_ms, max_ms, llamadores) ordenado por total
+    """
+    path = path or Config.DB_SLOW_QUERY_LOG
+    n = n or Config.DB_QUERY_STATS_TOP
+    grupos = {}
+    with open(path, encoding='utf-8') as f:
+        for linea in f:
+            if linea.startswith(' '):
+                continue   # pasos del plan
+            partes = linea.rstrip('\n').split(' | ', 4)
+            if len(partes) != 5 or not partes[1].endswith(' ms'):
+                continue
+            _, duracion, _, caller, sql = partes
+            ms = float(duracion[:-3])
+            veces, total, maximo, callers = grupos.get(sql, (0, 0.0, 0.0, set()))
+            callers.add(caller)
+            grupos[sql] = (veces + 1, total + ms, max(maximo, ms), callers)
+
+    ordenadas = sorted(grupos.items(), key=lambda g: g[1][1], reverse=True)
+    return [(sql, v, t, m, sorted(c)) for sql, (v, t, m, c) in ordenadas[:n]]
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    n = int(argv[0]) if argv else None
+    try:
+        grupos = summarize_slow_log(n=n)
+    except FileNotFoundError:
+        print(f"No existe {Config.DB_SLOW_QUERY_LOG}: aún no hubo consultas lentas")
+        return 0
+
+    print(f"{'total ms':>10} {'veces':>6} {'máx ms':>8}  sentencia")
+    for sql, veces, total, maximo, callers in grupos:
+        print(f"{total:>10.1f} {veces:>6} {maximo:>8.1f}  {sql}")
+        print(f"{'':>27}  ← {', '.join(callers)}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
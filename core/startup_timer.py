@@ -0,0 +1,149 @@
+# -*- coding: utf-8 -*-
+"""
+Medición del arranque de la aplicación
+
+main.py marca hitos (importaciones, BD lista, QApplication, ventana creada)
+hasta el primer pintado de la ventana principal. Cada arranque se registra
+en el log; con ``--bench-startup`` la app se cierra sola tras el primer
+pintado y agrega una línea JSON a Config.STARTUP_BENCH_LOG, así el tiempo
+de arranque se sigue entre versiones.
+
+El reloj empieza cuando se importa este módulo (primera línea de main.py).
+Si el proceso lo lanzó ``--run``, el tiempo cuenta desde el lanzamiento
+(incluye arrancar el intérprete).
+
+Uso:
+    python main.py --bench-startup        # Un arranque medido
+    python -m core.startup_timer --run 5  # 5 arranques medidos + resumen
+    python -m core.startup_timer [n]      # Resumen de los últimos n arranques
+"""
+import json
+import os
+import subprocess
+import sys
+import time
+from datetime import datetime
+from core.config import Config
+
+ENV_ORIGIN = 'GYM_STARTUP_T0'
+
+_t0 = time.perf_counter()
+_origen = os.environ.get(ENV_ORIGIN)
+# Tiempo transcurrido desde el lanzamiento del proceso hasta importar este módulo
+_offset_ms = max(0.0, (time.time() - float(_origen)) * 1000) if _origen else 0.0
+_hitos = [('proceso', _offset_ms)] if _origen else []
+
+
+def elapsed_ms():
+    """Milisegundos desde el inicio del arranque."""
+    return _offset_ms + (time.perf_counter() - _t0) * 1000
+
+
+def mark(nombre):
+    """
+    Registra un hito del arranque.
+
+    Args:
+        nombre: Identificador del hito (ej: 'bd', 'ventana')
+    """
+    _hitos.append((nombre, elapsed_ms()))
+
+
+def report():
+    """
+    Resumen del arranque actual.
+
+    Returns:
+        dict: fecha, total_ms (último hito) e hitos {nombre: ms acumulados}
+    """
+    return {
+        'fecha': datetime.now().strftime(Config.DATETIME_FORMAT),
+        'total_ms': round(_hitos[-1][1], 1) if _hitos else None,
+        'hitos': {nombre: round(ms, 1) for nombre, ms in _hitos},
+    }
+
+
+def format_report(datos=None):
+    """Una línea legible con el tiempo de cada fase."""
+    datos = datos or report()
+    previo = 0.0
+    fases = []
+    for nombre, ms in datos['hitos'].items():
+        fases.append(f"{nombre} +{ms - previo:.0f}")
+        previo = ms
+    return f"{datos['total_ms']:.0f} ms ({', '.join(fases)})"
+
+
+def record(path=None):
+    """
+    Agrega el arranque actual al historial de benchmarks.
+
+    Args:
+        path: Archivo JSONL (por defecto Config.STARTUP_BENCH_LOG)
+    """
+    with open(path or Config.STARTUP_BENCH_LOG, 'a', encoding='utf-8') as f:
+        f.write(json.dumps(report(), ensure_ascii=False) + '\n')
+
+
+def _percentil(valores, p):
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, int(len(ordenados) * p))]
+
+
+def summarize(path=None, n=20):
+    """
+    Resume los últimos n arranques registrados.
+
+    Args:
+        path: Archivo JSONL (por defecto Config.STARTUP_BENCH_LOG)
+        n: Cantidad de arranques a considerar
+
+    Returns:
+        str: Mediana / p90 / mínimo del total y mediana por hito
+    """
+    path = path or Config.STARTUP_BENCH_LOG
+    try:
+        with open(path, encoding='utf-8') as f:
+            registros = [json.loads(linea) for linea in f if linea.strip()][-n:]
+    except FileNotFoundError:
+        return f"Sin arranques registrados en {path}"
+    if not registros:
+        return f"Sin arranques registrados en {path}"
+
+    totales = [r['total_ms'] for r in registros]
+    lineas = [
+        f"Arranques: {len(registros)} (último {registros[-1]['fecha']})",
+        f"Hasta el primer pintado: mediana {_percentil(totales, 0.5):.0f} ms | "
+        f"p90 {_percentil(totales, 0.9):.0f} ms | mín {min(totales):.0f} ms",
+    ]
+    nombres = list(registros[-1]['hitos'])
+    lineas.append("Mediana acumulada por hito:")
+    for nombre in nombres:
+        valores = [r['hitos'][nombre] for r in registros if nombre in r['hitos']]
+        lineas.append(f"  {nombre:<16} {_percentil(valores, 0.5):8.0f} ms")
+    lineas.append(f"Último: {format_report(registros[-1])}")
+    return '\n'.join(lineas)
+
+
+def run_benchmark(veces=5):
+    """
+    Lanza la app ``veces`` veces con --bench-startup (cada una registra su arranque).
+
+    Args:
+        veces: Arranques a medir
+    """
+    raiz = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    for _ in range(veces):
+        env = dict(os.environ, **{ENV_ORIGIN: repr(time.time())})
+        subprocess.run([sys.executable, os.path.join(raiz, 'main.py'), '--bench-startup'],
+                       cwd=raiz, env=env, check=True)
+
+
+if __name__ == '__main__':
+    args = sys.argv[1:]
+    if args and args[0] == '--run':
+        veces = int(args[1]) if len(args) > 1 else 5
+        run_benchmark(veces)
+        print(summarize(n=veces))
+    else:
+        print(summarize(n=int(args[0]) if args else 20))
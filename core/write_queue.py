@@ -0,0 +1,331 @@
+# -*- coding: utf-8 -*-
+"""
+Cola de escritura con commit agrupado (group commit)
+
+En modo autoconsumo cada escritura abre su transacción y hace su propio
+commit, y cada commit es un fsync. En horas pico (check-ins, ventas, caja)
+eso limita el ritmo de escritura al del disco.
+
+Aquí un único hilo escritor toma los trabajos encolados por los servicios y
+ejecuta todos los que llegan en la misma ventana (unos pocos ms) dentro de
+una sola transacción: un fsync para todo el lote. Cada trabajo corre en su
+propio SAVEPOINT, así el error de uno revierte solo lo suyo; su Future recibe
+el resultado o la excepción recién después del COMMIT del lote.
+
+Un trabajo es una función ``trabajo(conn)`` que escribe con la conexión que
+recibe y NO hace commit ni rollback (eso lo maneja la cola).
+
+Desde un trabajo, ``after_commit(fn)`` deja ``fn`` para después del COMMIT
+(ej: publicar un evento). Corre en el hilo que esperaba la escritura y se
+descarta si el trabajo se revierte.
+"""
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from core.config import Config
+from core.database_manager import get_pool
+from core.logger import logger
+
+_STOP = object()
+_local = threading.local()
+
+
+class _Job:
+    __slots__ = ('fn', 'future', 'callbacks')
+
+    def __init__(self, fn):
+        self.fn = fn
+        self.future = Future()
+        self.callbacks = []
+
+
+class WriteQueue:
+    """Hilo escritor único que confirma los trabajos por lotes"""
+
+    def __init__(self, window_ms=None, max_batch=None):
+        self.window = (window_ms if window_ms is not None else Config.DB_GROUP_COMMIT_MS) / 1000.0
+        self.max_batch = max_batch or Config.DB_GROUP_COMMIT_MAX
+        self._jobs = queue.SimpleQueue()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._conn = None
+        self.stats = {'jobs': 0, 'batches': 0, 'errors': 0, 'max_batch': 0}
+
+    # ------------------------------------------------------------------
+    # Ciclo de vida
+    # ------------------------------------------------------------------
+
+    def start(self):
+        """Inicia el hilo escritor (idempotente)."""
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._conn = get_pool().acquire()
+            self._thread = threading.Thread(target=self._run, name="WriteQueue", daemon=True)
+            self._thread.start()
+        logger.info(
+            f"Cola de escritura iniciada (ventana {self.window * 1000:.0f} ms, "
+            f"lote máx. {self.max_batch})"
+        )
+
+    def stop(self, timeout=10):
+        """Confirma lo pendiente y detiene el hilo escritor."""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is None:
+            return
+        self._jobs.put(_STOP)
+        thread.join(timeout=timeout)
+        get_pool().release(self._conn)
+        self._conn = None
+        logger.info(f"Cola de escritura detenida: {self.stats}")
+
+    # ------------------------------------------------------------------
+    # API
+    # ------------------------------------------------------------------
+
+    def submit(self, fn):
+        """
+        Encola un trabajo de escritura.
+
+        Args:
+            fn: Función ``fn(conn)`` que escribe sin hacer commit
+
+        Returns:
+            Future: Se resuelve con el valor de ``fn`` (o su excepción)
+                    cuando el lote que lo contiene quedó confirmado
+        """
+        if threading.current_thread() is self._thread:
+            # Trabajo encolado desde otro trabajo: corre en la misma transacción
+            return self._run_nested(fn)
+        job = self._enqueue(fn)
+        # Sin nadie esperando, lo diferido corre en el hilo escritor
+        job.future.add_done_callback(
+            lambda f: f.cancelled() or f.exception() or _run_callbacks(job.callbacks)
+        )
+        return job.future
+
+    def run(self, fn, timeout=None):
+        """
+        Encola un trabajo y espera su resultado.
+
+        Args:
+            fn: Función ``fn(conn)`` que escribe sin hacer commit
+            timeout: Segundos máximos de espera (None = sin límite)
+
+        Returns:
+            Any: Lo que devuelva ``fn``
+
+        Raises:
+            Exception: La que lanzó ``fn`` (sus cambios se revierten)
+        """
+        if threading.current_thread() is self._thread:
+            return self._run_nested(fn).result()
+        job = self._enqueue(fn)
+        resultado = job.future.result(timeout)
+        _run_callbacks(job.callbacks)
+        return resultado
+
+    def _enqueue(self, fn):
+        if self._thread is None:
+            self.start()
+        job = _Job(fn)
+        self._jobs.put(job)
+        return job
+
+    # ------------------------------------------------------------------
+    # Hilo escritor
+    # ------------------------------------------------------------------
+
+    def _run(self):
+        detener = False
+        while not detener:
+            job = self._jobs.get()
+            if job is _STOP:
+                break
+
+            lote = [job]
+            limite = time.monotonic() + self.window
+            while len(lote) < self.max_batch:
+                # Primero lo que ya está en cola; después se espera el resto de la ventana
+                try:
+                    siguiente = self._jobs.get_nowait()
+                except queue.Empty:
+                    restante = limite - time.monotonic()
+                    if restante <= 0:
+                        break
+                    try:
+                        siguiente = self._jobs.get(timeout=restante)
+                    except queue.Empty:
+                        break
+                if siguiente is _STOP:
+                    detener = True
+                    break
+                lote.append(siguiente)
+
+            self._commit_batch(lote)
+
+    def _commit_batch(self, lote):
+        conn = self._conn
+        hechos = []
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            for job in lote:
+                if not job.future.set_running_or_notify_cancel():
+                    continue
+                conn.execute("SAVEPOINT trabajo")
+                _local.after_commit = job.callbacks
+                try:
+                    resultado = job.fn(conn)
+                except Exception as e:
+                    conn.execute("ROLLBACK TO trabajo")
+                    conn.execute("RELEASE trabajo")
+                    job.callbacks.clear()
+                    hechos.append((job, None, e))
+                else:
+                    conn.execute("RELEASE trabajo")
+                    hechos.append((job, resultado, None))
+                finally:
+                    _local.after_commit = None
+            conn.commit()
+        except Exception as e:
+            # Falló el lote completo (BEGIN/COMMIT o una BD inconsistente)
+            logger.error(f"Cola de escritura: lote de {len(lote)} revertido: {e}")
+            try:
+                conn.rollback()
+            except Exception:
+                pass
+            for job in lote:
+                job.callbacks.clear()
+                if not job.future.done():
+                    job.future.set_exception(e)
+            self.stats['errors'] += len(lote)
+            return
+
+        self.stats['jobs'] += len(hechos)
+        self.stats['batches'] += 1
+        self.stats['max_batch'] = max(self.stats['max_batch'], len(hechos))
+        for job, resultado, error in hechos:
+            if error is not None:
+                self.stats['errors'] += 1
+                job.future.set_exception(error)
+            else:
+                job.future.set_result(resultado)
+
+    def _run_nested(self, fn):
+        future = Future()
+        try:
+            future.set_result(_run_savepoint(self._conn, fn))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+
+def _run_savepoint(conn, fn):
+    # Escritura dentro de otra escritura en curso (mismo hilo): corre en un
+    # savepoint de la misma transacción en lugar de pedir otro lock de
+    # escritura, que nunca llegaría mientras la de afuera no termine
+    diferidos = _local.after_commit
+    marca = len(diferidos)
+    conn.execute("SAVEPOINT anidado")
+    try:
+        resultado = fn(conn)
+    except Exception:
+        conn.execute("ROLLBACK TO anidado")
+        conn.execute("RELEASE anidado")
+        del diferidos[marca:]
+        raise
+    conn.execute("RELEASE anidado")
+    return resultado
+
+
+def after_commit(fn, key=None):
+    """
+    Ejecuta ``fn()`` cuando se confirme la escritura en curso.
+
+    Dentro de un trabajo (run_write) se difiere hasta el COMMIT y se descarta
+    si el trabajo se revierte; fuera de una escritura gestionada corre de
+    inmediato.
+
+    Args:
+        fn: Función sin argumentos (ej: publicar un evento)
+        key: Si ya hay una función diferida con esta clave en el trabajo, no
+             se agrega otra (ej: un solo recálculo por transacción)
+    """
+    diferidos = getattr(_local, 'after_commit', None)
+    if diferidos is None:
+        _run_callbacks([(key, fn)])
+    elif key is None or all(k != key for k, _ in diferidos):
+        diferidos.append((key, fn))
+
+
+def _run_callbacks(callbacks):
+    # La escritura ya está confirmada: un error aquí solo se registra
+    for _, fn in callbacks:
+        try:
+            fn()
+        except Exception as e:
+            logger.error(f"Error en acción posterior al commit: {e}")
+
+
+_write_queue = None
+_write_queue_lock = threading.Lock()
+
+
+def get_write_queue():
+    """Devuelve la cola de escritura del proceso (se inicia en el primer uso)."""
+    global _write_queue
+    with _write_queue_lock:
+        if _write_queue is None:
+            _write_queue = WriteQueue()
+        return _write_queue
+
+
+def stop_write_queue():
+    """Confirma lo pendiente y detiene el hilo escritor (al cerrar la app)."""
+    global _write_queue
+    with _write_queue_lock:
+        cola, _write_queue = _write_queue, None
+    if cola is not None:
+        cola.stop()
+
+
+def run_write(fn):
+    """
+    Ejecuta un trabajo de escritura en su propia transacción lógica.
+
+    Con Config.DB_WRITE_QUEUE pasa por la cola (commit agrupado); si no, abre
+    una transacción IMMEDIATE en una conexión del pool y la confirma. Llamada
+    desde dentro de otra escritura en curso, corre en un savepoint de ella.
+
+    Args:
+        fn: Función ``fn(conn)`` que escribe sin hacer commit
+
+    Returns:
+        Any: Lo que devuelva ``fn``
+    """
+    if Config.DB_WRITE_QUEUE:
+        return get_write_queue().run(fn)
+
+    actual = getattr(_local, 'conn', None)
+    if actual is not None:
+        return _run_savepoint(actual, fn)
+
+    pool = get_pool()
+    conn = pool.acquire()
+    diferidos = _local.after_commit = []
+    _local.conn = conn
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        resultado = fn(conn)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        _local.after_commit = None
+        _local.conn = None
+        pool.release(conn)
+    _run_callbacks(diferidos)
+    return resultado
@@ -2,39 +2,73 @@
 """
 Punto de entrada principal de GymManager PRO
 """
+from core import startup_timer  # 🔥 Primero: el reloj del arranque empieza aquí
 import sys
+from PyQt6.QtCore import QTimer
 from PyQt6.QtWidgets import QApplication
-from core.database_manager import create_initial_tables
+from core.database_manager import (
+    create_initial_tables, close_pool, start_maintenance, stop_maintenance
+)
+from core.config import Config
 from core.logger import logger
+from core.query_stats import get_query_stats
+from core.write_queue import stop_write_queue
+from ui.async_bridge import shutdown_bridge
 from ui.main_window import MainWindow
 from ui.styles import ESTILO_OSCURO
 
 def main():
     """Función principal de inicio"""
+    startup_timer.mark('imports')
+    bench_startup = '--bench-startup' in sys.argv
+
     logger.info("="*50)
     logger.info("Iniciando GymManager PRO")
     logger.info("="*50)
     
-    # Crear/actualizar base de datos
-    try:
-        create_initial_tables()
-        logger.info("Base de datos inicializada correctamente")
-    except Exception as e:
-        logger.error(f"Error al inicializar base de datos: {e}")
-        sys.exit(1)
-
+    if Config.API_URL:
+        # 🔥 La terminal no abre la BD compartida: migraciones, perfil de
+        # almacenamiento y mantenimiento son cosa del servidor POS
+        logger.info(f"Modo terminal: servicios vía el servidor POS {Config.API_URL}")
+    else:
+        # Crear/actualizar base de datos
+        try:
+            create_initial_tables()
+            start_maintenance()
+            logger.info("Base de datos inicializada correctamente")
+            startup_timer.mark('bd')
+        except Exception as e:
+            logger.error(f"Error al inicializar base de datos: {e}")
+            sys.exit(1)
+    
     # Crear aplicación Qt
     app = QApplication(sys.argv)
     app.setStyleSheet(ESTILO_OSCURO)
+    startup_timer.mark('qt')
     
     # Crear y mostrar ventana principal
     ventana = MainWindow()
+    startup_timer.mark('ventana')
+
+    def primer_pintado():
+        startup_timer.mark('primer_pintado')
+        logger.info(f"Arranque hasta el primer pintado: {startup_timer.format_report()}")
+        if bench_startup:
+            startup_timer.record()
+            QTimer.singleShot(0, app.quit)
+
+    ventana.primer_pintado.connect(primer_pintado)
     ventana.show()
     
     logger.info("Aplicación iniciada correctamente")
     
     # Ejecutar loop de eventos
     exit_code = app.exec()
+    shutdown_bridge()
+    stop_maintenance()
+    stop_write_queue()
+    get_query_stats().log_summary()
+    close_pool()
     
     logger.info(f"Aplicación cerrada con código: {exit_code}")
     sys.exit(exit_code)
@@ -5,7 +5,7 @@ Modelo para gestión de asistencias
 import sqlite3
 from datetime import datetime
 from core.base_model import BaseModel
-from core.config import Config
+from models.member_model import MemberModel
 
 class AttendanceModel(BaseModel):
     """Modelo para operaciones CRUD de asistencias"""
@@ -13,7 +13,8 @@ class AttendanceModel(BaseModel):
     def insert_check_in(self, miembro_id, fecha_hora_entrada):
         """
         Registra una asistencia de entrada.
-        Valida que no exista ya una entrada el mismo día.
+        El índice único idx_attendance_miembro_dia impide una segunda
+        entrada el mismo día.
         
         Args:
             miembro_id: ID del miembro
@@ -22,34 +23,144 @@ class AttendanceModel(BaseModel):
         Raises:
             ValueError: Si ya registró asistencia hoy
         """
-        with self.get_db_connection() as conn:
-            cursor = conn.cursor()
-            
-            # Verificar si ya registró hoy
-            fecha_hoy = datetime.now().strftime(Config.DATE_FORMAT)
-            cursor.execute("""
-                SELECT 1
-                FROM attendance
-                WHERE miembro_id = ? AND DATE(fecha_hora_entrada) = ?
-                LIMIT 1
-            """, (miembro_id, fecha_hoy))
-            
-            existe = cursor.fetchone()
-            
-            if existe:
+        def _insert(conn):
+            try:
+                conn.execute("""
+                    INSERT INTO attendance (miembro_id, fecha_hora_entrada)
+                    VALUES (?, ?)
+                """, (miembro_id, fecha_hora_entrada))
+            except sqlite3.IntegrityError:
                 raise ValueError("Ya registró asistencia hoy")
+        
+        self.run_write(_insert)
+        
+        self.logger.info(
+            f"Asistencia registrada: Miembro={miembro_id}, Fecha={fecha_hora_entrada}"
+        )
+
+    def register_check_in(self, identifier, fecha_hora_entrada):
+        """
+        Check-in completo en una sola conexión y transacción: resuelve el
+        miembro por DNI o código, lee su vencimiento de member_status e
+        inserta la entrada solo si la membresía está vigente ese día.
+        
+        Args:
+            identifier: DNI o código de membresía
+            fecha_hora_entrada: Fecha y hora de entrada (YYYY-MM-DD HH:MM:SS)
+            
+        Returns:
+            tuple: (miembro_id, nombre, latest_expiry, registrado)
+                   o None si el miembro no existe
             
-            # Insertar nueva asistencia
-            cursor.execute("""
+        Raises:
+            ValueError: Si ya registró asistencia hoy
+        """
+        identifier = identifier.strip()
+        return self.run_write(
+            lambda conn: self._register_check_in(conn, identifier, fecha_hora_entrada)
+        )
+
+    def _register_check_in(self, conn, identifier, fecha_hora_entrada):
+        # 🔥 Corre como trabajo de la cola de escritura: la transacción ya tiene
+        # el lock de escritura (BEGIN IMMEDIATE), así la lectura y el INSERT
+        # ven el mismo estado y no hay upgrade de lock que pueda fallar
+        fecha_dia = fecha_hora_entrada[:10]
+        
+        miembro = conn.execute("""
+            SELECT m.id, m.nombre, ms.latest_expiry
+            FROM members m
+            LEFT JOIN member_status ms ON ms.miembro_id = m.id
+            WHERE m.dni = ?
+            UNION ALL
+            SELECT m.id, m.nombre, ms.latest_expiry
+            FROM members m
+            LEFT JOIN member_status ms ON ms.miembro_id = m.id
+            WHERE m.codigo_membresia = ?
+            LIMIT 1
+        """, (identifier, MemberModel.normalizar_codigo(identifier))).fetchone()
+        
+        if not miembro:
+            return None
+        
+        miembro_id, nombre, latest_expiry = miembro
+        
+        if not latest_expiry or latest_expiry < fecha_dia:
+            return (miembro_id, nombre, latest_expiry, False)
+        
+        try:
+            conn.execute("""
                 INSERT INTO attendance (miembro_id, fecha_hora_entrada)
                 VALUES (?, ?)
             """, (miembro_id, fecha_hora_entrada))
+        except sqlite3.IntegrityError:
+            raise ValueError("Ya registró asistencia hoy")
+        
+        return (miembro_id, nombre, latest_expiry, True)
+
+    def insert_check_ins_batch(self, registros):
+        """
+        Inserta un lote de entradas en una sola transacción (modo kiosco).
+        Las entradas repetidas del mismo día se descartan por el índice
+        único idx_attendance_miembro_dia; las de miembros eliminados, por la FK.
+        
+        Args:
+            registros: Lista de tuplas (miembro_id, fecha_hora_entrada)
             
-            conn.commit()
+        Returns:
+            list: Registros efectivamente insertados (el resto se descartó)
+        """
+        query = """
+            INSERT OR IGNORE INTO attendance (miembro_id, fecha_hora_entrada)
+            VALUES (?, ?)
+        """
+        
+        def _insertar(conn):
+            insertados = []
+            # Fila por fila (mismo trabajo) para saber cuáles se descartaron
+            for registro in registros:
+                try:
+                    if conn.execute(query, registro).rowcount:
+                        insertados.append(registro)
+                except sqlite3.IntegrityError as e:
+                    # Un miembro eliminado entre la marcación y el volcado rompe la FK
+                    self.logger.warning(f"Entrada de kiosco descartada {registro}: {e}")
+            return insertados
+        
+        return self.run_write(_insertar)
+
+    def get_member_ids_checked_in(self, fecha):
+        """
+        IDs de miembros con entrada registrada en un día.
+        
+        Args:
+            fecha: Día a consultar (YYYY-MM-DD, date o datetime)
             
-            self.logger.info(
-                f"Asistencia registrada: Miembro={miembro_id}, Fecha={fecha_hora_entrada}"
-            )
+        Returns:
+            set: IDs de miembros
+        """
+        query = """
+            SELECT DISTINCT miembro_id FROM attendance
+            WHERE fecha_hora_entrada >= ? AND fecha_hora_entrada < ?
+        """
+        return {fila[0] for fila in self.execute_query(query, self.day_range(fecha))}
+
+    def has_check_in(self, miembro_id, fecha):
+        """
+        Indica si un miembro tiene entrada registrada en un día.
+        
+        Args:
+            miembro_id: ID del miembro
+            fecha: Día a consultar (YYYY-MM-DD, date o datetime)
+            
+        Returns:
+            bool: True si hay al menos una entrada ese día
+        """
+        query = """
+            SELECT 1 FROM attendance
+            WHERE miembro_id = ? AND fecha_hora_entrada >= ? AND fecha_hora_entrada < ?
+            LIMIT 1
+        """
+        return self.execute_query(query, (miembro_id, *self.day_range(fecha)), fetch_one=True) is not None
 
     def delete_last_check_in(self, miembro_id):
         """
@@ -61,65 +172,79 @@ class AttendanceModel(BaseModel):
         Returns:
             bool: True si se eliminó, False si no había entradas
         """
-        with self.get_db_connection() as conn:
-            cursor = conn.cursor()
-            
+        def _eliminar(conn):
             # Buscar última entrada
-            cursor.execute("""
+            row = conn.execute("""
                 SELECT id FROM attendance
                 WHERE miembro_id = ?
                 ORDER BY fecha_hora_entrada DESC
                 LIMIT 1
-            """, (miembro_id,))
-            
-            row = cursor.fetchone()
+            """, (miembro_id,)).fetchone()
             
             if not row:
-                return False
+                return None
             
-            last_id = row[0]
-            
-            # Eliminar
-            cursor.execute("DELETE FROM attendance WHERE id = ?", (last_id,))
-            conn.commit()
-            
-            self.logger.info(f"Asistencia eliminada: ID={last_id}, Miembro={miembro_id}")
-            
-            return True
+            conn.execute("DELETE FROM attendance WHERE id = ?", (row[0],))
+            return row[0]
+        
+        last_id = self.run_write(_eliminar)
+        if last_id is None:
+            return False
+        
+        self.logger.info(f"Asistencia eliminada: ID={last_id}, Miembro={miembro_id}")
+        
+        return True
 
-    def get_todays_log(self):
+    def get_todays_log(self, after_id=None, before=None, limit=None):
         """
         Devuelve una lista de asistencias registradas hoy con información del miembro.
         
+        🔥 Solo recorre las entradas de hoy (rango sobre idx_attendance_fecha) y
+        toma el plan vigente de la proyección member_status, sin agrupar payments.
+        
+        Args:
+            after_id: Si se indica, solo entradas con id mayor (carga incremental)
+            before: (fecha_hora_entrada, id) de la última fila mostrada; trae las
+                    anteriores a ella (paginación por cursor al hacer scroll)
+            limit: Máximo de filas a devolver
+            
         Returns:
-            list: Lista de tuplas (codigo, nombre, plan, vencimiento, hora_entrada)
+            list: Lista de tuplas (id, codigo, nombre, plan, vencimiento, hora_entrada),
+                  de la más reciente a la más antigua
         """
-        fecha_hoy = datetime.now().strftime(Config.DATE_FORMAT)
+        inicio, fin = self.day_range(datetime.now())
         
-        # Query optimizada con subconsulta para obtener solo el plan vigente
         query = """
             SELECT 
+                a.id,
                 m.codigo_membresia,
                 m.nombre,
                 COALESCE(p.nombre_plan, 'Sin plan') AS nombre_plan,
-                pay.fecha_vencimiento,
+                ms.latest_expiry,
                 a.fecha_hora_entrada
             FROM attendance a
             JOIN members m ON a.miembro_id = m.id
-            LEFT JOIN (
-                SELECT 
-                    miembro_id, 
-                    MAX(fecha_vencimiento) AS fecha_vencimiento, 
-                    plan_id
-                FROM payments
-                GROUP BY miembro_id
-            ) pay ON pay.miembro_id = m.id
-            LEFT JOIN plans p ON pay.plan_id = p.id
-            WHERE DATE(a.fecha_hora_entrada) = ?
-            ORDER BY a.fecha_hora_entrada DESC
+            LEFT JOIN member_status ms ON ms.miembro_id = a.miembro_id
+            LEFT JOIN plans p ON p.id = ms.plan_id
+            WHERE a.fecha_hora_entrada >= ? AND a.fecha_hora_entrada < ?
         """
+        params = [inicio, fin]
+        
+        if after_id is not None:
+            query += " AND a.id > ?"
+            params.append(after_id)
+        
+        if before is not None:
+            query += " AND (a.fecha_hora_entrada, a.id) < (?, ?)"
+            params.extend(before)
+        
+        query += " ORDER BY a.fecha_hora_entrada DESC, a.id DESC"
+        
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(limit)
         
-        return self.execute_query(query, (fecha_hoy,))
+        return self.execute_query(query, tuple(params))
 
     def get_log_by_member_and_range(self, miembro_id, desde, hasta):
         """
@@ -148,11 +273,13 @@ class AttendanceModel(BaseModel):
                 FROM payments pay
                 WHERE pay.miembro_id = ?
             ) pay ON a.miembro_id = pay.miembro_id
-                AND DATE(a.fecha_hora_entrada) BETWEEN pay.fecha_pago AND pay.fecha_vencimiento
+                AND a.fecha_hora_entrada >= pay.fecha_pago
+                AND a.fecha_hora_entrada < DATE(pay.fecha_vencimiento, '+1 day')
             LEFT JOIN plans p ON pay.plan_id = p.id
             WHERE a.miembro_id = ?
-              AND DATE(a.fecha_hora_entrada) BETWEEN ? AND ?
+              AND a.fecha_hora_entrada >= ? AND a.fecha_hora_entrada < ?
             ORDER BY a.fecha_hora_entrada DESC
         """
         
-        return self.execute_query(query, (miembro_id, miembro_id, desde, hasta))
+        inicio, fin = self.day_range(desde, hasta)
+        return self.execute_query(query, (miembro_id, miembro_id, inicio, fin))
@@ -3,12 +3,58 @@
 Modelo para gestión de Beneficios y su configuración por categoría
 """
 import json
+from dataclasses import dataclass, field
 from typing import List, Tuple, Optional, Dict, Any
 from core.base_model import BaseModel
+from core.catalog import get_catalog
+
+
+@dataclass(frozen=True)
+class BenefitConfig:
+    """
+    Beneficio habilitado de una categoría con su configuración ya parseada.
+    """
+    codigo: str
+    nombre: str
+    tipo_valor: str
+    icono: Optional[str]
+    config: Dict[str, Any] = field(default_factory=dict)
+    
+    @property
+    def value(self) -> Any:
+        """
+        Valor efectivo del beneficio: cantidad, porcentaje o enabled (en ese orden).
+        
+        Returns:
+            Any: Valor configurado o None si la configuración no tiene ninguno
+        """
+        for clave in ("cantidad", "descuento_porcentaje", "enabled"):
+            if clave in self.config:
+                return self.config[clave]
+        return None
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Formato de diccionario usado por las vistas.
+        
+        Returns:
+            Dict: codigo, nombre, tipo_valor, icono y config
+        """
+        return {
+            "codigo": self.codigo,
+            "nombre": self.nombre,
+            "tipo_valor": self.tipo_valor,
+            "icono": self.icono,
+            "config": self.config
+        }
+
 
 class BenefitModel(BaseModel):
     """Modelo para operaciones CRUD de beneficios"""
     
+    # Catálogo compartido categoría → {codigo: BenefitConfig}
+    CATALOG = 'benefit_matrix'
+    
     # ========== TIPOS DE BENEFICIOS ==========
     
     def get_all_benefit_types(self, include_inactive: bool = False) -> List[Tuple]:
@@ -198,6 +244,7 @@ class BenefitModel(BaseModel):
                 {'valor_configurado': valor_json},
                 {'id': existing[0]}
             )
+            get_catalog().invalidate(self.CATALOG)
             return existing[0]
         else:
             # Insertar
@@ -206,7 +253,9 @@ class BenefitModel(BaseModel):
                 'benefit_type_id': benefit_type_id,
                 'valor_configurado': valor_json
             }
-            return self.insert('category_benefits', data)
+            registro_id = self.insert('category_benefits', data)
+            get_catalog().invalidate(self.CATALOG)
+            return registro_id
     
     def delete_category_benefit(self, categoria_id: int, benefit_type_id: int) -> bool:
         """
@@ -223,7 +272,102 @@ class BenefitModel(BaseModel):
             'categoria_id': categoria_id,
             'benefit_type_id': benefit_type_id
         }
-        return self.delete('category_benefits', where)
+        deleted = self.delete('category_benefits', where)
+        get_catalog().invalidate(self.CATALOG)
+        return deleted
+    
+    # ========== MATRIZ PRECOMPILADA ==========
+    
+    def load_benefit_matrix(self) -> Dict[int, Dict[str, BenefitConfig]]:
+        """
+        Construye la matriz categoría → beneficios habilitados, con cada
+        valor_configurado parseado una sola vez (cargador del catálogo).
+        
+        Solo incluye categorías activas, tipos de beneficio activos y
+        configuraciones con enabled=True, igual que get_member_benefits.
+        
+        Returns:
+            Dict[int, Dict[str, BenefitConfig]]: Por categoria_id, beneficios por código
+                                                 (ordenados por nombre)
+        """
+        query = """
+            SELECT
+                cb.categoria_id,
+                bt.codigo,
+                bt.nombre,
+                bt.tipo_valor,
+                bt.icono,
+                cb.valor_configurado
+            FROM category_benefits cb
+            JOIN membership_categories mc ON cb.categoria_id = mc.id
+            JOIN benefit_types bt ON cb.benefit_type_id = bt.id
+            WHERE mc.activo = 1
+            AND bt.activo = 1
+            ORDER BY cb.categoria_id, bt.nombre
+        """
+        
+        matriz = {}
+        for categoria_id, codigo, nombre, tipo_valor, icono, valor in self.execute_query(query):
+            try:
+                config = json.loads(valor) if valor else {}
+            except json.JSONDecodeError:
+                self.logger.warning(f"Error parseando config de beneficio {codigo}")
+                continue
+            
+            if config.get("enabled", False):
+                matriz.setdefault(categoria_id, {})[codigo] = BenefitConfig(
+                    codigo, nombre, tipo_valor, icono, config
+                )
+        
+        return matriz
+    
+    def get_benefit_matrix(self) -> Dict[int, Dict[str, BenefitConfig]]:
+        """
+        🔥 Matriz de beneficios en caché (ver core.catalog).
+        
+        Returns:
+            Dict[int, Dict[str, BenefitConfig]]: Matriz compartida, no modificar
+        """
+        return get_catalog().get(self.CATALOG, self.load_benefit_matrix)
+    
+    def get_member_categories(self, miembro_id: int) -> List[int]:
+        """
+        Categorías de todos los pagos vigentes de un miembro (usa
+        idx_payments_miembro_venc), de la del último vencimiento a la más antigua.
+        
+        Un miembro puede tener varios planes vigentes a la vez (ej: uno sin
+        categoría recién pagado y otro Premium): sus beneficios se suman.
+        
+        Args:
+            miembro_id: ID del miembro
+            
+        Returns:
+            List[int]: IDs de categoría (vacía si no tiene pagos vigentes con categoría)
+        """
+        query = """
+            SELECT pl.categoria_id
+            FROM payments pay
+            JOIN plans pl ON pay.plan_id = pl.id
+            WHERE pay.miembro_id = ?
+            AND pay.fecha_vencimiento >= DATE('now')
+            AND pl.categoria_id IS NOT NULL
+            GROUP BY pl.categoria_id
+            ORDER BY MAX(pay.fecha_vencimiento) DESC, pl.categoria_id
+        """
+        return [fila[0] for fila in self.execute_query(query, (miembro_id,))]
+    
+    def get_member_category(self, miembro_id: int) -> Optional[int]:
+        """
+        Categoría a mostrar de un miembro: la del pago vigente que vence último.
+        
+        Args:
+            miembro_id: ID del miembro
+            
+        Returns:
+            int: ID de la categoría o None si no tiene membresía vigente con categoría
+        """
+        categorias = self.get_member_categories(miembro_id)
+        return categorias[0] if categorias else None
     
     def get_member_benefits(self, miembro_id: int) -> List[Dict[str, Any]]:
         """
@@ -236,7 +380,8 @@ class BenefitModel(BaseModel):
             List[Dict]: Beneficios del miembro
             
         Nota:
-            Requiere que el miembro tenga un pago activo con plan que tenga categoría
+            Requiere que el miembro tenga un pago activo con plan que tenga categoría.
+            Se suman los beneficios de las categorías de todos sus pagos vigentes.
         """
         query = """
             SELECT DISTINCT
@@ -245,13 +390,12 @@ class BenefitModel(BaseModel):
                 bt.tipo_valor,
                 bt.icono,
                 cb.valor_configurado
-            FROM members m
-            JOIN payments pay ON m.id = pay.miembro_id
+            FROM payments pay
             JOIN plans pl ON pay.plan_id = pl.id
             JOIN membership_categories mc ON pl.categoria_id = mc.id
             JOIN category_benefits cb ON mc.id = cb.categoria_id
             JOIN benefit_types bt ON cb.benefit_type_id = bt.id
-            WHERE m.id = ?
+            WHERE pay.miembro_id = ?
             AND pay.fecha_vencimiento >= DATE('now')
             AND mc.activo = 1
             AND bt.activo = 1
@@ -305,4 +449,20 @@ class BenefitModel(BaseModel):
                 'tipo_valor': result[3],
                 'descripcion': result[4]
             }
-        return None
\ No newline at end of file
+        return None
+
+    def get_next_benefit_code(self):
+        """
+        Genera el siguiente código automático de beneficio (BEN001, BEN002...).
+        
+        Returns:
+            str: Código libre siguiente al mayor BENnnn existente
+        """
+        query = """
+            SELECT MAX(CAST(SUBSTR(codigo, 4) AS INTEGER))
+            FROM benefit_types
+            WHERE codigo LIKE 'BEN%'
+        """
+        result = self.execute_query(query, fetch_one=True)
+        max_code = (result[0] if result else None) or 0
+        return f"BEN{str(max_code + 1).zfill(3)}"
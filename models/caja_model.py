@@ -3,8 +3,13 @@
 Modelo para gestión de caja y movimientos de efectivo
 """
 from core.base_model import BaseModel
+from core.event_bus import get_event_bus
+from core.events import CashBalanceChanged, CashMovementRecorded
+from core.write_queue import after_commit
 from core.response import Result
 
+METODOS_PAGO = ('efectivo', 'yape', 'plin', 'pos_banco')
+
 
 class CajaModel(BaseModel):
     """Modelo para operaciones de caja y cash movements"""
@@ -65,6 +70,7 @@ class CajaModel(BaseModel):
             caja_sesion_id = self.execute_query(
                 query,
                 (usuario_id, efectivo_inicial, yape_inicial, plin_inicial, pos_banco_inicial), commit=True)
+            self.publicar_saldos()
             return Result.ok("Caja abierta exitosamente", {"caja_sesion_id": caja_sesion_id})
         except Exception as e:
             return Result.fail(f"Error al abrir caja: {str(e)}")
@@ -140,6 +146,7 @@ class CajaModel(BaseModel):
                 "UPDATE cash_movements SET caja_sesion_id = ? WHERE caja_sesion_id IS NULL",
                 (caja_sesion_id,), commit=True)
             
+            self.publicar_saldos()
             return Result.ok(
                 f"Caja cerrada ({estado})",
                 {
@@ -158,6 +165,10 @@ class CajaModel(BaseModel):
         """
         Calcula los totales de una sesión de caja
         
+        🔥 Si la sesión está abierta los totales salen de caja_saldos (una fila
+        por método, mantenida por triggers); las sesiones cerradas se suman
+        desde sus movimientos.
+        
         Args:
             caja_sesion_id: ID de la sesión
             
@@ -165,14 +176,15 @@ class CajaModel(BaseModel):
             dict: Totales calculados por método de pago
         """
         # Obtener montos iniciales
-        sesion = self.execute_query("""SELECT efectivo_inicial, yape_inicial, plin_inicial, pos_banco_inicial
+        sesion = self.execute_query("""SELECT efectivo_inicial, yape_inicial, plin_inicial, pos_banco_inicial, estado
                FROM caja_sesiones WHERE id = ?""",
             (caja_sesion_id,), fetch_one=True)
         
         if not sesion or sesion == True:
             return None
         
-        efectivo_ini, yape_ini, plin_ini, pos_banco_ini = sesion
+        if sesion[4] == 'abierta':
+            return self._totales(sesion, self._saldos_pendientes())
         
         # Calcular ingresos y egresos por método
         query = """
@@ -188,35 +200,32 @@ class CajaModel(BaseModel):
         
         movimientos = self.execute_query(query, (caja_sesion_id,), fetch_all=True)
         
-        # Inicializar totales
-        totales = {
-            'efectivo_ingresos': 0,
-            'efectivo_egresos': 0,
-            'yape_ingresos': 0,
-            'yape_egresos': 0,
-            'plin_ingresos': 0,
-            'plin_egresos': 0,
-            'pos_banco_ingresos': 0,
-            'pos_banco_egresos': 0
-        }
-        
-        # Sumar movimientos
+        # Sumar movimientos: {metodo: [ingresos, egresos]}
+        por_metodo = {metodo: [0, 0] for metodo in METODOS_PAGO}
         for metodo, tipo, total in movimientos:
-            key = f"{metodo}_{tipo}s"  # ej: 'efectivo_ingresos'
-            if key in totales:
-                totales[key] = total
-        
-        # Calcular esperados
-        return {
-            'efectivo_esperado': efectivo_ini + totales['efectivo_ingresos'] - totales['efectivo_egresos'],
-            'yape_esperado': yape_ini + totales['yape_ingresos'] - totales['yape_egresos'],
-            'plin_esperado': plin_ini + totales['plin_ingresos'] - totales['plin_egresos'],
-            'pos_banco_esperado': pos_banco_ini + totales['pos_banco_ingresos'] - totales['pos_banco_egresos'],
-            'total_ingresos': sum([totales['efectivo_ingresos'], totales['yape_ingresos'], 
-                                  totales['plin_ingresos'], totales['pos_banco_ingresos']]),
-            'total_egresos': sum([totales['efectivo_egresos'], totales['yape_egresos'], 
-                                 totales['plin_egresos'], totales['pos_banco_egresos']])
+            if metodo in por_metodo:
+                por_metodo[metodo][0 if tipo == 'ingreso' else 1] = total
+        
+        return self._totales(sesion, por_metodo)
+
+    def _saldos_pendientes(self):
+        """Ingresos y egresos de la sesión abierta por método, desde caja_saldos."""
+        filas = self.execute_query("SELECT metodo_pago, ingresos, egresos FROM caja_saldos")
+        por_metodo = {metodo: [0, 0] for metodo in METODOS_PAGO}
+        for metodo, ingresos, egresos in filas:
+            por_metodo[metodo] = [ingresos, egresos]
+        return por_metodo
+
+    @staticmethod
+    def _totales(sesion, por_metodo):
+        """Esperado por método = inicial + ingresos - egresos."""
+        totales = {
+            f'{metodo}_esperado': round(inicial + por_metodo[metodo][0] - por_metodo[metodo][1], 2)
+            for metodo, inicial in zip(METODOS_PAGO, sesion[:4])
         }
+        totales['total_ingresos'] = sum(v[0] for v in por_metodo.values())
+        totales['total_egresos'] = sum(v[1] for v in por_metodo.values())
+        return totales
 
     # ==================== MOVIMIENTOS DE EFECTIVO ====================
 
@@ -249,17 +258,27 @@ class CajaModel(BaseModel):
             ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
         """
         
+        params = (tipo_movimiento, categoria, metodo_pago, monto,
+                  referencia_tipo, referencia_id, descripcion, glosa, usuario_id)
+        
+        def _insertar(conn):
+            movement_id = self.execute_query(query, params, fetch_all=False, connection=conn)
+            # 🔥 Los eventos salen tras el COMMIT de la transacción que lo contiene
+            # (un solo recálculo de saldos aunque haya varios movimientos)
+            bus = get_event_bus()
+            bus.publish_after_commit(CashMovementRecorded(
+                movement_id, tipo_movimiento, categoria, metodo_pago, monto
+            ))
+            after_commit(self.publicar_saldos, key='caja_saldos')
+            return movement_id
+        
         try:
-            # 🔥 Si hay connection, NO hacemos commit aquí (lo hace el servicio padre)
-            do_commit = (connection is None)
-            
-            movement_id = self.execute_query(
-                query,
-                (tipo_movimiento, categoria, metodo_pago, monto,
-                 referencia_tipo, referencia_id, descripcion, glosa, usuario_id),
-                commit=do_commit,
-                connection=connection  # Pasamos la conexión al BaseModel
-            )
+            # 🔥 Si hay connection, NO hacemos commit aquí (lo hace el servicio padre);
+            # si no, el INSERT va a la cola de escritura (commit agrupado)
+            if connection is not None:
+                movement_id = _insertar(connection)
+            else:
+                movement_id = self.run_write(_insertar)
             return Result.ok("Movimiento registrado exitosamente", {"movement_id": movement_id})
         except Exception as e:
             return Result.fail(f"Error al registrar movimiento: {str(e)}")
@@ -276,8 +295,8 @@ class CajaModel(BaseModel):
                 id, fecha_hora, tipo_movimiento, categoria, metodo_pago,
                 monto, descripcion, estado
             FROM cash_movements
-            WHERE DATE(fecha_hora) = DATE('now', 'localtime')
-            AND estado = 'activo'
+            WHERE estado = 'activo'
+            AND fecha_hora >= DATE('now', 'localtime') AND fecha_hora < DATE('now', 'localtime', '+1 day')
             ORDER BY fecha_hora DESC
         """
         return self.execute_query(query, fetch_all=True)
@@ -299,11 +318,11 @@ class CajaModel(BaseModel):
                 id, fecha_hora, tipo_movimiento, categoria, metodo_pago,
                 monto, descripcion, estado
             FROM cash_movements
-            WHERE DATE(fecha_hora) BETWEEN ? AND ?
-            AND estado = 'activo'
+            WHERE estado = 'activo'
+            AND fecha_hora >= ? AND fecha_hora < ?
         """
         
-        params = [fecha_inicio, fecha_fin]
+        params = list(self.day_range(fecha_inicio, fecha_fin))
         
         if categoria:
             query += " AND categoria = ?"
@@ -323,26 +342,52 @@ class CajaModel(BaseModel):
         Returns:
             Result: Resultado de la operación
         """
-        query = "UPDATE cash_movements SET estado = 'extornado' WHERE id = ?"
         try:
-            self.execute_query(query, (movement_id,), commit=True)
+            self.run_write(lambda conn: self.update(
+                'cash_movements', {'estado': 'extornado'}, {'id': movement_id}, connection=conn
+            ))
+            self.publicar_saldos()
             return Result.ok("Movimiento eliminado exitosamente")
         except Exception as e:
             return Result.fail(f"Error al eliminar movimiento: {str(e)}")
 
     def get_saldos_actuales(self):
         """
-        Calcula los saldos actuales de la caja abierta
+        Saldos actuales de la caja abierta
+        
+        🔥 Lectura O(1): la sesión abierta (idx_caja_sesiones_estado) y las
+        cuatro filas de caja_saldos, sin recorrer los movimientos.
         
         Returns:
-            dict: Saldos por método de pago
+            dict: Saldo por método ('efectivo', 'yape', 'plin', 'pos_banco'),
+                  más los totales de get_totales_sesion; None si no hay caja abierta
         """
         sesion = self.get_sesion_abierta()
         
         if not sesion:
             return None
         
-        return self.get_totales_sesion(sesion[0])
+        return self._saldos_de(sesion)
+
+    def _saldos_de(self, sesion):
+        totales = self._totales(sesion[3:7], self._saldos_pendientes())
+        for metodo in METODOS_PAGO:
+            totales[metodo] = totales[f'{metodo}_esperado']
+        return totales
+
+    def publicar_saldos(self):
+        """
+        Publica CashBalanceChanged con el estado y los saldos actuales.
+        
+        Se llama después de confirmar la escritura (registrar_movimiento la
+        deja con after_commit, también dentro de la transacción de una venta).
+        Si nadie escucha no se consulta la BD.
+        """
+        bus = get_event_bus()
+        if not bus.has_subscribers(CashBalanceChanged):
+            return
+        sesion = self.get_sesion_abierta()
+        bus.publish(CashBalanceChanged(sesion, self._saldos_de(sesion) if sesion else None))
 
     def registrar_remesa(self, monto, descripcion="Remesa de efectivo", usuario_id=None):
         """
@@ -356,21 +401,21 @@ class CajaModel(BaseModel):
         Returns:
             Result: Resultado de la operación
         """
-        # Registrar egreso de efectivo
-        egreso = self.registrar_movimiento(
-            'egreso', 'remesa', 'efectivo', monto,
-            descripcion=f"{descripcion} (salida)", usuario_id=usuario_id
-        )
-        
-        if not egreso.success:
-            return egreso
-        
-        # Registrar ingreso en banco
-        ingreso = self.registrar_movimiento(
-            'ingreso', 'remesa', 'pos_banco', monto,
-            descripcion=f"{descripcion} (ingreso)", usuario_id=usuario_id
-        )
-        
-        if ingreso.success:
+        # Egreso de efectivo e ingreso en banco en la misma transacción:
+        # si falla el segundo no queda el primero
+        def _remesa(conn):
+            for tipo, metodo, sufijo in (('egreso', 'efectivo', 'salida'),
+                                         ('ingreso', 'pos_banco', 'ingreso')):
+                resultado = self.registrar_movimiento(
+                    tipo, 'remesa', metodo, monto,
+                    descripcion=f"{descripcion} ({sufijo})", usuario_id=usuario_id,
+                    connection=conn
+                )
+                if not resultado.success:
+                    raise ValueError(resultado.message)
+        
+        try:
+            self.run_write(_remesa)
             return Result.ok("Remesa registrada exitosamente")
-        return ingreso
\ No newline at end of file
+        except ValueError as e:
+            return Result.fail(str(e))
@@ -3,11 +3,15 @@
 Modelo para gestión de Categorías de Membresía
 """
 from core.base_model import BaseModel
+from core.catalog import get_catalog
+from models.benefit_model import BenefitModel
 from typing import Optional, List, Tuple
 
 class CategoryModel(BaseModel):
     """Modelo para operaciones CRUD de categorías de membresía"""
     
+    CATALOG = 'membership_categories'
+    
     def insert_category(self, nombre: str, color_hex: str, orden: int, descripcion: str = None) -> int:
         """
         Inserta una nueva categoría.
@@ -32,7 +36,27 @@ class CategoryModel(BaseModel):
             'activo': 1
         }
         
-        return self.insert('membership_categories', data)
+        categoria_id = self.insert('membership_categories', data)
+        self._invalidate_catalogs()
+        return categoria_id
+    
+    def _load_categories(self) -> List[Tuple]:
+        """Lee todas las categorías de la BD (cargador del catálogo)."""
+        query = """
+            SELECT id, nombre, color_hex, orden, descripcion, activo
+            FROM membership_categories
+            ORDER BY orden ASC, nombre ASC
+        """
+        return self.execute_query(query)
+    
+    def _invalidate_catalogs(self):
+        """Invalida el catálogo de categorías y la matriz de beneficios (depende de 'activo')."""
+        get_catalog().invalidate(self.CATALOG)
+        get_catalog().invalidate(BenefitModel.CATALOG)
+    
+    def _catalog(self):
+        """🔥 Catálogo de categorías en caché (ver core.catalog)."""
+        return get_catalog().table(self.CATALOG, self._load_categories)
     
     def get_all_categories(self, include_inactive: bool = False) -> List[Tuple]:
         """
@@ -44,17 +68,12 @@ class CategoryModel(BaseModel):
         Returns:
             List[Tuple]: (id, nombre, color_hex, orden, descripcion, activo)
         """
-        query = """
-            SELECT id, nombre, color_hex, orden, descripcion, activo
-            FROM membership_categories
-        """
+        categorias = self._catalog().rows
         
         if not include_inactive:
-            query += " WHERE activo = 1"
-        
-        query += " ORDER BY orden ASC, nombre ASC"
+            return [cat for cat in categorias if cat.activo == 1]
         
-        return self.execute_query(query)
+        return list(categorias)
     
     def get_category_by_id(self, categoria_id: int) -> Optional[Tuple]:
         """
@@ -66,12 +85,10 @@ class CategoryModel(BaseModel):
         Returns:
             Tuple: (id, nombre, color_hex, orden, descripcion, activo) o None
         """
-        query = """
-            SELECT id, nombre, color_hex, orden, descripcion, activo
-            FROM membership_categories
-            WHERE id = ?
-        """
-        return self.execute_query(query, (categoria_id,), fetch_one=True)
+        try:
+            return self._catalog().by_id.get(int(categoria_id))
+        except (TypeError, ValueError):
+            return None
     
     def get_category_by_name(self, nombre: str) -> Optional[Tuple]:
         """
@@ -83,12 +100,7 @@ class CategoryModel(BaseModel):
         Returns:
             Tuple: (id, nombre, color_hex, orden, descripcion, activo) o None
         """
-        query = """
-            SELECT id, nombre, color_hex, orden, descripcion, activo
-            FROM membership_categories
-            WHERE nombre = ?
-        """
-        return self.execute_query(query, (nombre,), fetch_one=True)
+        return self._catalog().by_name.get(nombre)
     
     def update_category(self, categoria_id: int, nombre: str, color_hex: str, 
                        orden: int, descripcion: str = None, activo: bool = True) -> bool:
@@ -114,7 +126,9 @@ class CategoryModel(BaseModel):
             'activo': 1 if activo else 0
         }
         
-        return self.update('membership_categories', data, {'id': categoria_id})
+        updated = self.update('membership_categories', data, {'id': categoria_id})
+        self._invalidate_catalogs()
+        return updated
     
     def delete_category(self, categoria_id: int) -> bool:
         """
@@ -126,7 +140,9 @@ class CategoryModel(BaseModel):
         Returns:
             bool: True si se marcó como inactiva
         """
-        return self.update('membership_categories', {'activo': 0}, {'id': categoria_id})
+        updated = self.update('membership_categories', {'activo': 0}, {'id': categoria_id})
+        self._invalidate_catalogs()
+        return updated
     
     def hard_delete_category(self, categoria_id: int) -> bool:
         """
@@ -149,7 +165,9 @@ class CategoryModel(BaseModel):
         if result and result[0] > 0:
             raise ValueError(f"No se puede eliminar: {result[0]} planes asociados a esta categoría")
         
-        return self.delete('membership_categories', {'id': categoria_id})
+        deleted = self.delete('membership_categories', {'id': categoria_id})
+        self._invalidate_catalogs()
+        return deleted
     
     def count_plans_by_category(self, categoria_id: int) -> int:
         """
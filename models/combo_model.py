@@ -3,7 +3,7 @@
 Modelo para gestión de Planes Combo (Nx1)
 Permite asignar múltiples beneficiarios a un solo pago
 """
-from typing import List, Tuple, Optional
+from typing import Iterable, List, Tuple, Optional
 from core.base_model import BaseModel
 
 class ComboModel(BaseModel):
@@ -32,6 +32,28 @@ class ComboModel(BaseModel):
         
         return self.insert('payment_members', data)
     
+    def add_members_to_combo(self, vinculos: Iterable[Tuple[int, int, bool]]) -> List[int]:
+        """
+        Agrega varios beneficiarios en una sola transacción (executemany).
+        
+        Args:
+            vinculos: Iterable de (payment_id, miembro_id, es_titular)
+            
+        Returns:
+            List[int]: IDs de los registros, en el mismo orden
+            
+        Raises:
+            ValueError: Si algún miembro ya está en el combo (se revierte todo)
+        """
+        return self.bulk_insert('payment_members', (
+            {
+                'payment_id': payment_id,
+                'miembro_id': miembro_id,
+                'es_titular': 1 if es_titular else 0
+            }
+            for payment_id, miembro_id, es_titular in vinculos
+        ))
+    
     def get_combo_members(self, payment_id: int) -> List[Tuple]:
         """
         Obtiene todos los beneficiarios de un pago combo.
@@ -92,12 +92,12 @@ class GastoModel(BaseModel):
         params = [estado]
         
         if fecha_inicio:
-            query += " AND DATE(fecha_hora) >= ?"
-            params.append(fecha_inicio)
+            query += " AND fecha_hora >= ?"
+            params.append(self.day_range(fecha_inicio)[0])
         
         if fecha_fin:
-            query += " AND DATE(fecha_hora) <= ?"
-            params.append(fecha_fin)
+            query += " AND fecha_hora < ?"
+            params.append(self.day_range(fecha_fin)[1])
         
         if tipo_gasto:
             query += " AND tipo_gasto = ?"
@@ -120,8 +120,8 @@ class GastoModel(BaseModel):
                 id, fecha_hora, tipo_gasto, monto, metodo_pago,
                 descripcion, estado
             FROM gastos
-            WHERE DATE(fecha_hora) = DATE('now', 'localtime')
-            AND estado = 'activo'
+            WHERE estado = 'activo'
+            AND fecha_hora >= DATE('now', 'localtime') AND fecha_hora < DATE('now', 'localtime', '+1 day')
             ORDER BY fecha_hora DESC
         """
         return self.execute_query(query, fetch_all=True)
@@ -141,11 +141,11 @@ class GastoModel(BaseModel):
         query = """
             SELECT COALESCE(SUM(monto), 0)
             FROM gastos
-            WHERE DATE(fecha_hora) BETWEEN ? AND ?
-            AND estado = 'activo'
+            WHERE estado = 'activo'
+            AND fecha_hora >= ? AND fecha_hora < ?
         """
         
-        params = [fecha_inicio, fecha_fin]
+        params = list(self.day_range(fecha_inicio, fecha_fin))
         
         if tipo_gasto:
             query += " AND tipo_gasto = ?"
@@ -171,12 +171,12 @@ class GastoModel(BaseModel):
                 COUNT(*) as cantidad,
                 SUM(monto) as total_monto
             FROM gastos
-            WHERE DATE(fecha_hora) BETWEEN ? AND ?
-            AND estado = 'activo'
+            WHERE estado = 'activo'
+            AND fecha_hora >= ? AND fecha_hora < ?
             GROUP BY tipo_gasto
             ORDER BY total_monto DESC
         """
-        return self.execute_query(query, (fecha_inicio, fecha_fin), fetch_all=True)
+        return self.execute_query(query, self.day_range(fecha_inicio, fecha_fin), fetch_all=True)
 
     def get_gastos_by_metodo_pago(self, fecha_inicio, fecha_fin):
         """
@@ -195,12 +195,12 @@ class GastoModel(BaseModel):
                 COUNT(*) as cantidad,
                 SUM(monto) as total_monto
             FROM gastos
-            WHERE DATE(fecha_hora) BETWEEN ? AND ?
-            AND estado = 'activo'
+            WHERE estado = 'activo'
+            AND fecha_hora >= ? AND fecha_hora < ?
             GROUP BY metodo_pago
             ORDER BY total_monto DESC
         """
-        return self.execute_query(query, (fecha_inicio, fecha_fin), fetch_all=True)
+        return self.execute_query(query, self.day_range(fecha_inicio, fecha_fin), fetch_all=True)
 
     def anular_gasto(self, gasto_id, motivo="Anulación manual"):
         """
@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+"""
+Modelo para gestión de mediciones corporales
+"""
+from core.base_model import BaseModel
+
+class MeasurementModel(BaseModel):
+    """Modelo para operaciones CRUD de mediciones"""
+
+    # Columnas que se pueden registrar en una medición (además de miembro_id)
+    COLUMNS = (
+        'fecha_medicion', 'peso', 'talla', 'grasa_corporal', 'resistencia_fisica',
+        'pecho', 'hombros', 'cintura', 'cadera', 'biceps', 'antebrazo',
+        'muslo', 'gemelos', 'cuello', 'comentarios'
+    )
+
+    def insert_measurement(self, miembro_id, datos):
+        """
+        Inserta una nueva medición.
+
+        Args:
+            miembro_id: ID del miembro
+            datos: dict con fecha_medicion y las columnas de COLUMNS que se midieron
+
+        Returns:
+            int: ID de la medición insertada
+        """
+        data = {'miembro_id': miembro_id}
+        data.update((columna, datos.get(columna)) for columna in self.COLUMNS)
+        return self.run_write(lambda conn: self.insert('measurements', data, connection=conn))
+
+    def get_member_measurements(self, miembro_id):
+        """
+        Obtiene las mediciones de un miembro ordenadas por fecha ASC.
+
+        Args:
+            miembro_id: ID del miembro
+
+        Returns:
+            list: Filas (id, fecha_medicion, peso, talla, grasa_corporal, pecho, hombros,
+                  cintura, cadera, biceps, antebrazo, muslo, gemelos, cuello, comentarios)
+        """
+        query = """
+            SELECT id, fecha_medicion, peso, talla, grasa_corporal, pecho, hombros,
+                   cintura, cadera, biceps, antebrazo, muslo, gemelos, cuello, comentarios
+            FROM measurements
+            WHERE miembro_id = ?
+            ORDER BY fecha_medicion ASC
+        """
+        return self.execute_query(query, (miembro_id,))
+
+    def delete_measurement(self, measurement_id):
+        """
+        Elimina una medición por ID.
+
+        Args:
+            measurement_id: ID de la medición
+
+        Returns:
+            bool: True si se eliminó, False si no existe
+        """
+        return self.run_write(
+            lambda conn: self.delete('measurements', {'id': measurement_id}, connection=conn)
+        )
@@ -2,6 +2,7 @@
 """
 Modelo para gestión de miembros
 """
+import re
 import sqlite3
 from datetime import datetime
 from core.base_model import BaseModel
@@ -10,6 +11,30 @@ from core.config import Config
 class MemberModel(BaseModel):
     """Modelo para operaciones CRUD de miembros"""
     
+    # Estados de membresía calculados en SQL (get_members_page)
+    BUCKET_ACTIVE = 'activo'
+    BUCKET_EXPIRING = 'por_vencer'
+    BUCKET_EXPIRED = 'vencido'
+    BUCKET_NO_PLAN = 'sin_plan'
+    
+    # Columnas de estado (requieren como primer parámetro '+N days')
+    _STATUS_COLUMNS = f"""
+                ms.latest_expiry,
+                CASE
+                    WHEN ms.latest_expiry IS NULL THEN '{BUCKET_NO_PLAN}'
+                    WHEN ms.latest_expiry < DATE('now', 'localtime') THEN '{BUCKET_EXPIRED}'
+                    WHEN ms.latest_expiry <= DATE('now', 'localtime', ?) THEN '{BUCKET_EXPIRING}'
+                    ELSE '{BUCKET_ACTIVE}'
+                END AS estado,
+                CAST(julianday(ms.latest_expiry) - julianday(DATE('now', 'localtime')) AS INTEGER)
+                    AS dias_restantes"""
+    
+    # Pesos bm25 por columna de members_fts: nombre, dni, codigo, contacto, email
+    _FTS_WEIGHTS = "10.0, 8.0, 8.0, 2.0, 1.0"
+    
+    # None = aún no verificado si la BD tiene el índice FTS5
+    _fts_available = None
+    
     def insert_member(self, nombre, dni, contacto, email, direccion, codigo_membresia, foto_path=None):
         """
         Inserta un nuevo miembro en la base de datos.
@@ -39,7 +64,7 @@ class MemberModel(BaseModel):
                 'email': email,
                 'direccion': direccion,
                 'fecha_registro': fecha_registro,
-                'codigo_membresia': codigo_membresia,
+                'codigo_membresia': self.normalizar_codigo(codigo_membresia),
                 'foto_path': foto_path
             }
             
@@ -66,6 +91,174 @@ class MemberModel(BaseModel):
         """
         return self.execute_query(query)
 
+    def get_all_members_with_expiry(self):
+        """
+        Obtiene todos los miembros con su fecha de vencimiento en una sola consulta.
+        
+        Returns:
+            list: Lista de tuplas (id, nombre, dni, contacto, codigo_membresia, latest_expiry)
+                  latest_expiry es None si el miembro no tiene pagos
+        """
+        query = """
+            SELECT m.id, m.nombre, m.dni, m.contacto, m.codigo_membresia, ms.latest_expiry
+            FROM members m
+            LEFT JOIN member_status ms ON ms.miembro_id = m.id
+            ORDER BY m.nombre ASC
+        """
+        return self.execute_query(query)
+
+    def _has_fts(self):
+        """Verifica (una sola vez) si existe el índice de búsqueda members_fts."""
+        if MemberModel._fts_available is None:
+            resultado = self.execute_query(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'members_fts'",
+                fetch_one=True
+            )
+            MemberModel._fts_available = resultado is not None
+        return MemberModel._fts_available
+
+    @staticmethod
+    def _fts_query(search):
+        """
+        Convierte el texto del usuario en una consulta FTS5 de prefijos.
+        Cada palabra se cita (evita inyectar operadores) y se busca por prefijo;
+        todas las palabras deben coincidir.
+        
+        Ejemplo: 'juan per' → '"juan"* "per"*'
+        """
+        tokens = re.findall(r"\w+", search)
+        return " ".join(f'"{token}"*' for token in tokens)
+
+    def _search_clause(self, search):
+        """Arma el filtro de búsqueda por nombre, DNI o código."""
+        if not search or not search.strip():
+            return "", []
+        
+        if self._has_fts():
+            fts_query = self._fts_query(search)
+            if not fts_query:
+                return " AND 0", []
+            clause = " AND m.id IN (SELECT rowid FROM members_fts WHERE members_fts MATCH ?)"
+            return clause, [fts_query]
+        
+        pattern = f"%{search.strip()}%"
+        clause = " AND (m.nombre LIKE ? OR m.dni LIKE ? OR m.codigo_membresia LIKE ?)"
+        return clause, [pattern, pattern, pattern]
+
+    def search_members(self, search, limit=20):
+        """
+        Búsqueda rankeada de miembros por nombre, DNI, código, contacto o email.
+        Con el índice FTS5 la búsqueda es por prefijo, sin distinguir tildes ni
+        mayúsculas, y ordenada por relevancia (bm25).
+        
+        Args:
+            search: Texto a buscar
+            limit: Máximo de resultados
+            
+        Returns:
+            list: Lista de tuplas (id, nombre, dni, contacto, codigo_membresia,
+                  latest_expiry, estado, dias_restantes)
+        """
+        if not search or not search.strip():
+            return []
+        
+        dias_alerta = f"+{Config.ALERT_DAYS_THRESHOLD} days"
+        
+        if self._has_fts():
+            fts_query = self._fts_query(search)
+            if not fts_query:
+                return []
+            query = f"""
+                SELECT
+                    m.id, m.nombre, m.dni, m.contacto, m.codigo_membresia,{self._STATUS_COLUMNS}
+                FROM members_fts f
+                JOIN members m ON m.id = f.rowid
+                LEFT JOIN member_status ms ON ms.miembro_id = m.id
+                WHERE members_fts MATCH ?
+                ORDER BY bm25(members_fts, {self._FTS_WEIGHTS}), m.nombre
+                LIMIT ?
+            """
+            return self.execute_query(query, (dias_alerta, fts_query, limit))
+        
+        search_clause, params = self._search_clause(search)
+        query = f"""
+            SELECT
+                m.id, m.nombre, m.dni, m.contacto, m.codigo_membresia,{self._STATUS_COLUMNS}
+            FROM members m
+            LEFT JOIN member_status ms ON ms.miembro_id = m.id
+            WHERE 1 = 1{search_clause}
+            ORDER BY m.nombre, m.id
+            LIMIT ?
+        """
+        return self.execute_query(query, tuple([dias_alerta] + params + [limit]))
+
+    def get_members_page(self, limit=Config.DEFAULT_PAGE_SIZE, after=None, before=None, search=None):
+        """
+        Obtiene una página de miembros con su estado de membresía calculado en SQL.
+        Paginación por keyset sobre (nombre, id): no usa OFFSET, así que el
+        costo de cada página es el mismo sin importar cuántos miembros haya.
+        
+        Args:
+            limit: Cantidad de miembros por página
+            after: Cursor (nombre, id) del último miembro de la página anterior
+            before: Cursor (nombre, id) del primer miembro de la página siguiente
+                    (para retroceder); se ignora si se pasa 'after'
+            search: Texto a buscar en nombre, DNI o código (opcional)
+            
+        Returns:
+            tuple: (filas, hay_mas) donde filas es una lista de tuplas
+                   (id, nombre, dni, contacto, codigo_membresia, latest_expiry,
+                    estado, dias_restantes) y estado es uno de BUCKET_*
+        """
+        search_clause, params = self._search_clause(search)
+        
+        if after is not None:
+            cursor_clause = " AND (m.nombre, m.id) > (?, ?)"
+            params.extend(after)
+            order = "ASC"
+        elif before is not None:
+            cursor_clause = " AND (m.nombre, m.id) < (?, ?)"
+            params.extend(before)
+            order = "DESC"
+        else:
+            cursor_clause = ""
+            order = "ASC"
+        
+        query = f"""
+            SELECT
+                m.id, m.nombre, m.dni, m.contacto, m.codigo_membresia,{self._STATUS_COLUMNS}
+            FROM members m
+            LEFT JOIN member_status ms ON ms.miembro_id = m.id
+            WHERE 1 = 1{search_clause}{cursor_clause}
+            ORDER BY m.nombre {order}, m.id {order}
+            LIMIT ?
+        """
+        params = [f"+{Config.ALERT_DAYS_THRESHOLD} days"] + params + [limit + 1]
+        
+        rows = self.execute_query(query, tuple(params))
+        hay_mas = len(rows) > limit
+        rows = rows[:limit]
+        
+        if order == "DESC":
+            rows.reverse()
+        
+        return rows, hay_mas
+
+    def count_members(self, search=None):
+        """
+        Cuenta los miembros que coinciden con la búsqueda.
+        
+        Args:
+            search: Texto a buscar en nombre, DNI o código (opcional)
+            
+        Returns:
+            int: Cantidad de miembros
+        """
+        search_clause, params = self._search_clause(search)
+        query = f"SELECT COUNT(*) FROM members m WHERE 1 = 1{search_clause}"
+        resultado = self.execute_query(query, tuple(params), fetch_one=True)
+        return resultado[0] if resultado else 0
+
     def get_member_registration_date(self, miembro_id):
         """
         Obtiene la fecha de registro de un miembro.
@@ -84,10 +277,58 @@ class MemberModel(BaseModel):
         resultado = self.execute_query(query, (miembro_id,), fetch_one=True)
         return resultado[0] if resultado else None
 
+    def get_access_snapshot(self):
+        """
+        Datos mínimos para validar accesos en memoria (modo kiosco).
+        
+        Returns:
+            list: Lista de tuplas (id, nombre, dni, codigo_membresia, latest_expiry)
+        """
+        query = """
+            SELECT m.id, m.nombre, m.dni, m.codigo_membresia, ms.latest_expiry
+            FROM members m
+            LEFT JOIN member_status ms ON ms.miembro_id = m.id
+        """
+        return self.execute_query(query)
+
+    def get_access_entry(self, miembro_id):
+        """
+        Datos de acceso de un solo miembro (para actualizar la instantánea del kiosco).
+        
+        Args:
+            miembro_id: ID del miembro
+            
+        Returns:
+            tuple: (id, nombre, dni, codigo_membresia, latest_expiry) o None si no existe
+        """
+        query = """
+            SELECT m.id, m.nombre, m.dni, m.codigo_membresia, ms.latest_expiry
+            FROM members m
+            LEFT JOIN member_status ms ON ms.miembro_id = m.id
+            WHERE m.id = ?
+        """
+        return self.execute_query(query, (miembro_id,), fetch_one=True)
+
+    @staticmethod
+    def normalizar_codigo(codigo):
+        """
+        Forma canónica de un código de membresía (sin espacios, en mayúsculas).
+        
+        Args:
+            codigo: Código tal como lo ingresó el usuario
+            
+        Returns:
+            str: Código normalizado
+        """
+        return codigo.strip().upper() if codigo else codigo
+
     def find_member_by_identifier(self, identifier):
         """
         Busca un miembro por DNI o código de membresía (case-insensitive).
         
+        🔥 Los códigos se guardan en mayúsculas canónicas, así que cada rama
+        del UNION es una búsqueda directa en el índice UNIQUE de su columna.
+        
         Args:
             identifier: DNI o código de membresía
             
@@ -100,10 +341,16 @@ class MemberModel(BaseModel):
         query = """
             SELECT id, nombre, dni, contacto, email, direccion, codigo_membresia, foto_path
             FROM members
-            WHERE dni = ? OR UPPER(codigo_membresia) = UPPER(?)
+            WHERE dni = ?
+            UNION ALL
+            SELECT id, nombre, dni, contacto, email, direccion, codigo_membresia, foto_path
+            FROM members
+            WHERE codigo_membresia = ?
             LIMIT 1
         """
-        return self.execute_query(query, (identifier, identifier), fetch_one=True)
+        return self.execute_query(
+            query, (identifier, self.normalizar_codigo(identifier)), fetch_one=True
+        )
 
     def codigo_exists(self, codigo):
         """
@@ -116,7 +363,7 @@ class MemberModel(BaseModel):
             bool: True si existe, False en caso contrario
         """
         query = "SELECT 1 FROM members WHERE codigo_membresia = ? LIMIT 1"
-        resultado = self.execute_query(query, (codigo,), fetch_one=True)
+        resultado = self.execute_query(query, (self.normalizar_codigo(codigo),), fetch_one=True)
         return resultado is not None
 
     def update_foto_path(self, codigo_membresia, foto_path):
@@ -165,30 +412,31 @@ class MemberModel(BaseModel):
         Args:
             codigo_membresia: Código del miembro a eliminar
         """
-        with self.get_db_connection() as conn:
-            cursor = conn.cursor()
-            
+        def _eliminar(conn):
             # Copiar datos antes de eliminar
-            cursor.execute(
+            miembro = conn.execute(
                 "SELECT * FROM members WHERE codigo_membresia = ?",
                 (codigo_membresia,)
+            ).fetchone()
+            
+            if not miembro:
+                return False
+            
+            eliminado_en = datetime.now().strftime(Config.DATETIME_FORMAT)
+            
+            conn.execute("""
+                INSERT OR IGNORE INTO members_eliminados
+                (id, nombre, dni, contacto, email, direccion, fecha_registro, 
+                 codigo_membresia, foto_path, eliminado_en)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, (*miembro, eliminado_en))
+
+            # Eliminar de tabla principal (CASCADE eliminará relaciones)
+            conn.execute(
+                "DELETE FROM members WHERE codigo_membresia = ?",
+                (codigo_membresia,)
             )
-            miembro = cursor.fetchone()
-            
-            if miembro:
-                eliminado_en = datetime.now().strftime(Config.DATETIME_FORMAT)
-                
-                cursor.execute("""
-                    INSERT OR IGNORE INTO members_eliminados
-                    (id, nombre, dni, contacto, email, direccion, fecha_registro, 
-                     codigo_membresia, foto_path, eliminado_en)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """, (*miembro, eliminado_en))
-
-                # Eliminar de tabla principal (CASCADE eliminará relaciones)
-                cursor.execute(
-                    "DELETE FROM members WHERE codigo_membresia = ?",
-                    (codigo_membresia,)
-                )
-                conn.commit()
-                self.logger.info(f"Miembro {codigo_membresia} eliminado correctamente")
+            return True
+        
+        if self.run_write(_eliminar):
+            self.logger.info(f"Miembro {codigo_membresia} eliminado correctamente")
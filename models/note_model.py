@@ -25,7 +25,7 @@ class NoteModel(BaseModel):
             'fecha_hora': datetime.now().strftime(Config.DATETIME_FORMAT),
             'nota': nota
         }
-        return self.insert('notes', data)
+        return self.run_write(lambda conn: self.insert('notes', data, connection=conn))
     
     def get_member_notes(self, miembro_id):
         """
@@ -55,4 +55,4 @@ class NoteModel(BaseModel):
         Returns:
             bool: True si se eliminó, False si no existe
         """
-        return self.delete('notes', {'id': note_id})
+        return self.run_write(lambda conn: self.delete('notes', {'id': note_id}, connection=conn))
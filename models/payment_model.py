@@ -93,6 +93,7 @@ class PaymentModel(BaseModel):
         🔥 MÉTODO CENTRALIZADO - ÚNICA FUENTE DE VERDAD
         Obtiene la fecha de vencimiento más lejana del miembro.
         Usado por MemberService, PaymentService y AttendanceService.
+        Lee la proyección member_status (mantenida por triggers de payments).
         
         Args:
             miembro_id: ID del miembro
@@ -101,8 +102,8 @@ class PaymentModel(BaseModel):
             str: Fecha en formato YYYY-MM-DD o None si no tiene pagos
         """
         query = """
-            SELECT MAX(fecha_vencimiento)
-            FROM payments
+            SELECT latest_expiry
+            FROM member_status
             WHERE miembro_id = ?
         """
         resultado = self.execute_query(query, (miembro_id,), fetch_one=True)
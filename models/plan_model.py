@@ -4,10 +4,13 @@ Modelo para gestión de planes/tarifas
 """
 import sqlite3
 from core.base_model import BaseModel
+from core.catalog import get_catalog
 
 class PlanModel(BaseModel):
     """Modelo para operaciones CRUD de planes"""
 
+    CATALOG = 'plans'
+
     def insert_plan(self, nombre, precio, dias, personas, inicio, fin, desc, categoria_id=None):
         """
         Crea un nuevo plan/tarifa.
@@ -39,6 +42,7 @@ class PlanModel(BaseModel):
             }
             
             plan_id = self.insert('plans', data)
+            get_catalog().invalidate(self.CATALOG)
             
             self.logger.info(f"Plan creado: ID={plan_id}, Nombre={nombre}")
             
@@ -59,6 +63,20 @@ class PlanModel(BaseModel):
                 "message": f"Error al crear plan: {e}"
             }
 
+    def _load_plans(self):
+        """Lee todos los planes de la BD (cargador del catálogo)."""
+        query = """
+            SELECT id, nombre_plan, precio, duracion_dias, cantidad_personas, 
+                   fecha_inicio_venta, fecha_fin_venta, descripcion, estado, categoria_id 
+            FROM plans
+            ORDER BY precio ASC
+        """
+        return self.execute_query(query)
+
+    def _catalog(self):
+        """🔥 Catálogo de planes en caché (ver core.catalog)."""
+        return get_catalog().table(self.CATALOG, self._load_plans)
+
     def get_all_plans(self, include_inactive=False):
         """
         Obtiene todos los planes.
@@ -69,18 +87,12 @@ class PlanModel(BaseModel):
         Returns:
             list: Lista de tuplas con datos de planes
         """
-        query = """
-            SELECT id, nombre_plan, precio, duracion_dias, cantidad_personas, 
-                   fecha_inicio_venta, fecha_fin_venta, descripcion, estado, categoria_id 
-            FROM plans
-        """
+        planes = self._catalog().rows
         
         if not include_inactive:
-            query += " WHERE estado = 1"
-            
-        query += " ORDER BY precio ASC"
+            return [plan for plan in planes if plan.estado == 1]
         
-        return self.execute_query(query)
+        return list(planes)
 
     def get_plan_by_id(self, plan_id):
         """
@@ -92,13 +104,22 @@ class PlanModel(BaseModel):
         Returns:
             tuple: Datos del plan o None
         """
-        query = """
-            SELECT id, nombre_plan, precio, duracion_dias, cantidad_personas, 
-                   fecha_inicio_venta, fecha_fin_venta, descripcion, estado, categoria_id 
-            FROM plans
-            WHERE id = ?
+        try:
+            return self._catalog().by_id.get(int(plan_id))
+        except (TypeError, ValueError):
+            return None
+
+    def get_plan_by_name(self, nombre):
+        """
+        Obtiene un plan por su nombre exacto.
+        
+        Args:
+            nombre: Nombre del plan
+            
+        Returns:
+            tuple: Datos del plan o None
         """
-        return self.execute_query(query, (plan_id,), fetch_one=True)
+        return self._catalog().by_name.get(nombre)
 
     def update_plan(self, plan_id, nombre, precio, dias, personas, inicio, fin, desc, estado, categoria_id=None):
         """
@@ -133,6 +154,7 @@ class PlanModel(BaseModel):
             }
             
             updated = self.update('plans', data, {'id': plan_id})
+            get_catalog().invalidate(self.CATALOG)
             
             if updated:
                 self.logger.info(f"Plan actualizado: ID={plan_id}")
@@ -186,6 +208,7 @@ class PlanModel(BaseModel):
             
             # Si no hay pagos, eliminar
             deleted = self.delete('plans', {'id': plan_id})
+            get_catalog().invalidate(self.CATALOG)
             
             if deleted:
                 self.logger.info(f"Plan eliminado: ID={plan_id}")
@@ -12,29 +12,32 @@ class ProductoModel(BaseModel):
     def __init__(self):
         super().__init__()
 
+    # Columnas de get_all_productos / get_productos_by_ids (mismas filas)
+    _SELECT_PRODUCTOS = """
+        SELECT 
+            p.id,
+            p.sku,
+            p.codigo_barras,
+            p.nombre,
+            p.categoria_id,
+            c.nombre as categoria_nombre,
+            p.precio_venta,
+            p.stock_actual,
+            p.stock_minimo,
+            p.foto_path,
+            p.activo,
+            p.fecha_registro,
+            p.precio_compra,
+            p.proveedor_id
+        FROM productos p
+        INNER JOIN categorias_producto c ON p.categoria_id = c.id
+    """
+
     def get_all_productos(self, include_inactive=False):
         """
         Obtiene todos los productos con información de categoría
         """
-        query = """
-            SELECT 
-                p.id,
-                p.sku,
-                p.codigo_barras,
-                p.nombre,
-                p.categoria_id,
-                c.nombre as categoria_nombre,
-                p.precio_venta,
-                p.stock_actual,
-                p.stock_minimo,
-                p.foto_path,
-                p.activo,
-                p.fecha_registro,
-                p.precio_compra,
-                p.proveedor_id
-            FROM productos p
-            INNER JOIN categorias_producto c ON p.categoria_id = c.id
-        """
+        query = self._SELECT_PRODUCTOS
         
         if not include_inactive:
             query += " WHERE p.activo = 1"
@@ -43,6 +46,24 @@ class ProductoModel(BaseModel):
         
         return self.execute_query(query, fetch_all=True)
 
+    def get_productos_by_ids(self, producto_ids):
+        """
+        Obtiene varios productos por ID (activos o no), con las mismas
+        columnas que get_all_productos.
+        
+        Args:
+            producto_ids: IDs de los productos
+            
+        Returns:
+            list: Filas de los productos que existen
+        """
+        ids = list(producto_ids)
+        if not ids:
+            return []
+        marcas = ', '.join('?' * len(ids))
+        query = self._SELECT_PRODUCTOS + f" WHERE p.id IN ({marcas})"
+        return self.execute_query(query, tuple(ids), fetch_all=True)
+
     def get_producto_by_id(self, producto_id):
         """Obtiene un producto por ID"""
         query = """
@@ -26,32 +26,26 @@ class VentaModel(BaseModel):
                 connection=connection
             )
             
-            # Insertar detalle de venta
+            # Insertar detalle de venta (un solo executemany para todas las líneas)
             if detalle_items:
-                # CORRECCIÓN: 'precio_unit' -> 'precio_unitario'
-                detalle_query = """
-                    INSERT INTO ventas_detalle (
-                        venta_id, producto_id, cantidad, precio_unitario,
-                        descuento_porcentaje, subtotal
-                    ) VALUES (?, ?, ?, ?, ?, ?)
-                """
-                
-                for item in detalle_items:
-                    self.execute_query(
-                        detalle_query,
-                        (venta_id, item['producto_id'], item['cantidad'],
-                         item['precio_unit'], item.get('descuento_porcentaje', 0),
-                         item['subtotal']),
-                        fetch_all=False,  # ← CORRECCIÓN: No usar fetch_all en INSERT
-                        commit=(connection is None),
-                        connection=connection
-                    )
+                self.bulk_insert(
+                    'ventas_detalle',
+                    ({
+                        'venta_id': venta_id,
+                        'producto_id': item['producto_id'],
+                        'cantidad': item['cantidad'],
+                        'precio_unitario': item['precio_unit'],
+                        'descuento_porcentaje': item.get('descuento_porcentaje', 0),
+                        'subtotal': item['subtotal'],
+                    } for item in detalle_items),
+                    connection=connection
+                )
             
             return Result.ok("Venta registrada exitosamente", {"venta_id": venta_id})
         except Exception as e:
             return Result.fail(f"Error al crear venta: {str(e)}")
 
-    def get_venta_by_id(self, venta_id):
+    def get_venta_by_id(self, venta_id, connection=None):
         # Obtener venta principal
         venta_query = """
             SELECT v.id, v.fecha_hora, v.cliente_tipo, v.cliente_id,
@@ -61,7 +55,7 @@ class VentaModel(BaseModel):
             LEFT JOIN members m ON v.cliente_id = m.id
             WHERE v.id = ?
         """
-        venta = self.execute_query(venta_query, (venta_id,), fetch_one=True)
+        venta = self.execute_query(venta_query, (venta_id,), fetch_one=True, connection=connection)
         if not venta: return None
         
         # Obtener detalle (CORRECCIÓN: precio_unitario)
@@ -72,7 +66,7 @@ class VentaModel(BaseModel):
             INNER JOIN productos p ON vd.producto_id = p.id
             WHERE vd.venta_id = ?
         """
-        detalle = self.execute_query(detalle_query, (venta_id,), fetch_all=True)
+        detalle = self.execute_query(detalle_query, (venta_id,), fetch_all=True, connection=connection)
         return {'venta': venta, 'detalle': detalle}
 
     def get_ventas(self, fecha_inicio=None, fecha_fin=None, cliente_id=None, estado='completada', limit=100):
@@ -86,11 +80,11 @@ class VentaModel(BaseModel):
         """
         params = [estado]
         if fecha_inicio:
-            query += " AND DATE(v.fecha_hora) >= ?"
-            params.append(fecha_inicio)
+            query += " AND v.fecha_hora >= ?"
+            params.append(self.day_range(fecha_inicio)[0])
         if fecha_fin:
-            query += " AND DATE(v.fecha_hora) <= ?"
-            params.append(fecha_fin)
+            query += " AND v.fecha_hora < ?"
+            params.append(self.day_range(fecha_fin)[1])
         if cliente_id:
             query += " AND v.cliente_id = ?"
             params.append(cliente_id)
@@ -105,14 +99,15 @@ class VentaModel(BaseModel):
                 v.total, v.metodo_pago, v.estado
             FROM ventas v
             LEFT JOIN members m ON v.cliente_id = m.id
-            WHERE DATE(v.fecha_hora) = DATE('now', 'localtime') AND v.estado = 'completada'
+            WHERE v.fecha_hora >= DATE('now', 'localtime') AND v.fecha_hora < DATE('now', 'localtime', '+1 day')
+              AND v.estado = 'completada'
             ORDER BY v.fecha_hora DESC
         """
         return self.execute_query(query, fetch_all=True)
 
     def get_total_ventas_periodo(self, fecha_inicio, fecha_fin):
-        query = "SELECT COALESCE(SUM(total), 0) FROM ventas WHERE DATE(fecha_hora) BETWEEN ? AND ? AND estado = 'completada'"
-        result = self.execute_query(query, (fecha_inicio, fecha_fin), fetch_one=True)
+        query = "SELECT COALESCE(SUM(total), 0) FROM ventas WHERE estado = 'completada' AND fecha_hora >= ? AND fecha_hora < ?"
+        result = self.execute_query(query, self.day_range(fecha_inicio, fecha_fin), fetch_one=True)
         return result[0] if result else 0
 
     def get_productos_mas_vendidos(self, limit=10, fecha_inicio=None, fecha_fin=None):
@@ -125,8 +120,8 @@ class VentaModel(BaseModel):
         """
         params = []
         if fecha_inicio and fecha_fin:
-            query += " AND DATE(v.fecha_hora) BETWEEN ? AND ?"
-            params.extend([fecha_inicio, fecha_fin])
+            query += " AND v.fecha_hora >= ? AND v.fecha_hora < ?"
+            params.extend(self.day_range(fecha_inicio, fecha_fin))
         query += " GROUP BY p.id, p.nombre, p.sku ORDER BY cantidad_total DESC LIMIT ?"
         params.append(limit)
         return self.execute_query(query, tuple(params), fetch_all=True)
@@ -142,7 +137,7 @@ class VentaModel(BaseModel):
     def get_ventas_by_metodo_pago(self, fecha_inicio, fecha_fin):
         query = """
             SELECT metodo_pago, COUNT(*) as cantidad_ventas, SUM(total) as total_monto
-            FROM ventas WHERE DATE(fecha_hora) BETWEEN ? AND ? AND estado = 'completada'
+            FROM ventas WHERE estado = 'completada' AND fecha_hora >= ? AND fecha_hora < ?
             GROUP BY metodo_pago ORDER BY total_monto DESC
         """
-        return self.execute_query(query, (fecha_inicio, fecha_fin), fetch_all=True)
\ No newline at end of file
+        return self.execute_query(query, self.day_range(fecha_inicio, fecha_fin), fetch_all=True)
\ No newline at end of file
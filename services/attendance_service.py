@@ -7,6 +7,8 @@ from models.attendance_model import AttendanceModel
 from services.member_service import MemberService
 from services.payment_service import PaymentService
 from core.config import Config
+from core.event_bus import get_event_bus
+from core.events import CheckInRecorded, CheckInDeleted
 from core.logger import logger
 
 class AttendanceService:
@@ -35,21 +37,43 @@ class AttendanceService:
                 'fecha_vencimiento': str (opcional)
             }
         """
-        # Buscar miembro
-        miembro_data = self.member_service.find_member_by_identifier(member_identifier)
+        # 🔥 Check-in fusionado: miembro, estado, duplicado e INSERT en una
+        # sola conexión y transacción (ver AttendanceModel.register_check_in)
+        fecha_check_in = datetime.now().strftime(Config.DATETIME_FORMAT)
 
-        if not miembro_data:
+        try:
+            resultado = self.model.register_check_in(member_identifier, fecha_check_in)
+        except ValueError as ve:
+            if "Ya registró asistencia hoy" in str(ve):
+                return {
+                    'status': 'YaMarcado',
+                    'message': "Ya registró asistencia hoy",
+                    'alerta': None
+                }
+            return {
+                'status': 'Error',
+                'message': f"No se pudo registrar la asistencia: {str(ve)}",
+                'alerta': None
+            }
+        except Exception as e:
+            logger.error(f"Error al registrar asistencia: {e}")
+            return {
+                'status': 'Error',
+                'message': f"Error al registrar asistencia: {str(e)}",
+                'alerta': None
+            }
+
+        if not resultado:
             return {
                 'status': 'Error',
                 'message': "Miembro no encontrado por DNI o Código",
                 'alerta': None
             }
 
-        miembro_id = miembro_data[0]
-        miembro_nombre = miembro_data[1]
+        miembro_id, miembro_nombre, latest_expiry, registrado = resultado
 
         # ✅ USAR VALIDACIÓN UNIFICADA
-        validacion = self.payment_service.validate_membership_status(miembro_id)
+        validacion = PaymentService.evaluate_expiry(latest_expiry)
         
         status = validacion['status']
         alerta = validacion['alerta']
@@ -76,54 +100,39 @@ class AttendanceService:
                 'alerta': alerta
             }
 
-        # Registrar asistencia con validación de duplicado
-        fecha_check_in = datetime.now().strftime(Config.DATETIME_FORMAT)
-
-        try:
-            self.model.insert_check_in(miembro_id, fecha_check_in)
-            
-            logger.info(
-                f"Asistencia registrada: {miembro_nombre} ({member_identifier})"
-            )
-            
-            message = f"Acceso concedido. Tu plan vence: {fecha_vencimiento}"
-
-            return {
-                'status': 'Éxito',
-                'message': message,
-                'alerta': alerta,
-                'miembro_nombre': miembro_nombre,
-                'fecha_vencimiento': fecha_vencimiento
-            }
-            
-        except ValueError as ve:
-            if "Ya registró asistencia hoy" in str(ve):
-                return {
-                    'status': 'YaMarcado',
-                    'message': "Ya registró asistencia hoy",
-                    'alerta': None
-                }
+        if not registrado:
             return {
                 'status': 'Error',
-                'message': f"No se pudo registrar la asistencia: {str(ve)}",
-                'alerta': None
-            }
-        except Exception as e:
-            logger.error(f"Error al registrar asistencia: {e}")
-            return {
-                'status': 'Error',
-                'message': f"Error al registrar asistencia: {str(e)}",
+                'message': f"No se pudo registrar la asistencia: {alerta}",
                 'alerta': None
             }
 
-    def get_todays_log(self):
+        logger.info(
+            f"Asistencia registrada: {miembro_nombre} ({member_identifier})"
+        )
+        get_event_bus().publish(CheckInRecorded(miembro_id, fecha_check_in))
+
+        return {
+            'status': 'Éxito',
+            'message': f"Acceso concedido. Tu plan vence: {fecha_vencimiento}",
+            'alerta': alerta,
+            'miembro_nombre': miembro_nombre,
+            'fecha_vencimiento': fecha_vencimiento
+        }
+
+    def get_todays_log(self, after_id=None, before=None, limit=None):
         """
         Obtiene el log de asistencia de hoy desde el modelo.
         
+        Args:
+            after_id: Si se indica, solo entradas posteriores a ese id
+            before: (fecha_hora_entrada, id) desde donde seguir hacia atrás
+            limit: Máximo de filas
+            
         Returns:
-            list: Lista de tuplas con datos de asistencias de hoy
+            list: Lista de tuplas (id, codigo, nombre, plan, vencimiento, hora_entrada)
         """
-        return self.model.get_todays_log()
+        return self.model.get_todays_log(after_id, before=before, limit=limit)
 
     def delete_last_check_in_by_code(self, codigo_membresia):
         """
@@ -141,7 +150,10 @@ class AttendanceService:
             return False
 
         miembro_id = miembro_data[0]
-        return self.model.delete_last_check_in(miembro_id)
+        eliminado = self.model.delete_last_check_in(miembro_id)
+        if eliminado:
+            get_event_bus().publish(CheckInDeleted(miembro_id))
+        return eliminado
     
     def get_log_by_member_and_range(self, miembro_id, desde, hasta):
         """
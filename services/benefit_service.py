@@ -2,7 +2,8 @@
 """
 Servicio de Lógica de Negocio para Beneficios
 """
-from models.benefit_model import BenefitModel
+from models.benefit_model import BenefitModel, BenefitConfig
+from core.catalog import get_catalog
 from core.response import Result
 from core.logger import logger
 from typing import List, Dict, Any, Optional
@@ -180,6 +181,18 @@ class BenefitService:
             logger.error(f"Error al eliminar configuración: {e}")
             return Result.fail(f"Error: {str(e)}", "DELETE_ERROR")
     
+    def get_member_category(self, miembro_id: int) -> Optional[int]:
+        """
+        Categoría a mostrar del miembro (la del pago vigente que vence último).
+        
+        Args:
+            miembro_id: ID del miembro
+            
+        Returns:
+            int: ID de la categoría o None
+        """
+        return self.model.get_member_category(miembro_id)
+    
     def get_member_benefits(self, miembro_id: int) -> List[Dict[str, Any]]:
         """
         Obtiene los beneficios activos de un miembro.
@@ -191,11 +204,39 @@ class BenefitService:
             List[Dict]: Beneficios activos del miembro
         """
         try:
-            return self.model.get_member_benefits(miembro_id)
+            return [b.to_dict() for b in self._member_benefit_map(miembro_id).values()]
         except Exception as e:
             logger.error(f"Error al obtener beneficios del miembro {miembro_id}: {e}")
             return []
     
+    def _member_benefit_map(self, miembro_id: int) -> Dict[str, BenefitConfig]:
+        """
+        🔥 Beneficios del miembro resueltos contra la matriz precompilada:
+        una consulta indexada de las categorías de sus pagos vigentes y luego
+        acceso directo por diccionario.
+        
+        Se suman los beneficios de todas esas categorías; si dos configuran el
+        mismo beneficio, vale el del plan que vence último.
+        
+        Args:
+            miembro_id: ID del miembro
+            
+        Returns:
+            Dict[str, BenefitConfig]: Beneficios habilitados por código (por nombre)
+        """
+        categorias = self.model.get_member_categories(miembro_id)
+        if not categorias:
+            return {}
+        matriz = self.model.get_benefit_matrix()
+        if len(categorias) == 1:
+            return matriz.get(categorias[0], {})
+        
+        beneficios = {}
+        for categoria_id in categorias:
+            for codigo, beneficio in matriz.get(categoria_id, {}).items():
+                beneficios.setdefault(codigo, beneficio)
+        return dict(sorted(beneficios.items(), key=lambda par: par[1].nombre))
+    
     def check_member_has_benefit(self, miembro_id: int, benefit_code: str) -> Dict[str, Any]:
         """
         Verifica si un miembro tiene un beneficio específico.
@@ -215,16 +256,15 @@ class BenefitService:
             }
         """
         try:
-            beneficios = self.model.get_member_benefits(miembro_id)
+            beneficio = self._member_benefit_map(miembro_id).get(benefit_code)
             
-            for beneficio in beneficios:
-                if beneficio["codigo"] == benefit_code:
-                    return {
-                        "has_benefit": True,
-                        "config": beneficio["config"],
-                        "nombre": beneficio["nombre"],
-                        "icono": beneficio["icono"]
-                    }
+            if beneficio:
+                return {
+                    "has_benefit": True,
+                    "config": beneficio.config,
+                    "nombre": beneficio.nombre,
+                    "icono": beneficio.icono
+                }
             
             return {
                 "has_benefit": False,
@@ -259,22 +299,26 @@ class BenefitService:
             cantidad = benefit_service.get_benefit_value(123, "guests_allowed", 0)
             # Retorna: 4 (si es Premium) o 0 (si no tiene)
         """
-        check = self.check_member_has_benefit(miembro_id, benefit_code)
-        
-        if not check["has_benefit"]:
+        try:
+            beneficio = self._member_benefit_map(miembro_id).get(benefit_code)
+        except Exception as e:
+            logger.error(f"Error al verificar beneficio '{benefit_code}' para miembro {miembro_id}: {e}")
             return default
         
-        config = check["config"]
+        if beneficio is None:
+            return default
         
-        # Retornar el valor según el tipo
-        if "cantidad" in config:
-            return config["cantidad"]
-        elif "descuento_porcentaje" in config:
-            return config["descuento_porcentaje"]
-        elif "enabled" in config:
-            return config["enabled"]
+        valor = beneficio.value
+        return default if valor is None else valor
+
+    def get_next_benefit_code(self):
+        """
+        Código automático para un nuevo tipo de beneficio.
         
-        return default
+        Returns:
+            str: Código libre (ej: 'BEN004')
+        """
+        return self.model.get_next_benefit_code()
 
     def create_benefit_type(self, data):
         """
@@ -297,6 +341,7 @@ class BenefitService:
             
             # Insertar
             self.model.insert('benefit_types', data)
+            get_catalog().invalidate(BenefitModel.CATALOG)
             
             self.logger.info(f"Tipo de beneficio creado: {data['codigo']}")
             
@@ -332,6 +377,7 @@ class BenefitService:
                 update_data,
                 {'codigo': codigo}
             )
+            get_catalog().invalidate(BenefitModel.CATALOG)
             
             if updated:
                 self.logger.info(f"Tipo de beneficio actualizado: {codigo}")
@@ -364,33 +410,31 @@ class BenefitService:
             Result object
         """
         try:
-            with self.model.get_db_connection() as conn:
-                cursor = conn.cursor()
-                
+            def _eliminar(conn):
                 # Eliminar configuraciones asociadas
-                cursor.execute(
-                    "DELETE FROM category_benefits WHERE benefit_codigo = ?",
-                    (codigo,)
-                )
+                conn.execute("""
+                    DELETE FROM category_benefits
+                    WHERE benefit_type_id IN (SELECT id FROM benefit_types WHERE codigo = ?)
+                """, (codigo,))
                 
                 # Eliminar tipo
-                cursor.execute(
+                return conn.execute(
                     "DELETE FROM benefit_types WHERE codigo = ?",
                     (codigo,)
+                ).rowcount > 0
+            
+            if self.model.run_write(_eliminar):
+                get_catalog().invalidate(BenefitModel.CATALOG)
+                self.logger.info(f"Tipo de beneficio eliminado: {codigo}")
+                return Result(
+                    success=True,
+                    message="Tipo de beneficio eliminado exitosamente"
+                )
+            else:
+                return Result(
+                    success=False,
+                    message="No se encontró el tipo de beneficio"
                 )
-                
-                if cursor.rowcount > 0:
-                    conn.commit()
-                    self.logger.info(f"Tipo de beneficio eliminado: {codigo}")
-                    return Result(
-                        success=True,
-                        message="Tipo de beneficio eliminado exitosamente"
-                    )
-                else:
-                    return Result(
-                        success=False,
-                        message="No se encontró el tipo de beneficio"
-                    )
         
         except Exception as e:
             self.logger.error(f"Error al eliminar tipo de beneficio: {e}")
@@ -0,0 +1,316 @@
+# -*- coding: utf-8 -*-
+"""
+Índice en memoria del catálogo de productos para el Market
+
+El punto de venta resuelve cada escaneo, cambio de categoría y tecla del
+buscador contra este índice en lugar de consultar SQLite:
+
+- Código de barras y SKU → producto en diccionarios.
+- Búsqueda por subcadena (como el ``LIKE '%term%'`` de
+  ProductoModel.search_productos) con un índice de trigramas sobre nombre,
+  SKU y código; los términos de 1-2 letras recorren el catálogo.
+- Lista de productos por categoría, ya ordenada por nombre.
+
+Se carga una vez (productos activos) y se mantiene al día con los eventos
+StockChanged y ProductChanged (core/events.py): el stock se actualiza sin
+consultas y los productos editados se releen por ID. Pasados
+Config.CATALOG_INDEX_TTL segundos el índice queda vencido (stale()) y quien lo
+usa programa una recarga completa en segundo plano (MarketView vía
+ui/async_bridge), por si hubo cambios que no pasaron por los servicios (o, en
+una terminal, por otra terminal); mientras tanto se sigue respondiendo con el
+índice anterior. Solo la primera carga es síncrona.
+
+Los productos se leen con ProductoService vía ``service_for``: en una
+terminal (Config.API_URL) la carga va al servidor POS, no a la BD compartida.
+
+Uso:
+    catalogo = get_catalog_index()
+    catalogo.by_code('7751234567890')
+    catalogo.search('agua')
+"""
+import threading
+import time
+import unicodedata
+from api.client import service_for
+from core.config import Config
+from core.event_bus import get_event_bus
+from core.events import ProductChanged, StockChanged
+from core.logger import logger
+from services.producto_service import ProductoService
+
+
+def normalizar(texto):
+    """Minúsculas y sin tildes (búsqueda 'cafe' encuentra 'Café')."""
+    if not texto:
+        return ''
+    texto = unicodedata.normalize('NFKD', str(texto).casefold())
+    return ''.join(c for c in texto if not unicodedata.combining(c))
+
+
+def _trigramas(texto):
+    return {texto[i:i + 3] for i in range(len(texto) - 2)}
+
+
+class ProductCatalogIndex:
+    """Productos activos indexados por código, SKU, trigramas y categoría"""
+
+    def __init__(self, source=None, ttl=None):
+        """
+        Args:
+            source: Origen de los productos, con get_all_productos y
+                    get_productos_by_ids (por defecto ProductoService local o remoto)
+            ttl: Segundos hasta la recarga completa (Config.CATALOG_INDEX_TTL)
+        """
+        self.source = source or service_for(ProductoService)
+        self.ttl = ttl if ttl is not None else Config.CATALOG_INDEX_TTL
+        self._lock = threading.Lock()
+        # Serializa recargas y actualizaciones: un evento no se pierde en una recarga
+        self._load_lock = threading.RLock()
+        self._loaded_at = None
+        self._por_id = {}          # id → fila (mismas columnas que get_all_productos)
+        self._textos = {}          # id → (nombre, sku, código) normalizados
+        self._por_barras = {}      # código de barras → set de ids
+        self._por_sku = {}         # SKU en mayúsculas → set de ids
+        self._trigramas = {}       # trigrama → set de ids
+        self._por_categoria = {}   # categoria_id → [ids ordenados por nombre]
+        self._orden = {}           # id → posición por nombre (orden de la BD)
+        self.stats = {'reloads': 0, 'refreshed': 0, 'stock_updates': 0}
+
+    # ------------------------------------------------------------------
+    # Carga y actualización
+    # ------------------------------------------------------------------
+
+    def ready(self):
+        """True si el índice ya se cargó (las consultas no tocan la BD)."""
+        return self._loaded_at is not None
+
+    def stale(self):
+        """True si el índice está cargado pero pasó el TTL: conviene recargarlo."""
+        return self._loaded_at is not None and time.monotonic() - self._loaded_at >= self.ttl
+
+    def reload(self):
+        """
+        Recarga todos los productos activos (BD local o servidor POS).
+
+        El índice nuevo se arma aparte y se reemplaza de una vez: las consultas
+        de otros hilos siguen respondiendo con el anterior mientras tanto.
+        """
+        with self._load_lock:
+            self._reload()
+
+    def _reload(self):
+        filas = self.source.get_all_productos()
+        inicio = time.perf_counter()
+        nuevo = ProductCatalogIndex(source=self.source, ttl=self.ttl)
+        for fila in filas:
+            nuevo._agregar(fila)
+        nuevo._reordenar()
+        with self._lock:
+            for atributo in ('_por_id', '_textos', '_por_barras', '_por_sku',
+                             '_trigramas', '_por_categoria', '_orden'):
+                setattr(self, atributo, getattr(nuevo, atributo))
+            self._loaded_at = time.monotonic()
+            self.stats['reloads'] += 1
+        logger.info(
+            f"Índice del catálogo cargado: {len(filas)} productos "
+            f"({(time.perf_counter() - inicio) * 1000:.1f} ms)"
+        )
+
+    def invalidate(self):
+        """Fuerza una recarga completa en el próximo uso."""
+        self._loaded_at = None
+
+    def refresh(self, producto_ids):
+        """
+        Relee productos puntuales (creados, editados o desactivados).
+
+        Args:
+            producto_ids: IDs a releer; los inactivos o borrados salen del índice
+        """
+        with self._load_lock:
+            if self._loaded_at is not None:
+                self._refresh(set(producto_ids))
+
+    def _refresh(self, ids):
+        filas = {f.id: f for f in self.source.get_productos_by_ids(list(ids))}
+        with self._lock:
+            for producto_id in ids:
+                self._quitar(producto_id)
+                fila = filas.get(producto_id)
+                if fila is not None and fila.activo:
+                    self._agregar(fila)
+            self._reordenar()
+            self.stats['refreshed'] += len(ids)
+
+    def apply_stock(self, stock):
+        """
+        Actualiza el stock sin consultar la BD.
+
+        Args:
+            stock: {producto_id: stock_nuevo}
+        """
+        with self._load_lock, self._lock:
+            for producto_id, nuevo in stock.items():
+                fila = self._por_id.get(producto_id)
+                if fila is not None:
+                    self._por_id[producto_id] = fila._replace(stock_actual=nuevo)
+            self.stats['stock_updates'] += len(stock)
+
+    def _on_stock(self, evento):
+        if evento.stock:
+            self.apply_stock(evento.stock)
+        else:
+            self.refresh(evento.producto_ids)
+
+    def _on_producto(self, evento):
+        self.refresh(evento.producto_ids)
+
+    def _ensure(self):
+        # Solo la primera carga bloquea; vencido el TTL se sigue usando el índice
+        # actual hasta que la recarga en segundo plano lo reemplace
+        if self.ready():
+            return
+        # Un solo hilo carga; los demás esperan y usan el resultado
+        with self._load_lock:
+            if not self.ready():
+                self._reload()
+
+    # Llamar con _lock tomado
+    def _agregar(self, fila):
+        pid = fila.id
+        textos = (normalizar(fila.nombre), normalizar(fila.sku), normalizar(fila.codigo_barras))
+        self._por_id[pid] = fila
+        self._textos[pid] = textos
+        if fila.codigo_barras:
+            self._por_barras.setdefault(str(fila.codigo_barras).strip(), set()).add(pid)
+        if fila.sku:
+            self._por_sku.setdefault(fila.sku.strip().upper(), set()).add(pid)
+        for trigrama in set().union(*map(_trigramas, textos)):
+            self._trigramas.setdefault(trigrama, set()).add(pid)
+
+    # Llamar con _lock tomado
+    def _quitar(self, producto_id):
+        fila = self._por_id.pop(producto_id, None)
+        if fila is None:
+            return
+        textos = self._textos.pop(producto_id)
+        for indice, clave in ((self._por_barras, str(fila.codigo_barras or '').strip()),
+                              (self._por_sku, (fila.sku or '').strip().upper())):
+            ids = indice.get(clave)
+            if ids is not None:
+                ids.discard(producto_id)
+                if not ids:
+                    del indice[clave]
+        for trigrama in set().union(*map(_trigramas, textos)):
+            ids = self._trigramas.get(trigrama)
+            if ids is not None:
+                ids.discard(producto_id)
+                if not ids:
+                    del self._trigramas[trigrama]
+
+    # Llamar con _lock tomado
+    def _reordenar(self):
+        ordenados = sorted(self._por_id.values(), key=lambda f: (f.nombre, f.id))
+        self._orden = {f.id: i for i, f in enumerate(ordenados)}
+        por_categoria = {}
+        for fila in ordenados:
+            por_categoria.setdefault(fila.categoria_id, []).append(fila.id)
+        self._por_categoria = por_categoria
+
+    # ------------------------------------------------------------------
+    # Consultas (en memoria)
+    # ------------------------------------------------------------------
+
+    def get(self, producto_id):
+        """Producto por ID o None."""
+        self._ensure()
+        return self._por_id.get(producto_id)
+
+    def get_many(self, producto_ids):
+        """Productos por ID en el orden recibido (omite los que ya no están)."""
+        self._ensure()
+        with self._lock:
+            return [self._por_id[i] for i in producto_ids if i in self._por_id]
+
+    def by_code(self, codigo):
+        """
+        Resuelve un escaneo o código tipeado: código de barras o SKU exacto.
+
+        El nombre no cuenta como código: para eso está search(). Si varios
+        productos comparten el código, gana el primero en orden del catálogo.
+
+        Returns:
+            Fila del producto o None
+        """
+        self._ensure()
+        codigo = str(codigo or '').strip()
+        with self._lock:
+            ids = self._por_barras.get(codigo) or self._por_sku.get(codigo.upper())
+            if not ids:
+                return None
+            return self._por_id[min(ids, key=self._orden.__getitem__)]
+
+    def all(self):
+        """Todos los productos activos ordenados por nombre."""
+        self._ensure()
+        with self._lock:
+            return sorted(self._por_id.values(), key=lambda f: self._orden[f.id])
+
+    def by_category(self, categoria_id):
+        """Productos activos de una categoría ordenados por nombre."""
+        self._ensure()
+        with self._lock:
+            return [self._por_id[i] for i in self._por_categoria.get(categoria_id, ())]
+
+    def in_catalog_order(self, producto_ids):
+        """Productos de la lista, en el orden del catálogo (por nombre)."""
+        self._ensure()
+        with self._lock:
+            ids = [i for i in set(producto_ids) if i in self._por_id]
+            ids.sort(key=self._orden.__getitem__)
+            return [self._por_id[i] for i in ids]
+
+    def search(self, term, limit=None):
+        """
+        Productos cuyo nombre, SKU o código de barras contiene ``term``.
+
+        Args:
+            term: Texto buscado (sin distinguir mayúsculas ni tildes)
+            limit: Máximo de resultados (None = todos)
+
+        Returns:
+            list: Filas ordenadas por nombre
+        """
+        self._ensure()
+        term = normalizar(term).strip()
+        if not term:
+            return self.all()[:limit]
+        with self._lock:
+            if len(term) >= 3:
+                # Intersección de trigramas, empezando por el menos frecuente
+                conjuntos = sorted(
+                    (self._trigramas.get(t, ()) for t in _trigramas(term)), key=len
+                )
+                candidatos = set(conjuntos[0]).intersection(*conjuntos[1:])
+            else:
+                candidatos = self._por_id.keys()
+            ids = [i for i in candidatos if any(term in t for t in self._textos[i])]
+            ids.sort(key=self._orden.__getitem__)
+            return [self._por_id[i] for i in ids[:limit]]
+
+
+_catalog_index = None
+_catalog_index_lock = threading.Lock()
+
+
+def get_catalog_index():
+    """Devuelve el índice del catálogo del proceso (se carga en el primer uso)."""
+    global _catalog_index
+    with _catalog_index_lock:
+        if _catalog_index is None:
+            _catalog_index = ProductCatalogIndex()
+            # 'sync': el índice queda al día antes de que la venta retorne a la vista
+            bus = get_event_bus()
+            bus.subscribe(StockChanged, _catalog_index._on_stock)
+            bus.subscribe(ProductChanged, _catalog_index._on_producto)
+        return _catalog_index
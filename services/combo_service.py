@@ -6,6 +6,8 @@ from models.combo_model import ComboModel
 from models.member_model import MemberModel
 from models.plan_model import PlanModel
 from core.response import Result
+from core.event_bus import get_event_bus
+from core.events import PaymentRegistered
 from core.logger import logger
 from typing import List, Dict, Tuple
 
@@ -40,7 +42,7 @@ class ComboService:
             if not plan:
                 return Result.fail("Plan no encontrado", "NOT_FOUND")
             
-            max_personas = plan[4]  # 🔥 FIX: columna cantidad_personas (índice 4)
+            max_personas = plan.cantidad_personas
             
             # Validar cantidad de miembros
             total_personas = 1 + len(beneficiarios_ids)  # 1 titular + demás miembros
@@ -69,20 +71,12 @@ class ComboService:
             monto_por_persona = round(monto_total / total_personas, 2)
             
             # Ajustar el monto del titular al monto prorrateado
-            with payment_model.get_db_connection() as conn:
-                cursor = conn.cursor()
-                cursor.execute(
-                    "UPDATE payments SET monto_pagado = ? WHERE id = ?",
-                    (monto_por_persona, payment_id)
-                )
-                conn.commit()
+            payment_model.update('payments', {'monto_pagado': monto_por_persona}, {'id': payment_id})
             
             logger.info(f"Monto prorrateado: S/ {monto_total:.2f} / {total_personas} = S/ {monto_por_persona:.2f} por persona")
             
-            # Registrar titular en payment_members
-            self.combo_model.add_member_to_combo(payment_id, titular_id, es_titular=True)
-            
-            # Registrar los demás miembros del combo
+            # Validar a todos los miembros antes de crear pagos
+            nombres = {}
             for miembro_id in beneficiarios_ids:
                 # Validar que no sea el mismo titular
                 if miembro_id == titular_id:
@@ -106,41 +100,59 @@ class ComboService:
                 miembro_nombre = miembro[0]
                 
                 # Validar que no esté duplicado
-                if self.combo_model.is_member_in_combo(payment_id, miembro_id):
+                if miembro_id in nombres or self.combo_model.is_member_in_combo(payment_id, miembro_id):
                     return Result.fail(
                         f"El miembro {miembro_nombre} ya está en este combo",
                         "DUPLICATE_ERROR"
                     )
-                
-                # 🔥 CREAR PAGO INDIVIDUAL CON MONTO PRORRATEADO
-                miembro_payment_result = payment_model.register_payment(
-                    miembro_id=miembro_id,
-                    plan_id=plan_id,
-                    monto_pagado=monto_por_persona,  # Monto prorrateado
-                    fecha_pago=fecha_pago,
-                    fecha_vencimiento=fecha_vencimiento
-                )
-                
-                if not miembro_payment_result.get("success"):
-                    logger.error(f"Error al crear pago para miembro {miembro_id}: {miembro_payment_result.get('message')}")
-                    return Result.fail(
-                        f"Error al registrar pago de {miembro_nombre}",
-                        "PAYMENT_ERROR"
+                nombres[miembro_id] = miembro_nombre
+            
+            # Vínculos en payment_members; se insertan todos juntos al final
+            vinculos = [(payment_id, titular_id, True)]
+            # Un PaymentRegistered por beneficiario (las vistas refrescan su estado)
+            eventos = []
+            
+            try:
+                for miembro_id, miembro_nombre in nombres.items():
+                    # 🔥 CREAR PAGO INDIVIDUAL CON MONTO PRORRATEADO
+                    miembro_payment_result = payment_model.register_payment(
+                        miembro_id=miembro_id,
+                        plan_id=plan_id,
+                        monto_pagado=monto_por_persona,  # Monto prorrateado
+                        fecha_pago=fecha_pago,
+                        fecha_vencimiento=fecha_vencimiento
                     )
-                
-                miembro_payment_id = miembro_payment_result.get("payment_id")
-                
-                # 🔥 IMPORTANTE: Vincular en payment_members de DOS formas:
-                # 1. El miembro con su propio payment_id (como titular de su pago)
-                self.combo_model.add_member_to_combo(miembro_payment_id, miembro_id, es_titular=True)
-                
-                # 2. El miembro también vinculado al payment_id del titular (tracking del combo)
-                self.combo_model.add_member_to_combo(payment_id, miembro_id, es_titular=False)
-                
-                logger.info(
-                    f"Pago creado para {miembro_nombre} (ID {miembro_id}): "
-                    f"payment_id={miembro_payment_id}, monto=S/ {monto_por_persona:.2f}"
-                )
+                    
+                    if not miembro_payment_result.get("success"):
+                        logger.error(f"Error al crear pago para miembro {miembro_id}: {miembro_payment_result.get('message')}")
+                        return Result.fail(
+                            f"Error al registrar pago de {miembro_nombre}",
+                            "PAYMENT_ERROR"
+                        )
+                    
+                    miembro_payment_id = miembro_payment_result.get("payment_id")
+                    
+                    # 🔥 IMPORTANTE: Vincular en payment_members de DOS formas:
+                    # 1. El miembro con su propio payment_id (como titular de su pago)
+                    vinculos.append((miembro_payment_id, miembro_id, True))
+                    
+                    # 2. El miembro también vinculado al payment_id del titular (tracking del combo)
+                    vinculos.append((payment_id, miembro_id, False))
+                    eventos.append(PaymentRegistered(
+                        miembro_payment_id, miembro_id, plan_id,
+                        monto_por_persona, fecha_vencimiento
+                    ))
+                    
+                    logger.info(
+                        f"Pago creado para {miembro_nombre} (ID {miembro_id}): "
+                        f"payment_id={miembro_payment_id}, monto=S/ {monto_por_persona:.2f}"
+                    )
+            finally:
+                # Aun si un pago falla, los ya creados quedan vinculados
+                self.combo_model.add_members_to_combo(vinculos)
+                bus = get_event_bus()
+                for evento in eventos:
+                    bus.publish_after_commit(evento)
             
             logger.info(
                 f"Combo registrado exitosamente: Payment {payment_id}, {total_personas} personas, "
@@ -181,7 +193,7 @@ class ComboService:
             if not plan:
                 return Result.fail("Plan no encontrado", "NOT_FOUND")
             
-            max_personas = plan[4]  # 🔥 FIX: cantidad_personas
+            max_personas = plan.cantidad_personas
             current_count = self.combo_model.count_combo_members(payment_id)
             
             if current_count >= max_personas:
@@ -1,10 +1,19 @@
 # -*- coding: utf-8 -*-
 """Servicio de movimientos de inventario"""
 from core.base_model import BaseModel
+from core.event_bus import get_event_bus
+from core.events import StockChanged
 from core.response import Result
 from models.producto_model import ProductoModel
 
+class _StockRechazado(Exception):
+    """Línea rechazada (producto inexistente o sin stock); revierte el lote"""
+
+
 class InventarioService:
+    TIPOS_ENTRADA = ('entrada', 'ajuste')
+    TIPOS_SALIDA = ('salida', 'venta')
+    
     def __init__(self):
         self.base = BaseModel()
         self.producto_model = ProductoModel()
@@ -12,57 +21,121 @@ class InventarioService:
     def registrar_movimiento(self, producto_id, tipo, cantidad, motivo, 
                             referencia_tipo=None, referencia_id=None, usuario_id=None, connection=None):
         """Registra movimiento y actualiza stock. Soporta transacción externa."""
+        result = self.registrar_movimientos(
+            [(producto_id, tipo, cantidad)], motivo,
+            referencia_tipo, referencia_id, usuario_id, connection=connection
+        )
+        if not result.success:
+            return result
+        return Result.ok(
+            "Movimiento registrado", 
+            {"movement_id": result.data['movement_ids'][0],
+             "stock_nuevo": result.data['stock'][producto_id]}
+        )
+    
+    def registrar_movimientos(self, movimientos, motivo, referencia_tipo=None,
+                              referencia_id=None, usuario_id=None, connection=None):
+        """
+        Registra varios movimientos (ej: todas las líneas de un carrito) de forma
+        atómica: o se aplican todos o ninguno.
         
-        # Obtener stock actual
-        # Nota: Usamos lectura normal aunque haya transacción, para simplificar.
-        producto = self.producto_model.get_producto_by_id(producto_id)
-        if not producto:
-            return Result.fail("Producto no encontrado")
-        
-        stock_actual = producto[7]
-        
-        # Calcular nuevo stock
-        if tipo in ['entrada', 'ajuste']:
-            stock_nuevo = stock_actual + cantidad
-        elif tipo in ['salida', 'venta']:
-            stock_nuevo = stock_actual - cantidad
-            if stock_nuevo < 0:
-                return Result.fail(f"Stock insuficiente para {producto[3]}")
-        else:
-            return Result.fail("Tipo de movimiento inválido")
+        El stock se ajusta con un UPDATE condicional por línea en la misma
+        conexión (sin leer antes el producto), así dos cajas que venden las
+        últimas unidades no pueden dejar stock negativo: la segunda no
+        encuentra fila que cumpla ``stock_actual >= cantidad``.
         
-        # Registrar movimiento
-        query = """
-            INSERT INTO inventario_movimientos (
-                producto_id, tipo_movimiento, cantidad, stock_anterior,
-                stock_nuevo, motivo, usuario_id, referencia_tipo, referencia_id
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        Args:
+            movimientos: Lista de (producto_id, tipo, cantidad)
+            motivo: Motivo común a todos los movimientos
+            referencia_tipo: Tipo de documento de origen (ej: 'venta')
+            referencia_id: ID del documento de origen
+            usuario_id: Usuario que registra
+            connection: Transacción externa (si no, va a la cola de escritura)
+            
+        Returns:
+            Result: data = {'movement_ids': [...], 'stock': {producto_id: stock_nuevo}}
         """
+        movimientos = list(movimientos)
+        for _, tipo, _ in movimientos:
+            if tipo not in self.TIPOS_ENTRADA and tipo not in self.TIPOS_SALIDA:
+                return Result.fail("Tipo de movimiento inválido")
+        
+        if not movimientos:
+            return Result.ok("Sin movimientos", {"movement_ids": [], "stock": {}})
         
         try:
-            movement_id = self.base.execute_query(
-                query,
-                (producto_id, tipo, cantidad, stock_actual, stock_nuevo,
-                 motivo, usuario_id, referencia_tipo, referencia_id),
-                commit=(connection is None),
-                connection=connection
-            )
-            
-            # Actualizar stock en producto (Usando update genérico de base que acepta connection)
-            self.base.update(
-                'productos', 
-                {'stock_actual': stock_nuevo}, 
-                {'id': producto_id},
-                connection=connection
-            )
+            if connection:
+                # Savepoint: un rechazo a mitad del lote no deja líneas aplicadas
+                # en la transacción del llamador
+                connection.execute("SAVEPOINT movimientos_inventario")
+                try:
+                    resultado = self._aplicar_movimientos(
+                        connection, movimientos, motivo, referencia_tipo, referencia_id, usuario_id
+                    )
+                except Exception:
+                    connection.execute("ROLLBACK TO movimientos_inventario")
+                    raise
+                finally:
+                    connection.execute("RELEASE movimientos_inventario")
+            else:
+                # Trabajo de la cola de escritura: un rechazo revierte su savepoint
+                resultado = self.base.run_write(lambda conn: self._aplicar_movimientos(
+                    conn, movimientos, motivo, referencia_tipo, referencia_id, usuario_id
+                ))
             
+            movement_ids, stock = resultado
             return Result.ok(
-                "Movimiento registrado", 
-                {"movement_id": movement_id, "stock_nuevo": stock_nuevo}
+                "Movimientos registrados",
+                {"movement_ids": movement_ids, "stock": stock}
             )
+        except _StockRechazado as e:
+            return Result.fail(str(e))
         except Exception as e:
             return Result.fail(f"Error al registrar movimiento: {str(e)}")
     
+    def _aplicar_movimientos(self, conn, movimientos, motivo, referencia_tipo,
+                             referencia_id, usuario_id):
+        stock = {}
+        kardex = []
+        for producto_id, tipo, cantidad in movimientos:
+            # 🔥 Lectura y escritura en una sola sentencia: el stock anterior se
+            # deduce del nuevo, que es el que quedó realmente en la fila
+            if tipo in self.TIPOS_SALIDA:
+                fila = conn.execute("""
+                    UPDATE productos SET stock_actual = stock_actual - ?
+                    WHERE id = ? AND stock_actual >= ?
+                    RETURNING stock_actual
+                """, (cantidad, producto_id, cantidad)).fetchone()
+                delta = -cantidad
+            else:
+                fila = conn.execute("""
+                    UPDATE productos SET stock_actual = stock_actual + ?
+                    WHERE id = ?
+                    RETURNING stock_actual
+                """, (cantidad, producto_id)).fetchone()
+                delta = cantidad
+            
+            if fila is None:
+                producto = conn.execute(
+                    "SELECT nombre FROM productos WHERE id = ?", (producto_id,)
+                ).fetchone()
+                if not producto:
+                    raise _StockRechazado("Producto no encontrado")
+                raise _StockRechazado(f"Stock insuficiente para {producto[0]}")
+            
+            stock_nuevo = fila[0]
+            stock[producto_id] = stock_nuevo
+            kardex.append({
+                'producto_id': producto_id, 'tipo_movimiento': tipo, 'cantidad': cantidad,
+                'stock_anterior': stock_nuevo - delta, 'stock_nuevo': stock_nuevo,
+                'motivo': motivo, 'usuario_id': usuario_id,
+                'referencia_tipo': referencia_tipo, 'referencia_id': referencia_id,
+            })
+        
+        movement_ids = self.base.bulk_insert('inventario_movimientos', kardex, connection=conn)
+        get_event_bus().publish_after_commit(StockChanged(list(stock), stock))
+        return movement_ids, stock
+    
     def get_movimientos_producto(self, producto_id, limit=50):
         query = """
             SELECT fecha_hora, tipo_movimiento, cantidad, stock_anterior, stock_nuevo, motivo
@@ -0,0 +1,341 @@
+# -*- coding: utf-8 -*-
+"""
+Servicio de check-in en modo kiosco / torniquete
+
+Pensado para lectores de código de barras o QR donde decenas de miembros
+marcan en pocos minutos. Cada identificador se valida contra una instantánea
+en memoria de las membresías y se responde sin tocar la BD; la entrada se
+encola y un hilo la vuelca a ``attendance`` en transacciones por lote.
+
+Antes de encolar, cada entrada se agrega a un archivo append-only (spill).
+Al iniciar el servicio se reaplica lo que haya quedado en él, así un cierre
+abrupto no pierde marcaciones. El índice único por miembro y día hace que
+reaplicar sea idempotente. Como escribe directo en la BD, no corre en una
+terminal (Config.API_URL).
+
+Las entradas registradas por otro camino (recepción, terminales) llegan con
+el evento CheckInRecorded y marcan al miembro en la instantánea; si aun así
+una entrada encolada resulta duplicada al volcar, se registra en el log.
+Los pagos registrados o eliminados (PaymentRegistered / PaymentDeleted)
+recargan el vencimiento de ese miembro sin esperar a la próxima recarga.
+"""
+import json
+import os
+import threading
+import time
+from datetime import datetime
+from models.attendance_model import AttendanceModel
+from models.member_model import MemberModel
+from services.attendance_service import AttendanceService
+from services.payment_service import PaymentService
+from core.config import Config
+from core.event_bus import get_event_bus
+from core.events import CheckInRecorded, CheckInDeleted, PaymentRegistered, PaymentDeleted
+from core.logger import logger
+
+
+class KioskService:
+    """Check-in de alto volumen con validación en memoria y escritura por lotes"""
+
+    def __init__(self, flush_interval_ms=None, spill_path=None):
+        self.model = AttendanceModel()
+        self.member_model = MemberModel()
+        self.attendance_service = AttendanceService()
+
+        self.flush_interval = (flush_interval_ms or Config.KIOSK_FLUSH_INTERVAL_MS) / 1000.0
+        self.spill_path = spill_path or Config.KIOSK_SPILL_FILE
+
+        # _lock protege instantánea, cola y spill; _flush_lock serializa volcados
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._miembros = {}          # identificador -> (miembro_id, nombre, latest_expiry)
+        self._marcados_hoy = set()   # miembro_id con entrada hoy (BD + cola)
+        self._pendientes = []        # (miembro_id, fecha_hora_entrada) sin volcar
+        self._dia = None
+        self._snapshot_at = 0.0
+        self._spill = None
+        self._stop = threading.Event()
+        self._thread = None
+        self._suscripciones = ()
+        self.flushed_total = 0
+
+    # ------------------------------------------------------------------
+    # Ciclo de vida
+    # ------------------------------------------------------------------
+
+    def start(self):
+        """Reaplica el spill pendiente, carga la instantánea e inicia el volcado."""
+        if self._thread is not None:
+            return
+        if Config.API_URL:
+            raise RuntimeError("El modo kiosco solo funciona en la PC del servidor POS")
+
+        self._recover_spill()
+        self._spill = open(self.spill_path, "a", encoding="utf-8")
+        # Antes de la instantánea: así no se pierde una entrada entre ambas
+        self._subscribe()
+        self.refresh_snapshot()
+
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="KioskFlusher", daemon=True)
+        self._thread.start()
+        logger.info(
+            f"Modo kiosco iniciado: {len(self._miembros)} identificadores, "
+            f"volcado cada {self.flush_interval * 1000:.0f} ms"
+        )
+
+    def stop(self):
+        """Detiene el hilo, vuelca lo pendiente y cierra el spill."""
+        if self._thread is None:
+            return
+
+        self._stop.set()
+        self._thread.join(timeout=5)
+        self._thread = None
+        self.flush()
+        self._unsubscribe()
+
+        with self._lock:
+            self._spill.close()
+            self._spill = None
+        logger.info(f"Modo kiosco detenido: {self.flushed_total} entradas volcadas")
+
+    def _run(self):
+        while not self._stop.wait(self.flush_interval):
+            try:
+                self.flush()
+                if time.monotonic() - self._snapshot_at > Config.KIOSK_SNAPSHOT_TTL:
+                    self.refresh_snapshot()
+            except Exception as e:
+                logger.error(f"Error en volcado de kiosco: {e}")
+
+    # ------------------------------------------------------------------
+    # Instantánea de membresías
+    # ------------------------------------------------------------------
+
+    def refresh_snapshot(self):
+        """Recarga desde la BD los miembros, su vencimiento y las entradas de hoy."""
+        hoy = datetime.now().strftime(Config.DATE_FORMAT)
+        filas = self.member_model.get_access_snapshot()
+        marcados = self.model.get_member_ids_checked_in(hoy)
+
+        miembros = {}
+        for miembro_id, nombre, dni, codigo, latest_expiry in filas:
+            datos = (miembro_id, nombre, latest_expiry)
+            miembros[dni] = datos
+            miembros[codigo] = datos
+
+        with self._lock:
+            # Lo encolado aún no está en la BD pero cuenta como marcado
+            if self._dia == hoy:
+                marcados.update(m for m, _ in self._pendientes)
+            self._miembros = miembros
+            self._marcados_hoy = marcados
+            self._dia = hoy
+            self._snapshot_at = time.monotonic()
+
+    def refresh_member(self, miembro_id):
+        """Recarga desde la BD el vencimiento de un solo miembro en la instantánea."""
+        fila = self.member_model.get_access_entry(miembro_id)
+
+        with self._lock:
+            # Identificadores viejos (DNI o código cambiados, miembro eliminado)
+            for clave in [k for k, datos in self._miembros.items() if datos[0] == miembro_id]:
+                del self._miembros[clave]
+            if fila is not None:
+                _, nombre, dni, codigo, latest_expiry = fila
+                datos = (miembro_id, nombre, latest_expiry)
+                self._miembros[dni] = datos
+                self._miembros[codigo] = datos
+
+    def _subscribe(self):
+        # Se guardan los métodos ligados: unsubscribe compara por identidad.
+        # Los que consultan la BD van en el hilo del bus, no en el que publica
+        self._suscripciones = (
+            (CheckInRecorded, self._on_check_in, 'sync'),
+            (CheckInDeleted, self._on_check_in_deleted, 'queued'),
+            (PaymentRegistered, self._on_payment, 'queued'),
+            (PaymentDeleted, self._on_payment, 'queued'),
+        )
+        bus = get_event_bus()
+        for tipo, handler, modo in self._suscripciones:
+            bus.subscribe(tipo, handler, modo)
+
+    def _unsubscribe(self):
+        bus = get_event_bus()
+        for tipo, handler, _ in self._suscripciones:
+            bus.unsubscribe(tipo, handler)
+        self._suscripciones = ()
+
+    def _on_check_in(self, evento):
+        """Entrada registrada (recepción, terminal o este kiosco): ya cuenta como marcado."""
+        with self._lock:
+            if self._dia and str(evento.fecha_hora).startswith(self._dia):
+                self._marcados_hoy.add(evento.miembro_id)
+
+    def _on_check_in_deleted(self, evento):
+        """Se borró una entrada: puede volver a marcar si ya no tiene ninguna hoy."""
+        dia = self._dia
+        if dia is None or self.model.has_check_in(evento.miembro_id, dia):
+            return
+        with self._lock:
+            # Lo encolado aún no está en la BD
+            if self._dia == dia and all(m != evento.miembro_id for m, _ in self._pendientes):
+                self._marcados_hoy.discard(evento.miembro_id)
+
+    def _on_payment(self, evento):
+        """Pago registrado o eliminado: cambia el vencimiento de ese miembro."""
+        if evento.miembro_id is None:
+            self._snapshot_at = 0.0   # no se sabe de quién: recargar todo
+        else:
+            self.refresh_member(evento.miembro_id)
+
+    # ------------------------------------------------------------------
+    # Marcación
+    # ------------------------------------------------------------------
+
+    def check_in(self, member_identifier):
+        """
+        Registra una entrada validando en memoria.
+
+        Los identificadores desconocidos o con acceso denegado se verifican
+        contra la BD con AttendanceService (puede ser un miembro nuevo o que
+        acaba de renovar); el resto responde sin consultas.
+
+        Args:
+            member_identifier: DNI o código de membresía
+
+        Returns:
+            dict: Mismo formato que AttendanceService.register_check_in
+        """
+        identifier = member_identifier.strip()
+        ahora = datetime.now()
+
+        if ahora.strftime(Config.DATE_FORMAT) != self._dia:
+            self.refresh_snapshot()
+
+        with self._lock:
+            miembro = (
+                self._miembros.get(identifier)
+                or self._miembros.get(MemberModel.normalizar_codigo(identifier))
+            )
+
+            if miembro is not None:
+                miembro_id, miembro_nombre, latest_expiry = miembro
+
+                if miembro_id in self._marcados_hoy:
+                    return {
+                        'status': 'YaMarcado',
+                        'message': "Ya registró asistencia hoy",
+                        'alerta': None
+                    }
+
+                validacion = PaymentService.evaluate_expiry(latest_expiry)
+
+                if validacion['status'] not in (Config.STATUS_EXPIRED, Config.STATUS_NO_PLAN):
+                    fecha_check_in = ahora.strftime(Config.DATETIME_FORMAT)
+                    self._write_spill(miembro_id, fecha_check_in)
+                    self._pendientes.append((miembro_id, fecha_check_in))
+                    self._marcados_hoy.add(miembro_id)
+
+                    fecha_vencimiento = validacion['fecha_vencimiento']
+                    return {
+                        'status': 'Éxito',
+                        'message': f"Acceso concedido. Tu plan vence: {fecha_vencimiento}",
+                        'alerta': validacion['alerta'],
+                        'miembro_nombre': miembro_nombre,
+                        'fecha_vencimiento': fecha_vencimiento
+                    }
+
+        # Camino lento: la instantánea no alcanza para decidir
+        resultado = self.attendance_service.register_check_in(identifier)
+        if resultado['status'] in ('Éxito', 'YaMarcado'):
+            self._snapshot_at = 0.0   # recargar en el próximo ciclo del hilo
+        return resultado
+
+    # ------------------------------------------------------------------
+    # Volcado y spill
+    # ------------------------------------------------------------------
+
+    def flush(self):
+        """
+        Escribe en la BD las entradas encoladas en una sola transacción.
+
+        Returns:
+            int: Cantidad de filas insertadas
+        """
+        with self._flush_lock:
+            with self._lock:
+                lote, self._pendientes = self._pendientes, []
+
+            if not lote:
+                return 0
+
+            try:
+                insertados = self.model.insert_check_ins_batch(lote)
+            except Exception as e:
+                # Se reencola al frente; el spill sigue teniendo las filas
+                with self._lock:
+                    self._pendientes[:0] = lote
+                logger.error(f"No se pudo volcar lote de kiosco ({len(lote)} entradas): {e}")
+                return 0
+
+            with self._lock:
+                self._rewrite_spill()
+
+            self.flushed_total += len(insertados)
+            bus = get_event_bus()
+            for miembro_id, fecha_hora in insertados:
+                bus.publish(CheckInRecorded(miembro_id, fecha_hora))
+            for miembro_id, fecha_hora in set(lote).difference(insertados):
+                # El kiosco ya respondió "Éxito": queda constancia de la entrada perdida
+                logger.warning(
+                    f"Kiosco: entrada de miembro {miembro_id} ({fecha_hora}) descartada "
+                    f"al volcar (ya tenía asistencia ese día o el miembro ya no existe)"
+                )
+            return len(insertados)
+
+    def pending_count(self):
+        """Cantidad de entradas encoladas sin volcar."""
+        with self._lock:
+            return len(self._pendientes)
+
+    def _write_spill(self, miembro_id, fecha_hora):
+        # Llamar con _lock tomado
+        self._spill.write(json.dumps([miembro_id, fecha_hora]) + "\n")
+        self._spill.flush()
+        if Config.KIOSK_SPILL_FSYNC:
+            os.fsync(self._spill.fileno())
+
+    def _rewrite_spill(self):
+        # Llamar con _lock tomado: deja en el spill solo lo que sigue pendiente
+        if self._spill is None:
+            return
+        self._spill.seek(0)
+        self._spill.truncate()
+        for miembro_id, fecha_hora in self._pendientes:
+            self._spill.write(json.dumps([miembro_id, fecha_hora]) + "\n")
+        self._spill.flush()
+
+    def _recover_spill(self):
+        """Reaplica las entradas que quedaron en el spill tras un cierre abrupto."""
+        if not os.path.exists(self.spill_path):
+            return
+
+        registros = []
+        with open(self.spill_path, encoding="utf-8") as f:
+            for linea in f:
+                try:
+                    miembro_id, fecha_hora = json.loads(linea)
+                    registros.append((int(miembro_id), str(fecha_hora)))
+                except (ValueError, TypeError):
+                    # Última línea a medio escribir al momento del corte
+                    logger.warning(f"Línea inválida en spill de kiosco: {linea!r}")
+
+        if registros:
+            insertados = self.model.insert_check_ins_batch(registros)
+            logger.info(
+                f"Spill de kiosco recuperado: {len(insertados)}/{len(registros)} entradas aplicadas"
+            )
+
+        open(self.spill_path, "w").close()
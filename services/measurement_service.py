@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+"""
+Servicio de lógica de negocio para mediciones corporales
+"""
+from models.measurement_model import MeasurementModel
+from core.logger import logger
+
+class MeasurementService:
+    """Servicio para gestión de mediciones de miembros"""
+
+    def __init__(self):
+        self.model = MeasurementModel()
+
+    def add_measurement(self, miembro_id, datos):
+        """
+        Registra una nueva medición de un miembro.
+
+        Args:
+            miembro_id: ID del miembro
+            datos: dict con fecha_medicion, peso, talla y el resto de medidas (opcionales)
+
+        Returns:
+            dict: {"success": bool, "message": str, "measurement_id": int}
+        """
+        if not datos.get('peso') or not datos.get('talla'):
+            return {
+                "success": False,
+                "message": "Peso y Talla son obligatorios"
+            }
+
+        try:
+            measurement_id = self.model.insert_measurement(miembro_id, datos)
+            logger.info(f"Medición agregada: ID={measurement_id}, Miembro={miembro_id}")
+
+            return {
+                "success": True,
+                "message": "Medición registrada correctamente",
+                "measurement_id": measurement_id
+            }
+        except Exception as e:
+            logger.error(f"Error al agregar medición: {e}")
+            return {
+                "success": False,
+                "message": f"Error al agregar medición: {str(e)}"
+            }
+
+    def get_measurements(self, miembro_id):
+        """
+        Obtiene las mediciones de un miembro con su IMC calculado.
+
+        Args:
+            miembro_id: ID del miembro
+
+        Returns:
+            list: Lista de dicts (id, fecha, peso, grasa, imc, perímetros y comentarios)
+                  ordenada por fecha ASC
+        """
+        mediciones = []
+        for r in self.model.get_member_measurements(miembro_id):
+            imc = round(r.peso / (r.talla * r.talla), 2) if r.peso and r.talla else None
+            mediciones.append({
+                "id": r.id, "fecha": r.fecha_medicion, "peso": r.peso,
+                "grasa": r.grasa_corporal, "imc": imc,
+                "pecho": r.pecho, "hombros": r.hombros, "cintura": r.cintura,
+                "cadera": r.cadera, "brazo": r.biceps, "antebrazo": r.antebrazo,
+                "muslo": r.muslo, "pantorrilla": r.gemelos, "cuello": r.cuello,
+                "comentarios": r.comentarios
+            })
+        return mediciones
+
+    def delete_measurement(self, measurement_id):
+        """
+        Elimina una medición por ID.
+
+        Args:
+            measurement_id: ID de la medición
+
+        Returns:
+            dict: {"success": bool, "message": str}
+        """
+        try:
+            deleted = self.model.delete_measurement(measurement_id)
+
+            if deleted:
+                logger.info(f"Medición eliminada: ID={measurement_id}")
+                return {
+                    "success": True,
+                    "message": "Medición eliminada correctamente"
+                }
+            else:
+                return {
+                    "success": False,
+                    "message": "No se encontró la medición"
+                }
+        except Exception as e:
+            logger.error(f"Error al eliminar medición: {e}")
+            return {
+                "success": False,
+                "message": f"Error al eliminar medición: {str(e)}"
+            }
@@ -117,19 +117,16 @@ class MemberService:
     def get_all_members_with_status(self):
         """
         Obtiene todos los miembros con el estado de su membresía.
-        🔥 USA PaymentModel.get_latest_expiry_date() - ÚNICA FUENTE
+        🔥 Una sola consulta contra la proyección member_status (sin N+1)
         
         Returns:
             list: Lista de tuplas (id, nombre, dni, contacto, codigo, estado)
         """
-        miembros = self.model.get_all_members()
+        miembros = self.model.get_all_members_with_expiry()
         resultado = []
 
         for miembro in miembros:
-            miembro_id, nombre, dni, contacto, codigo = miembro
-            
-            # 🔥 USAR PAYMENTMODEL PARA CONSISTENCIA
-            fecha_vencimiento = self.payment_model.get_latest_expiry_date(miembro_id)
+            miembro_id, nombre, dni, contacto, codigo, fecha_vencimiento = miembro
 
             if fecha_vencimiento:
                 try:
@@ -153,6 +150,68 @@ class MemberService:
 
         return resultado
 
+    def _con_estado(self, fila):
+        """Convierte una fila con bucket de estado en la tupla que muestran las vistas"""
+        miembro_id, nombre, dni, contacto, codigo, vencimiento, bucket, _dias = fila
+        if bucket == MemberModel.BUCKET_NO_PLAN:
+            estado = "Sin plan"
+        elif bucket == MemberModel.BUCKET_EXPIRED:
+            estado = f"Vencida ({vencimiento})"
+        else:
+            estado = f"Válida hasta {vencimiento}"
+        return (miembro_id, nombre, dni, contacto, codigo, estado, bucket)
+
+    def get_members_page(self, search=None, after=None, before=None, limit=Config.DEFAULT_PAGE_SIZE):
+        """
+        Obtiene una página del listado de miembros con su estado calculado en SQL.
+        
+        Args:
+            search: Texto a buscar en nombre, DNI o código (opcional)
+            after: Cursor de la página siguiente (ver 'next_cursor')
+            before: Cursor de la página anterior (ver 'prev_cursor')
+            limit: Miembros por página
+            
+        Returns:
+            dict: {
+                'members': list de tuplas (id, nombre, dni, contacto, codigo, estado, bucket),
+                'prev_cursor': tuple o None,
+                'next_cursor': tuple o None,
+                'has_more': bool
+            }
+        """
+        filas, hay_mas = self.model.get_members_page(limit, after, before, search)
+        
+        miembros = [self._con_estado(fila) for fila in filas]
+        
+        primero = (filas[0][1], filas[0][0]) if filas else None
+        ultimo = (filas[-1][1], filas[-1][0]) if filas else None
+        
+        return {
+            'members': miembros,
+            'prev_cursor': primero,
+            'next_cursor': ultimo,
+            'has_more': hay_mas
+        }
+
+    def search(self, term, limit=20):
+        """
+        Búsqueda rankeada de miembros (prefijo, sin tildes ni mayúsculas).
+        
+        Args:
+            term: Texto a buscar en nombre, DNI, código, contacto o email
+            limit: Máximo de resultados
+            
+        Returns:
+            list: Lista de tuplas (id, nombre, dni, contacto, codigo, estado, bucket)
+                  ordenadas por relevancia
+        """
+        filas = self.model.search_members(term, limit)
+        return [self._con_estado(fila) for fila in filas]
+
+    def count_members(self, search=None):
+        """Cuenta los miembros que coinciden con la búsqueda"""
+        return self.model.count_members(search)
+
     def find_member_by_identifier(self, identifier):
         """
         Busca un miembro por DNI o código y retorna info con estado de membresía.
@@ -6,6 +6,8 @@ from datetime import datetime, timedelta
 from models.payment_model import PaymentModel
 from services.plan_service import PlanService
 from core.config import Config
+from core.event_bus import get_event_bus
+from core.events import PaymentRegistered, PaymentDeleted
 from core.logger import logger
 
 class PaymentService:
@@ -31,8 +33,19 @@ class PaymentService:
                 'alerta': str o None
             }
         """
-        fecha_vencimiento_str = self.model.get_latest_expiry_date(miembro_id)
+        return self.evaluate_expiry(self.model.get_latest_expiry_date(miembro_id))
+
+    @staticmethod
+    def evaluate_expiry(fecha_vencimiento_str):
+        """
+        Calcula el estado de membresía a partir de la fecha de vencimiento.
         
+        Args:
+            fecha_vencimiento_str: Último vencimiento (YYYY-MM-DD) o None
+            
+        Returns:
+            dict: Mismo formato que validate_membership_status
+        """
         if not fecha_vencimiento_str:
             return {
                 'status': Config.STATUS_NO_PLAN,
@@ -113,8 +126,7 @@ class PaymentService:
             }
 
         # Obtener duración del plan
-        planes = self.plan_service.get_all_plans(include_inactive=True)
-        plan = next((p for p in planes if p[0] == plan_id), None)
+        plan = self.plan_service.get_plan(plan_id)
         
         if not plan:
             return {
@@ -122,7 +134,7 @@ class PaymentService:
                 "message": "Plan no encontrado"
             }
             
-        duracion_dias = plan[3]
+        duracion_dias = plan.duracion_dias
 
         # Determinar fecha de inicio de la nueva vigencia
         current_date_str = datetime.now().strftime(Config.DATE_FORMAT)
@@ -155,6 +167,10 @@ class PaymentService:
         )
 
         if resultado.get("success"):
+            get_event_bus().publish(PaymentRegistered(
+                resultado.get("payment_id"), miembro_id, plan_id, monto_pagado,
+                fecha_vencimiento.strftime(Config.DATE_FORMAT)
+            ))
             mensaje = (
                 f"Pago registrado correctamente. "
                 f"Vigencia: {fecha_inicio_vigencia.strftime(Config.DATE_FORMAT)} "
@@ -192,4 +208,14 @@ class PaymentService:
     
     def delete_payment_by_id(self, id_pago):
         """Elimina (extorna) un pago por ID"""
-        return self.model.delete_payment_by_id(id_pago)
+        bus = get_event_bus()
+        miembro_id = None
+        if bus.has_subscribers(PaymentDeleted):
+            fila = self.model.execute_query(
+                "SELECT miembro_id FROM payments WHERE id = ?", (id_pago,), fetch_one=True
+            )
+            miembro_id = fila[0] if fila else None
+        resultado = self.model.delete_payment_by_id(id_pago)
+        if resultado.get("success"):
+            bus.publish(PaymentDeleted(id_pago, miembro_id))
+        return resultado
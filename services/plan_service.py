@@ -94,6 +94,18 @@ class PlanService:
         """
         return self.model.get_all_plans(include_inactive)
 
+    def get_plan(self, plan_id):
+        """
+        Obtiene un plan por ID desde el catálogo en caché.
+        
+        Args:
+            plan_id: ID del plan
+            
+        Returns:
+            tuple: Datos del plan o None
+        """
+        return self.model.get_plan_by_id(plan_id)
+
     def update_plan(self, plan_id, nombre, precio, dias, personas, inicio_venta, fin_venta, descripcion, estado, categoria_id=None):
         """
         Actualiza un plan con validación.
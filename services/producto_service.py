@@ -1,7 +1,8 @@
 # -*- coding: utf-8 -*-
 """Servicio de productos"""
-import pandas as pd
 from models.producto_model import ProductoModel
+from core.event_bus import get_event_bus
+from core.events import ProductChanged, StockChanged
 from core.validators import Validator
 from core.response import Result
 
@@ -26,6 +27,9 @@ class ProductoService:
     def get_producto(self, producto_id):
         return self.model.get_producto_by_id(producto_id)
     
+    def get_productos_by_ids(self, producto_ids):
+        return self.model.get_productos_by_ids(producto_ids)
+    
     def search_productos(self, term):
         return self.model.search_productos(term)
     
@@ -46,10 +50,13 @@ class ProductoService:
             return Result.fail("Categoría inválida")
         
         # El modelo ya retorna un objeto Result, lo pasamos directamente
-        return self.model.create_producto(
+        result = self.model.create_producto(
             sku, nombre, categoria_id, precio, stock_inicial, 
             stock_minimo, codigo_barras, None, precio_compra, proveedor_id
         )
+        if result.success:
+            get_event_bus().publish(ProductChanged([result.data['producto_id']]))
+        return result
     
     def update_producto(self, producto_id, nombre, categoria_id, precio, 
                        stock_minimo, codigo_barras=None, precio_compra=0, proveedor_id=None):
@@ -58,16 +65,25 @@ class ProductoService:
         if not validate_positive_number(precio):
             return Result.fail("Precio inválido")
         
-        return self.model.update_producto(
+        result = self.model.update_producto(
             producto_id, nombre, categoria_id, precio, stock_minimo, codigo_barras,
             None, precio_compra, proveedor_id
         )
+        if result.success:
+            get_event_bus().publish(ProductChanged([producto_id]))
+        return result
     
     def update_stock(self, producto_id, nuevo_stock):
-        return self.model.update_stock(producto_id, nuevo_stock)
+        result = self.model.update_stock(producto_id, nuevo_stock)
+        if result.success:
+            get_event_bus().publish(StockChanged([producto_id], {producto_id: nuevo_stock}))
+        return result
     
     def toggle_active(self, producto_id):
-        return self.model.toggle_active(producto_id)
+        result = self.model.toggle_active(producto_id)
+        if result.success:
+            get_event_bus().publish(ProductChanged([producto_id]))
+        return result
     
     def get_categorias(self):
         return self.model.get_all_categorias()
@@ -77,6 +93,9 @@ class ProductoService:
         Importa productos desde Excel.
         Columnas esperadas: Nombre, Categoria, PrecioVenta, Stock, Minimo, Barras
         """
+        # 🔥 Importación diferida: pandas tarda en cargar y solo se usa aquí
+        import pandas as pd
+
         try:
             df = pd.read_excel(file_path)
             
@@ -88,6 +107,7 @@ class ProductoService:
             
             exitos = 0
             errores = []
+            creados = []
             
             for index, row in df.iterrows():
                 try:
@@ -105,16 +125,21 @@ class ProductoService:
                     sku = self.model.get_next_sku(cat_id)
                     
                     # Crear
-                    self.model.create_producto(
+                    creado = self.model.create_producto(
                         sku, nombre, cat_id, precio, 
                         int(row.get('Stock', 0)), 
                         int(row.get('Minimo', 0)),
                         str(row.get('Barras', ''))
                     )
+                    if creado.success:
+                        creados.append(creado.data['producto_id'])
                     exitos += 1
                 except Exception as e:
                     errores.append(f"Fila {index+2}: Error al procesar - {str(e)}")
             
+            if creados:
+                get_event_bus().publish(ProductChanged(creados))
+            
             summary = f"Importación finalizada. Éxitos: {exitos}. Errores: {len(errores)}."
             if errores:
                 return Result.fail(summary + "\n\nDetalle de errores (primeros 5):\n" + "\n".join(errores[:5]))
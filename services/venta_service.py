@@ -1,6 +1,8 @@
 # -*- coding: utf-8 -*-
+from core.event_bus import get_event_bus
+from core.events import SaleCompleted, SaleCancelled
 from core.response import Result
-from core.database_manager import get_connection
+from core.write_queue import after_commit
 from models.venta_model import VentaModel
 from models.caja_model import CajaModel
 from services.inventario_service import InventarioService
@@ -13,16 +15,15 @@ class VentaService:
     
     def procesar_venta(self, cliente_tipo, cliente_id, total, metodo_pago,
                        items, usuario_id=None):
-        conn = get_connection()
-        try:
-            # === BLINDAJE DE DATOS (Evita error 'list is not supported') ===
-            # Aseguramos que sean tipos simples, no listas ni objetos
-            c_id = int(cliente_id) if cliente_id is not None else None
-            tot = float(total)
-            u_id = int(usuario_id) if usuario_id is not None else None
-            m_pago = str(metodo_pago)
-            c_tipo = str(cliente_tipo)
-            
+        # === BLINDAJE DE DATOS (Evita error 'list is not supported') ===
+        # Aseguramos que sean tipos simples, no listas ni objetos
+        c_id = int(cliente_id) if cliente_id is not None else None
+        tot = float(total)
+        u_id = int(usuario_id) if usuario_id is not None else None
+        m_pago = str(metodo_pago)
+        c_tipo = str(cliente_tipo)
+        
+        def _venta(conn):
             # 1. Crear venta
             result = self.venta_model.create_venta(
                 c_tipo, c_id, tot, m_pago, u_id, items,
@@ -33,18 +34,14 @@ class VentaService:
             
             venta_id = result.data['venta_id']
             
-            # 2. Descontar stock
-            for item in items:
-                p_id = int(item['producto_id'])
-                cant = int(item['cantidad'])
-                
-                inv_result = self.inventario.registrar_movimiento(
-                    p_id, 'venta', cant,
-                    f"Venta #{venta_id}", 'venta', venta_id, u_id,
-                    connection=conn
-                )
-                if not inv_result.success:
-                    raise Exception(f"Stock error prod {p_id}: {inv_result.message}")
+            # 2. Descontar stock (todo el carrito en un lote)
+            inv_result = self.inventario.registrar_movimientos(
+                [(int(item['producto_id']), 'venta', int(item['cantidad'])) for item in items],
+                f"Venta #{venta_id}", 'venta', venta_id, u_id,
+                connection=conn
+            )
+            if not inv_result.success:
+                raise Exception(f"Stock error: {inv_result.message}")
             
             # 3. Caja
             cash_result = self.caja_model.registrar_movimiento(
@@ -58,54 +55,52 @@ class VentaService:
             if not cash_result.success:
                 raise Exception(cash_result.message)
             
-            conn.commit()
+            get_event_bus().publish_after_commit(SaleCompleted(
+                venta_id, tot, m_pago, [int(item['producto_id']) for item in items]
+            ))
+            return venta_id
+        
+        # 🔥 Toda la venta es un trabajo de la cola de escritura: en horas pico
+        # varias ventas (y check-ins, movimientos de caja...) comparten commit
+        try:
+            venta_id = self.venta_model.run_write(_venta)
             return Result.ok("Venta procesada", {"venta_id": venta_id})
-            
         except Exception as e:
-            conn.rollback()
             return Result.fail(f"Error transacción: {str(e)}")
-        finally:
-            conn.close()
     
     def extornar_venta(self, venta_id, usuario_id=None):
-        conn = get_connection()
-        try:
-            detalle = self.venta_model.get_venta_by_id(venta_id)
-            if not detalle or detalle['venta'][8] == 'cancelada':
-                raise Exception("Venta no encontrada o ya anulada")
+        def _extorno(conn):
+            # Misma conexión del writer: ve las ventas aún no confirmadas del lote
+            detalle = self.venta_model.get_venta_by_id(venta_id, connection=conn)
             
-            # Cancelar venta
-            self.venta_model.execute_query(
-                "UPDATE ventas SET estado='cancelada' WHERE id=?", 
-                (venta_id,), connection=conn
-            )
+            # Cancelar venta (condicional: dos extornos simultáneos no pasan ambos)
+            cancelada = conn.execute(
+                "UPDATE ventas SET estado='cancelada' WHERE id=? AND estado != 'cancelada'",
+                (venta_id,)
+            ).rowcount
+            if not detalle or not cancelada:
+                raise Exception("Venta no encontrada o ya anulada")
             
             # Devolver stock
-            items = detalle['detalle']
-            for item in items:
-                # item: id, prod_id, nombre, sku, cant...
-                prod_id = item[1]
-                cantidad = item[4]
-                self.inventario.registrar_movimiento(
-                    prod_id, 'entrada', cantidad,
-                    f"Anulación Venta #{venta_id}", 'venta_anulada', venta_id, usuario_id,
-                    connection=conn
-                )
+            self.inventario.registrar_movimientos(
+                [(item.producto_id, 'entrada', item.cantidad) for item in detalle['detalle']],
+                f"Anulación Venta #{venta_id}", 'venta_anulada', venta_id, usuario_id,
+                connection=conn
+            )
 
             # Extornar caja
             self.caja_model.execute_query(
                 "UPDATE cash_movements SET estado='extornado' WHERE referencia_tipo='venta' AND referencia_id=?",
                 (venta_id,), connection=conn
             )
-            
-            conn.commit()
+            get_event_bus().publish_after_commit(SaleCancelled(venta_id))
+            after_commit(self.caja_model.publicar_saldos, key='caja_saldos')
+        
+        try:
+            self.venta_model.run_write(_extorno)
             return Result.ok("Venta anulada correctamente")
-            
         except Exception as e:
-            conn.rollback()
             return Result.fail(f"Error al extornar: {str(e)}")
-        finally:
-            conn.close()
 
     def get_ventas(self, fecha_inicio=None, fecha_fin=None, limit=100):
         return self.venta_model.get_ventas(fecha_inicio, fecha_fin, limit=limit)
@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+"""
+Fixtures compartidas de las pruebas
+
+Cada prueba que usa ``db`` trabaja sobre una BD SQLite nueva en un directorio
+temporal (migrada a la última versión), con el pool y la cola de escritura
+del proceso reiniciados. Los logs y archivos auxiliares también van al
+directorio temporal: las pruebas nunca tocan gym_db.sqlite ni gym_manager.log.
+"""
+import os
+import sys
+import tempfile
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.config import Config
+
+# Antes de importar core.logger (abre Config.LOG_FILE al importarse)
+_TMP = tempfile.mkdtemp(prefix='gym_tests_')
+Config.LOG_FILE = os.path.join(_TMP, 'gym_manager.log')
+Config.DB_SLOW_QUERY_LOG = os.path.join(_TMP, 'slow_queries.log')
+Config.STARTUP_BENCH_LOG = os.path.join(_TMP, 'startup_bench.jsonl')
+Config.KIOSK_SPILL_FILE = os.path.join(_TMP, 'kiosk_spill.jsonl')
+Config.DB_NAME = os.path.join(_TMP, 'gym_db.sqlite')
+
+from core.catalog import get_catalog
+from core.database_manager import close_pool, create_initial_tables
+from core.write_queue import stop_write_queue
+
+
+def _reiniciar():
+    stop_write_queue()
+    close_pool()
+    get_catalog().clear()
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    """BD migrada y vacía (salvo los datos iniciales); devuelve su ruta."""
+    _reiniciar()
+    monkeypatch.setattr(Config, 'DB_NAME', str(tmp_path / 'gym_db.sqlite'))
+    monkeypatch.setattr(Config, 'KIOSK_SPILL_FILE', str(tmp_path / 'kiosk_spill.jsonl'))
+    create_initial_tables()
+    yield Config.DB_NAME
+    _reiniciar()
+
+
+@pytest.fixture(params=[True, False], ids=['cola', 'directo'])
+def write_mode(request, monkeypatch):
+    """Corre la prueba con la cola de escritura y con escrituras directas."""
+    monkeypatch.setattr(Config, 'DB_WRITE_QUEUE', request.param)
+    return request.param
+
+
+@pytest.fixture
+def nuevo_miembro(db):
+    """Fábrica: registra un miembro con MemberService y devuelve (id, código)."""
+    from services.member_service import MemberService
+    service = MemberService()
+    contador = iter(range(10000000, 99999999))
+
+    def _crear(nombre='Ana Torres', dni=None):
+        r = service.register_member(nombre, dni or str(next(contador)), '999888777', None, None)
+        assert r['success'], r['message']
+        return r['miembro_id'], r['codigo']
+    return _crear
+
+
+@pytest.fixture
+def nuevo_plan(db):
+    """Fábrica: crea un plan con PlanModel y devuelve su ID."""
+    from models.plan_model import PlanModel
+    model = PlanModel()
+    contador = iter(range(1, 100000))
+
+    def _crear(dias=30, precio=80, categoria_id=None):
+        r = model.insert_plan(f"Plan prueba {next(contador)}", precio, dias, 1,
+                              None, None, None, categoria_id)
+        assert r['success'], r['message']
+        return r['plan_id']
+    return _crear
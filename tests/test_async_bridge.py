@@ -0,0 +1,140 @@
+# -*- coding: utf-8 -*-
+"""Pruebas del puente asíncrono entre vistas y servicios (ui/async_bridge.py)"""
+import threading
+import time
+
+import pytest
+
+pytest.importorskip("PyQt6")
+
+from PyQt6 import sip
+from PyQt6.QtCore import QCoreApplication, QObject
+
+from ui.async_bridge import AsyncBridge
+
+
+@pytest.fixture(scope='module')
+def app():
+    return QCoreApplication.instance() or QCoreApplication([])
+
+
+@pytest.fixture
+def puente(app):
+    puente = AsyncBridge(max_threads=4)
+    yield puente
+    puente.shutdown(timeout_ms=2000)
+
+
+def _esperar(app, condicion, timeout=3.0):
+    limite = time.monotonic() + timeout
+    while not condicion():
+        assert time.monotonic() < limite, "tiempo de espera agotado"
+        app.processEvents()
+        time.sleep(0.005)
+
+
+def test_resultado_vuelve_al_hilo_de_la_gui(app, puente):
+    hilos = {}
+    resultados = []
+
+    def servicio(a, b):
+        hilos['servicio'] = threading.current_thread()
+        return a + b
+
+    def on_result(valor):
+        hilos['entrega'] = threading.current_thread()
+        resultados.append(valor)
+
+    puente.submit(servicio, 2, 3, on_result=on_result)
+    _esperar(app, lambda: resultados)
+
+    assert resultados == [5]
+    assert hilos['servicio'] is not threading.main_thread()
+    assert hilos['entrega'] is threading.main_thread()
+
+
+def test_misma_clave_solo_entrega_la_ultima(app, puente):
+    soltar = threading.Event()
+    resultados = []
+
+    def lento(valor):
+        soltar.wait(2)
+        return valor
+
+    for texto in ('a', 'an', 'ana'):
+        puente.submit(lento, texto, on_result=resultados.append, key='busqueda')
+    soltar.set()
+    _esperar(app, lambda: not puente._live)
+
+    assert resultados == ['ana']
+    assert puente.stats['dropped'] == 2
+
+
+def test_skip_if_busy_no_apila_consultas(app, puente):
+    soltar = threading.Event()
+    resultados = []
+
+    def sondeo():
+        soltar.wait(2)
+        return 'ok'
+
+    primera = puente.submit(sondeo, on_result=resultados.append, key='sondeo', skip_if_busy=True)
+    segunda = puente.submit(sondeo, on_result=resultados.append, key='sondeo', skip_if_busy=True)
+    soltar.set()
+    _esperar(app, lambda: resultados)
+
+    assert primera is not None and segunda is None
+    assert resultados == ['ok']
+    # Liberada la clave, se puede volver a lanzar
+    assert puente.submit(sondeo, on_result=resultados.append, key='sondeo',
+                         skip_if_busy=True) is not None
+    _esperar(app, lambda: len(resultados) == 2)
+
+
+def test_antirrebote_lanza_solo_lo_ultimo_tipeado(app, puente):
+    llamadas = []
+    resultados = []
+
+    def buscar(texto):
+        llamadas.append(texto)
+        return texto.upper()
+
+    for texto in ('p', 'pr', 'pro'):
+        puente.submit(buscar, texto, on_result=resultados.append, key='filtro', delay_ms=50)
+    _esperar(app, lambda: resultados)
+
+    assert llamadas == ['pro']
+    assert resultados == ['PRO']
+
+
+def test_errores_van_a_on_error(app, puente):
+    errores = []
+
+    def falla():
+        raise ValueError("BD ocupada")
+
+    puente.submit(falla, on_result=pytest.fail, on_error=errores.append)
+    _esperar(app, lambda: errores)
+
+    assert isinstance(errores[0], ValueError)
+    assert puente.stats['errors'] == 1
+
+
+def test_dueno_destruido_o_cancelado_no_recibe(app, puente):
+    soltar = threading.Event()
+    recibidos = []
+
+    def lento(valor):
+        soltar.wait(2)
+        return valor
+
+    destruido, cancelado = QObject(), QObject()
+    puente.submit(lento, 1, on_result=recibidos.append, owner=destruido, key='x')
+    puente.submit(lento, 2, on_result=recibidos.append, owner=cancelado, key='x')
+    sip.delete(destruido)
+    puente.cancel(owner=cancelado)
+    soltar.set()
+    _esperar(app, lambda: puente.stats['dropped'] == 2)
+
+    assert recibidos == []
+    assert not puente._inflight
@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+"""Pruebas de los beneficios del miembro resueltos con la matriz precompilada"""
+from datetime import date, timedelta
+
+import pytest
+
+from models.benefit_model import BenefitModel
+from models.category_model import CategoryModel
+from models.payment_model import PaymentModel
+from services.benefit_service import BenefitService
+
+
+@pytest.fixture
+def tipos(db):
+    """IDs de los tipos de beneficio sembrados, por código."""
+    return {fila[2]: fila[0] for fila in BenefitModel().execute_query(
+        "SELECT id, nombre, codigo FROM benefit_types")}
+
+
+def _categoria(nombre, beneficios, tipos):
+    categoria_id = CategoryModel().insert_category(nombre, '#123456', 90)
+    for codigo, config in beneficios.items():
+        BenefitModel().set_category_benefit(categoria_id, tipos[codigo], config)
+    return categoria_id
+
+
+def _pagar(miembro_id, plan_id, dias):
+    PaymentModel().register_payment(
+        miembro_id, plan_id, 80, date.today().isoformat(),
+        (date.today() + timedelta(days=dias)).isoformat()
+    )
+
+
+def test_suma_categorias_y_gana_la_que_vence_ultimo(nuevo_miembro, nuevo_plan, tipos):
+    basica = _categoria('Prueba Básica', {
+        'BEN001': {'enabled': True},
+        'BEN003': {'enabled': True, 'cantidad': 2},
+    }, tipos)
+    oro = _categoria('Prueba Oro', {'BEN003': {'enabled': True, 'cantidad': 5}}, tipos)
+    vencida = _categoria('Prueba Vencida', {'BEN004': {'enabled': True}}, tipos)
+    miembro_id, _ = nuevo_miembro()
+    _pagar(miembro_id, nuevo_plan(categoria_id=basica), 10)
+    _pagar(miembro_id, nuevo_plan(categoria_id=oro), 40)
+    _pagar(miembro_id, nuevo_plan(categoria_id=vencida), -1)
+    service = BenefitService()
+
+    assert {b['codigo'] for b in service.get_member_benefits(miembro_id)} == {'BEN001', 'BEN003'}
+    assert service.get_benefit_value(miembro_id, 'BEN003', 0) == 5
+    assert service.check_member_has_benefit(miembro_id, 'BEN001')['has_benefit']
+    assert service.get_benefit_value(miembro_id, 'BEN004', 'no') == 'no'
+    assert service.get_member_category(miembro_id) == oro
+
+
+def test_cambios_de_configuracion_invalidan_la_matriz(nuevo_miembro, nuevo_plan, tipos):
+    categoria_id = _categoria('Prueba Plata', {'BEN003': {'enabled': True, 'cantidad': 1}}, tipos)
+    miembro_id, _ = nuevo_miembro()
+    _pagar(miembro_id, nuevo_plan(categoria_id=categoria_id), 30)
+    service = BenefitService()
+    assert service.get_benefit_value(miembro_id, 'BEN003') == 1
+
+    BenefitModel().set_category_benefit(categoria_id, tipos['BEN003'], {'enabled': True, 'cantidad': 3})
+    assert service.get_benefit_value(miembro_id, 'BEN003') == 3
+
+    BenefitModel().set_category_benefit(categoria_id, tipos['BEN003'], {'enabled': False})
+    assert service.get_member_benefits(miembro_id) == []
+
+
+def test_sin_pagos_vigentes_no_hay_beneficios(nuevo_miembro, tipos):
+    miembro_id, _ = nuevo_miembro()
+
+    assert BenefitService().get_member_benefits(miembro_id) == []
+    assert BenefitService().get_member_category(miembro_id) is None
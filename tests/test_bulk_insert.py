@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+"""Pruebas de BaseModel.bulk_insert (executemany por bloques con ids inferidos)"""
+import sqlite3
+import threading
+
+import pytest
+
+from core.base_model import BaseModel
+from core.database_manager import get_connection
+
+
+@pytest.fixture
+def miembro_id(nuevo_miembro):
+    return nuevo_miembro()[0]
+
+
+def _notas(miembro_id, n, prefijo='nota'):
+    return ({'miembro_id': miembro_id, 'fecha_hora': '2026-01-01 10:00', 'nota': f'{prefijo} {i}'}
+            for i in range(n))
+
+
+def _por_id(ids):
+    filas = BaseModel().execute_query(
+        f"SELECT id, nota FROM notes WHERE id IN ({', '.join('?' * len(ids))})", tuple(ids)
+    )
+    return {f.id: f.nota for f in filas}
+
+
+def test_ids_inferidos_corresponden_a_las_filas(miembro_id, write_mode):
+    ids = BaseModel().bulk_insert('notes', _notas(miembro_id, 10), chunk_size=3)
+
+    assert _por_id(ids) == {id_: f'nota {i}' for i, id_ in enumerate(ids)}
+
+
+def test_ids_correctos_con_escritores_concurrentes(miembro_id, write_mode):
+    model = BaseModel()
+    resultados, errores = {}, []
+
+    def _lote(hilo):
+        try:
+            resultados[hilo] = model.bulk_insert(
+                'notes', _notas(miembro_id, 50, prefijo=f'h{hilo}'), chunk_size=7
+            )
+        except Exception as e:
+            errores.append(e)
+
+    hilos = [threading.Thread(target=_lote, args=(h,)) for h in range(4)]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+
+    assert errores == []
+    for hilo, ids in resultados.items():
+        assert _por_id(ids) == {id_: f'h{hilo} {i}' for i, id_ in enumerate(ids)}
+
+
+def test_ids_explicitos_se_devuelven_tal_cual(miembro_id):
+    registros = [dict(r, id=100 + i * 10) for i, r in enumerate(_notas(miembro_id, 3))]
+
+    assert BaseModel().bulk_insert('notes', registros) == [100, 110, 120]
+
+
+def test_error_de_integridad_no_deja_filas(miembro_id):
+    registros = list(_notas(miembro_id, 5))
+    registros[3]['miembro_id'] = 999999
+
+    with pytest.raises(ValueError):
+        BaseModel().bulk_insert('notes', registros, chunk_size=2)
+    assert BaseModel().execute_query("SELECT COUNT(*) FROM notes", fetch_one=True)[0] == 0
+
+
+def test_fuera_de_transaccion_no_infiere_ids(miembro_id):
+    conn = get_connection()
+    conn.isolation_level = None  # autocommit: cada fila confirma sola
+    try:
+        with pytest.raises(sqlite3.ProgrammingError):
+            BaseModel().bulk_insert('notes', _notas(miembro_id, 2), connection=conn)
+    finally:
+        conn.close()
+
+
+def test_lista_vacia(db):
+    with pytest.raises(ValueError):
+        BaseModel().bulk_insert('notes', [])
@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+"""Pruebas de los saldos de la caja abierta mantenidos por triggers (caja_saldos)"""
+import random
+
+import pytest
+
+from core.base_model import BaseModel
+from models.caja_model import CajaModel, METODOS_PAGO
+
+
+def _recalculado():
+    """Saldos sumando cash_movements, como antes de caja_saldos."""
+    por_metodo = {m: [0, 0, 0] for m in METODOS_PAGO}
+    for metodo, tipo, monto in BaseModel().execute_query(
+        "SELECT metodo_pago, tipo_movimiento, monto FROM cash_movements "
+        "WHERE estado = 'activo' AND caja_sesion_id IS NULL"
+    ):
+        por_metodo[metodo][0 if tipo == 'ingreso' else 1] += monto
+        por_metodo[metodo][2] += 1
+    return {m: (round(i, 2), round(e, 2), n) for m, (i, e, n) in por_metodo.items()}
+
+
+def _mantenido():
+    return {
+        m: (i, e, n) for m, i, e, n in BaseModel().execute_query(
+            "SELECT metodo_pago, ingresos, egresos, movimientos FROM caja_saldos"
+        )
+    }
+
+
+@pytest.fixture
+def caja(db):
+    caja = CajaModel()
+    resultado = caja.abrir_caja(100, 0, 0, 0)
+    assert resultado.success, resultado.message
+    return caja
+
+
+def test_saldos_de_la_sesion_abierta(caja):
+    caja.registrar_movimiento('ingreso', 'market', 'efectivo', 30)
+    caja.registrar_movimiento('ingreso', 'membresia', 'yape', 80)
+    caja.registrar_movimiento('egreso', 'gasto', 'efectivo', 12.5)
+
+    saldos = caja.get_saldos_actuales()
+
+    assert saldos['efectivo'] == 117.5
+    assert saldos['yape'] == 80
+    assert saldos['total_ingresos'] == 110
+    assert saldos['total_egresos'] == 12.5
+
+
+def test_extorno_y_remesa(caja):
+    movimiento = caja.registrar_movimiento('ingreso', 'market', 'efectivo', 50)
+    caja.extornar_movimiento(movimiento.data['movement_id'])
+    caja.registrar_remesa(40)
+
+    saldos = caja.get_saldos_actuales()
+
+    assert saldos['efectivo'] == 60
+    assert saldos['pos_banco'] == 40
+    assert _mantenido() == _recalculado()
+
+
+def test_coincide_con_el_recalculo_tras_cambios_al_azar(caja):
+    azar = random.Random(8)
+    ids = []
+    for _ in range(200):
+        accion = azar.random()
+        if accion < 0.7 or not ids:
+            r = caja.registrar_movimiento(
+                azar.choice(['ingreso', 'egreso']), 'ajuste', azar.choice(METODOS_PAGO),
+                round(azar.uniform(0.1, 99.9), 2)
+            )
+            ids.append(r.data['movement_id'])
+        elif accion < 0.85:
+            caja.extornar_movimiento(ids.pop(azar.randrange(len(ids))))
+        else:
+            BaseModel().update('cash_movements', {'monto': round(azar.uniform(0.1, 9.9), 2)},
+                               {'id': azar.choice(ids)})
+
+    assert _mantenido() == _recalculado()
+
+
+def test_cerrar_caja_vacia_los_saldos(caja):
+    caja.registrar_movimiento('ingreso', 'market', 'efectivo', 30)
+    sesion_id = caja.get_sesion_abierta()[0]
+
+    resultado = caja.cerrar_caja(sesion_id, 130, 0, 0, 0)
+
+    assert resultado.success, resultado.message
+    assert resultado.data['diferencias']['efectivo'] == 0
+    assert all(v == (0, 0, 0) for v in _mantenido().values())
+    assert caja.get_totales_sesion(sesion_id)['efectivo_esperado'] == 130
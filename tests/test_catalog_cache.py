@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+"""Pruebas del caché versionado de catálogos (core/catalog.py)"""
+from core.catalog import CatalogCache
+from models.plan_model import PlanModel
+
+
+def test_construye_una_vez_hasta_invalidar():
+    cache = CatalogCache()
+    cargas = []
+
+    def _cargar():
+        cargas.append(1)
+        return [(1, 'Mensual'), (2, 'Anual')]
+
+    tabla = cache.table('plans', _cargar)
+    assert cache.table('plans', _cargar) is tabla
+    assert tabla.by_id[2] == (2, 'Anual')
+    assert tabla.by_name['Mensual'] == (1, 'Mensual')
+
+    cache.invalidate('plans')
+    assert cache.table('plans', _cargar) is not tabla
+    assert len(cargas) == 2
+    assert cache.version('plans') == 1
+
+
+def test_invalidado_durante_la_carga_no_se_guarda():
+    cache = CatalogCache()
+
+    def _cargar_mientras_cambia():
+        # Otra escritura invalida mientras esta carga leía la BD
+        cache.invalidate('plans')
+        return 'instantánea vieja'
+
+    assert cache.get('plans', _cargar_mientras_cambia) == 'instantánea vieja'
+    assert cache.get('plans', lambda: 'nueva') == 'nueva'
+
+
+def test_planes_sin_consultas_repetidas_y_al_dia_tras_escribir(nuevo_plan, monkeypatch):
+    plan_id = nuevo_plan(dias=30)
+    cargas = []
+    original = PlanModel._load_plans
+    monkeypatch.setattr(PlanModel, '_load_plans',
+                        lambda self: cargas.append(1) or original(self))
+    model = PlanModel()
+
+    for _ in range(5):
+        assert model.get_plan_by_id(plan_id).duracion_dias == 30
+        assert model.get_plan_by_id(str(plan_id)).id == plan_id
+    assert len(cargas) == 1
+
+    plan = model.get_plan_by_id(plan_id)
+    model.update_plan(plan_id, plan.nombre_plan, 90, 60, 1, None, None, None, 1)
+    nuevo = nuevo_plan(dias=7)
+
+    assert model.get_plan_by_id(plan_id).duracion_dias == 60
+    assert model.get_plan_by_id(nuevo).duracion_dias == 7
+    assert model.get_plan_by_id('x') is None
+    assert len(cargas) == 2   # una recarga tras las dos escrituras
@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+"""Pruebas del índice en memoria del catálogo (services/catalog_index.py)"""
+import time
+from collections import namedtuple
+
+import pytest
+
+from core.event_bus import get_event_bus
+from core.events import ProductChanged, StockChanged
+from models.producto_model import ProductoModel
+from services.catalog_index import ProductCatalogIndex
+from services.producto_service import ProductoService
+
+Producto = namedtuple('Producto', 'id nombre sku codigo_barras categoria_id stock_actual activo')
+
+
+class _Origen:
+    """Origen en memoria con la interfaz de ProductoService que usa el índice."""
+
+    def __init__(self, *filas):
+        self.filas = {f.id: f for f in filas}
+        self.cargas = 0
+
+    def get_all_productos(self):
+        self.cargas += 1
+        return sorted((f for f in self.filas.values() if f.activo), key=lambda f: f.nombre)
+
+    def get_productos_by_ids(self, ids):
+        return [self.filas[i] for i in ids if i in self.filas]
+
+
+@pytest.fixture
+def origen():
+    return _Origen(
+        Producto(1, 'Agua Mineral', 'BEB-001', '7750001', 1, 10, 1),
+        Producto(2, 'Café Pasado', 'BEB-002', '7750002', 1, 5, 1),
+        Producto(3, 'Barra Proteica', 'SUP-001', None, 2, 0, 1),
+    )
+
+
+def test_busqueda_por_subcadena_sin_tildes(origen):
+    indice = ProductCatalogIndex(source=origen, ttl=60)
+
+    assert [p.id for p in indice.search('cafe')] == [2]
+    assert [p.id for p in indice.search('ine')] == [1]
+    assert [p.id for p in indice.search('a')] == [1, 3, 2]
+    assert [p.id for p in indice.search('beb-00')] == [1, 2]
+    assert indice.search('xyz') == []
+
+
+def test_by_code_y_categoria(origen):
+    indice = ProductCatalogIndex(source=origen, ttl=60)
+
+    assert indice.by_code(' 7750002 ').id == 2
+    assert indice.by_code('sup-001').id == 3
+    assert indice.by_code('Agua Mineral') is None
+    assert [p.id for p in indice.by_category(1)] == [1, 2]
+
+
+def test_quitar_un_producto_conserva_al_otro_con_el_mismo_codigo(origen):
+    origen.filas[4] = Producto(4, 'Agua Grande', 'beb-001 ', ' 7750001', 1, 3, 1)
+    indice = ProductCatalogIndex(source=origen, ttl=60)
+    assert indice.by_code('7750001').id == 4    # primero por nombre
+
+    origen.filas[4] = origen.filas[4]._replace(activo=0)
+    indice.refresh([4])
+
+    assert indice.by_code('7750001').id == 1
+    assert indice.by_code('BEB-001').id == 1
+
+
+def test_stock_y_refresh_sin_recargar(origen):
+    indice = ProductCatalogIndex(source=origen, ttl=60)
+    indice.all()
+    indice.apply_stock({1: 7})
+    origen.filas[2] = origen.filas[2]._replace(nombre='Zumo de Naranja')
+    indice.refresh([2])
+
+    assert indice.get(1).stock_actual == 7
+    assert indice.search('cafe') == []
+    assert [p.id for p in indice.search('naranja')] == [2]
+    assert [p.id for p in indice.all()] == [1, 3, 2]
+    assert origen.cargas == 1
+
+
+def test_vencido_sigue_respondiendo_hasta_la_recarga(origen):
+    indice = ProductCatalogIndex(source=origen, ttl=0.05)
+    indice.all()
+    time.sleep(0.1)
+    origen.filas[5] = Producto(5, 'Yogurt', 'LAC-001', '999', 3, 1, 1)
+
+    assert indice.stale()
+    assert indice.by_code('999') is None
+    assert origen.cargas == 1
+
+    indice.reload()
+    assert not indice.stale()
+    assert indice.by_code('999').id == 5
+
+
+def test_coincide_con_la_busqueda_sql_y_sigue_los_eventos(db):
+    service = ProductoService()
+    categoria_id = service.get_categorias()[0].id
+    for i in range(30):
+        service.create_producto(f"Producto {i} {'Café' if i % 3 else 'Agua'}", categoria_id,
+                                1 + i % 5, stock_inicial=10, codigo_barras=f"775{i:06d}")
+    indice = ProductCatalogIndex(source=service, ttl=60)
+    bus = get_event_bus()
+    bus.subscribe(StockChanged, indice._on_stock)
+    bus.subscribe(ProductChanged, indice._on_producto)
+    try:
+        model = ProductoModel()
+        for termino in ('agua', '1', 'producto 2', '775000012'):
+            assert [p.id for p in indice.search(termino)] == \
+                   [p.id for p in model.search_productos(termino)]
+
+        producto_id = indice.by_code('775000004').id
+        service.update_stock(producto_id, 2)
+        service.toggle_active(indice.by_code('775000005').id)
+
+        assert indice.get(producto_id).stock_actual == 2
+        assert indice.by_code('775000005') is None
+    finally:
+        bus.unsubscribe(StockChanged, indice._on_stock)
+        bus.unsubscribe(ProductChanged, indice._on_producto)
@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+"""Pruebas del check-in en una sola transacción con índice único por día"""
+import threading
+from datetime import date, timedelta
+
+import pytest
+
+from core.base_model import BaseModel
+from models.attendance_model import AttendanceModel
+from models.payment_model import PaymentModel
+from services.attendance_service import AttendanceService
+
+
+def _con_plan(nuevo_miembro, nuevo_plan, vence, nombre='Ana Torres'):
+    miembro_id, codigo = nuevo_miembro(nombre)
+    PaymentModel().register_payment(
+        miembro_id, nuevo_plan(), 80, (date.today() - timedelta(days=60)).isoformat(),
+        vence.isoformat()
+    )
+    return miembro_id, codigo
+
+
+def _entradas(miembro_id):
+    return BaseModel().execute_query(
+        "SELECT COUNT(*) FROM attendance WHERE miembro_id = ?", (miembro_id,), fetch_one=True
+    )[0]
+
+
+def test_una_entrada_por_dia(nuevo_miembro, nuevo_plan, write_mode):
+    miembro_id, codigo = _con_plan(nuevo_miembro, nuevo_plan, date.today() + timedelta(days=10))
+    service = AttendanceService()
+
+    assert service.register_check_in(codigo.lower())['status'] == 'Éxito'
+    assert service.register_check_in(codigo)['status'] == 'YaMarcado'
+    assert _entradas(miembro_id) == 1
+
+
+@pytest.mark.parametrize('dias, estado', [(-1, 'Vencido'), (None, 'Sin Plan')])
+def test_acceso_denegado_no_registra(nuevo_miembro, nuevo_plan, dias, estado):
+    if dias is None:
+        miembro_id, codigo = nuevo_miembro()
+    else:
+        miembro_id, codigo = _con_plan(nuevo_miembro, nuevo_plan, date.today() + timedelta(days=dias))
+
+    assert AttendanceService().register_check_in(codigo)['status'] == estado
+    assert _entradas(miembro_id) == 0
+
+
+def test_miembro_desconocido(db):
+    resultado = AttendanceService().register_check_in('NOEXISTE')
+
+    assert resultado['status'] == 'Error'
+    assert 'no encontrado' in resultado['message']
+
+
+def test_marcaciones_simultaneas_registran_una(nuevo_miembro, nuevo_plan, write_mode):
+    miembro_id, codigo = _con_plan(nuevo_miembro, nuevo_plan, date.today() + timedelta(days=10))
+    service = AttendanceService()
+    estados = []
+    barrera = threading.Barrier(6)
+
+    def _marcar():
+        barrera.wait()
+        estados.append(service.register_check_in(codigo)['status'])
+
+    hilos = [threading.Thread(target=_marcar) for _ in range(6)]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+
+    assert sorted(estados) == ['YaMarcado'] * 5 + ['Éxito']
+    assert _entradas(miembro_id) == 1
+
+
+def test_borrar_la_ultima_permite_volver_a_marcar(nuevo_miembro, nuevo_plan):
+    miembro_id, codigo = _con_plan(nuevo_miembro, nuevo_plan, date.today() + timedelta(days=10))
+    service = AttendanceService()
+    service.register_check_in(codigo)
+
+    assert service.delete_last_check_in_by_code(codigo)
+    assert AttendanceModel().has_check_in(miembro_id, date.today().isoformat()) is False
+    assert service.register_check_in(codigo)['status'] == 'Éxito'
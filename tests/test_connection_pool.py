@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+"""Pruebas del pool de conexiones (core/database_manager.ConnectionPool)"""
+import sqlite3
+import threading
+
+import pytest
+
+from core.base_model import BaseModel
+from core.database_manager import ConnectionPool, get_pool
+
+
+@pytest.fixture
+def pool(db):
+    pool = ConnectionPool(db_name=db, max_size=2, timeout=0.2)
+    yield pool
+    pool.close()
+
+
+def test_reutiliza_la_conexion_devuelta(pool):
+    conn = pool.acquire()
+    pool.release(conn)
+    assert pool.acquire() is conn
+
+    stats = pool.get_stats()
+    assert stats['checkouts'] == 2
+    assert stats['hits'] == 1
+    assert stats['misses'] == 1
+
+
+def test_timeout_cuando_todas_estan_prestadas(pool):
+    a, b = pool.acquire(), pool.acquire()
+    with pytest.raises(sqlite3.OperationalError):
+        pool.acquire()
+    pool.release(a)
+    pool.release(b)
+    assert pool.get_stats()['in_use'] == 0
+
+
+def test_espera_a_que_otro_hilo_devuelva(pool):
+    a, b = pool.acquire(), pool.acquire()
+    threading.Timer(0.05, pool.release, args=(a,)).start()
+
+    assert pool.acquire() is a
+    assert pool.get_stats()['waits'] == 1
+    pool.release(b)
+
+
+def test_release_revierte_la_transaccion_abierta(pool):
+    conn = pool.acquire()
+    conn.execute("BEGIN")
+    conn.execute("INSERT INTO categorias_producto (nombre, prefijo) VALUES ('Sin confirmar', 'SC')")
+    pool.release(conn)
+
+    with pool.connection() as conn:
+        assert not conn.in_transaction
+        fila = conn.execute(
+            "SELECT COUNT(*) FROM categorias_producto WHERE nombre = 'Sin confirmar'"
+        ).fetchone()
+    assert fila[0] == 0
+
+
+def test_recicla_conexiones_vencidas(db):
+    pool = ConnectionPool(db_name=db, max_size=1, max_age=0.000001)
+    conn = pool.acquire()
+    pool.release(conn)
+    otra = pool.acquire()
+    pool.release(otra)
+    pool.close()
+
+    assert otra is not conn
+    assert pool.get_stats()['recycled'] == 1
+
+
+def test_pool_cerrado_rechaza_prestamos(pool):
+    pool.close()
+    with pytest.raises(sqlite3.ProgrammingError):
+        pool.acquire()
+
+
+def test_base_model_devuelve_la_conexion_al_pool(db):
+    model = BaseModel()
+    for _ in range(5):
+        model.execute_query("SELECT 1", fetch_one=True)
+
+    stats = get_pool().get_stats()
+    assert stats['in_use'] == 0
+    assert stats['hits'] >= 4
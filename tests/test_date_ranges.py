@@ -0,0 +1,36 @@
+# -*- coding: utf-8 -*-
+"""Pruebas de los rangos de fecha semiabiertos (BaseModel.day_range)"""
+from datetime import date, datetime
+
+from core.base_model import BaseModel
+from models.attendance_model import AttendanceModel
+
+
+def test_day_range_semiabierto():
+    assert BaseModel.day_range('2026-02-28') == ('2026-02-28', '2026-03-01')
+    assert BaseModel.day_range(date(2026, 12, 30), '2026-12-31 18:00:00') == \
+           ('2026-12-30', '2027-01-01')
+    assert BaseModel.day_range(datetime(2026, 1, 5, 23, 59)) == ('2026-01-05', '2026-01-06')
+
+
+def test_rango_incluye_los_bordes_del_dia(nuevo_miembro):
+    miembro_id, _ = nuevo_miembro()
+    model = AttendanceModel()
+    for fecha_hora in ('2026-03-09 23:59:59', '2026-03-10 00:00:00',
+                       '2026-03-11 23:59:59', '2026-03-12 00:00:00'):
+        model.insert_check_in(miembro_id, fecha_hora)
+
+    log = model.get_log_by_member_and_range(miembro_id, '2026-03-10', '2026-03-11')
+
+    assert sorted(f[0] for f in log) == ['2026-03-10 00:00:00', '2026-03-11 23:59:59']
+
+
+def test_filtro_de_fecha_usa_el_indice(db):
+    inicio, fin = BaseModel.day_range('2026-03-10')
+    plan = BaseModel().execute_query(
+        "EXPLAIN QUERY PLAN SELECT id FROM attendance "
+        "WHERE miembro_id = ? AND fecha_hora_entrada >= ? AND fecha_hora_entrada < ?",
+        (1, inicio, fin)
+    )
+
+    assert any('idx_attendance_miembro_fecha' in str(fila[-1]) for fila in plan)
@@ -0,0 +1,144 @@
+# -*- coding: utf-8 -*-
+"""Pruebas del bus de eventos y de la publicación tras el COMMIT"""
+import threading
+
+import pytest
+
+from core.base_model import BaseModel
+from core.event_bus import Event, EventBus, get_event_bus
+from core.events import PaymentRegistered, StockChanged
+from models.payment_model import PaymentModel
+from models.plan_model import PlanModel
+from services.combo_service import ComboService
+
+
+class _Cambio(Event):
+    __slots__ = ('valor',)
+
+    def __init__(self, valor):
+        self.valor = valor
+
+
+class _CambioHijo(_Cambio):
+    __slots__ = ()
+
+
+@pytest.fixture
+def suscrito():
+    """Suscribe un manejador al bus del proceso y lo quita al terminar."""
+    altas = []
+
+    def _suscribir(tipo, handler, mode='sync'):
+        altas.append((tipo, get_event_bus().subscribe(tipo, handler, mode)))
+    yield _suscribir
+    for tipo, handler in altas:
+        get_event_bus().unsubscribe(tipo, handler)
+
+
+def test_entrega_por_tipo_y_clases_base():
+    bus = EventBus()
+    recibidos = []
+    bus.subscribe(_Cambio, lambda e: recibidos.append(('cambio', e.valor)))
+    bus.subscribe(Event, lambda e: recibidos.append(('todo', e.valor)))
+
+    bus.publish(_CambioHijo(1))
+    assert recibidos == [('cambio', 1), ('todo', 1)]
+    assert bus.has_subscribers(_CambioHijo)
+    assert not EventBus().has_subscribers(_Cambio)
+
+
+def test_error_de_un_manejador_no_afecta_a_los_demas():
+    bus = EventBus()
+    recibidos = []
+
+    def falla(evento):
+        raise RuntimeError("roto")
+
+    bus.subscribe(_Cambio, falla)
+    bus.subscribe(_Cambio, recibidos.append)
+    evento = _Cambio(2)
+    bus.publish(evento)
+
+    assert recibidos == [evento]
+    assert bus.stats == {'published': 1, 'delivered': 1, 'errors': 1}
+
+    bus.unsubscribe(_Cambio, falla)
+    bus.unsubscribe(_Cambio, falla)   # segunda baja: no falla
+    bus.publish(_Cambio(3))
+    assert bus.stats['errors'] == 1
+    with pytest.raises(ValueError):
+        bus.subscribe(_Cambio, recibidos.append, mode='diferido')
+
+
+def test_modo_queued_entrega_en_orden_en_el_despachador():
+    bus = EventBus()
+    recibidos = []
+    bus.subscribe(_Cambio, lambda e: recibidos.append((e.valor, threading.current_thread().name)),
+                  mode='queued')
+
+    for valor in range(20):
+        bus.publish(_Cambio(valor))
+    assert bus.join(timeout=5)
+
+    assert [v for v, _ in recibidos] == list(range(20))
+    assert {hilo for _, hilo in recibidos} == {'EventBus'}
+
+
+def test_capture_junta_los_eventos_del_hilo():
+    bus = EventBus()
+    with bus.capture() as externos:
+        assert bus.has_subscribers(_Cambio)
+        bus.publish(_Cambio(1))
+        with bus.capture() as internos:
+            bus.publish(_Cambio(2))
+        otro = threading.Thread(target=lambda: bus.publish(_Cambio(3)))
+        otro.start()
+        otro.join()
+
+    assert [e.valor for e in internos] == [2]
+    assert [e.valor for e in externos] == [1, 2]
+    assert not bus.has_subscribers(_Cambio)
+
+
+def test_publish_after_commit_espera_al_commit(db, write_mode, suscrito):
+    recibidos = []
+    suscrito(StockChanged, recibidos.append)
+
+    def job(conn):
+        get_event_bus().publish_after_commit(StockChanged([1], {1: 5}))
+        assert recibidos == []   # aún dentro de la transacción
+        return True
+
+    BaseModel().run_write(job)
+    assert [e.stock for e in recibidos] == [{1: 5}]
+
+    def job_fallido(conn):
+        get_event_bus().publish_after_commit(StockChanged([2], {2: 0}))
+        raise RuntimeError("revertir")
+
+    with pytest.raises(RuntimeError):
+        BaseModel().run_write(job_fallido)
+    assert len(recibidos) == 1
+
+    # Fuera de una escritura publica de inmediato
+    get_event_bus().publish_after_commit(StockChanged([3]))
+    assert [e.producto_ids for e in recibidos][-1] == (3,)
+
+
+def test_combo_publica_un_pago_por_beneficiario(nuevo_miembro, suscrito):
+    titular, _ = nuevo_miembro('Titular')
+    beneficiarios = [nuevo_miembro(f'Beneficiario {i}')[0] for i in range(2)]
+    plan_id = PlanModel().insert_plan("Trío", 150, 30, 3, None, None, None)['plan_id']
+    payment_id = PaymentModel().register_payment(
+        titular, plan_id, 150, '2026-01-01', '2026-01-30'
+    )['payment_id']
+    recibidos = []
+    suscrito(PaymentRegistered, recibidos.append)
+
+    result = ComboService().register_combo_payment(payment_id, titular, beneficiarios, plan_id)
+
+    assert result.success, result.message
+    assert sorted(e.miembro_id for e in recibidos) == sorted(beneficiarios)
+    assert {(e.plan_id, e.monto, e.fecha_vencimiento) for e in recibidos} == {
+        (plan_id, 50.0, '2026-01-30')
+    }
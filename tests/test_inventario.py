@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+"""Pruebas del ajuste atómico de stock de InventarioService"""
+import threading
+
+import pytest
+
+from core.base_model import BaseModel
+from core.event_bus import get_event_bus
+from core.events import StockChanged
+from services.inventario_service import InventarioService
+from services.producto_service import ProductoService
+
+
+@pytest.fixture
+def productos(db):
+    service = ProductoService()
+    categoria_id = service.get_categorias()[0].id
+    ids = []
+    for nombre, stock in (('Agua', 5), ('Barra proteica', 2)):
+        result = service.create_producto(nombre, categoria_id, 3, stock_inicial=stock)
+        ids.append(result.data['producto_id'])
+    return ids
+
+
+def _stock(producto_id):
+    return BaseModel().execute_query(
+        "SELECT stock_actual FROM productos WHERE id = ?", (producto_id,), fetch_one=True
+    )[0]
+
+
+def _kardex(referencia_id):
+    return BaseModel().execute_query("""
+        SELECT producto_id, tipo_movimiento, cantidad, stock_anterior, stock_nuevo
+        FROM inventario_movimientos WHERE referencia_tipo = 'prueba' AND referencia_id = ?
+        ORDER BY id
+    """, (referencia_id,))
+
+
+def test_lote_actualiza_stock_y_kardex(productos):
+    agua, barra = productos
+    result = InventarioService().registrar_movimientos(
+        [(agua, 'venta', 3), (barra, 'entrada', 4)], 'Venta 1', 'prueba', 1
+    )
+
+    assert result.success
+    assert result.data['stock'] == {agua: 2, barra: 6}
+    assert len(result.data['movement_ids']) == 2
+    assert (_stock(agua), _stock(barra)) == (2, 6)
+    assert _kardex(1) == [(agua, 'venta', 3, 5, 2), (barra, 'entrada', 4, 2, 6)]
+
+
+def test_linea_sin_stock_revierte_todo_el_lote(productos):
+    agua, barra = productos
+    eventos = []
+    get_event_bus().subscribe(StockChanged, eventos.append)
+    try:
+        result = InventarioService().registrar_movimientos(
+            [(agua, 'venta', 1), (barra, 'venta', 3)], 'Venta 2', 'prueba', 2
+        )
+    finally:
+        get_event_bus().unsubscribe(StockChanged, eventos.append)
+
+    assert not result.success
+    assert result.message == "Stock insuficiente para Barra proteica"
+    assert (_stock(agua), _stock(barra)) == (5, 2)
+    assert _kardex(2) == []
+    assert eventos == []
+
+
+def test_producto_inexistente_y_tipo_invalido(productos):
+    service = InventarioService()
+
+    assert service.registrar_movimiento(99999, 'entrada', 1, 'x').message == "Producto no encontrado"
+    assert not service.registrar_movimiento(productos[0], 'regalo', 1, 'x').success
+    assert _stock(productos[0]) == 5
+
+
+def test_ventas_concurrentes_no_dejan_stock_negativo(productos, write_mode):
+    agua = productos[0]
+    service = InventarioService()
+    resultados = []
+    barrera = threading.Barrier(8)
+
+    def vender():
+        barrera.wait()
+        resultados.append(service.registrar_movimiento(agua, 'venta', 1, 'Venta', 'prueba', 3))
+
+    hilos = [threading.Thread(target=vender) for _ in range(8)]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+
+    assert sum(r.success for r in resultados) == 5
+    assert _stock(agua) == 0
+    assert sorted(fila.stock_nuevo for fila in _kardex(3)) == [0, 1, 2, 3, 4]
+
+
+def test_transaccion_externa_conserva_lo_previo_del_llamador(productos):
+    agua, barra = productos
+    service = InventarioService()
+
+    def job(conn):
+        primero = service.registrar_movimientos([(agua, 'venta', 2)], 'Venta', 'prueba', 4,
+                                                connection=conn)
+        segundo = service.registrar_movimientos([(agua, 'ajuste', 1), (barra, 'salida', 9)],
+                                                'Merma', 'prueba', 4, connection=conn)
+        return primero, segundo
+
+    primero, segundo = BaseModel().run_write(job)
+
+    assert primero.success and not segundo.success
+    assert (_stock(agua), _stock(barra)) == (3, 2)
+    assert _kardex(4) == [(agua, 'venta', 2, 5, 3)]
+
+
+def test_evento_de_stock_sale_tras_el_commit(productos):
+    agua = productos[0]
+    vistos = []
+
+    def on_stock(evento):
+        # Otra conexión ya ve el stock nuevo: el evento no se adelanta al COMMIT
+        vistos.append((evento.producto_ids, evento.stock, _stock(agua)))
+
+    get_event_bus().subscribe(StockChanged, on_stock)
+    try:
+        InventarioService().registrar_movimiento(agua, 'salida', 2, 'Merma', 'prueba', 5)
+    finally:
+        get_event_bus().unsubscribe(StockChanged, on_stock)
+
+    assert vistos == [((agua,), {agua: 3}, 3)]
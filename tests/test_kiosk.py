@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+"""Pruebas del modo kiosco (services/kiosk_service.py): marcación en memoria y spill"""
+import json
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from core.base_model import BaseModel
+from core.config import Config
+from core.event_bus import get_event_bus
+from models.payment_model import PaymentModel
+from services.kiosk_service import KioskService
+from services.payment_service import PaymentService
+
+
+def _asistencias():
+    return BaseModel().execute_query(
+        "SELECT miembro_id, fecha_hora_entrada FROM attendance ORDER BY id"
+    )
+
+
+@pytest.fixture
+def socio(nuevo_miembro, nuevo_plan):
+    """Miembro con plan vigente; devuelve (id, código)."""
+    miembro_id, codigo = nuevo_miembro()
+    vence = (date.today() + timedelta(days=30)).isoformat()
+    PaymentModel().register_payment(miembro_id, nuevo_plan(), 80, date.today().isoformat(), vence)
+    return miembro_id, codigo
+
+
+@pytest.fixture
+def kiosco(db):
+    # Sin volcado automático durante la prueba: se vuelca a mano con flush()
+    kiosco = KioskService(flush_interval_ms=600000)
+    yield kiosco
+    kiosco.stop()
+
+
+def _cortar(kiosco):
+    """Simula un cierre abrupto: detiene el hilo sin volcar lo pendiente."""
+    kiosco._stop.set()
+    kiosco._thread.join()
+    kiosco._thread = None
+    kiosco._unsubscribe()
+    kiosco._spill.close()
+
+
+def test_marca_en_memoria_y_vuelca_en_lote(kiosco, socio):
+    miembro_id, codigo = socio
+    kiosco.start()
+
+    assert kiosco.check_in(codigo.lower())['status'] == 'Éxito'
+    assert kiosco.check_in(codigo)['status'] == 'YaMarcado'
+    assert kiosco.pending_count() == 1
+    assert _asistencias() == []
+
+    assert kiosco.flush() == 1
+    assert [a[0] for a in _asistencias()] == [miembro_id]
+
+
+def test_recupera_el_spill_tras_un_corte(db, socio):
+    miembro_id, codigo = socio
+    viejo = KioskService(flush_interval_ms=600000)
+    viejo.start()
+    viejo.check_in(codigo)
+    _cortar(viejo)
+    assert _asistencias() == []
+
+    nuevo = KioskService(flush_interval_ms=600000)
+    nuevo.start()
+    try:
+        assert [a[0] for a in _asistencias()] == [miembro_id]
+        # Ya quedó marcado en la instantánea y el spill se vació
+        assert nuevo.check_in(codigo)['status'] == 'YaMarcado'
+        with open(Config.KIOSK_SPILL_FILE, encoding='utf-8') as f:
+            assert f.read() == ''
+    finally:
+        nuevo.stop()
+
+
+def test_spill_con_linea_cortada_y_duplicados(kiosco, socio):
+    miembro_id, _ = socio
+    ahora = datetime.now().strftime(Config.DATETIME_FORMAT)
+    with open(Config.KIOSK_SPILL_FILE, 'w', encoding='utf-8') as f:
+        f.write(json.dumps([miembro_id, ahora]) + "\n")
+        f.write(json.dumps([miembro_id, ahora]) + "\n")   # reaplicar es idempotente
+        f.write('[%d, "2026-' % miembro_id)                 # escritura cortada
+
+    kiosco.start()
+
+    assert _asistencias() == [(miembro_id, ahora)]
+
+
+def test_pago_nuevo_habilita_sin_recargar_todo(kiosco, nuevo_miembro, nuevo_plan):
+    miembro_id, codigo = nuevo_miembro()
+    plan_id = nuevo_plan()
+    kiosco.start()
+    assert kiosco.check_in(codigo)['status'] != 'Éxito'
+
+    resultado = PaymentService().process_payment(miembro_id, plan_id, 80, date.today().isoformat())
+    assert resultado['success'], resultado['message']
+    assert get_event_bus().join(timeout=5)
+
+    assert kiosco.check_in(codigo)['status'] == 'Éxito'
+    assert kiosco.pending_count() == 1
@@ -0,0 +1,43 @@
+# -*- coding: utf-8 -*-
+"""Pruebas de los códigos de membresía en mayúsculas canónicas"""
+import sqlite3
+
+import pytest
+
+from core.base_model import BaseModel
+from models.member_model import MemberModel
+
+
+def test_codigo_guardado_en_mayusculas(nuevo_miembro):
+    miembro_id, codigo = nuevo_miembro()
+
+    assert codigo == codigo.strip().upper()
+    assert BaseModel().execute_query(
+        "SELECT codigo_membresia FROM members WHERE id = ?", (miembro_id,), fetch_one=True
+    )[0] == codigo
+
+
+def test_busqueda_por_codigo_sin_distinguir_mayusculas(nuevo_miembro):
+    miembro_id, codigo = nuevo_miembro(dni='44556677')
+    model = MemberModel()
+
+    assert model.find_member_by_identifier(f"  {codigo.lower()} ")[0] == miembro_id
+    assert model.find_member_by_identifier('44556677')[0] == miembro_id
+    assert model.find_member_by_identifier('NOEXISTE') is None
+    assert model.codigo_exists(codigo.lower())
+
+
+def test_trigger_rechaza_codigos_no_canonicos(nuevo_miembro):
+    miembro_id, _ = nuevo_miembro()
+
+    with pytest.raises(sqlite3.IntegrityError, match='mayúsculas'):
+        BaseModel().update('members', {'codigo_membresia': 'abc123'}, {'id': miembro_id})
+
+
+def test_la_busqueda_por_codigo_usa_el_indice(db):
+    plan = BaseModel().execute_query(
+        "EXPLAIN QUERY PLAN SELECT id FROM members WHERE codigo_membresia = ?", ('GYM001',)
+    )
+    detalle = ' '.join(str(fila[-1]) for fila in plan)
+
+    assert detalle.startswith('SEARCH members USING') and 'INDEX' in detalle
@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+"""Pruebas del listado de miembros paginado por keyset con estado calculado en SQL"""
+from datetime import date, timedelta
+
+from models.member_model import MemberModel
+from models.payment_model import PaymentModel
+from services.member_service import MemberService
+
+
+def _recorrer(service, limit, search=None):
+    paginas, after = [], None
+    while True:
+        pagina = service.get_members_page(search=search, after=after, limit=limit)
+        paginas.append(pagina)
+        if not pagina['has_more']:
+            return paginas
+        after = pagina['next_cursor']
+
+
+def test_las_paginas_cubren_todo_sin_repetir(nuevo_miembro):
+    # Nombres repetidos: el desempate por id no debe saltar ni repetir filas
+    for i in range(23):
+        nuevo_miembro(f"Socio {i % 5}")
+    service = MemberService()
+
+    paginas = _recorrer(service, limit=5)
+    filas = [m for p in paginas for m in p['members']]
+
+    assert len(paginas) == 5
+    assert len(filas) == 23 == len({m[0] for m in filas})
+    assert [(m[1], m[0]) for m in filas] == sorted((m[1], m[0]) for m in filas)
+
+
+def test_before_vuelve_a_la_pagina_anterior(nuevo_miembro):
+    for i in range(12):
+        nuevo_miembro(f"Socio {i:02d}")
+    service = MemberService()
+    primera = service.get_members_page(limit=5)
+    segunda = service.get_members_page(after=primera['next_cursor'], limit=5)
+
+    atras = service.get_members_page(before=segunda['prev_cursor'], limit=5)
+
+    assert [m[0] for m in atras['members']] == [m[0] for m in primera['members']]
+    assert not atras['has_more']
+
+
+def test_busqueda_filtra_y_cuenta(nuevo_miembro):
+    for nombre in ('Ana Torres', 'Ana Ruiz', 'Luis Torres'):
+        nuevo_miembro(nombre)
+    service = MemberService()
+
+    pagina = service.get_members_page(search='torres', limit=10)
+
+    assert {m[1] for m in pagina['members']} == {'Ana Torres', 'Luis Torres'}
+    assert service.count_members('torres') == 2
+    assert service.count_members() == 3
+
+
+def test_bucket_de_estado(nuevo_miembro, nuevo_plan):
+    hoy = date.today()
+    plan_id = nuevo_plan()
+    vencimientos = {
+        'Activo Uno': hoy + timedelta(days=60),
+        'Por Vencer': hoy + timedelta(days=1),
+        'Vencido Dos': hoy - timedelta(days=1),
+        'Sin Plan': None,
+    }
+    for nombre, vence in vencimientos.items():
+        miembro_id, _ = nuevo_miembro(nombre)
+        if vence:
+            PaymentModel().register_payment(
+                miembro_id, plan_id, 80, hoy.isoformat(), vence.isoformat()
+            )
+
+    buckets = {m[1]: m[6] for m in MemberService().get_members_page(limit=10)['members']}
+
+    assert buckets == {
+        'Activo Uno': MemberModel.BUCKET_ACTIVE,
+        'Por Vencer': MemberModel.BUCKET_EXPIRING,
+        'Vencido Dos': MemberModel.BUCKET_EXPIRED,
+        'Sin Plan': MemberModel.BUCKET_NO_PLAN,
+    }
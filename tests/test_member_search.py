@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+"""Pruebas de la búsqueda de miembros con el índice FTS5 (members_fts)"""
+from models.member_model import MemberModel
+from services.member_service import MemberService
+
+
+def _nombres(resultados):
+    return [m[1] for m in resultados]
+
+
+def test_prefijo_sin_tildes_ni_mayusculas(nuevo_miembro):
+    nuevo_miembro('José Pérez')
+    nuevo_miembro('Josefina Ramos')
+    nuevo_miembro('Carlos Díaz')
+    service = MemberService()
+
+    assert set(_nombres(service.search('jose'))) == {'José Pérez', 'Josefina Ramos'}
+    assert _nombres(service.search('PEREZ')) == ['José Pérez']
+    assert _nombres(service.search('jo pe')) == ['José Pérez']
+
+
+def test_busca_por_dni_y_codigo(nuevo_miembro):
+    _, codigo = nuevo_miembro('Ana Torres', dni='44556677')
+    nuevo_miembro('Luis Rojas', dni='11223344')
+    service = MemberService()
+
+    assert _nombres(service.search('4455')) == ['Ana Torres']
+    assert _nombres(service.search(codigo.lower())) == ['Ana Torres']
+
+
+def test_el_indice_sigue_a_updates_y_deletes(nuevo_miembro):
+    _, codigo = nuevo_miembro('Ana Torres', dni='44556677')
+    service = MemberService()
+
+    service.update_member_profile(codigo, 'Ana Vargas', '44556677', None, None, None)
+    assert service.search('torres') == []
+    assert _nombres(service.search('vargas')) == ['Ana Vargas']
+
+    service.delete_member(codigo)
+    assert service.search('vargas') == []
+
+
+def test_operadores_fts_se_tratan_como_texto(nuevo_miembro):
+    nuevo_miembro('Ana Torres')
+    service = MemberService()
+
+    # Comillas sueltas y operadores no rompen la consulta MATCH
+    assert _nombres(service.search('ana"')) == ['Ana Torres']
+    assert _nombres(service.search('tor* NOT')) == []
+    assert service.search('-') == []
+    assert MemberModel._fts_query('juan per') == '"juan"* "per"*'
@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+"""Pruebas de la proyección member_status mantenida por triggers de payments"""
+from core.base_model import BaseModel
+from models.payment_model import PaymentModel
+
+
+def _estado(miembro_id):
+    return BaseModel().execute_query(
+        "SELECT latest_expiry, plan_id, categoria_id FROM member_status WHERE miembro_id = ?",
+        (miembro_id,), fetch_one=True
+    )
+
+
+def _pagar(miembro_id, plan_id, vence):
+    r = PaymentModel().register_payment(miembro_id, plan_id, 80, '2026-01-01', vence)
+    assert r['success'], r['message']
+    return r['payment_id']
+
+
+def test_sin_pagos_no_hay_fila(nuevo_miembro):
+    miembro_id, _ = nuevo_miembro()
+    assert _estado(miembro_id) is None
+    assert PaymentModel().get_latest_expiry_date(miembro_id) is None
+
+
+def test_insert_toma_el_vencimiento_mas_lejano(nuevo_miembro, nuevo_plan):
+    miembro_id, _ = nuevo_miembro()
+    largo, corto = nuevo_plan(dias=90), nuevo_plan(dias=30)
+
+    _pagar(miembro_id, largo, '2026-06-01')
+    _pagar(miembro_id, corto, '2026-02-01')
+
+    assert tuple(_estado(miembro_id)) == ('2026-06-01', largo, None)
+
+
+def test_delete_recalcula_o_elimina_la_fila(nuevo_miembro, nuevo_plan):
+    miembro_id, _ = nuevo_miembro()
+    plan_id = nuevo_plan()
+    viejo = _pagar(miembro_id, plan_id, '2026-02-01')
+    nuevo = _pagar(miembro_id, plan_id, '2026-03-01')
+    pagos = PaymentModel()
+
+    assert pagos.delete_payment_by_id(nuevo)['success']
+    assert _estado(miembro_id)[0] == '2026-02-01'
+
+    assert pagos.delete_payment_by_id(viejo)['success']
+    assert _estado(miembro_id) is None
+
+
+def test_update_mueve_el_pago_entre_miembros(nuevo_miembro, nuevo_plan):
+    ana, _ = nuevo_miembro('Ana Torres')
+    luis, _ = nuevo_miembro('Luis Rojas')
+    plan_id = nuevo_plan()
+    pago = _pagar(ana, plan_id, '2026-04-01')
+
+    BaseModel().update('payments', {'miembro_id': luis}, {'id': pago})
+
+    assert _estado(ana) is None
+    assert _estado(luis)[0] == '2026-04-01'
+
+
+def test_cambio_de_categoria_del_plan_se_propaga(nuevo_miembro, nuevo_plan):
+    miembro_id, _ = nuevo_miembro()
+    plan_id = nuevo_plan()
+    _pagar(miembro_id, plan_id, '2026-04-01')
+    categoria_id = BaseModel().execute_query(
+        "SELECT MIN(id) FROM membership_categories", fetch_one=True
+    )[0]
+
+    BaseModel().update('plans', {'categoria_id': categoria_id}, {'id': plan_id})
+
+    assert _estado(miembro_id)[2] == categoria_id
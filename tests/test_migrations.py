@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+"""Pruebas de las migraciones versionadas (core/migrations.py)"""
+import sqlite3
+
+import pytest
+
+from core import migrations
+from core.migrations import LATEST_VERSION, MIGRATIONS, get_schema_version, migrate
+
+
+@pytest.fixture
+def conn(tmp_path):
+    conn = sqlite3.connect(str(tmp_path / 'migraciones.sqlite'))
+    conn.execute("PRAGMA foreign_keys = ON")
+    yield conn
+    conn.close()
+
+
+def _objetos(conn):
+    return set(conn.execute("SELECT type, name FROM sqlite_master").fetchall())
+
+
+def test_bd_nueva_queda_en_la_ultima_version(conn):
+    aplicadas = migrate(conn)
+
+    assert aplicadas == [m[0] for m in MIGRATIONS]
+    assert get_schema_version(conn) == LATEST_VERSION == 8
+    tablas = {nombre for tipo, nombre in _objetos(conn) if tipo == 'table'}
+    assert {'members', 'payments', 'member_status', 'caja_saldos', 'members_fts'} <= tablas
+
+
+def test_migrar_de_nuevo_no_ejecuta_ddl(conn):
+    migrate(conn)
+    antes = _objetos(conn)
+    cambios = conn.total_changes
+
+    assert migrate(conn) == []
+    assert _objetos(conn) == antes
+    assert conn.total_changes == cambios
+
+
+def test_actualiza_una_bd_v1_conservando_los_datos(conn, monkeypatch):
+    monkeypatch.setattr(migrations, 'MIGRATIONS', MIGRATIONS[:1])
+    assert migrate(conn) == [1]
+    conn.execute(
+        "INSERT INTO members (nombre, dni, fecha_registro, codigo_membresia) "
+        "VALUES ('Ana Pérez', '12345678', '2026-01-01', ' gym001 ')"
+    )
+    conn.execute(
+        "INSERT INTO plans (nombre_plan, precio, duracion_dias) VALUES ('Mensual Prueba', 80, 30)"
+    )
+    plan_id = conn.execute("SELECT id FROM plans WHERE nombre_plan = 'Mensual Prueba'").fetchone()[0]
+    for vence in ('2026-02-01', '2026-03-01'):
+        conn.execute(
+            "INSERT INTO payments (miembro_id, plan_id, monto_pagado, fecha_pago, fecha_vencimiento) "
+            "VALUES (1, ?, 80, '2026-01-01', ?)", (plan_id, vence)
+        )
+    conn.commit()
+
+    monkeypatch.setattr(migrations, 'MIGRATIONS', MIGRATIONS)
+    assert migrate(conn) == list(range(2, LATEST_VERSION + 1))
+
+    assert conn.execute("SELECT codigo_membresia FROM members").fetchone()[0] == 'GYM001'
+    assert conn.execute(
+        "SELECT latest_expiry, plan_id FROM member_status WHERE miembro_id = 1"
+    ).fetchone() == ('2026-03-01', plan_id)
+    assert conn.execute(
+        "SELECT rowid FROM members_fts WHERE members_fts MATCH 'perez'"
+    ).fetchall() == [(1,)]
+
+
+def test_una_migracion_fallida_revierte_todo(conn, monkeypatch):
+    def _rota(cursor):
+        cursor.execute("CREATE TABLE a_medias (id INTEGER)")
+        raise sqlite3.OperationalError("falla a propósito")
+
+    monkeypatch.setattr(migrations, 'MIGRATIONS', MIGRATIONS + [(99, "Rota", _rota)])
+    with pytest.raises(sqlite3.OperationalError):
+        migrate(conn)
+
+    assert get_schema_version(conn) == 0
+    assert _objetos(conn) == set()
@@ -0,0 +1,40 @@
+# -*- coding: utf-8 -*-
+"""Pruebas de las filas con nombre que devuelve BaseModel.execute_query"""
+from core.base_model import BaseModel, row_type
+
+
+def test_filas_por_nombre_y_por_posicion(nuevo_miembro):
+    miembro_id, codigo = nuevo_miembro('Ana Torres', dni='44556677')
+
+    fila = BaseModel().execute_query(
+        "SELECT id, nombre, dni AS documento, codigo_membresia FROM members WHERE id = ?",
+        (miembro_id,), fetch_one=True
+    )
+
+    assert (fila.id, fila.nombre, fila.documento) == (miembro_id, 'Ana Torres', '44556677')
+    assert fila[3] == fila.codigo_membresia == codigo
+    assert tuple(fila) == (miembro_id, 'Ana Torres', '44556677', codigo)
+    assert fila == (miembro_id, 'Ana Torres', '44556677', codigo)
+
+
+def test_misma_clase_por_forma_de_consulta(db):
+    model = BaseModel()
+    a = model.execute_query("SELECT 1 AS uno, 2 AS dos", fetch_one=True)
+    b = model.execute_query("SELECT 3 AS uno, 4 AS dos")
+
+    assert type(a) is type(b[0]) is row_type(('uno', 'dos'))
+    assert not hasattr(a, '__dict__')
+
+
+def test_columnas_sin_alias_valido(db):
+    fila = BaseModel().execute_query("SELECT COUNT(*), 5 AS cinco", fetch_one=True)
+
+    assert fila._fields == ('_0', 'cinco')
+    assert fila == (1, 5)
+
+
+def test_sin_resultados(db):
+    model = BaseModel()
+
+    assert model.execute_query("SELECT id FROM members WHERE id = -1") == []
+    assert model.execute_query("SELECT id FROM members WHERE id = -1", fetch_one=True) is None
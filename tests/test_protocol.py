@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+"""Pruebas del protocolo del servidor POS (api/protocol.py) y de una llamada remota"""
+import asyncio
+import json
+import socket
+import threading
+from datetime import date
+
+import pytest
+
+from api.client import ApiClient, ApiError, RemoteService
+from api.protocol import OPERATIONS, decode, decode_event, encode, encode_event
+from api.server import PosServer
+from core.base_model import row_type
+from core.events import PaymentDeleted, StockChanged
+from core.response import Result
+
+
+def _viaje(obj):
+    """Ida y vuelta por JSON, como entre el servidor y la terminal."""
+    return decode(json.loads(json.dumps(encode(obj))))
+
+
+def test_operaciones_publicadas_existen():
+    for nombre, (cls, operaciones) in OPERATIONS.items():
+        for metodo in operaciones:
+            assert callable(getattr(cls, metodo, None)), f"{nombre}.{metodo}"
+
+
+def test_filas_conservan_sus_campos():
+    Fila = row_type(('id', 'nombre', 'stock_actual'))
+    filas = [Fila(1, 'Agua', 10), Fila(2, 'Café', 0)]
+
+    vuelta = _viaje(filas)
+
+    assert vuelta == filas
+    assert vuelta[1].nombre == 'Café'
+    assert _viaje(filas[0])._fields == ('id', 'nombre', 'stock_actual')
+
+
+def test_result_con_datos_anidados():
+    Fila = row_type(('id', 'monto'))
+    original = Result.ok("Listo", {'detalle': [Fila(1, 9.5)], 'stock': {5: 3, 7: 0}})
+
+    vuelta = _viaje(original)
+
+    assert isinstance(vuelta, Result)
+    assert vuelta == original
+    assert vuelta.data['detalle'][0].monto == 9.5
+
+
+def test_claves_int_bytes_y_fechas():
+    assert _viaje({1: 'a', 2: 'b'}) == {1: 'a', 2: 'b'}
+    assert _viaje(b'\x00\xfffoto') == b'\x00\xfffoto'
+    assert _viaje(date(2026, 3, 1)) == '2026-03-01'
+    assert _viaje((1, 2)) == [1, 2]
+
+
+def test_eventos():
+    evento = decode_event(json.loads(json.dumps(encode_event(StockChanged([3, 4], {3: 9, 4: 0})))))
+
+    assert isinstance(evento, StockChanged)
+    assert evento.producto_ids == (3, 4)
+    assert evento.stock == {3: 9, 4: 0}
+    assert decode_event(encode_event(PaymentDeleted(8))).miembro_id is None
+    assert decode_event({'type': 'EventoDelFuturo', 'fields': {}}) is None
+
+
+def _puerto_libre():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+@pytest.fixture
+def servidor(db):
+    """Servidor POS en un hilo; devuelve una fábrica de clientes."""
+    puerto = _puerto_libre()
+    server = PosServer(host='127.0.0.1', port=puerto, token='secreto')
+    loop = asyncio.new_event_loop()
+    listo = threading.Event()
+
+    def _correr():
+        asyncio.set_event_loop(loop)
+        loop.run_until_complete(server.start())
+        listo.set()
+        loop.run_forever()
+
+    hilo = threading.Thread(target=_correr, daemon=True)
+    hilo.start()
+    assert listo.wait(5)
+
+    yield lambda token='secreto': ApiClient(f'http://127.0.0.1:{puerto}', token=token)
+
+    async def _apagar():
+        await server.stop()
+        # Conexiones keep-alive de los clientes que siguen esperando otra petición
+        pendientes = [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
+        for tarea in pendientes:
+            tarea.cancel()
+        await asyncio.gather(*pendientes, return_exceptions=True)
+
+    asyncio.run_coroutine_threadsafe(_apagar(), loop).result(10)
+    loop.call_soon_threadsafe(loop.stop)
+    hilo.join(5)
+    loop.close()
+
+
+def test_llamada_remota_igual_que_la_local(servidor):
+    miembros = RemoteService('member', client=servidor())
+
+    registro = miembros.register_member('Ana Torres', '44556677', '999888777', None, None)
+    pagina = miembros.get_members_page(limit=10)
+
+    assert registro['success']
+    assert [m[1] for m in pagina['members']] == ['Ana Torres']
+    assert pagina['next_cursor'] == ['Ana Torres', registro['miembro_id']]
+    assert [m[1] for m in miembros.search('torr')] == ['Ana Torres']
+
+
+def test_servidor_rechaza_token_invalido_y_metodos_no_publicados(servidor):
+    with pytest.raises(ApiError, match='Token'):
+        servidor(token='otro').call('member', 'count_members')
+    with pytest.raises(AttributeError):
+        RemoteService('member', client=servidor()).model
@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+"""Pruebas de la instrumentación de consultas y del log de consultas lentas"""
+import logging
+
+import pytest
+
+from core.base_model import BaseModel
+from core.config import Config
+from core.query_stats import QueryStats, get_query_stats, normalize_sql, summarize_slow_log
+
+
+def test_normalize_sql_agrupa_literales_y_listas():
+    a = normalize_sql("SELECT *  FROM members\n WHERE id IN (1, 2, 3) AND nombre = 'Ana'")
+    b = normalize_sql("SELECT * FROM members WHERE id IN (7,8) AND nombre = 'O''Neil'")
+
+    assert a == b == "SELECT * FROM members WHERE id IN (?, ...) AND nombre = ?"
+    # Los dígitos dentro de identificadores no son literales
+    assert normalize_sql("SELECT col2 FROM t1 WHERE x = -4.5") == "SELECT col2 FROM t1 WHERE x = ?"
+
+
+def test_record_acumula_histograma_y_llamadores():
+    stats = QueryStats(slow_ms=10_000)
+    stats.record("SELECT * FROM plans WHERE id = 1", 0.0005, rows=1, caller='A.uno')
+    stats.record("SELECT * FROM plans WHERE id = 2", 0.030, rows=1, caller='A.uno')
+    stats.record("SELECT * FROM plans WHERE id = 3", 0.700, rows=0, caller='B.dos')
+    stats.record("DELETE FROM plans", 0.002, caller='B.dos')
+
+    primera, segunda = stats.top(by='total')
+    assert primera['sql'] == "SELECT * FROM plans WHERE id = ?"
+    assert primera['count'] == 3
+    assert primera['rows'] == 2
+    assert primera['max_ms'] == pytest.approx(700)
+    assert primera['histogram'] == {'<1ms': 1, '<5ms': 0, '<20ms': 0,
+                                    '<100ms': 1, '<500ms': 0, '>=500ms': 1}
+    assert primera['callers'] == {'A.uno': 2, 'B.dos': 1}
+    assert primera['slow'] == 0
+    assert segunda['sql'] == "DELETE FROM plans"
+
+    assert [s['sql'] for s in stats.top(1, by='count')] == [primera['sql']]
+    with pytest.raises(ValueError):
+        stats.top(by='filas')
+
+    stats.reset()
+    assert stats.top() == []
+    assert stats.format_top() == "Sin consultas registradas"
+
+
+def test_base_model_cuenta_cada_consulta_una_sola_vez(db):
+    stats = get_query_stats()
+    stats.reset()
+    model = BaseModel()
+
+    planes = model.execute_query("SELECT id FROM plans WHERE id > ?", (0,))
+    model.execute_query("SELECT id FROM plans WHERE id > ?", (0,))
+    model.execute_query("UPDATE plans SET precio = precio WHERE id < ?", (0,), commit=True)
+
+    por_sql = {s['sql']: s for s in stats.top(50)}
+    lectura = por_sql["SELECT id FROM plans WHERE id > ?"]
+    assert lectura['count'] == 2
+    assert lectura['rows'] == 2 * len(planes) > 0
+    assert 'test_query_stats.test_base_model_cuenta_cada_consulta_una_sola_vez' in lectura['callers']
+    assert por_sql["UPDATE plans SET precio = precio WHERE id < ?"]['count'] == 1
+
+
+def test_lentas_van_al_log_con_su_plan(db):
+    stats = QueryStats(slow_ms=0)
+    marca = "SELECT id FROM members WHERE codigo_membresia = 'LENTA-9'"
+    with BaseModel().get_db_connection() as conn:
+        stats.record(marca, 0.25, rows=0, caller='Prueba.lenta', conn=conn)
+        stats.record(marca, 0.05, rows=0, caller='Prueba.lenta', conn=conn)
+
+    for handler in logging.getLogger('GymManager.slow').handlers:
+        handler.flush()
+    with open(Config.DB_SLOW_QUERY_LOG, encoding='utf-8') as f:
+        contenido = f.read()
+
+    sql = "SELECT id FROM members WHERE codigo_membresia = ?"
+    assert f"250.0 ms | filas=0 | Prueba.lenta | {sql}" in contenido
+    assert "USING" in contenido   # plan de EXPLAIN QUERY PLAN bajo la sentencia
+    assert stats.top()[0]['slow'] == 2
+
+    grupos = {g[0]: g for g in summarize_slow_log()}
+    _, veces, total, maximo, callers = grupos[sql]
+    assert veces >= 2
+    assert maximo >= 250.0
+    assert 'Prueba.lenta' in callers
+
+
+def test_summarize_slow_log_agrupa_y_ordena(tmp_path):
+    log = tmp_path / 'lentas.log'
+    log.write_text(
+        "2026-01-01 10:00:00 | 120.0 ms | filas=3 | A.uno | SELECT a\n"
+        "    SCAN members\n"
+        "2026-01-01 10:00:01 | 300.5 ms | filas=- | B.dos | SELECT b\n"
+        "línea que no es del formato\n"
+        "2026-01-01 10:00:02 | 150.0 ms | filas=1 | C.tres | SELECT a\n",
+        encoding='utf-8'
+    )
+
+    assert summarize_slow_log(str(log)) == [
+        ('SELECT b', 1, 300.5, 300.5, ['B.dos']),
+        ('SELECT a', 2, 270.0, 150.0, ['A.uno', 'C.tres']),
+    ]
+    assert summarize_slow_log(str(log), n=1)[0][0] == 'SELECT b'
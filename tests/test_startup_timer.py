@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+"""Pruebas de la medición del arranque (core/startup_timer.py)"""
+import json
+import os
+import subprocess
+import sys
+import time
+
+import pytest
+
+from core import startup_timer
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture
+def hitos(monkeypatch):
+    lista = []
+    monkeypatch.setattr(startup_timer, '_hitos', lista)
+    return lista
+
+
+def test_hitos_acumulados_y_reporte(hitos):
+    startup_timer.mark('imports')
+    time.sleep(0.01)
+    startup_timer.mark('bd')
+
+    datos = startup_timer.report()
+    assert list(datos['hitos']) == ['imports', 'bd']
+    assert datos['hitos']['bd'] - datos['hitos']['imports'] >= 9
+    assert datos['total_ms'] == datos['hitos']['bd']
+
+    datos = {'fecha': '2026-01-01 10:00:00', 'total_ms': 900.0,
+             'hitos': {'imports': 250.0, 'bd': 400.0, 'primer_pintado': 900.0}}
+    assert startup_timer.format_report(datos) == "900 ms (imports +250, bd +150, primer_pintado +500)"
+
+
+def test_reporte_sin_hitos(hitos):
+    assert startup_timer.report()['total_ms'] is None
+    assert startup_timer.report()['hitos'] == {}
+
+
+def test_record_y_summarize(tmp_path, hitos):
+    archivo = tmp_path / 'bench.jsonl'
+    assert startup_timer.summarize(str(archivo)).startswith("Sin arranques registrados")
+
+    for total in (500, 100, 300, 200, 400):
+        hitos[:] = [('bd', total / 2), ('primer_pintado', total)]
+        startup_timer.record(str(archivo))
+
+    registros = [json.loads(linea) for linea in archivo.read_text(encoding='utf-8').splitlines()]
+    assert [r['total_ms'] for r in registros] == [500, 100, 300, 200, 400]
+
+    resumen = startup_timer.summarize(str(archivo)).splitlines()
+    assert resumen[0].startswith("Arranques: 5")
+    assert resumen[1] == "Hasta el primer pintado: mediana 300 ms | p90 500 ms | mín 100 ms"
+    assert resumen[3].split() == ['bd', '150', 'ms']
+    assert resumen[-1] == "Último: 400 ms (bd +200, primer_pintado +200)"
+
+    # Solo los últimos n arranques
+    assert "mediana 400 ms" in startup_timer.summarize(str(archivo), n=2)
+
+
+def test_origen_del_proceso_cuenta_desde_el_lanzamiento():
+    env = dict(os.environ, **{startup_timer.ENV_ORIGIN: repr(time.time() - 2)})
+    salida = subprocess.run(
+        [sys.executable, '-c',
+         "import json; from core import startup_timer as t; "
+         "t.mark('imports'); print(json.dumps(t.report()['hitos']))"],
+        cwd=RAIZ, env=env, capture_output=True, text=True, check=True
+    ).stdout
+
+    hitos = json.loads(salida)
+    assert list(hitos) == ['proceso', 'imports']
+    assert 2000 <= hitos['proceso'] <= hitos['imports']
@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+"""Pruebas de los PRAGMA aplicados a cada conexión según el perfil de almacenamiento"""
+import pytest
+
+from core.config import Config
+from core.database_manager import ConnectionPool, get_connection, get_storage_profile
+
+
+def _pragmas(conn):
+    return {
+        nombre: conn.execute(f"PRAGMA {nombre}").fetchone()[0]
+        for nombre in ('journal_mode', 'synchronous', 'foreign_keys', 'busy_timeout', 'cache_size')
+    }
+
+
+def test_perfil_desktop_en_conexiones_del_pool(db):
+    pool = ConnectionPool(db_name=db, max_size=1)
+    with pool.connection() as conn:
+        pragmas = _pragmas(conn)
+    pool.close()
+
+    assert pragmas == {
+        'journal_mode': 'wal', 'synchronous': 1, 'foreign_keys': 1,
+        'busy_timeout': 5000, 'cache_size': -16000,
+    }
+
+
+@pytest.mark.parametrize('perfil, journal, synchronous', [
+    ('safe', 'wal', 2),
+    ('network_share', 'delete', 2),
+])
+def test_otros_perfiles(db, monkeypatch, perfil, journal, synchronous):
+    monkeypatch.setattr(Config, 'DB_STORAGE_PROFILE', perfil)
+    conn = get_connection()
+    try:
+        pragmas = _pragmas(conn)
+    finally:
+        conn.close()
+
+    assert (pragmas['journal_mode'], pragmas['synchronous']) == (journal, synchronous)
+    assert pragmas['foreign_keys'] == 1
+
+
+def test_perfil_desconocido_usa_desktop(monkeypatch):
+    monkeypatch.setattr(Config, 'DB_STORAGE_PROFILE', 'inexistente')
+
+    assert get_storage_profile() is Config.STORAGE_PROFILES['desktop']
@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+"""Pruebas de ColumnTableModel (ui/table_model.py): diff por clave y orden en sitio"""
+import pytest
+
+pytest.importorskip("PyQt6")
+
+from PyQt6.QtCore import QCoreApplication, Qt
+
+from core.base_model import row_type
+from ui.table_model import Column, ColumnTableModel
+
+Producto = row_type(('id', 'nombre', 'precio', 'stock'))
+
+
+@pytest.fixture(scope='module')
+def app():
+    return QCoreApplication.instance() or QCoreApplication([])
+
+
+@pytest.fixture
+def modelo(app):
+    modelo = ColumnTableModel([
+        Column("Nombre", 'nombre'),
+        Column("Precio", 'precio', fmt=lambda v: f"S/ {v:.2f}"),
+        Column("Stock", 'stock'),
+    ], key='id')
+    modelo.set_rows([Producto(i, f"Producto {i}", 1.5 * i, 10) for i in range(1, 6)])
+
+    senales = {'changed': [], 'inserted': [], 'removed': [], 'reset': 0}
+    modelo.dataChanged.connect(lambda a, b, *_: senales['changed'].append(a.row()))
+    modelo.rowsInserted.connect(lambda _, i, f: senales['inserted'].append((i, f)))
+    modelo.rowsRemoved.connect(lambda _, i, f: senales['removed'].append((i, f)))
+    modelo.modelReset.connect(lambda: senales.__setitem__('reset', senales['reset'] + 1))
+    modelo.senales = senales
+    return modelo
+
+
+def test_diff_toca_solo_las_filas_que_cambiaron(modelo):
+    filas = modelo.records()
+    nuevas = [filas[0], filas[1]._replace(stock=7), Producto(9, "Nuevo", 3.0, 1),
+              filas[3], filas[4]]
+
+    modelo.apply_diff(nuevas)
+
+    assert modelo.records() == nuevas
+    assert modelo.senales['changed'] == [1]
+    assert modelo.senales['removed'] == [(2, 2)]
+    assert modelo.senales['inserted'] == [(2, 2)]
+    assert modelo.senales['reset'] == 0
+
+
+def test_diff_sin_cambios_no_emite_nada(modelo):
+    modelo.apply_diff(modelo.records())
+
+    assert modelo.senales == {'changed': [], 'inserted': [], 'removed': [], 'reset': 0}
+
+
+def test_diff_con_otro_orden_recarga_completo(modelo):
+    invertidas = list(reversed(modelo.records()))
+
+    modelo.apply_diff(invertidas)
+
+    assert modelo.records() == invertidas
+    assert modelo.senales['reset'] == 1
+
+
+def test_datos_formateados_y_columnas_tipadas(modelo):
+    assert modelo.data(modelo.index(1, 1)) == "S/ 3.00"
+    assert modelo.value(4, 'stock') == 10
+    assert modelo._data[modelo._index['precio']].typecode == 'd'
+
+
+def test_sort_en_sitio_y_diff_despues(modelo):
+    modelo.sort(1, Qt.SortOrder.DescendingOrder)
+    assert [r.id for r in modelo.records()] == [5, 4, 3, 2, 1]
+
+    # Ordenado localmente: el diff recarga y vuelve a ordenar
+    filas = [Producto(i, f"Producto {i}", 1.0 * (i % 3), 10) for i in range(1, 6)]
+    modelo.apply_diff(filas)
+    assert [r.precio for r in modelo.records()] == sorted((r.precio for r in filas), reverse=True)
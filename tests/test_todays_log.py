@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+"""Pruebas del log de asistencias de hoy con carga incremental y por cursor"""
+from datetime import date, datetime, timedelta
+
+from models.attendance_model import AttendanceModel
+from models.payment_model import PaymentModel
+from services.attendance_service import AttendanceService
+
+
+def _marcar(model, miembro_id, hora):
+    model.insert_check_in(miembro_id, f"{date.today().isoformat()} {hora}")
+
+
+def test_solo_hoy_con_plan_vigente(nuevo_miembro, nuevo_plan):
+    model = AttendanceModel()
+    ana, codigo = nuevo_miembro('Ana Torres')
+    luis, _ = nuevo_miembro('Luis Rojas')
+    plan_id = nuevo_plan()
+    vence = (date.today() + timedelta(days=5)).isoformat()
+    PaymentModel().register_payment(ana, plan_id, 80, date.today().isoformat(), vence)
+    ayer = (datetime.now() - timedelta(days=1)).strftime('%Y-%m-%d 10:00:00')
+    model.insert_check_in(luis, ayer)
+    _marcar(model, ana, '08:00:00')
+    _marcar(model, luis, '09:00:00')
+
+    log = AttendanceService().get_todays_log()
+
+    assert [(f[2], f[3], f[4]) for f in log] == [
+        ('Luis Rojas', 'Sin plan', None),
+        ('Ana Torres', model.execute_query(
+            "SELECT nombre_plan FROM plans WHERE id = ?", (plan_id,), fetch_one=True)[0], vence),
+    ]
+    assert log[1][1] == codigo
+
+
+def test_after_id_trae_solo_las_nuevas(nuevo_miembro):
+    model = AttendanceModel()
+    primeros = [nuevo_miembro(f"Socio {i}")[0] for i in range(3)]
+    for i, miembro_id in enumerate(primeros):
+        _marcar(model, miembro_id, f"08:0{i}:00")
+    ultimo_id = max(f[0] for f in model.get_todays_log())
+
+    nuevo, _ = nuevo_miembro('Socio Nuevo')
+    _marcar(model, nuevo, '09:00:00')
+
+    assert [f[2] for f in model.get_todays_log(after_id=ultimo_id)] == ['Socio Nuevo']
+
+
+def test_before_pagina_hacia_atras(nuevo_miembro):
+    model = AttendanceModel()
+    for i in range(7):
+        _marcar(model, nuevo_miembro(f"Socio {i}")[0], f"08:{i:02d}:00")
+
+    primera = model.get_todays_log(limit=3)
+    resto = model.get_todays_log(before=(primera[-1][5], primera[-1][0]), limit=10)
+
+    horas = [f[5][-8:] for f in primera + resto]
+    assert horas == [f"08:{i:02d}:00" for i in range(6, -1, -1)]
@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+"""Pruebas de la cola de escritura con commit agrupado (core/write_queue.py)"""
+import sqlite3
+
+import pytest
+
+from core.base_model import BaseModel
+from core.database_manager import get_connection
+from core.write_queue import WriteQueue, after_commit, run_write
+
+
+@pytest.fixture
+def tabla(db):
+    conn = get_connection()
+    conn.execute("CREATE TABLE prueba (valor INTEGER UNIQUE)")
+    conn.commit()
+    conn.close()
+
+
+def _insertar(valor):
+    def trabajo(conn):
+        conn.execute("INSERT INTO prueba (valor) VALUES (?)", (valor,))
+        return valor
+    return trabajo
+
+
+def _valores():
+    return sorted(v for (v,) in BaseModel().execute_query("SELECT valor FROM prueba"))
+
+
+@pytest.fixture
+def cola(tabla):
+    # Ventana amplia: todo lo encolado en la prueba entra en el mismo lote
+    cola = WriteQueue(window_ms=200)
+    yield cola
+    cola.stop()
+
+
+def test_un_lote_con_un_trabajo_fallido_conserva_los_demas(cola):
+    def _falla(conn):
+        conn.execute("INSERT INTO prueba (valor) VALUES (99)")
+        raise ValueError("trabajo inválido")
+
+    futuros = [cola.submit(_insertar(1)), cola.submit(_falla), cola.submit(_insertar(2))]
+
+    assert futuros[0].result(5) == 1
+    assert futuros[2].result(5) == 2
+    assert isinstance(futuros[1].exception(5), ValueError)
+    assert _valores() == [1, 2]
+    assert cola.stats['batches'] == 1
+    assert cola.stats['errors'] == 1
+
+
+def test_error_de_sqlite_llega_solo_a_su_trabajo(cola):
+    futuros = [cola.submit(_insertar(7)), cola.submit(_insertar(7)), cola.submit(_insertar(8))]
+
+    assert futuros[0].result(5) == 7
+    assert isinstance(futuros[1].exception(5), sqlite3.IntegrityError)
+    assert futuros[2].result(5) == 8
+    assert _valores() == [7, 8]
+
+
+def test_run_devuelve_el_resultado_o_relanza(cola):
+    assert cola.run(_insertar(3)) == 3
+    with pytest.raises(sqlite3.IntegrityError):
+        cola.run(_insertar(3))
+
+
+def test_after_commit_solo_para_trabajos_confirmados(cola):
+    llamados = []
+
+    def _con_aviso(valor, falla=False):
+        def trabajo(conn):
+            conn.execute("INSERT INTO prueba (valor) VALUES (?)", (valor,))
+            after_commit(lambda: llamados.append(valor))
+            if falla:
+                raise ValueError(valor)
+        return trabajo
+
+    cola.run(_con_aviso(1))
+    with pytest.raises(ValueError):
+        cola.run(_con_aviso(2, falla=True))
+
+    assert llamados == [1]
+
+
+def test_escritura_anidada_corre_en_un_savepoint(tabla, write_mode):
+    def _externo(conn):
+        conn.execute("INSERT INTO prueba (valor) VALUES (1)")
+        with pytest.raises(sqlite3.IntegrityError):
+            run_write(_insertar(1))
+        return run_write(_insertar(2))
+
+    assert run_write(_externo) == 2
+    assert _valores() == [1, 2]
+
+
+def test_fallo_externo_revierte_lo_anidado(tabla, write_mode):
+    def _externo(conn):
+        run_write(_insertar(5))
+        raise RuntimeError("revertir todo")
+
+    with pytest.raises(RuntimeError):
+        run_write(_externo)
+    assert _valores() == []
@@ -0,0 +1,216 @@
+# -*- coding: utf-8 -*-
+"""
+Puente asíncrono entre las vistas y los servicios
+
+Las vistas no deben consultar la BD (ni el servidor POS) en el hilo de la
+GUI: si la BD está ocupada la ventana se congela y el lector de códigos
+pierde teclas. Aquí cada llamada de servicio corre en un QThreadPool y el
+resultado vuelve al hilo de la GUI por una señal.
+
+- ``key``: identifica la consulta dentro de su vista (ej: 'productos'). Una
+  llamada nueva con la misma clave deja obsoleta a la anterior: si aún no
+  arrancó no corre, y si ya corrió su resultado se descarta. Así una
+  búsqueda escrita letra por letra solo pinta la última.
+- ``delay_ms``: espera a que se deje de tipear antes de lanzar la consulta.
+- ``skip_if_busy``: para sondeos periódicos; si la anterior sigue en curso
+  no se lanza otra (con BD lenta no se apilan consultas).
+- ``owner``: widget dueño del resultado. Si se destruyó antes de que llegue
+  el resultado, se descarta sin tocar el widget.
+
+Uso:
+    get_bridge().submit(self.service.get_x, arg, on_result=self._pintar_x, key='x')
+"""
+import threading
+from PyQt6 import sip
+from PyQt6.QtCore import QObject, QRunnable, QThreadPool, QTimer, pyqtSignal
+from core.config import Config
+from core.logger import logger
+
+
+class Task:
+    """Llamada de servicio encolada en el puente"""
+
+    __slots__ = ('fn', 'args', 'key', 'owner', 'on_result', 'on_error', 'cancelled')
+
+    def __init__(self, fn, args, key, owner, on_result, on_error):
+        self.fn = fn
+        self.args = args
+        self.key = key
+        self.owner = owner
+        self.on_result = on_result
+        self.on_error = on_error
+        self.cancelled = False
+
+    def cancel(self):
+        """El resultado no se entregará (si aún no arrancó, tampoco corre)."""
+        self.cancelled = True
+
+
+class _Runnable(QRunnable):
+    def __init__(self, task, done_signal):
+        super().__init__()
+        self.task = task
+        self.done_signal = done_signal
+
+    def run(self):
+        task = self.task
+        resultado, error = None, None
+        if not task.cancelled:
+            try:
+                resultado = task.fn(*task.args)
+            except Exception as e:
+                error = e
+        # Siempre se avisa: el hilo de la GUI libera la clave aunque se haya cancelado
+        self.done_signal.emit(task, resultado, error)
+
+
+class AsyncBridge(QObject):
+    """Ejecuta llamadas de servicio en segundo plano y entrega el resultado por señal"""
+
+    _done = pyqtSignal(object, object, object)
+
+    def __init__(self, max_threads=None, parent=None):
+        super().__init__(parent)
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(max_threads or Config.UI_WORKER_THREADS)
+        self._inflight = {}     # (owner, key) → última Task lanzada con esa clave
+        self._delayed = {}      # (owner, key) → (QTimer, Task) esperando fin de tipeo
+        self._live = set()
+        self._done.connect(self._deliver)
+        self.stats = {'submitted': 0, 'delivered': 0, 'dropped': 0, 'errors': 0}
+
+    def submit(self, fn, *args, on_result=None, on_error=None, key=None, owner=None,
+               delay_ms=0, skip_if_busy=False):
+        """
+        Ejecuta ``fn(*args)`` en un hilo del pool.
+
+        Args:
+            fn: Función de servicio (no debe tocar widgets)
+            *args: Argumentos posicionales para fn
+            on_result: Callback ``on_result(resultado)`` en el hilo de la GUI
+            on_error: Callback ``on_error(excepcion)``; sin él se registra en el log
+            key: Clave de coalescencia dentro del dueño
+            owner: QObject dueño (por defecto el de on_result si es método de un QObject)
+            delay_ms: Espera de antirrebote antes de lanzar (requiere key)
+            skip_if_busy: No lanzar si hay una llamada con la misma clave en curso
+
+        Returns:
+            Task: Para cancelarla, o None si se omitió por skip_if_busy
+        """
+        if owner is None and isinstance(getattr(on_result, '__self__', None), QObject):
+            owner = on_result.__self__
+        task = Task(fn, args, key, owner, on_result, on_error)
+
+        if key is not None:
+            clave = (owner, key)
+            if skip_if_busy and clave in self._inflight:
+                return None
+            anterior = self._inflight.get(clave)
+            if anterior is not None:
+                anterior.cancel()
+            pendiente = self._delayed.pop(clave, None)
+            if pendiente is not None:
+                pendiente[0].stop()
+                pendiente[0].deleteLater()
+            self._inflight[clave] = task
+
+            if delay_ms:
+                timer = QTimer(self)
+                timer.setSingleShot(True)
+                timer.timeout.connect(lambda: self._start_delayed(clave, task))
+                self._delayed[clave] = (timer, task)
+                timer.start(delay_ms)
+                return task
+
+        self._start(task)
+        return task
+
+    def cancel(self, owner=None, key=None):
+        """
+        Cancela las llamadas pendientes de un dueño (todas si no se indica).
+
+        Args:
+            owner: QObject dueño (ej: al cerrar un diálogo)
+            key: Solo las de esta clave
+        """
+        for task in list(self._live) + [t for _, t in self._delayed.values()]:
+            if (owner is None or task.owner is owner) and (key is None or task.key == key):
+                task.cancel()
+        for clave in [c for c in self._delayed
+                      if (owner is None or c[0] is owner) and (key is None or c[1] == key)]:
+            timer, task = self._delayed.pop(clave)
+            timer.stop()
+            timer.deleteLater()
+            self._release(task)
+
+    def shutdown(self, timeout_ms=5000):
+        """Cancela lo pendiente y espera a los hilos en curso (al cerrar la app)."""
+        self.cancel()
+        self.pool.waitForDone(timeout_ms)
+        logger.info(f"Puente asíncrono detenido: {self.stats}")
+
+    # ------------------------------------------------------------------
+    # Internos (hilo de la GUI)
+    # ------------------------------------------------------------------
+
+    def _start_delayed(self, clave, task):
+        pendiente = self._delayed.pop(clave, None)
+        if pendiente is not None:
+            pendiente[0].deleteLater()
+        if not task.cancelled:
+            self._start(task)
+        else:
+            self._release(task)
+
+    def _start(self, task):
+        self.stats['submitted'] += 1
+        self._live.add(task)
+        self.pool.start(_Runnable(task, self._done))
+
+    def _release(self, task):
+        clave = (task.owner, task.key)
+        if task.key is not None and self._inflight.get(clave) is task:
+            del self._inflight[clave]
+
+    def _deliver(self, task, resultado, error):
+        self._live.discard(task)
+        self._release(task)
+
+        owner = task.owner
+        if task.cancelled or (owner is not None and sip.isdeleted(owner)):
+            self.stats['dropped'] += 1
+            return
+
+        if error is not None:
+            self.stats['errors'] += 1
+            if task.on_error is not None:
+                task.on_error(error)
+            else:
+                logger.error(f"Error en llamada asíncrona {getattr(task.fn, '__qualname__', task.fn)}: {error}")
+            return
+
+        self.stats['delivered'] += 1
+        if task.on_result is not None:
+            task.on_result(resultado)
+
+
+_bridge = None
+_bridge_lock = threading.Lock()
+
+
+def get_bridge():
+    """Devuelve el puente del proceso (se crea en el primer uso, desde la GUI)."""
+    global _bridge
+    with _bridge_lock:
+        if _bridge is None:
+            _bridge = AsyncBridge()
+        return _bridge
+
+
+def shutdown_bridge():
+    """Cancela lo pendiente y espera a los hilos en curso (al cerrar la app)."""
+    global _bridge
+    with _bridge_lock:
+        puente, _bridge = _bridge, None
+    if puente is not None:
+        puente.shutdown()
@@ -1,30 +1,46 @@
 # -*- coding: utf-8 -*-
 """
-Vista de Check-in / Asistencias con sincronización por señales
+Vista de Check-in / Asistencias con sincronización por eventos
 """
 from PyQt6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QLabel,
-    QLineEdit, QPushButton, QMessageBox, QTableWidget,
-    QTableWidgetItem, QHeaderView
+    QLineEdit, QPushButton, QMessageBox, QHeaderView, QCheckBox, QApplication
 )
-from PyQt6.QtCore import Qt, pyqtSignal
-from PyQt6.QtGui import QColor
+from PyQt6.QtCore import Qt
+from api.client import service_for
 from services.attendance_service import AttendanceService
+from services.kiosk_service import KioskService
 from datetime import datetime
+from functools import partial
 from core.config import Config
+from core.events import CheckInRecorded, CheckInDeleted
+from ui.async_bridge import get_bridge
+from ui.event_relay import get_relay
+from ui.table_model import Column, ColumnTableModel, GridView
+
+
+def _color_vencimiento(registro):
+    """Verde si la membresía sigue vigente, rojo si venció."""
+    try:
+        fecha_venc = datetime.strptime(registro.vencimiento, Config.DATE_FORMAT)
+    except (TypeError, ValueError):
+        return None
+    return "green" if fecha_venc >= datetime.now() else "red"
 
 class AttendanceView(QWidget):
     """
     Vista para registro de asistencias.
-    Emite señal cuando se registra o elimina una asistencia.
+    El log se actualiza con los eventos CheckInRecorded / CheckInDeleted
+    (recepción, kiosco, perfil 360 u otra terminal).
     """
-    
-    # 🔥 SEÑAL PARA SINCRONIZACIÓN
-    asistencia_registrada = pyqtSignal()
 
     def __init__(self):
         super().__init__()
-        self.service = AttendanceService()
+        self.service = service_for(AttendanceService)
+        self.bridge = get_bridge()
+        self.kiosk = None
+        self._log_last_id = 0
+        self._log_day = None
         self.layout = QVBoxLayout()
         self.setLayout(self.layout)
 
@@ -33,6 +49,14 @@ class AttendanceView(QWidget):
         self._setup_delete_button()
         self.load_log()
 
+        # 🔥 Una ráfaga de entradas (volcado del kiosco) se junta en una sola consulta
+        relay = get_relay()
+        relay.subscribe(CheckInRecorded,
+                        lambda e: self.append_log(delay_ms=Config.UI_EVENT_DEBOUNCE_MS), owner=self)
+        relay.subscribe(CheckInDeleted,
+                        lambda e: self.load_log(delay_ms=Config.UI_EVENT_DEBOUNCE_MS), owner=self)
+        QApplication.instance().aboutToQuit.connect(self._stop_kiosk)
+
     def _setup_input_area(self):
         """Área de entrada de DNI/Código"""
         input_layout = QVBoxLayout()
@@ -57,6 +81,14 @@ class AttendanceView(QWidget):
 
         input_layout.addLayout(input_button_layout)
 
+        self.chk_kiosk = QCheckBox("Modo kiosco / torniquete (sin ventanas de confirmación)")
+        self.chk_kiosk.toggled.connect(self._toggle_kiosk)
+        if Config.API_URL:
+            # El kiosco valida y vuelca directo en la BD: solo en la PC del servidor
+            self.chk_kiosk.setEnabled(False)
+            self.chk_kiosk.setToolTip("Disponible solo en la PC del servidor POS")
+        input_layout.addWidget(self.chk_kiosk)
+
         self.lbl_detailed_status = QLabel("...")
         self.lbl_detailed_status.setStyleSheet(
             "font-size: 14pt; font-style: italic; padding: 5px; margin-top: 10px;"
@@ -74,13 +106,17 @@ class AttendanceView(QWidget):
         label.setStyleSheet("font-weight: bold; font-size: 14px;")
         self.layout.addWidget(label)
 
-        self.table = QTableWidget()
-        self.table.setColumnCount(5)
-        self.table.setHorizontalHeaderLabels(
-            ["Código", "Nombre", "Plan", "Válido hasta", "Hora de Entrada"]
-        )
+        # 🔥 Con muchas entradas en el día solo se traen los primeros lotes;
+        # el resto llega al hacer scroll
+        self.log_model = ColumnTableModel([
+            Column("Código", 'codigo'),
+            Column("Nombre", 'nombre'),
+            Column("Plan", 'plan'),
+            Column("Válido hasta", 'vencimiento', color=_color_vencimiento),
+            Column("Hora de Entrada", 'entrada'),
+        ], fields=('id', 'codigo', 'nombre', 'plan', 'vencimiento', 'entrada'), key='id', parent=self)
+        self.table = GridView(self.log_model)
         self.table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
-        self.table.setSelectionBehavior(QTableWidget.SelectionBehavior.SelectRows)
         self.layout.addWidget(self.table)
         self.layout.addStretch()
 
@@ -117,23 +153,24 @@ class AttendanceView(QWidget):
             QMessageBox.warning(self, "Advertencia", "Por favor, ingrese un DNI o Código")
             return
 
-        try:
-            resultado = self.service.register_check_in(identifier)
-        except Exception as e:
-            QMessageBox.critical(self, "Error Crítico", f"Ocurrió un error inesperado:\n{str(e)}")
+        if self.kiosk is not None:
+            self._mark_entry_kiosk(identifier)
             return
 
+        # 🔥 El registro corre en segundo plano: se puede seguir escaneando
+        self.identifier_input.clear()
+        self.bridge.submit(self.service.register_check_in, identifier,
+                           on_result=self._on_check_in, on_error=self._on_check_in_error)
+
+    def _on_check_in_error(self, error):
+        QMessageBox.critical(self, "Error Crítico", f"Ocurrió un error inesperado:\n{str(error)}")
+
+    def _on_check_in(self, resultado):
+        """Muestra el resultado de register_check_in"""
         status = resultado.get('status')
         message = resultado.get('message')
         alerta = resultado.get('alerta')
 
-        self.identifier_input.clear()
-        self.load_log()
-
-        # 🔥 EMITIR SEÑAL PARA SINCRONIZACIÓN
-        if status == 'Éxito':
-            self.asistencia_registrada.emit()
-
         msg = QMessageBox()
         msg.setWindowTitle("Resultado de Asistencia")
 
@@ -165,36 +202,105 @@ class AttendanceView(QWidget):
         msg.setText(message)
         msg.exec()
 
-    def load_log(self):
-        """Carga el log de asistencias de hoy"""
-        registros = self.service.get_todays_log()
-        self.table.setRowCount(0)
+    def _mark_entry_kiosk(self, identifier):
+        """Marcación en modo kiosco: responde solo con la etiqueta, sin diálogos."""
+        self.identifier_input.clear()
+
+        try:
+            resultado = self.kiosk.check_in(identifier)
+        except Exception as e:
+            resultado = {'status': 'Error', 'message': f"Error: {str(e)}", 'alerta': None}
+
+        status = resultado.get('status')
+
+        if status == 'Éxito':
+            texto = f"¡ACCESO CONCEDIDO! Bienvenido(a) {resultado.get('miembro_nombre', 'Miembro')}."
+            if resultado.get('alerta'):
+                texto += f"  {resultado['alerta']}"
+            color = "#a6e3a1"
+        elif status in ['Vencido', 'Sin Plan']:
+            texto = resultado.get('message')
+            color = "#f38ba8"
+        else:
+            texto = resultado.get('message')
+            color = "orange"
 
-        for row_index, (codigo, nombre, plan, vencimiento, entrada) in enumerate(registros):
-            self.table.insertRow(row_index)
-            self.table.setItem(row_index, 0, QTableWidgetItem(codigo))
-            self.table.setItem(row_index, 1, QTableWidgetItem(nombre))
-            self.table.setItem(row_index, 2, QTableWidgetItem(plan))
+        self.lbl_detailed_status.setText(texto)
+        self.lbl_detailed_status.setStyleSheet(
+            f"color: {color}; font-size: 14pt; font-style: italic; font-weight: bold;"
+        )
 
-            item_venc = QTableWidgetItem(vencimiento)
+    def _toggle_kiosk(self, activo):
+        """Inicia o detiene el servicio de kiosco."""
+        if activo:
             try:
-                fecha_venc = datetime.strptime(vencimiento, Config.DATE_FORMAT)
-                if fecha_venc >= datetime.now():
-                    item_venc.setForeground(QColor("green"))
-                else:
-                    item_venc.setForeground(QColor("red"))
-            except:
-                pass
-            self.table.setItem(row_index, 3, item_venc)
+                self.kiosk = KioskService()
+                self.kiosk.start()
+            except Exception as e:
+                self.kiosk = None
+                self.chk_kiosk.setChecked(False)
+                QMessageBox.critical(self, "Error", f"No se pudo iniciar el modo kiosco:\n{str(e)}")
+                return
+            self.identifier_input.setFocus()
+        else:
+            self._stop_kiosk()
+
+    def _stop_kiosk(self):
+        """Vuelca lo pendiente y detiene el kiosco (también al cerrar la app)."""
+        if self.kiosk is not None:
+            self.kiosk.stop()
+            self.kiosk = None
+
+    def load_log(self, delay_ms=0):
+        """
+        Carga el log de asistencias de hoy (primer lote en segundo plano)
+
+        Args:
+            delay_ms: Antirrebote (al recargar por eventos)
+        """
+        self.bridge.submit(partial(self.service.get_todays_log, limit=Config.UI_FETCH_BATCH),
+                           on_result=self._fill_log, key='log', delay_ms=delay_ms)
 
-            self.table.setItem(row_index, 4, QTableWidgetItem(entrada))
+    def _fill_log(self, registros):
+        completo = len(registros) < Config.UI_FETCH_BATCH
+        self.log_model.set_rows(registros, fetcher=None if completo else self._fetch_older)
+
+        self._log_last_id = max((r[0] for r in registros), default=0)
+        self._log_day = datetime.now().date()
+
+    def _fetch_older(self, ultima, limite):
+        """Entradas anteriores a la última del lote anterior (corre en segundo plano)."""
+        return self.service.get_todays_log(before=(ultima.entrada, ultima.id), limit=limite)
+
+    def append_log(self, delay_ms=0):
+        """
+        🔥 Agrega al log solo las entradas nuevas desde la última mostrada.
+        Si cambió el día se recarga completo.
+
+        Args:
+            delay_ms: Antirrebote (al llegar una ráfaga de CheckInRecorded)
+        """
+        if self._log_day != datetime.now().date():
+            self.load_log(delay_ms)
+            return
+
+        # La consulta lee _log_last_id al correr: tras el antirrebote trae todo lo nuevo
+        self.bridge.submit(lambda: self.service.get_todays_log(after_id=self._log_last_id),
+                           on_result=self._prepend_log, key='log', delay_ms=delay_ms)
+
+    def _prepend_log(self, nuevos):
+        # Vienen de la más reciente a la más antigua: van arriba en ese orden
+        self.log_model.insert_rows(0, nuevos)
+
+        if nuevos:
+            self._log_last_id = max(self._log_last_id, max(r[0] for r in nuevos))
 
     def delete_selected_entry(self):
         """
         Elimina la entrada seleccionada y emite señal para sincronización.
         """
-        selected_row = self.table.currentRow()
-        if selected_row == -1:
+        registro = self.table.current_record()
+        if registro is None:
             QMessageBox.warning(
                 self, 
                 "Sin selección", 
@@ -202,7 +308,7 @@ class AttendanceView(QWidget):
             )
             return
 
-        codigo = self.table.item(selected_row, 0).text()
+        codigo = registro.codigo
         confirm = QMessageBox.question(
             self,
             "Confirmar eliminación",
@@ -214,13 +320,9 @@ class AttendanceView(QWidget):
             try:
                 resultado = self.service.delete_last_check_in_by_code(codigo)
                 if resultado:
+                    # El log se recarga con el evento CheckInDeleted
                     QMessageBox.information(self, "Eliminado", "Entrada eliminada correctamente")
-                    
-                    # 🔥 EMITIR SEÑAL
-                    self.asistencia_registrada.emit()
                 else:
                     QMessageBox.warning(self, "No encontrado", "No se encontró entrada para eliminar")
             except Exception as e:
                 QMessageBox.critical(self, "Error", f"No se pudo eliminar la entrada:\n{str(e)}")
-
-            self.load_log()
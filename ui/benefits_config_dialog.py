@@ -8,6 +8,7 @@ from PyQt6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QLabel,
                              QFrame, QScrollArea, QWidget, QMessageBox)
 from PyQt6.QtCore import Qt
 from PyQt6.QtGui import QFont
+from api.client import service_for
 from services.benefit_service import BenefitService
 from core.logger import logger
 
@@ -18,7 +19,7 @@ class BenefitsConfigDialog(QDialog):
         super().__init__(parent)
         self.categoria_id = categoria_id
         self.categoria_nombre = categoria_nombre
-        self.benefit_service = BenefitService()
+        self.benefit_service = service_for(BenefitService)
         self.benefit_widgets = {}  # {benefit_code: {widgets}}
         
         self.setWindowTitle(f"Configurar Beneficios - {categoria_nombre}")
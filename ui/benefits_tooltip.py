@@ -5,6 +5,7 @@ Componente reutilizable y optimizado
 """
 from PyQt6.QtWidgets import (QDialog, QVBoxLayout, QLabel, QFrame, QHBoxLayout)
 from PyQt6.QtCore import Qt
+from api.client import service_for
 from services.benefit_service import BenefitService
 
 class BenefitsTooltip(QDialog):
@@ -18,7 +19,7 @@ class BenefitsTooltip(QDialog):
         """
         super().__init__(parent)
         self.miembro_id = miembro_id
-        self.benefit_service = BenefitService()
+        self.benefit_service = service_for(BenefitService)
         
         self._setup_ui()
         self._load_benefits()
@@ -12,8 +12,13 @@ from PyQt6.QtWidgets import (
 )
 from PyQt6.QtCore import Qt, QDate, QTimer, pyqtSignal, QSize
 from PyQt6.QtGui import QFont, QColor
+from api.client import service_for
 from services.caja_service import CajaService
 from services.gasto_service import GastoService
+from core.config import Config
+from core.events import CashBalanceChanged
+from ui.async_bridge import get_bridge
+from ui.event_relay import get_relay
 from datetime import datetime
 
 
@@ -22,16 +27,22 @@ class CajaView(QWidget):
     
     def __init__(self):
         super().__init__()
-        self.caja_service = CajaService()
-        self.gasto_service = GastoService()
+        self.caja_service = service_for(CajaService)
+        self.gasto_service = service_for(GastoService)
+        self.bridge = get_bridge()
         
         self._setup_ui()
         self.refresh_all()
         
-        # Timer para actualizar cada 30 segundos
+        # 🔥 Los saldos llegan con cada movimiento confirmado (sin recalcular ni sondear)
+        get_relay().subscribe(CashBalanceChanged, self._on_saldos)
+        
+        # Una terminal remota solo recibe los eventos de sus propias operaciones:
+        # lo de las demás terminales se sondea cada 30 segundos
         self.timer = QTimer()
         self.timer.timeout.connect(self.refresh_saldos)
-        self.timer.start(30000)
+        if Config.API_URL:
+            self.timer.start(30000)
     
     def _setup_ui(self):
         """Configura la interfaz estilo Market"""
@@ -335,8 +346,20 @@ class CajaView(QWidget):
         self.refresh_movimientos()
     
     def refresh_saldos(self):
-        """Actualiza saldos y estado de caja"""
+        """Actualiza saldos y estado de caja (la consulta corre en segundo plano)"""
+        self.bridge.submit(self._leer_saldos, on_result=self._pintar_saldos, key='saldos')
+
+    def _leer_saldos(self):
+        """Sesión abierta y saldos por método (corre en segundo plano)"""
         sesion = self.caja_service.get_sesion_abierta()
+        return sesion, (self.caja_service.get_saldos_actuales() if sesion else None)
+
+    def _on_saldos(self, evento):
+        self._pintar_saldos((evento.sesion, evento.saldos))
+
+    def _pintar_saldos(self, datos):
+        """Pinta estado y saldos con el resultado de _leer_saldos"""
+        sesion, saldos = datos
         
         if not sesion:
             # Caja cerrada
@@ -376,9 +399,7 @@ class CajaView(QWidget):
         fecha_apertura = sesion[1]
         self.lbl_info_sesion.setText(f"Desde: {fecha_apertura}")
         
-        # Obtener saldos
-        saldos = self.caja_service.get_saldos_actuales()
-        
+        # Saldos por método
         efectivo = saldos.get('efectivo', 0)
         yape = saldos.get('yape', 0)
         plin = saldos.get('plin', 0)
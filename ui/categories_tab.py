@@ -10,6 +10,7 @@ from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QPushButton,
                              QFrame)
 from PyQt6.QtCore import Qt, pyqtSignal
 from PyQt6.QtGui import QColor, QFont
+from api.client import service_for
 from services.category_service import CategoryService
 from core.logger import logger
 from ui.manage_benefits_dialog import ManageBenefitsDialog
@@ -21,7 +22,7 @@ class CategoriesTab(QWidget):
     
     def __init__(self, parent=None):
         super().__init__(parent)
-        self.category_service = CategoryService()
+        self.category_service = service_for(CategoryService)
         self._setup_ui()
         self._load_categories()
     
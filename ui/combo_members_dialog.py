@@ -8,8 +8,9 @@ from PyQt6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QLabel,
                              QScrollArea, QWidget)
 from PyQt6.QtCore import Qt, pyqtSignal
 from PyQt6.QtGui import QFont
-from models.member_model import MemberModel
+from api.client import service_for
 from services.combo_service import ComboService
+from services.member_service import MemberService
 from core.logger import logger
 
 class ComboMembersDialog(QDialog):
@@ -27,8 +28,8 @@ class ComboMembersDialog(QDialog):
         self.pagador_id = pagador_id
         self.pagador_nombre = pagador_nombre
         
-        self.member_model = MemberModel()
-        self.combo_service = ComboService()
+        self.member_service = service_for(MemberService)
+        self.combo_service = service_for(ComboService)
         
         self.selected_members = []  # Lista de dicts con info de miembros
         
@@ -334,23 +335,43 @@ class ComboMembersDialog(QDialog):
             result_label.setStyleSheet("color: #f59e0b; font-size: 12px; background: transparent;")
             return
         
-        # 🔥 FIX: Usar método correcto
-        miembro_data = self.member_model.find_member_by_identifier(search_term)
-        
-        if not miembro_data:
-            result_label.setText(f"❌ No se encontró miembro con código/DNI: {search_term}")
-            result_label.setStyleSheet("color: #ef4444; font-size: 12px; background: transparent;")
-            self._update_slot_member(slot_numero, None)
-            return
-        
-        # Convertir tupla a dict
-        miembro = {
-            'id': miembro_data[0],
-            'nombre': miembro_data[1],
-            'dni': miembro_data[2],
-            'codigo': miembro_data[6],
-            'estado': miembro_data[7]
-        }
+        # 🔥 El servicio devuelve (id, nombre, dni, ..., codigo, estado, foto_path)
+        miembro_data = self.member_service.find_member_by_identifier(search_term)
+        
+        if miembro_data:
+            # Convertir tupla a dict
+            miembro = {
+                'id': miembro_data[0],
+                'nombre': miembro_data[1],
+                'dni': miembro_data[2],
+                'codigo': miembro_data[6],
+                'estado': miembro_data[7]
+            }
+        else:
+            # Sin coincidencia exacta: búsqueda por nombre (índice de texto)
+            coincidencias = self.member_service.search(search_term, limit=5)
+            
+            if len(coincidencias) != 1:
+                if coincidencias:
+                    nombres = ", ".join(c[1] for c in coincidencias)
+                    result_label.setText(
+                        f"⚠️ Varios miembros coinciden: {nombres}. Ingrese el código o DNI"
+                    )
+                    result_label.setStyleSheet("color: #f59e0b; font-size: 12px; background: transparent;")
+                else:
+                    result_label.setText(f"❌ No se encontró miembro con código/DNI: {search_term}")
+                    result_label.setStyleSheet("color: #ef4444; font-size: 12px; background: transparent;")
+                self._update_slot_member(slot_numero, None)
+                return
+            
+            miembro_id, nombre, dni, _contacto, codigo, estado, _bucket = coincidencias[0]
+            miembro = {
+                'id': miembro_id,
+                'nombre': nombre,
+                'dni': dni,
+                'codigo': codigo,
+                'estado': estado
+            }
         
         # Validar que no sea el pagador
         if miembro['id'] == self.pagador_id:
@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+"""
+Panel de diagnóstico de consultas SQL (Ctrl+Shift+D desde la ventana principal)
+Muestra el top-N de sentencias medidas en esta sesión con su histograma
+"""
+from PyQt6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QTableWidget,
+                             QTableWidgetItem, QPushButton, QHeaderView, QLabel,
+                             QComboBox, QAbstractItemView, QApplication)
+from PyQt6.QtCore import Qt
+from core.config import Config
+from core.query_stats import get_query_stats, HISTOGRAM_LABELS
+
+
+class DiagnosticsDialog(QDialog):
+    """Top de consultas por tiempo total, promedio, máximo o cantidad"""
+
+    ORDENES = [
+        ("Tiempo total", 'total'),
+        ("Promedio", 'avg'),
+        ("Máximo", 'max'),
+        ("Ejecuciones", 'count'),
+        ("Lentas", 'slow'),
+    ]
+    COLUMNAS = ["Sentencia", "Llamado desde", "N", "Total ms", "Prom ms",
+                "Máx ms", "Filas", "Lentas"] + list(HISTOGRAM_LABELS)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Diagnóstico de consultas")
+        self.setMinimumSize(1100, 600)
+        self.stats = get_query_stats()
+
+        self.setStyleSheet("""
+            QDialog { background-color: #0f172a; color: white; }
+            QTableWidget { background-color: #1e293b; color: white; border: 1px solid #334155; }
+            QPushButton { background-color: #3b82f6; color: white; padding: 6px 12px; border-radius: 4px; }
+            QComboBox { background-color: #1e293b; color: white; border: 1px solid #475569; padding: 4px; }
+        """)
+
+        self._setup_ui()
+        self._load_data()
+
+    def _setup_ui(self):
+        layout = QVBoxLayout(self)
+
+        fl = QHBoxLayout()
+        fl.addWidget(QLabel("Ordenar por:"))
+        self.combo_orden = QComboBox()
+        for texto, clave in self.ORDENES:
+            self.combo_orden.addItem(texto, clave)
+        self.combo_orden.currentIndexChanged.connect(self._load_data)
+        fl.addWidget(self.combo_orden)
+
+        btn_refrescar = QPushButton("🔄 Refrescar")
+        btn_refrescar.clicked.connect(self._load_data)
+        fl.addWidget(btn_refrescar)
+
+        btn_copiar = QPushButton("📋 Copiar")
+        btn_copiar.clicked.connect(self._copiar)
+        fl.addWidget(btn_copiar)
+
+        btn_reset = QPushButton("Reiniciar")
+        btn_reset.clicked.connect(self._reiniciar)
+        fl.addWidget(btn_reset)
+
+        fl.addStretch()
+        self.lbl_umbral = QLabel(
+            f"Umbral de lentas: {self.stats.slow_ms} ms → {Config.DB_SLOW_QUERY_LOG}"
+        )
+        fl.addWidget(self.lbl_umbral)
+        layout.addLayout(fl)
+
+        self.table = QTableWidget()
+        self.table.setColumnCount(len(self.COLUMNAS))
+        self.table.setHorizontalHeaderLabels(self.COLUMNAS)
+        self.table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        header = self.table.horizontalHeader()
+        header.setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)
+        for col in range(1, len(self.COLUMNAS)):
+            header.setSectionResizeMode(col, QHeaderView.ResizeMode.ResizeToContents)
+        layout.addWidget(self.table)
+
+        if not self.stats.enabled:
+            layout.addWidget(QLabel("⚠️ Instrumentación desactivada (Config.DB_QUERY_STATS)"))
+
+    def _load_data(self):
+        filas = self.stats.top(Config.DB_QUERY_STATS_TOP, by=self.combo_orden.currentData())
+        self.table.setRowCount(len(filas))
+
+        for r, s in enumerate(filas):
+            llamadores = sorted(s['callers'].items(), key=lambda c: c[1], reverse=True)
+            sql_item = QTableWidgetItem(s['sql'])
+            sql_item.setToolTip(s['sql'])
+            self.table.setItem(r, 0, sql_item)
+            self.table.setItem(r, 1, QTableWidgetItem(", ".join(c for c, _ in llamadores[:3])))
+
+            valores = [s['count'], f"{s['total_ms']:.1f}", f"{s['avg_ms']:.2f}",
+                       f"{s['max_ms']:.1f}", s['rows'], s['slow']]
+            valores += [s['histogram'][etiqueta] for etiqueta in HISTOGRAM_LABELS]
+            for c, valor in enumerate(valores, start=2):
+                item = QTableWidgetItem(str(valor))
+                item.setTextAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
+                self.table.setItem(r, c, item)
+
+    def _copiar(self):
+        QApplication.clipboard().setText(
+            self.stats.format_top(Config.DB_QUERY_STATS_TOP, by=self.combo_orden.currentData())
+        )
+
+    def _reiniciar(self):
+        self.stats.reset()
+        self._load_data()
@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+"""
+Entrega de eventos del bus (core/event_bus.py) en el hilo de la GUI
+
+Los eventos se publican en el hilo que confirmó la escritura (la cola de
+escritura, un hilo del puente asíncrono o el servidor POS). Un widget no se
+puede tocar desde ahí: el relay re-emite cada evento por una señal, que Qt
+encola hacia el hilo de la GUI. Si el widget dueño se destruye, la
+suscripción se quita sola.
+
+Uso:
+    get_relay().subscribe(CashBalanceChanged, self._on_saldos, owner=self)
+"""
+import threading
+from PyQt6 import sip
+from PyQt6.QtCore import QObject, pyqtSignal
+from core.event_bus import get_event_bus
+
+
+class EventRelay(QObject):
+    """Puente entre el bus de eventos y los slots de la GUI"""
+
+    _evento = pyqtSignal(object, object, object)    # slot, owner, evento
+
+    def __init__(self, bus=None, parent=None):
+        super().__init__(parent)
+        self.bus = bus or get_event_bus()
+        self._evento.connect(self._deliver)
+
+    def subscribe(self, event_type, slot, owner=None):
+        """
+        Suscribe un slot que se ejecuta en el hilo de la GUI.
+
+        Args:
+            event_type: Clase del evento
+            slot: ``slot(evento)``
+            owner: QObject dueño (por defecto el de slot si es método de un QObject);
+                   al destruirse se quita la suscripción
+
+        Returns:
+            callable: Manejador registrado en el bus (para unsubscribe)
+        """
+        if owner is None and isinstance(getattr(slot, '__self__', None), QObject):
+            owner = slot.__self__
+
+        def handler(evento):
+            # Desde el hilo de la GUI llega directo; desde otro hilo, encolado
+            self._evento.emit(slot, owner, evento)
+
+        self.bus.subscribe(event_type, handler)
+        if owner is not None:
+            owner.destroyed.connect(lambda *_: self.bus.unsubscribe(event_type, handler))
+        return handler
+
+    def unsubscribe(self, event_type, handler):
+        """Quita una suscripción hecha con subscribe."""
+        self.bus.unsubscribe(event_type, handler)
+
+    def _deliver(self, slot, owner, evento):
+        if owner is not None and sip.isdeleted(owner):
+            return
+        slot(evento)
+
+
+_relay = None
+_relay_lock = threading.Lock()
+
+
+def get_relay():
+    """Devuelve el relay del proceso (se crea en el primer uso, desde la GUI)."""
+    global _relay
+    with _relay_lock:
+        if _relay is None:
+            _relay = EventRelay()
+        return _relay
@@ -1,21 +1,22 @@
 # -*- coding: utf-8 -*-
-from PyQt6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QTableWidget, 
-                             QTableWidgetItem, QPushButton, QHeaderView, QLabel, 
-                             QDateEdit, QFrame, QMessageBox, QAbstractItemView, QTextEdit)
+from PyQt6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QPushButton, QHeaderView, QLabel, 
+                             QDateEdit, QFrame, QMessageBox, QTextEdit)
 from PyQt6.QtCore import Qt, QDate
-from PyQt6.QtGui import QColor, QFont
+from PyQt6.QtGui import QFont
+from api.client import service_for
 from services.venta_service import VentaService
+from ui.table_model import Column, ColumnTableModel, GridView
 
 class HistorialVentasDialog(QDialog):
     def __init__(self, parent=None):
         super().__init__(parent)
         self.setWindowTitle("Historial de Ventas")
         self.setMinimumSize(1000, 700)
-        self.service = VentaService()
+        self.service = service_for(VentaService)
         
         self.setStyleSheet("""
             QDialog { background-color: #0f172a; color: white; }
-            QTableWidget { background-color: #1e293b; color: white; border: 1px solid #334155; }
+            QTableView { background-color: #1e293b; color: white; border: 1px solid #334155; }
             QPushButton { background-color: #3b82f6; color: white; padding: 6px 12px; border-radius: 4px; }
             QDateEdit { background-color: #1e293b; color: white; border: 1px solid #475569; padding: 4px; }
         """)
@@ -56,12 +57,18 @@ class HistorialVentasDialog(QDialog):
         layout.addLayout(fl)
         
         # Tabla
-        self.table = QTableWidget()
-        self.table.setColumnCount(6)
-        self.table.setHorizontalHeaderLabels(["ID", "Hora", "Cliente", "Total", "Medio", "Estado"])
+        self.model = ColumnTableModel([
+            Column("ID", 'id'),
+            Column("Hora", 'fecha_hora', fmt=lambda v: v.split(' ')[1]),
+            Column("Cliente", 'cliente_nombre', fmt=lambda v: v or "Visitante"),
+            Column("Total", 'total', fmt=lambda v: f"S/ {v:.2f}"),
+            Column("Medio", 'metodo_pago', fmt=str.upper),
+            Column("Estado", 'estado', fmt=str.upper,
+                   color=lambda v: "#22c55e" if v.estado == 'completada' else "#ef4444"),
+        ], fields=('id', 'fecha_hora', 'cliente_tipo', 'cliente_nombre', 'total', 'metodo_pago', 'estado'),
+            key='id', parent=self)
+        self.table = GridView(self.model)
         self.table.horizontalHeader().setSectionResizeMode(2, QHeaderView.ResizeMode.Stretch)
-        self.table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
-        self.table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
         self.table.setColumnHidden(0, True)
         self.table.doubleClicked.connect(self._show_ticket)
         layout.addWidget(self.table)
@@ -114,22 +121,11 @@ class HistorialVentasDialog(QDialog):
         ff = self.date_to.date().toString("yyyy-MM-dd")
         ventas = self.service.get_ventas(fi, ff)
         
-        self.table.setRowCount(0)
+        self.model.set_rows(ventas)
         tot = 0
         cnt = 0
         
-        for r, v in enumerate(ventas):
-            self.table.insertRow(r)
-            self.table.setItem(r, 0, QTableWidgetItem(str(v[0])))
-            self.table.setItem(r, 1, QTableWidgetItem(v[1].split(' ')[1]))
-            self.table.setItem(r, 2, QTableWidgetItem(v[3] or "Visitante"))
-            self.table.setItem(r, 3, QTableWidgetItem(f"S/ {v[4]:.2f}"))
-            self.table.setItem(r, 4, QTableWidgetItem(v[5].upper()))
-            
-            est = QTableWidgetItem(v[6].upper())
-            est.setForeground(QColor("#22c55e" if v[6]=='completada' else "#ef4444"))
-            self.table.setItem(r, 5, est)
-            
+        for v in ventas:
             if v[6] == 'completada':
                 tot += v[4]
                 cnt += 1
@@ -146,10 +142,10 @@ class HistorialVentasDialog(QDialog):
             self.lbl_ticket_val.setText("S/ 0.00")
 
     def _extornar(self):
-        row = self.table.currentRow()
-        if row < 0: return
-        vid = int(self.table.item(row, 0).text())
-        if self.table.item(row, 5).text() != "COMPLETADA":
+        venta = self.table.current_record()
+        if venta is None: return
+        vid = venta.id
+        if venta.estado != 'completada':
             return QMessageBox.warning(self, "Error", "Ya anulada")
             
         if QMessageBox.question(self, "Confirmar", "¿Anular venta? Retorna stock y dinero.") == QMessageBox.StandardButton.Yes:
@@ -159,9 +155,9 @@ class HistorialVentasDialog(QDialog):
 
     def _show_ticket(self):
         """Muestra ticket con formato mejorado"""
-        row = self.table.currentRow()
-        if row < 0: return
-        vid = int(self.table.item(row, 0).text())
+        venta = self.table.current_record()
+        if venta is None: return
+        vid = venta.id
         data = self.service.get_venta_detalle(vid)
         if not data: return
         
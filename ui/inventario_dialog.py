@@ -1,28 +1,47 @@
 # -*- coding: utf-8 -*-
 from PyQt6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QTableWidget, 
                              QTableWidgetItem, QPushButton, QHeaderView, QLabel, 
-                             QFileDialog, QMessageBox, QWidget, QComboBox, QLineEdit,
+                             QFileDialog, QMessageBox, QComboBox, QLineEdit,
                              QFormLayout, QDoubleSpinBox, QSpinBox, QAbstractSpinBox, QFrame)
 from PyQt6.QtCore import Qt
-from PyQt6.QtGui import QColor, QCursor
+from PyQt6.QtGui import QCursor
+from api.client import service_for
 from services.producto_service import ProductoService
 from services.proveedor_service import ProveedorService
 from services.inventario_service import InventarioService
 from ui.proveedores_dialog import ProveedoresDialog
+from ui.table_model import Column, ColumnTableModel, GridView
+
+# Campos de get_all_productos (search_productos trae los 11 primeros)
+_CAMPOS_PRODUCTO = ('id', 'sku', 'codigo_barras', 'nombre', 'categoria_id', 'categoria_nombre',
+                    'precio_venta', 'stock_actual', 'stock_minimo', 'foto_path', 'activo',
+                    'fecha_registro', 'precio_compra', 'proveedor_id')
+
+
+def _color_stock(p):
+    if p.stock_actual <= 0:
+        return "#ef4444"
+    if p.stock_actual <= p.stock_minimo:
+        return "#f59e0b"
+    return None
 
 class InventarioDialog(QDialog):
+    COL_AJUSTE = 8
+    COL_KARDEX = 9
+
     def __init__(self, parent=None):
         super().__init__(parent)
         self.setWindowTitle("📦 Gestión de Inventario")
         self.setMinimumSize(1100, 700)
-        self.service = ProductoService()
-        self.prov_service = ProveedorService()
-        self.inv_service = InventarioService()
+        self.service = service_for(ProductoService)
+        self.prov_service = service_for(ProveedorService)
+        self.inv_service = service_for(InventarioService)
         self.filter_low_stock = False
+        self._prov_nombres = {}
         
         self.setStyleSheet("""
             QDialog { background-color: #0f172a; color: white; }
-            QTableWidget { background-color: #1e293b; color: white; border: 1px solid #334155; }
+            QTableWidget, QTableView { background-color: #1e293b; color: white; border: 1px solid #334155; }
             QPushButton { background-color: #3b82f6; color: white; padding: 8px 12px; border-radius: 4px; font-weight: bold; }
             QLabel { color: #e2e8f0; }
             QLineEdit, QComboBox, QDoubleSpinBox, QSpinBox { 
@@ -47,7 +66,7 @@ class InventarioDialog(QDialog):
         self.combo_cat = QComboBox()
         self.combo_cat.addItem("Todas", None)
         cats = self.service.get_categorias()
-        for c in cats: self.combo_cat.addItem(c[1], c[0])
+        for c in cats: self.combo_cat.addItem(c.nombre, c.id)
         self.combo_cat.currentIndexChanged.connect(self._load_data)
         h.addWidget(self.combo_cat, 1)
         h.addSpacing(20)
@@ -78,9 +97,23 @@ class InventarioDialog(QDialog):
         layout.addWidget(self.alert)
         
         # Tabla
-        self.table = QTableWidget()
-        self.table.setColumnCount(9)
-        self.table.setHorizontalHeaderLabels(["SKU", "Producto", "Categoría", "Costo", "Precio", "Stock", "Estado", "Proveedor", "Acciones"])
+        # 🔥 Las acciones son columnas del modelo (clic en la celda), no widgets por fila
+        self.model = ColumnTableModel([
+            Column("SKU", 'sku'),
+            Column("Producto", 'nombre'),
+            Column("Categoría", 'categoria_nombre'),
+            Column("Costo", 'precio_compra', fmt=lambda v: f"S/ {v or 0:.2f}"),
+            Column("Precio", 'precio_venta', fmt=lambda v: f"S/ {v:.2f}"),
+            Column("Stock", 'stock_actual', color=_color_stock, align=Qt.AlignmentFlag.AlignCenter),
+            Column("Estado", 'activo', fmt=lambda v: "Activo" if v else "Inactivo"),
+            Column("Proveedor", 'proveedor_id',
+                   fmt=lambda v: self._prov_nombres.get(v, "Sin proveedor")),
+            Column("Acciones", 'id', fmt=lambda v: "⚡ Ajuste", background="#0ea5e9",
+                   align=Qt.AlignmentFlag.AlignCenter),
+            Column("", 'id', fmt=lambda v: "📜", background="#64748b",
+                   align=Qt.AlignmentFlag.AlignCenter),
+        ], fields=_CAMPOS_PRODUCTO, key='id', parent=self)
+        self.table = GridView(self.model)
         
         # Ajustar anchos de columnas
         self.table.setColumnWidth(0, 100)   # SKU - ancho fijo pequeño
@@ -91,9 +124,9 @@ class InventarioDialog(QDialog):
         self.table.setColumnWidth(5, 70)    # Stock
         self.table.setColumnWidth(6, 80)    # Estado
         self.table.setColumnWidth(7, 150)   # Proveedor
-        # Columna 8 (Acciones) se ajusta automáticamente
-        self.table.setSelectionBehavior(QTableWidget.SelectionBehavior.SelectRows)
-        self.table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        self.table.setColumnWidth(self.COL_AJUSTE, 90)
+        self.table.setColumnWidth(self.COL_KARDEX, 40)
+        self.table.clicked.connect(self._on_action_click)
         self.table.doubleClicked.connect(self._on_table_click)
         layout.addWidget(self.table)
 
@@ -104,78 +137,40 @@ class InventarioDialog(QDialog):
         if term: prods = self.service.search_productos(term)
         else: prods = self.service.get_all_productos()
         
-        if cid: prods = [p for p in prods if p[4] == cid]
+        if cid: prods = [p for p in prods if p.categoria_id == cid]
         
-        low = sum(1 for p in prods if p[7] <= p[8])
+        low = sum(1 for p in prods if p.stock_actual <= p.stock_minimo)
         if low > 0:
             self.alert.setVisible(True)
             self.lbl_alert.setText(f"⚠️ {low} productos bajo stock (Doble clic para filtrar)")
         else: self.alert.setVisible(False)
         
         if self.filter_low_stock:
-            prods = [p for p in prods if p[7] <= p[8]]
+            prods = [p for p in prods if p.stock_actual <= p.stock_minimo]
             self.lbl_alert.setText("⚠️ Mostrando solo bajo stock (Doble clic para quitar filtro)")
             
-        self.table.setRowCount(0)
-        for r, p in enumerate(prods):
-            self.table.insertRow(r)
-            # Columna 0: SKU
-            self.table.setItem(r, 0, QTableWidgetItem(str(p[1])))
-            # Columna 1: Nombre del producto
-            self.table.setItem(r, 1, QTableWidgetItem(p[3]))
-            self.table.setItem(r, 2, QTableWidgetItem(p[5]))
-            costo = p[12] if len(p)>12 else 0
-            self.table.setItem(r, 3, QTableWidgetItem(f"S/ {costo:.2f}"))
-            self.table.setItem(r, 4, QTableWidgetItem(f"S/ {p[6]:.2f}"))
-            
-            st = QTableWidgetItem(str(p[7]))
-            st.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
-            if p[7]<=0: st.setForeground(QColor("#ef4444"))
-            elif p[7]<=p[8]: st.setForeground(QColor("#f59e0b"))
-            self.table.setItem(r, 5, st)
-            self.table.setItem(r, 6, QTableWidgetItem("Activo" if p[10] else "Inactivo"))
-            
-            # Columna Proveedor
-            prov_id = p[13] if len(p) > 13 else None
-            prov_nombre = "Sin proveedor"
-            if prov_id:
-                try:
-                    provs = self.prov_service.get_all()
-                    for pv in provs:
-                        if pv[0] == prov_id:
-                            prov_nombre = pv[1]
-                            break
-                except:
-                    pass
-            self.table.setItem(r, 7, QTableWidgetItem(prov_nombre))
-            
-            # Botones Acciones
-            w = QWidget()
-            wl = QHBoxLayout(w)
-            wl.setContentsMargins(0,0,0,0)
-            btn_adj = QPushButton("⚡ Ajuste")
-            btn_adj.setStyleSheet("background: #0ea5e9; font-size: 11px; padding: 4px;")
-            btn_adj.clicked.connect(lambda ch, pd=p: self._open_adjustment(pd))
-            
-            btn_hist = QPushButton("📜")
-            btn_hist.setToolTip("Ver Kardex")
-            btn_hist.setStyleSheet("background: #64748b; padding: 4px;")
-            btn_hist.clicked.connect(lambda ch, pid=p[0]: self._show_kardex(pid))
-            
-            wl.addWidget(btn_adj)
-            wl.addWidget(btn_hist)
-            self.table.setCellWidget(r, 8, w)
-            
-            self.table.item(r, 0).setData(Qt.ItemDataRole.UserRole, p)
+        # Un solo get_all de proveedores por recarga (antes era uno por fila)
+        try:
+            self._prov_nombres = {pv.id: pv.empresa for pv in self.prov_service.get_all()}
+        except Exception:
+            self._prov_nombres = {}
+        # Tras guardar o ajustar solo cambian las filas tocadas: se conserva scroll y selección
+        self.model.apply_diff(prods)
+        self.table.viewport().update()  # Por si cambió el nombre de un proveedor
 
     def _toggle_filter(self, e):
         self.filter_low_stock = not self.filter_low_stock
         self._load_data()
 
-    def _on_table_click(self):
-        row = self.table.currentRow()
-        if row < 0: return
-        self._open_form(self.table.item(row, 0).data(Qt.ItemDataRole.UserRole))
+    def _on_action_click(self, index):
+        if index.column() == self.COL_AJUSTE:
+            self._open_adjustment(self.model.record(index.row()))
+        elif index.column() == self.COL_KARDEX:
+            self._show_kardex(self.model.value(index.row(), 'id'))
+
+    def _on_table_click(self, index):
+        if index.column() in (self.COL_AJUSTE, self.COL_KARDEX): return
+        self._open_form(self.model.record(index.row()))
 
     def _open_form(self, p_data):
         dlg = QDialog(self)
@@ -184,18 +179,18 @@ class InventarioDialog(QDialog):
         dlg.setStyleSheet(self.styleSheet())
         f = QFormLayout(dlg)
         
-        inp_nom = QLineEdit(p_data[3] if p_data else "")
+        inp_nom = QLineEdit(p_data.nombre if p_data else "")
         combo_cat = QComboBox()
-        for c in self.service.get_categorias(): combo_cat.addItem(c[1], c[0])
+        for c in self.service.get_categorias(): combo_cat.addItem(c.nombre, c.id)
         if p_data: 
-            idx = combo_cat.findData(p_data[4])
+            idx = combo_cat.findData(p_data.categoria_id)
             if idx>=0: combo_cat.setCurrentIndex(idx)
             
         combo_prov = QComboBox()
         combo_prov.addItem("Sin Proveedor", None)
-        for pr in self.prov_service.get_all(): combo_prov.addItem(pr[1], pr[0])
-        if p_data and len(p_data)>13:
-            idx = combo_prov.findData(p_data[13])
+        for pr in self.prov_service.get_all(): combo_prov.addItem(pr.empresa, pr.id)
+        if p_data:
+            idx = combo_prov.findData(p_data.proveedor_id)
             if idx>=0: combo_prov.setCurrentIndex(idx)
             
         def mk_spin(float_val=False):
@@ -206,16 +201,16 @@ class InventarioDialog(QDialog):
             return s
             
         s_costo = mk_spin(True)
-        s_costo.setValue(p_data[12] if p_data and len(p_data)>12 else 0)
+        s_costo.setValue((p_data.precio_compra if p_data else 0) or 0)
         s_precio = mk_spin(True)
-        s_precio.setValue(p_data[6] if p_data else 0)
+        s_precio.setValue(p_data.precio_venta if p_data else 0)
         s_stock = mk_spin(False)
-        s_stock.setValue(p_data[7] if p_data else 0)
+        s_stock.setValue(p_data.stock_actual if p_data else 0)
         if p_data: s_stock.setEnabled(False)
         s_min = mk_spin(False)
-        s_min.setValue(p_data[8] if p_data else 0)
+        s_min.setValue(p_data.stock_minimo if p_data else 0)
         
-        inp_bar = QLineEdit(p_data[2] if p_data else "")
+        inp_bar = QLineEdit((p_data.codigo_barras or "") if p_data else "")
         
         # === FORMULARIO ORDENADO LÓGICAMENTE ===
         
@@ -289,7 +284,7 @@ class InventarioDialog(QDialog):
             'proveedor_id': prov.currentData()
         }
         if p_data:
-            res = self.service.update_producto(p_data[0], **args)
+            res = self.service.update_producto(p_data.id, **args)
         else:
             args['stock_inicial'] = st.value()
             res = self.service.create_producto(**args)
@@ -301,12 +296,12 @@ class InventarioDialog(QDialog):
 
     def _open_adjustment(self, p_data):
         dlg = QDialog(self)
-        dlg.setWindowTitle(f"Ajuste: {p_data[3]}")
+        dlg.setWindowTitle(f"Ajuste: {p_data.nombre}")
         dlg.setFixedSize(300, 250)
         dlg.setStyleSheet(self.styleSheet())
         l = QVBoxLayout(dlg)
         
-        l.addWidget(QLabel(f"Stock Actual: {p_data[7]}"))
+        l.addWidget(QLabel(f"Stock Actual: {p_data.stock_actual}"))
         
         c_tipo = QComboBox()
         c_tipo.addItems(["Entrada (Compra/Devolución)", "Salida (Merma/Uso)"])
@@ -327,7 +322,7 @@ class InventarioDialog(QDialog):
         def apply():
             tipo = "entrada" if c_tipo.currentIndex() == 0 else "salida"
             res = self.inv_service.registrar_movimiento(
-                p_data[0], tipo, spin.value(), motivo.text(), "ajuste_manual"
+                p_data.id, tipo, spin.value(), motivo.text(), "ajuste_manual"
             )
             if res.success:
                 QMessageBox.information(dlg, "Éxito", "Stock actualizado")
@@ -355,10 +350,10 @@ class InventarioDialog(QDialog):
         t.setRowCount(0)
         for r, m in enumerate(movs):
             t.insertRow(r)
-            t.setItem(r, 0, QTableWidgetItem(m[0]))
-            t.setItem(r, 1, QTableWidgetItem(m[1].upper()))
-            t.setItem(r, 2, QTableWidgetItem(str(m[2])))
-            t.setItem(r, 3, QTableWidgetItem(m[5]))
+            t.setItem(r, 0, QTableWidgetItem(m.fecha_hora))
+            t.setItem(r, 1, QTableWidgetItem(m.tipo_movimiento.upper()))
+            t.setItem(r, 2, QTableWidgetItem(str(m.cantidad)))
+            t.setItem(r, 3, QTableWidgetItem(m.motivo))
         dlg.exec()
 
 
@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+"""
+Pestañas que construyen su vista la primera vez que se abren
+
+Cada vista instancia servicios y consulta la BD en su constructor; armarlas
+todas al arrancar retrasa la primera ventana aunque el usuario solo abra una
+o dos. LazyTabWidget agrega una página vacía con una fábrica y llama a la
+fábrica cuando la pestaña se activa por primera vez.
+
+Uso:
+    tabs = LazyTabWidget()
+    tabs.add_lazy_tab(self._create_market, "🛒 Market")
+"""
+import time
+from PyQt6.QtCore import Qt
+from PyQt6.QtWidgets import QApplication, QLabel, QTabWidget, QVBoxLayout, QWidget
+from core.logger import logger
+
+
+class _LazyPage(QWidget):
+    """Página contenedora: aloja la vista cuando se construye"""
+
+    def __init__(self, factory, label):
+        super().__init__()
+        self.factory = factory
+        self.label = label
+        self.view = None
+        self._layout = QVBoxLayout(self)
+        self._layout.setContentsMargins(0, 0, 0, 0)
+
+    def ensure_view(self):
+        """Construye la vista si aún no existe y la devuelve."""
+        if self.view is not None:
+            return self.view
+
+        inicio = time.perf_counter()
+        QApplication.setOverrideCursor(Qt.CursorShape.WaitCursor)
+        try:
+            self.view = self.factory()
+        except Exception as e:
+            logger.error(f"No se pudo construir la pestaña {self.label}: {e}")
+            self.view = QLabel(f"⚠️ No se pudo cargar esta sección:\n{e}")
+            self.view.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        finally:
+            QApplication.restoreOverrideCursor()
+        self.factory = None
+
+        self._layout.addWidget(self.view)
+        logger.info(f"Pestaña {self.label} construida en {(time.perf_counter() - inicio) * 1000:.0f} ms")
+        return self.view
+
+
+class LazyTabWidget(QTabWidget):
+    """QTabWidget con pestañas de construcción diferida"""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.currentChanged.connect(self._on_current_changed)
+
+    def add_lazy_tab(self, factory, label):
+        """
+        Agrega una pestaña cuya vista se crea al activarla.
+
+        Args:
+            factory: Función sin argumentos que devuelve la vista (QWidget)
+            label: Texto de la pestaña
+
+        Returns:
+            int: Índice de la pestaña
+        """
+        return self.addTab(_LazyPage(factory, label), label)
+
+    def view(self, index):
+        """
+        Vista de una pestaña, construyéndola si hace falta.
+
+        Args:
+            index: Índice de la pestaña
+
+        Returns:
+            QWidget: La vista (o None si el índice no existe)
+        """
+        widget = self.widget(index)
+        if isinstance(widget, _LazyPage):
+            return widget.ensure_view()
+        return widget
+
+    def is_built(self, index):
+        """True si la vista de la pestaña ya fue construida."""
+        widget = self.widget(index)
+        return not isinstance(widget, _LazyPage) or widget.view is not None
+
+    def _on_current_changed(self, index):
+        if index >= 0:
+            self.view(index)
@@ -3,13 +3,10 @@
 Ventana principal con pestañas
 """
 import os
-from PyQt6.QtWidgets import QMainWindow, QTabWidget, QLabel, QVBoxLayout, QWidget
-from PyQt6.QtGui import QIcon
-from ui.members_view import MembersView
-from ui.attendance_view import AttendanceView
-from ui.plans_view import PlansView
-from ui.market_view import MarketView
-from ui.caja_view import CajaView
+from PyQt6.QtCore import pyqtSignal
+from PyQt6.QtWidgets import QMainWindow, QLabel, QVBoxLayout, QWidget
+from PyQt6.QtGui import QIcon, QKeySequence, QShortcut
+from ui.lazy_tabs import LazyTabWidget
 
 class DashboardView(QWidget):
     """Vista de inicio/dashboard"""
@@ -27,8 +24,13 @@ class DashboardView(QWidget):
 
 class MainWindow(QMainWindow):
     """Ventana principal de la aplicación"""
+
+    # Se emite una sola vez, al pintarse la ventana por primera vez (medición del arranque)
+    primer_pintado = pyqtSignal()
+
     def __init__(self):
         super().__init__()
+        self._pintada = False
         self.setWindowTitle("GymManager PRO | Sistema de Gestión")
         self.setGeometry(100, 100, 1200, 700)
         
@@ -36,11 +38,25 @@ class MainWindow(QMainWindow):
         self._set_window_icon()
         # ======================================
 
-        self.tab_widget = QTabWidget()
+        self.tab_widget = LazyTabWidget()
         self.setCentralWidget(self.tab_widget)
 
         self._setup_tabs()
 
+        # Panel de diagnóstico de consultas (oculto, solo por atajo)
+        QShortcut(QKeySequence("Ctrl+Shift+D"), self, activated=self._open_diagnostics)
+
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        if not self._pintada:
+            self._pintada = True
+            self.primer_pintado.emit()
+
+    def _open_diagnostics(self):
+        """Abre el panel con el top de consultas SQL de la sesión"""
+        from ui.diagnostics_dialog import DiagnosticsDialog
+        DiagnosticsDialog(self).exec()
+
     def _set_window_icon(self):
         """
         Configura el ícono de la ventana.
@@ -100,30 +116,58 @@ class MainWindow(QMainWindow):
             print(f"   Nombres buscados: {', '.join(possible_names[:5])}")
 
     def _setup_tabs(self):
-        """Configura todas las pestañas en el orden correcto"""
+        """
+        Configura todas las pestañas en el orden correcto.
+
+        🔥 Solo el Inicio se construye al arrancar: cada vista (y su módulo)
+        se crea la primera vez que se abre su pestaña (ui/lazy_tabs.py).
+        """
+        self.tab_members = None
+        self.tab_attendance = None
+        self.tab_plans = None
+        self.tab_market = None
+        self.tab_caja = None
+
         # 1. Dashboard
         self.tab_dashboard = DashboardView()
         self.tab_widget.addTab(self.tab_dashboard, "🏠 Inicio")
 
         # 2. Gestión de Miembros (PRIMERO)
-        self.tab_members = MembersView()
-        self.tab_widget.addTab(self.tab_members, "👥 Gestión de Miembros")
+        self.tab_widget.add_lazy_tab(self._create_members, "👥 Gestión de Miembros")
 
         # 3. Check-in / Asistencias (SEGUNDO)
-        self.tab_attendance = AttendanceView()
-        self.tab_widget.addTab(self.tab_attendance, "🏃 Check-in / Asistencia")
-        
-        # 🔥 ENLAZAR DESPUÉS DE CREAR AMBAS
-        self.tab_members.attendance_view = self.tab_attendance
+        self.tab_widget.add_lazy_tab(self._create_attendance, "🏃 Check-in / Asistencia")
 
         # 4. Planes
-        self.tab_plans = PlansView()
-        self.tab_widget.addTab(self.tab_plans, "💰 Planes y Tarifas")
+        self.tab_widget.add_lazy_tab(self._create_plans, "💰 Planes y Tarifas")
         
         # 5. Market
-        self.tab_market = MarketView()
-        self.tab_widget.addTab(self.tab_market, "🛒 Market")
+        self.tab_widget.add_lazy_tab(self._create_market, "🛒 Market")
         
         # 6. Caja
+        self.tab_widget.add_lazy_tab(self._create_caja, "💰 Caja")
+
+    def _create_members(self):
+        from ui.members_view import MembersView
+        self.tab_members = MembersView()
+        return self.tab_members
+
+    def _create_attendance(self):
+        from ui.attendance_view import AttendanceView
+        self.tab_attendance = AttendanceView()
+        return self.tab_attendance
+
+    def _create_plans(self):
+        from ui.plans_view import PlansView
+        self.tab_plans = PlansView()
+        return self.tab_plans
+
+    def _create_market(self):
+        from ui.market_view import MarketView
+        self.tab_market = MarketView()
+        return self.tab_market
+
+    def _create_caja(self):
+        from ui.caja_view import CajaView
         self.tab_caja = CajaView()
-        self.tab_widget.addTab(self.tab_caja, "💰 Caja")
+        return self.tab_caja
@@ -9,6 +9,7 @@ from PyQt6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QLabel,
                              QMessageBox, QFormLayout, QWidget)
 from PyQt6.QtCore import Qt
 from PyQt6.QtGui import QFont
+from api.client import service_for
 from services.benefit_service import BenefitService
 from core.logger import logger
 
@@ -17,7 +18,7 @@ class ManageBenefitsDialog(QDialog):
     
     def __init__(self, parent=None):
         super().__init__(parent)
-        self.benefit_service = BenefitService()
+        self.benefit_service = service_for(BenefitService)
         
         self.setWindowTitle("Gestionar Tipos de Beneficios")
         self.setModal(True)
@@ -267,7 +268,7 @@ class BenefitFormDialog(QDialog):
     def __init__(self, parent=None, benefit=None):
         super().__init__(parent)
         self.benefit = benefit
-        self.benefit_service = BenefitService()
+        self.benefit_service = service_for(BenefitService)
         self.is_edit = benefit is not None
         
         title = "Editar Beneficio" if self.is_edit else "Nuevo Beneficio"
@@ -405,14 +406,7 @@ class BenefitFormDialog(QDialog):
         if self.is_edit:
             codigo = self.benefit_codigo  # Usar código existente
         else:
-            # Obtener el máximo código existente
-            from core.database_manager import get_connection
-            conn = get_connection()
-            cursor = conn.cursor()
-            cursor.execute("SELECT MAX(CAST(SUBSTR(codigo, 4) AS INTEGER)) FROM benefit_types WHERE codigo LIKE 'BEN%'")
-            max_code = cursor.fetchone()[0] or 0
-            conn.close()
-            codigo = f"BEN{str(max_code + 1).zfill(3)}"
+            codigo = self.benefit_service.get_next_benefit_code()
         
         # Mapear tipo
         tipo_map = {
@@ -8,27 +8,41 @@ from PyQt6.QtWidgets import (
 from PyQt6.QtCore import Qt, QTimer
 from PyQt6.QtGui import QColor, QKeySequence, QShortcut
 
+from api.client import service_for
+from core.config import Config
 from services.producto_service import ProductoService
 from services.venta_service import VentaService
 from services.member_service import MemberService
 from services.benefit_service import BenefitService
 from services.caja_service import CajaService
+from services.catalog_index import get_catalog_index
 from ui.inventario_dialog import InventarioDialog
 from ui.historial_ventas_dialog import HistorialVentasDialog
+from core.events import CashBalanceChanged, StockChanged, ProductChanged
+from ui.async_bridge import get_bridge
+from ui.event_relay import get_relay
+from ui.table_model import Column, ColumnTableModel, GridView
 
 class MarketView(QWidget):
+    COL_AGREGAR = 4  # Columna "➕" del catálogo
+
     def __init__(self):
         super().__init__()
-        self.producto_service = ProductoService()
-        self.venta_service = VentaService()
-        self.member_service = MemberService()
-        self.benefit_service = BenefitService()
-        self.caja_service = CajaService()
+        self.producto_service = service_for(ProductoService)
+        self.venta_service = service_for(VentaService)
+        self.member_service = service_for(MemberService)
+        self.benefit_service = service_for(BenefitService)
+        self.caja_service = service_for(CajaService)
+        # 🔥 Catálogo en memoria: categorías, búsqueda y escaneos sin consultar la BD
+        self.catalogo = get_catalog_index()
+        # 🔥 Las consultas corren fuera del hilo de la GUI (ui/async_bridge.py)
+        self.bridge = get_bridge()
         
         self.carrito = [] 
         self.cliente_actual = None 
         self.descuento_global = 0
         self.categoria_activa = None
+        self._cobrando = False
         
         # Stack: 0=Bloqueo, 1=Venta
         self.stack = QStackedWidget()
@@ -52,10 +66,17 @@ class MarketView(QWidget):
         self.shortcut_enter2 = QShortcut(QKeySequence(Qt.Key.Key_Enter), self) # Numpad Enter
         self.shortcut_enter2.activated.connect(self._cobrar)
 
-        # Timer Caja
+        # 🔥 Apertura/cierre de caja llegan como evento; una terminal remota
+        # sigue sondeando (no recibe los eventos de las demás terminales)
+        relay = get_relay()
+        relay.subscribe(CashBalanceChanged, lambda e: self._on_caja_estado(e.sesion), owner=self)
+        # El índice ya se actualizó al llegar el evento: se repintan las filas visibles
+        relay.subscribe(StockChanged, self._on_catalogo)
+        relay.subscribe(ProductChanged, self._on_catalogo)
         self.timer = QTimer(self)
         self.timer.timeout.connect(self._check_caja)
-        self.timer.start(2000)
+        if Config.API_URL:
+            self.timer.start(Config.UI_CAJA_POLL_MS)
         self._check_caja()
 
     def _setup_locked_screen(self):
@@ -139,15 +160,22 @@ class MarketView(QWidget):
         left.addWidget(scroll)
         
         # Tabla Catalogo (Con SKU)
-        self.table_cat = QTableWidget()
-        self.table_cat.setColumnCount(5)
-        self.table_cat.setHorizontalHeaderLabels(["SKU", "Producto", "Precio", "Stock", ""])
+        # 🔥 El "➕" es una columna del modelo (no un QPushButton por fila)
+        self.cat_model = ColumnTableModel([
+            Column("SKU", 'sku'),
+            Column("Producto", 'nombre'),
+            Column("Precio", 'precio_venta', fmt=lambda v: f"S/ {v:.2f}"),
+            Column("Stock", 'stock_actual',
+                   color=lambda p: "#ef4444" if p.stock_actual <= p.stock_minimo else None),
+            Column("", 'id', fmt=lambda v: "➕", background="#22c55e",
+                   align=Qt.AlignmentFlag.AlignCenter),
+        ], key='id', parent=self)
+        self.table_cat = GridView(self.cat_model)
         self.table_cat.horizontalHeader().setSectionResizeMode(1, QHeaderView.ResizeMode.Stretch)
         self.table_cat.verticalHeader().setVisible(False)
-        self.table_cat.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
-        self.table_cat.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
-        self.table_cat.doubleClicked.connect(self._add_cart)
-        self.table_cat.setStyleSheet("QTableWidget { background: #0f172a; border: 1px solid #334155; border-radius: 6px; }")
+        self.table_cat.clicked.connect(self._on_cell_clicked)
+        self.table_cat.doubleClicked.connect(self._add_from_double_click)
+        self.table_cat.setStyleSheet("QTableView { background: #0f172a; border: 1px solid #334155; border-radius: 6px; }")
         self.table_cat.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Expanding)
         left.addWidget(self.table_cat)
         
@@ -238,16 +266,23 @@ class MarketView(QWidget):
 
     # --- LÓGICA ---
     def _check_caja(self):
-        is_open = self.caja_service.get_sesion_abierta() is not None
-        self.stack.setCurrentIndex(1 if is_open else 0)
+        # Si la consulta anterior sigue en curso (BD ocupada) no se lanza otra
+        self.bridge.submit(self.caja_service.get_sesion_abierta, on_result=self._on_caja_estado,
+                           key='caja', skip_if_busy=True)
+
+    def _on_caja_estado(self, sesion):
+        self.stack.setCurrentIndex(1 if sesion is not None else 0)
 
     def _load_cats(self):
+        self.bridge.submit(self.producto_service.get_categorias, on_result=self._pintar_cats,
+                           key='categorias')
+
+    def _pintar_cats(self, cats):
         # Limpiar
         while self.cat_layout.count():
             item = self.cat_layout.takeAt(0)
             if item.widget(): item.widget().deleteLater()
             
-        cats = self.producto_service.get_categorias()
         # Ordenar Otros al final
         otros = [c for c in cats if "otro" in c[1].lower()]
         norm = [c for c in cats if "otro" not in c[1].lower()]
@@ -279,91 +314,79 @@ class MarketView(QWidget):
         lbl.setStyleSheet("padding: 5px; font-size: 14px; font-weight: bold; color: #3b82f6; border-bottom: 2px solid #3b82f6;")
         
         if cid is None: self._load_top10()
+        else: self._mostrar(self.catalogo.by_category, cid)
+
+    def _mostrar(self, consulta, *args, delay_ms=0):
+        """
+        Llena el catálogo con ``consulta(*args)`` del índice.
+
+        Con el índice cargado se resuelve en el acto (microsegundos), aunque
+        esté vencido: la recarga por TTL corre en segundo plano. Solo la
+        primera carga se espera fuera del hilo de la GUI.
+        """
+        self._refrescar_catalogo()
+        if self.catalogo.ready():
+            # Descarta una consulta en curso que llegaría después con datos viejos
+            self.bridge.cancel(self, 'productos')
+            self._fill_table(consulta(*args))
         else:
-            prods = self.producto_service.get_all_productos()
-            filtered = [p for p in prods if p[4] == cid]
-            self._fill_table(filtered)
+            self.bridge.submit(consulta, *args, on_result=self._fill_table,
+                               key='productos', delay_ms=delay_ms)
+
+    def _refrescar_catalogo(self):
+        """Índice vencido (TTL): lo recarga en segundo plano y repinta al terminar."""
+        if self.catalogo.stale():
+            self.bridge.submit(self.catalogo.reload, on_result=self._on_catalogo,
+                               owner=self, key='catalogo', skip_if_busy=True)
 
     def _load_top10(self):
+        self.bridge.submit(self._top_productos, on_result=self._fill_table, key='productos')
+
+    def _top_productos(self):
+        """Más vendidos, o los primeros 20 si aún no hay ventas (corre en segundo plano)"""
         prods = self.venta_service.get_productos_mas_vendidos(limit=20)
         if not prods:
-            prods = self.producto_service.get_all_productos()[:20]
-        else:
-            ids = [p[0] for p in prods]
-            all_p = self.producto_service.get_all_productos()
-            prods = [p for p in all_p if p[0] in ids]
-        self._fill_table(prods)
+            return self.catalogo.all()[:20]
+        return self.catalogo.in_catalog_order(p.id for p in prods)
 
     def _filtrar(self, txt):
         if not txt:
             if self.categoria_activa: return
             self._load_top10()
             return
-        prods = self.producto_service.search_productos(txt)
-        self._fill_table(prods)
+        # 🔥 Código de barras o SKU exacto (escáner): solo ese producto
+        self._refrescar_catalogo()
+        if self.catalogo.ready():
+            producto = self.catalogo.by_code(txt)
+            if producto is not None:
+                self.bridge.cancel(self, 'productos')
+                self._fill_table([producto])
+                return
+        self._mostrar(self.catalogo.search, txt, delay_ms=Config.UI_SEARCH_DEBOUNCE_MS)
+
+    def _on_catalogo(self, evento=None):
+        """Stock, productos o el índice completo cambiaron: repinta la lista actual desde el índice."""
+        if not self.catalogo.ready():
+            return
+        txt = self.inp_search.text()
+        if txt:
+            self._filtrar(txt)
+        elif self.categoria_activa is not None:
+            self._fill_table(self.catalogo.by_category(self.categoria_activa))
+        else:
+            # Más vendidos: mismas filas con stock y datos al día
+            visibles = [p.id for p in self.cat_model.records()]
+            self._fill_table(self.catalogo.get_many(visibles))
 
     def _fill_table(self, prods):
-        self.table_cat.setRowCount(0)
-        
-        for r, p in enumerate(prods):
-            self.table_cat.insertRow(r)
-            
-            # Columnas de datos
-            self.table_cat.setItem(r, 0, QTableWidgetItem(str(p[1])))  # SKU
-            self.table_cat.setItem(r, 1, QTableWidgetItem(p[3]))        # Nombre
-            self.table_cat.setItem(r, 2, QTableWidgetItem(f"S/ {p[6]:.2f}"))  # Precio
-            
-            # Stock con color
-            st = QTableWidgetItem(str(p[7]))
-            if p[7] <= p[8]: 
-                st.setForeground(QColor("#ef4444"))
-            self.table_cat.setItem(r, 3, st)
-            
-            # BOTÓN + REAL (no item de tabla)
-            btn_add = QPushButton("➕")
-            btn_add.setStyleSheet("""
-                QPushButton {
-                    background: #22c55e;
-                    color: white;
-                    border: none;
-                    border-radius: 4px;
-                    font-size: 16px;
-                    font-weight: bold;
-                    padding: 6px;
-                }
-                QPushButton:hover {
-                    background: #16a34a;
-                }
-                QPushButton:pressed {
-                    background: #15803d;
-                }
-            """)
-            btn_add.clicked.connect(lambda checked, row=r: self._add_from_button(row))
-            self.table_cat.setCellWidget(r, 4, btn_add)
-            
-            # Guardar datos del producto
-            self.table_cat.item(r, 0).setData(Qt.ItemDataRole.UserRole, p)
-        
-        # Permitir doble click también
-        try:
-            self.table_cat.cellDoubleClicked.disconnect()
-        except:
-            pass
-        self.table_cat.cellDoubleClicked.connect(self._add_from_double_click)
+        # Mismos productos (ej: tras una venta): solo se repintan las filas que cambiaron
+        self.cat_model.apply_diff(prods)
 
-    def _add_from_button(self, row):
-        """Agregar producto desde botón +"""
-        p = self.table_cat.item(row, 0).data(Qt.ItemDataRole.UserRole)
-        if p:
-            self._add_product_to_cart(p)
-    
-    def _add_from_double_click(self, row, col):
+    def _add_from_double_click(self, index):
         """Agregar producto con doble click"""
-        if col == 4:  # Ignora si es en el botón
+        if index.column() == self.COL_AGREGAR:  # El clic simple ya lo agregó
             return
-        p = self.table_cat.item(row, 0).data(Qt.ItemDataRole.UserRole)
-        if p:
-            self._add_product_to_cart(p)
+        self._add_product_to_cart(self.cat_model.record(index.row()))
     
     def _add_product_to_cart(self, p):
         """Función unificada para agregar productos al carrito"""
@@ -389,11 +412,11 @@ class MarketView(QWidget):
         self.carrito.append({'data': p, 'cant': 1})
         self._render_cart()
 
-    def _on_cell_clicked(self, row, col):
+    def _on_cell_clicked(self, index):
         """Maneja clicks en la tabla de productos"""
-        if col == 4:  # Columna del botón +
-            p = self.table_cat.item(row, 0).data(Qt.ItemDataRole.UserRole)
-            if p and p[7] > 0:  # Hay stock
+        if index.column() == self.COL_AGREGAR:  # Columna del botón +
+            p = self.cat_model.record(index.row())
+            if p[7] > 0:  # Hay stock
                 self._add_product_to_cart(p)
     
     def _add_product_to_cart(self, p):
@@ -415,22 +438,6 @@ class MarketView(QWidget):
         self.carrito.append({'data': p, 'cant': 1})
         self._render_cart()
 
-    def _add_cart(self):
-        row = self.table_cat.currentRow()
-        if row < 0: return
-        p = self.table_cat.item(row, 0).data(Qt.ItemDataRole.UserRole)
-        
-        if p[7] <= 0: return
-        
-        for item in self.carrito:
-            if item['data'][0] == p[0]:
-                item['cant'] += 1
-                self._render_cart()
-                return
-        
-        self.carrito.append({'data': p, 'cant': 1})
-        self._render_cart()
-
     def _render_cart(self):
         """Renderiza el carrito con controles mejorados"""
         self.table_cart.setRowCount(0)
@@ -631,8 +638,9 @@ class MarketView(QWidget):
             self._render_cart()
 
     def _cobrar(self):
-        if not self.carrito: return
-        if not self.caja_service.get_sesion_abierta():
+        if not self.carrito or self._cobrando: return
+        # Estado del último sondeo; la venta vuelve a verificarlo en segundo plano
+        if self.stack.currentIndex() != 1:
             QMessageBox.warning(self, "Caja Cerrada", "No se puede vender.")
             return
         
@@ -675,9 +683,22 @@ class MarketView(QWidget):
         cli_id = self.cliente_actual[0] if self.cliente_actual else None
         metodo = {"Efectivo":"efectivo", "Yape":"yape", "Plin":"plin", "POS/Banco":"pos_banco"}[self.combo_metodo.currentText()]
         
-        res = self.venta_service.procesar_venta(cli_type, cli_id, tot, metodo, items)
-        
-        if res.success:
+        self._cobrando = True
+        self.bridge.submit(self._vender, cli_type, cli_id, tot, metodo, items,
+                           on_result=self._on_venta, on_error=self._on_venta_error)
+
+    def _vender(self, cli_type, cli_id, tot, metodo, items):
+        """Verifica la caja y registra la venta (corre en segundo plano)"""
+        if not self.caja_service.get_sesion_abierta():
+            return None
+        return self.venta_service.procesar_venta(cli_type, cli_id, tot, metodo, items)
+
+    def _on_venta(self, res):
+        self._cobrando = False
+        if res is None:
+            QMessageBox.warning(self, "Caja Cerrada", "No se puede vender.")
+            self._check_caja()
+        elif res.success:
             QMessageBox.information(self, "Éxito", "Venta registrada")
             self.carrito = []
             self._render_cart()
@@ -685,6 +706,10 @@ class MarketView(QWidget):
         else:
             QMessageBox.critical(self, "Error", res.message)
 
+    def _on_venta_error(self, error):
+        self._cobrando = False
+        QMessageBox.critical(self, "Error", str(error))
+
     def _buscar_cliente(self):
         dlg = QDialog(self)
         dlg.setWindowTitle("Buscar")
@@ -696,14 +721,17 @@ class MarketView(QWidget):
         l.addWidget(btn)
         
         def buscar():
-            m = self.member_service.find_member_by_identifier(inp.text())
-            if m:
+            btn.setEnabled(False)
+            self.bridge.submit(self._buscar_miembro, inp.text(), on_result=encontrado, owner=dlg)
+
+        def encontrado(res):
+            btn.setEnabled(True)
+            if res:
+                m, descuento = res
                 self.cliente_actual = m
                 self.lbl_cli.setText(m[1])
-                benefits = self.benefit_service.get_member_benefits(m[0])
-                for b in benefits:
-                    if b['config'].get('enabled') and 'market' in b.get('nombre','').lower():
-                        self.descuento_global = b['config'].get('descuento_porcentaje', 0)
+                if descuento is not None:
+                    self.descuento_global = descuento
                 self.lbl_desc.setText(f"Desc: {self.descuento_global}%")
                 self._render_cart()
                 dlg.accept()
@@ -712,6 +740,17 @@ class MarketView(QWidget):
         btn.clicked.connect(buscar)
         dlg.exec()
 
+    def _buscar_miembro(self, identificador):
+        """Miembro y su descuento de Market (corre en segundo plano)"""
+        m = self.member_service.find_member_by_identifier(identificador)
+        if not m:
+            return None
+        descuento = None
+        for b in self.benefit_service.get_member_benefits(m[0]):
+            if b['config'].get('enabled') and 'market' in b.get('nombre','').lower():
+                descuento = b['config'].get('descuento_porcentaje', 0)
+        return m, descuento
+
     def _open_inventario(self):
         InventarioDialog(self).exec()
         self._load_top10()
@@ -7,20 +7,19 @@ from PyQt6.QtWidgets import *
 from PyQt6.QtCore import Qt, QDate, pyqtSignal
 from PyQt6.QtGui import QPixmap, QPainter, QPainterPath, QColor
 from datetime import datetime
-from matplotlib.backends.backend_qtagg import FigureCanvasQTAgg as FigureCanvas
-from matplotlib.figure import Figure
-import matplotlib.dates as mdates
-import numpy as np
-import sqlite3
+from api.client import service_for
 from services.attendance_service import AttendanceService
 from services.member_service import MemberService
 from services.payment_service import PaymentService
-from models.payment_model import PaymentModel
 from core.config import Config
+from core.events import PaymentRegistered, PaymentDeleted, CheckInRecorded, CheckInDeleted
 from services.note_service import NoteService
 from services.category_service import CategoryService
 from services.benefit_service import BenefitService
+from services.measurement_service import MeasurementService
 from ui.benefits_tooltip import BenefitsTooltip
+from ui.async_bridge import get_bridge
+from ui.event_relay import get_relay
 
 class MedidasChartWidget(QWidget):
     """Widget para gráficos de mediciones corporales"""
@@ -28,6 +27,10 @@ class MedidasChartWidget(QWidget):
 
     def __init__(self, parent=None):
         super().__init__(parent)
+        # 🔥 matplotlib se importa recién al abrir la pestaña (no al arrancar la app)
+        from matplotlib.backends.backend_qtagg import FigureCanvasQTAgg as FigureCanvas
+        from matplotlib.figure import Figure
+
         # 🔥 FONDO OSCURO PARA EVITAR CUADRO BLANCO
         self.setStyleSheet("background-color: #0f172a;")
         
@@ -44,12 +47,14 @@ class MedidasChartWidget(QWidget):
         self.mediciones = []
         self.canvas.mpl_connect("button_press_event", self._on_click)
 
-        self.category_service = CategoryService()
-        self.benefit_service = BenefitService()
+        self.category_service = service_for(CategoryService)
+        self.benefit_service = service_for(BenefitService)
         self.current_categoria_id = None        
 
     def actualizar_grafico_multiple(self, data, claves, label):
         """Actualiza gráfico con múltiples métricas"""
+        import matplotlib.dates as mdates
+
         self.mediciones = data
         self.figure.clear()
         ax = self.figure.add_subplot(111)
@@ -101,11 +106,12 @@ class MedidasChartWidget(QWidget):
         """Detecta clicks en puntos del gráfico"""
         if not self.mediciones or not event.xdata:
             return
+        import matplotlib.dates as mdates
         
         click_fecha = mdates.num2date(event.xdata).date()
         fechas = [datetime.strptime(m["fecha"], Config.DATE_FORMAT).date() for m in self.mediciones]
         distancias = [abs((f - click_fecha).days) for f in fechas]
-        idx = np.argmin(distancias)
+        idx = min(range(len(distancias)), key=distancias.__getitem__)
         
         if distancias[idx] <= 5:  # Solo si está cerca
             self.punto_clickeado.emit(self.mediciones[idx])
@@ -113,9 +119,6 @@ class MedidasChartWidget(QWidget):
 
 class Member360Dialog(QDialog):
     """Vista 360 completa del miembro"""
-    
-    asistencia_registrada = pyqtSignal()
-    pago_registrado = pyqtSignal()
 
     def __init__(self, member_data, parent=None):
         super().__init__(parent)
@@ -126,9 +129,14 @@ class Member360Dialog(QDialog):
         self.edit_mode = False
         self.mediciones_data = []
         self.chips = []
-        self.note_service = NoteService()
-        self.category_service = CategoryService()
-        self.benefit_service = BenefitService()
+        # 🔥 Servicios locales o del servidor POS (terminal): ver api/client.py
+        self.member_service = service_for(MemberService)
+        self.note_service = service_for(NoteService)
+        self.measurement_service = service_for(MeasurementService)
+        self.category_service = service_for(CategoryService)
+        self.benefit_service = service_for(BenefitService)
+        # 🔥 Cada pestaña carga sus datos en segundo plano: el diálogo abre al instante
+        self.bridge = get_bridge()
         self._apply_dark_style()
         self._build_header()
         self._build_tabs()
@@ -138,6 +146,34 @@ class Member360Dialog(QDialog):
         root.addWidget(self.tabs)
         self.setLayout(root)
 
+        # 🔥 Pagos y asistencias del miembro registrados en cualquier vista o terminal
+        relay = get_relay()
+        self._suscripciones = [
+            (tipo, relay.subscribe(tipo, slot)) for tipo, slot in (
+                (PaymentRegistered, self._on_pago),
+                (PaymentDeleted, self._on_pago),
+                (CheckInRecorded, self._on_asistencia),
+                (CheckInDeleted, self._on_asistencia),
+            )
+        ]
+
+    def done(self, r):
+        """Al cerrar se descartan las consultas pendientes y las suscripciones del diálogo"""
+        self.bridge.cancel(self)
+        relay = get_relay()
+        for tipo, handler in self._suscripciones:
+            relay.unsubscribe(tipo, handler)
+        self._suscripciones = []
+        super().done(r)
+
+    def _on_pago(self, evento):
+        if evento.miembro_id in (None, self.member.get('id')):
+            self._load_payment_history()
+
+    def _on_asistencia(self, evento):
+        if evento.miembro_id == self.member.get('id'):
+            self._filter_asistencias()
+
     def _apply_dark_style(self):
         """Estilos dark UI"""
         self.setStyleSheet("""
@@ -222,11 +258,33 @@ class Member360Dialog(QDialog):
             font-size: 11pt;
         """)
 
-        # Categoría desde BD real
-        self.current_categoria_id = self._get_member_categoria()
+        # Categoría desde BD real (llega en segundo plano)
+        self.current_categoria_id = None
+        badges_layout.addWidget(state_badge)
+        badges_layout.addStretch()
+        self.badges_layout = badges_layout
+        self.bridge.submit(self._leer_categoria, on_result=self._pintar_categoria, key='categoria')
 
+        info_layout.addWidget(name_label)
+        info_layout.addWidget(since_label)
+        info_layout.addLayout(badges_layout)
+        
+        self.header_layout.addWidget(self.avatar_label)
+        self.header_layout.addSpacing(16)
+        self.header_layout.addLayout(info_layout)
+        self.header_layout.addStretch()
+
+    def _leer_categoria(self):
+        """Categoría vigente del miembro y sus datos (corre en segundo plano)"""
+        categoria_id = self._get_member_categoria()
+        if not categoria_id:
+            return None, None
+        return categoria_id, self.category_service.get_category_by_id(categoria_id)
+
+    def _pintar_categoria(self, datos):
+        """Agrega a la cabecera el badge de categoría y el botón de beneficios"""
+        self.current_categoria_id, categoria_obj = datos
         if self.current_categoria_id:
-            categoria_obj = self.category_service.get_category_by_id(self.current_categoria_id)
             if categoria_obj:
                 categoria_badge = QLabel(f"🏷️ {categoria_obj['nombre']}")
                 categoria_badge.setStyleSheet(f"""
@@ -259,26 +317,9 @@ class Member360Dialog(QDialog):
                 """)
                 self.info_btn.clicked.connect(self._show_benefits_tooltip)
                 
-                badges_layout.addWidget(state_badge)
-                badges_layout.addWidget(categoria_badge)
-                badges_layout.addWidget(self.info_btn)
-            else:
-                # Sin categoría asignada
-                badges_layout.addWidget(state_badge)
-        else:
-            # Sin categoría
-            badges_layout.addWidget(state_badge)
-
-        badges_layout.addStretch()
-
-        info_layout.addWidget(name_label)
-        info_layout.addWidget(since_label)
-        info_layout.addLayout(badges_layout)
-        
-        self.header_layout.addWidget(self.avatar_label)
-        self.header_layout.addSpacing(16)
-        self.header_layout.addLayout(info_layout)
-        self.header_layout.addStretch()
+                # Después del badge de estado, antes del stretch
+                self.badges_layout.insertWidget(1, categoria_badge)
+                self.badges_layout.insertWidget(2, self.info_btn)
 
     def _build_tabs(self):
         """Construye todas las pestañas"""
@@ -298,46 +339,13 @@ class Member360Dialog(QDialog):
         Returns:
             int: ID de categoría o None
         """
-        try:
-            miembro_id = self.member.get('id')
-            if not miembro_id:
-                return None
-            
-            # Obtener última membresía activa del miembro
-            from models.payment_model import PaymentModel
-            from models.plan_model import PlanModel
-            
-            payment_model = PaymentModel()
-            plan_model = PlanModel()
-            
-            # Obtener pagos del miembro
-            payments = payment_model.get_payments_by_member_id(miembro_id)
-            
-            if not payments:
-                return None
-            
-            # Buscar el último pago activo
-            for payment in payments:
-                fecha_pago, plan_nombre, monto, fecha_vencimiento = payment
-                
-                # Verificar si está activo (fecha_vencimiento >= hoy)
-                from datetime import date
-                
-                if isinstance(fecha_vencimiento, str):
-                    fecha_venc_obj = datetime.strptime(fecha_vencimiento, Config.DATE_FORMAT).date()
-                else:
-                    fecha_venc_obj = fecha_vencimiento
-                
-                if fecha_venc_obj >= date.today():
-                    # Obtener plan por nombre y su categoría
-                    planes = plan_model.get_all_plans(include_inactive=True)
-                    for plan in planes:
-                        if plan[1] == plan_nombre:  # plan[1] es nombre
-                            if plan[9]:  # plan[9] es categoria_id
-                                return plan[9]
-            
+        miembro_id = self.member.get('id')
+        if not miembro_id:
             return None
         
+        try:
+            # 🔥 Una consulta indexada en el servicio (local o en el servidor POS)
+            return self.benefit_service.get_member_category(miembro_id)
         except Exception as e:
             from core.logger import logger
             logger.error(f"Error al obtener categoría del miembro: {e}")
@@ -423,7 +431,7 @@ class Member360Dialog(QDialog):
 
     def _save_profile(self):
         """Guarda cambios del perfil"""
-        MemberService().update_member_profile(
+        self.member_service.update_member_profile(
             self.inp_codigo.text().strip(),
             self.inp_nombre.text().strip(),
             self.inp_dni.text().strip(),
@@ -444,7 +452,7 @@ class Member360Dialog(QDialog):
         )
         
         if reply == QMessageBox.StandardButton.Yes:
-            MemberService().delete_member(self.inp_codigo.text().strip())
+            self.member_service.delete_member(self.inp_codigo.text().strip())
             QMessageBox.information(self, "Eliminado", "Miembro eliminado correctamente")
             self.accept()
 
@@ -513,14 +521,15 @@ class Member360Dialog(QDialog):
         )
         if dlg.table_history:
             dlg.table_history.hide()
-        
-        dlg.pago_registrado.connect(self._load_payment_history)
-        dlg.pago_registrado.connect(self.pago_registrado.emit)
+        # El historial se recarga con el evento PaymentRegistered
         dlg.exec()
 
     def _load_payment_history(self):
-        """Carga historial de pagos"""
-        pagos = PaymentService().get_payments_by_codigo(self.member.get('codigo'))
+        """Carga historial de pagos en segundo plano"""
+        self.bridge.submit(service_for(PaymentService).get_payments_by_codigo, self.member.get('codigo'),
+                           on_result=self._fill_payment_history, key='pagos')
+
+    def _fill_payment_history(self, pagos):
         self.pagos_table.setRowCount(0)
         
         for row, (fecha, plan, monto, vence) in enumerate(pagos):
@@ -543,8 +552,11 @@ class Member360Dialog(QDialog):
         """Filtra pagos por rango de fechas"""
         desde = self.pagos_desde.date().toString("yyyy-MM-dd")
         hasta = self.pagos_hasta.date().toString("yyyy-MM-dd")
-        pagos = PaymentService().get_payments_by_codigo(self.member.get('codigo'), desde, hasta)
-        
+        self.bridge.submit(service_for(PaymentService).get_payments_by_codigo,
+                           self.member.get('codigo'), desde, hasta,
+                           on_result=self._fill_pagos_filtrados, key='pagos')
+
+    def _fill_pagos_filtrados(self, pagos):
         self.pagos_table.setRowCount(0)
         for row, (fecha, plan, monto, vence) in enumerate(pagos):
             self.pagos_table.insertRow(row)
@@ -555,7 +567,7 @@ class Member360Dialog(QDialog):
 
     def _extornar_ultimo_pago(self):
         """🔥 EXTORNA EL PAGO MÁS RECIENTE (primero de la lista ordenada DESC)"""
-        pagos = PaymentService().get_payments_by_codigo(self.member.get('codigo'))
+        pagos = service_for(PaymentService).get_payments_by_codigo(self.member.get('codigo'))
         
         if not pagos:
             QMessageBox.information(self, "Sin pagos", "No hay pagos registrados")
@@ -572,15 +584,13 @@ class Member360Dialog(QDialog):
         )
         
         if reply == QMessageBox.StandardButton.Yes:
-            id_pago = PaymentService().get_payment_id_by_fecha_plan_monto(
+            id_pago = service_for(PaymentService).get_payment_id_by_fecha_plan_monto(
                 self.member.get('codigo'), fecha, plan, monto
             )
             if id_pago:
-                resultado = PaymentService().delete_payment_by_id(id_pago)
+                resultado = service_for(PaymentService).delete_payment_by_id(id_pago)
                 if resultado.get("success"):
                     QMessageBox.information(self, "Extornado", "Pago eliminado correctamente")
-                    self._load_payment_history()
-                    self.pago_registrado.emit()
                 else:
                     QMessageBox.critical(self, "Error", resultado.get("message"))
 
@@ -590,90 +600,12 @@ class Member360Dialog(QDialog):
         w = QWidget()
         layout = QVBoxLayout(w)
         
-        # 🔥 KPIS - TARJETAS RESUMEN
-        self._cargar_mediciones()
-        
-        kpis_layout = QHBoxLayout()
-        kpis_layout.setSpacing(12)
-        
-        if self.mediciones_data:
-            actual = self.mediciones_data[-1]
-            anterior = self.mediciones_data[-2] if len(self.mediciones_data) > 1 else {}
-        else:
-            actual = {}
-            anterior = {}
-        
-        def crear_kpi(titulo, valor_actual, valor_anterior, unidad=""):
-            card = QFrame()
-            card.setStyleSheet("""
-                QFrame {
-                    background-color: #1e293b; 
-                    border-radius: 8px;
-                }
-            """)
-            card.setMinimumHeight(85)  # 🔥 ALTURA MÍNIMA PARA VER TODO
-            card.setMaximumHeight(100)
-            
-            card_layout = QVBoxLayout(card)
-            card_layout.setSpacing(4)
-            card_layout.setContentsMargins(12, 10, 12, 10)
-            
-            # Título
-            lbl_titulo = QLabel(titulo)
-            lbl_titulo.setStyleSheet("color: #9ca3af; font-size: 10pt; font-weight: bold;")
-            lbl_titulo.setAlignment(Qt.AlignmentFlag.AlignLeft)
-            
-            # Valor con flecha
-            if valor_actual is not None:
-                valor_str = f"{valor_actual:.1f}{unidad}"
-            else:
-                valor_str = "—"
-            
-            # 🔥 FLECHA DE TENDENCIA
-            flecha = ""
-            color_flecha = ""
-            if valor_actual is not None and valor_anterior is not None:
-                diferencia = valor_actual - valor_anterior
-                if diferencia > 0:
-                    flecha = " ▲"
-                    color_flecha = "#22c55e"  # Verde
-                elif diferencia < 0:
-                    flecha = " ▼"
-                    color_flecha = "#ef4444"  # Rojo
-                else:
-                    flecha = " ━"
-                    color_flecha = "#6b7280"  # Gris
-            
-            # Construir HTML del valor
-            if flecha:
-                valor_html = f"{valor_str} <span style='color:{color_flecha}; font-size: 14pt;'>{flecha}</span>"
-            else:
-                valor_html = valor_str
-            
-            lbl_valor = QLabel(valor_html)
-            lbl_valor.setTextFormat(Qt.TextFormat.RichText)
-            lbl_valor.setStyleSheet("color: #e5e7eb; font-size: 20pt; font-weight: bold;")
-            lbl_valor.setAlignment(Qt.AlignmentFlag.AlignLeft)
-            
-            card_layout.addWidget(lbl_titulo)
-            card_layout.addWidget(lbl_valor)
-            card_layout.addStretch()
-            
-            return card
-
-        # 🔥 CREAR LOS KPIs (esto va después de cargar mediciones)
-        if self.mediciones_data:
-            actual = self.mediciones_data[-1]
-            anterior = self.mediciones_data[-2] if len(self.mediciones_data) > 1 else {}
-        else:
-            actual = {}
-            anterior = {}
-
-        kpis_layout.addWidget(crear_kpi("Peso", actual.get('peso'), anterior.get('peso'), " kg"))
-        kpis_layout.addWidget(crear_kpi("% Grasa", actual.get('grasa'), anterior.get('grasa'), "%"))
-        kpis_layout.addWidget(crear_kpi("IMC", actual.get('imc'), anterior.get('imc'), ""))
+        # 🔥 KPIS - TARJETAS RESUMEN (se completan al llegar las mediciones)
+        self.kpis_layout = QHBoxLayout()
+        self.kpis_layout.setSpacing(12)
+        self._pintar_kpis()
                 
-        layout.addLayout(kpis_layout)
+        layout.addLayout(self.kpis_layout)
         layout.addSpacing(10)
         
         # 🔥 CHIPS CON ESTILO VISUAL DE SELECCIÓN
@@ -706,34 +638,102 @@ class Member360Dialog(QDialog):
         self.chart_widget.punto_clickeado.connect(self._mostrar_ficha_medicion)
         layout.addWidget(self.chart_widget)
         
-        # Activar primer chip por defecto
+        # Primer chip activo por defecto (el gráfico se dibuja al llegar los datos)
         if self.chips:
             self.chips[0][0].setChecked(True)
-            self._seleccionar_chip(self.chips[0][1], self.chips[0][2], self.chips[0][0])
+        self._cargar_mediciones()
         
         return w
 
+    def _crear_kpi(self, titulo, valor_actual, valor_anterior, unidad=""):
+        """Tarjeta KPI con el valor actual y la flecha de tendencia"""
+        card = QFrame()
+        card.setStyleSheet("""
+            QFrame {
+                background-color: #1e293b; 
+                border-radius: 8px;
+            }
+        """)
+        card.setMinimumHeight(85)  # 🔥 ALTURA MÍNIMA PARA VER TODO
+        card.setMaximumHeight(100)
+
+        card_layout = QVBoxLayout(card)
+        card_layout.setSpacing(4)
+        card_layout.setContentsMargins(12, 10, 12, 10)
+
+        # Título
+        lbl_titulo = QLabel(titulo)
+        lbl_titulo.setStyleSheet("color: #9ca3af; font-size: 10pt; font-weight: bold;")
+        lbl_titulo.setAlignment(Qt.AlignmentFlag.AlignLeft)
+
+        # Valor con flecha
+        if valor_actual is not None:
+            valor_str = f"{valor_actual:.1f}{unidad}"
+        else:
+            valor_str = "—"
+
+        # 🔥 FLECHA DE TENDENCIA
+        flecha = ""
+        color_flecha = ""
+        if valor_actual is not None and valor_anterior is not None:
+            diferencia = valor_actual - valor_anterior
+            if diferencia > 0:
+                flecha = " ▲"
+                color_flecha = "#22c55e"  # Verde
+            elif diferencia < 0:
+                flecha = " ▼"
+                color_flecha = "#ef4444"  # Rojo
+            else:
+                flecha = " ━"
+                color_flecha = "#6b7280"  # Gris
+
+        # Construir HTML del valor
+        if flecha:
+            valor_html = f"{valor_str} <span style='color:{color_flecha}; font-size: 14pt;'>{flecha}</span>"
+        else:
+            valor_html = valor_str
+
+        lbl_valor = QLabel(valor_html)
+        lbl_valor.setTextFormat(Qt.TextFormat.RichText)
+        lbl_valor.setStyleSheet("color: #e5e7eb; font-size: 20pt; font-weight: bold;")
+        lbl_valor.setAlignment(Qt.AlignmentFlag.AlignLeft)
+
+        card_layout.addWidget(lbl_titulo)
+        card_layout.addWidget(lbl_valor)
+        card_layout.addStretch()
+
+        return card
+
+    def _pintar_kpis(self):
+        """Tarjetas de peso, grasa e IMC: última medición contra la anterior"""
+        while self.kpis_layout.count():
+            item = self.kpis_layout.takeAt(0)
+            if item.widget(): item.widget().deleteLater()
+
+        if self.mediciones_data:
+            actual = self.mediciones_data[-1]
+            anterior = self.mediciones_data[-2] if len(self.mediciones_data) > 1 else {}
+        else:
+            actual = {}
+            anterior = {}
+
+        self.kpis_layout.addWidget(self._crear_kpi("Peso", actual.get('peso'), anterior.get('peso'), " kg"))
+        self.kpis_layout.addWidget(self._crear_kpi("% Grasa", actual.get('grasa'), anterior.get('grasa'), "%"))
+        self.kpis_layout.addWidget(self._crear_kpi("IMC", actual.get('imc'), anterior.get('imc'), ""))
+
     def _cargar_mediciones(self):
-        """Carga mediciones desde BD"""
-        conn = sqlite3.connect("gym_db.sqlite")
-        cursor = conn.cursor()
-        cursor.execute("""
-            SELECT id, fecha_medicion, peso, talla, grasa_corporal, pecho, hombros,
-                   cintura, cadera, biceps, antebrazo, muslo, gemelos, cuello, comentarios
-            FROM measurements WHERE miembro_id = ? ORDER BY fecha_medicion ASC
-        """, (self.member.get('id'),))
-        rows = cursor.fetchall()
-        conn.close()
-        
-        self.mediciones_data = []
-        for r in rows:
-            imc = round(r[2]/(r[3]*r[3]), 2) if r[2] and r[3] else None
-            self.mediciones_data.append({
-                "id": r[0], "fecha": r[1], "peso": r[2], "grasa": r[4], "imc": imc,
-                "pecho": r[5], "hombros": r[6], "cintura": r[7], "cadera": r[8],
-                "brazo": r[9], "antebrazo": r[10], "muslo": r[11], 
-                "pantorrilla": r[12], "cuello": r[13], "comentarios": r[14]
-            })
+        """Carga mediciones en segundo plano y refresca KPIs y gráfico"""
+        self.bridge.submit(self.measurement_service.get_measurements, self.member.get('id'),
+                           on_result=self._on_mediciones, key='mediciones')
+
+    def _on_mediciones(self, mediciones):
+        self.mediciones_data = mediciones
+        self._pintar_kpis()
+        # Refrescar gráfico con chip activo
+        for chip, claves, label in self.chips:
+            if chip.isChecked():
+                self._seleccionar_chip(claves, label, chip)
+                break
 
     def _seleccionar_chip(self, claves, label, boton):
         """Selecciona chip y actualiza gráfico"""
@@ -816,21 +816,14 @@ class Member360Dialog(QDialog):
         )
         
         if reply == QMessageBox.StandardButton.Yes:
-            conn = sqlite3.connect("gym_db.sqlite")
-            cursor = conn.cursor()
-            cursor.execute("DELETE FROM measurements WHERE id = ?", (medicion["id"],))
-            conn.commit()
-            conn.close()
+            resultado = self.measurement_service.delete_measurement(medicion["id"])
+            if not resultado["success"]:
+                QMessageBox.warning(self, "Error", resultado["message"])
+                return
             
-            QMessageBox.information(self, "Eliminada", "Medición eliminada correctamente")
+            QMessageBox.information(self, "Eliminada", resultado["message"])
             dialog.close()
             self._cargar_mediciones()
-            
-            # Refrescar gráfico con chip activo
-            for chip, claves, label in self.chips:
-                if chip.isChecked():
-                    self._seleccionar_chip(claves, label, chip)
-                    break
 
     def _new_measurement(self):
         """🔥 FORMULARIO COMPLETO DE NUEVA MEDICIÓN"""
@@ -956,44 +949,30 @@ class Member360Dialog(QDialog):
             try: return float(val.text()) if val.text() else None
             except: return None
         
-        conn = sqlite3.connect("gym_db.sqlite")
-        cursor = conn.cursor()
-        cursor.execute("""
-            INSERT INTO measurements (
-                miembro_id, fecha_medicion, peso, talla, grasa_corporal,
-                resistencia_fisica, pecho, hombros, cintura, cadera, biceps,
-                antebrazo, muslo, gemelos, cuello, comentarios
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """, (
-            self.member.get('id'),
-            fecha.date().toString("yyyy-MM-dd"),
-            to_float(campos['peso']),
-            to_float(campos['talla']),
-            to_float(campos['grasa']),
-            resistencia.currentText(),
-            to_float(campos['pecho']),
-            to_float(campos['hombros']),
-            to_float(campos['cintura']),
-            to_float(campos['cadera']),
-            to_float(campos['biceps']),
-            to_float(campos['antebrazo']),
-            to_float(campos['muslo']),
-            to_float(campos['gemelos']),
-            to_float(campos['cuello']),
-            comentarios.toPlainText()
-        ))
-        conn.commit()
-        conn.close()
+        resultado = self.measurement_service.add_measurement(self.member.get('id'), {
+            'fecha_medicion': fecha.date().toString("yyyy-MM-dd"),
+            'peso': to_float(campos['peso']),
+            'talla': to_float(campos['talla']),
+            'grasa_corporal': to_float(campos['grasa']),
+            'resistencia_fisica': resistencia.currentText(),
+            'pecho': to_float(campos['pecho']),
+            'hombros': to_float(campos['hombros']),
+            'cintura': to_float(campos['cintura']),
+            'cadera': to_float(campos['cadera']),
+            'biceps': to_float(campos['biceps']),
+            'antebrazo': to_float(campos['antebrazo']),
+            'muslo': to_float(campos['muslo']),
+            'gemelos': to_float(campos['gemelos']),
+            'cuello': to_float(campos['cuello']),
+            'comentarios': comentarios.toPlainText()
+        })
+        if not resultado["success"]:
+            QMessageBox.warning(self, "Error", resultado["message"])
+            return
         
         QMessageBox.information(self, "Guardado", "Medición registrada correctamente")
         dialog.accept()
         self._cargar_mediciones()
-        
-        # Refrescar gráfico
-        for chip, claves, label in self.chips:
-            if chip.isChecked():
-                self._seleccionar_chip(claves, label, chip)
-                break
 
     # ========== TAB: ASISTENCIAS ==========
     def _asistencias_widget(self):
@@ -1049,27 +1028,29 @@ class Member360Dialog(QDialog):
         desde = self.asis_desde.date().toString("yyyy-MM-dd")
         hasta = self.asis_hasta.date().toString("yyyy-MM-dd")
         
-        try:
-            registros = AttendanceService().get_log_by_member_and_range(
-                self.member.get("id"), desde, hasta
-            )
-            self.asis_table.setRowCount(0)
-            for row, (fecha_hora, plan) in enumerate(registros):
-                self.asis_table.insertRow(row)
-                self.asis_table.setItem(row, 0, QTableWidgetItem(str(fecha_hora)))
-                self.asis_table.setItem(row, 1, QTableWidgetItem(str(plan)))
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"No se pudo filtrar:\n{str(e)}")
+        self.bridge.submit(
+            service_for(AttendanceService).get_log_by_member_and_range,
+            self.member.get("id"), desde, hasta,
+            on_result=self._fill_asistencias, on_error=self._on_asistencias_error, key='asistencias'
+        )
+
+    def _fill_asistencias(self, registros):
+        self.asis_table.setRowCount(0)
+        for row, (fecha_hora, plan) in enumerate(registros):
+            self.asis_table.insertRow(row)
+            self.asis_table.setItem(row, 0, QTableWidgetItem(str(fecha_hora)))
+            self.asis_table.setItem(row, 1, QTableWidgetItem(str(plan)))
+
+    def _on_asistencias_error(self, error):
+        QMessageBox.critical(self, "Error", f"No se pudo filtrar:\n{str(error)}")
 
     def _mark_attendance_here(self):
         """Registra asistencia desde vista 360"""
         try:
-            resultado = AttendanceService().register_check_in(self.member.get("codigo"))
+            resultado = service_for(AttendanceService).register_check_in(self.member.get("codigo"))
             
             if resultado.get('status') == 'Éxito':
                 QMessageBox.information(self, "Asistencia", resultado['message'])
-                self._filter_asistencias()
-                self.asistencia_registrada.emit()
             else:
                 QMessageBox.warning(self, "Asistencia", resultado['message'])
         except Exception as e:
@@ -1216,12 +1197,13 @@ class Member360Dialog(QDialog):
                 QMessageBox.warning(self, "Error", resultado["message"])
 
     def _load_notes(self):
-        """🔥 CORREGIDO: Carga notas usando NoteService y guarda ID en UserRole"""
+        """🔥 CORREGIDO: Carga notas usando NoteService (en segundo plano) y guarda ID en UserRole"""
+        self.bridge.submit(self.note_service.get_notes, self.member.get('id'),
+                           on_result=self._fill_notes, key='notas')
+
+    def _fill_notes(self, notas):
         self.notes_table.setRowCount(0)
         
-        # 🔥 USAR NOTE SERVICE
-        notas = self.note_service.get_notes(self.member.get('id'))
-        
         for row, (note_id, fecha_hora, nota) in enumerate(notas):
             self.notes_table.insertRow(row)
             
@@ -1289,14 +1271,14 @@ class Member360Dialog(QDialog):
         if path:
             self.member['foto_path'] = path
             self._refresh_avatar()
-            MemberService().update_member_photo(self.member.get('codigo'), path)
+            self.member_service.update_member_photo(self.member.get('codigo'), path)
             QMessageBox.information(self, "Foto", "Foto actualizada correctamente")
 
     def _delete_photo(self):
         """Elimina foto"""
         self.member['foto_path'] = None
         self._refresh_avatar()
-        MemberService().update_member_photo(self.member.get('codigo'), None)
+        self.member_service.update_member_photo(self.member.get('codigo'), None)
         QMessageBox.information(self, "Foto", "Foto eliminada")
 
     def create_benefits_tab(self):
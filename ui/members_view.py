@@ -1,17 +1,31 @@
 # -*- coding: utf-8 -*-
 """
-Vista de gestión de miembros con paginación y sincronización por señales
+Vista de gestión de miembros con paginación y sincronización por eventos
 """
 from PyQt6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QLabel,
-    QLineEdit, QPushButton, QMessageBox, QTableWidget,
-    QTableWidgetItem, QHeaderView, QGroupBox, QGridLayout
+    QLineEdit, QPushButton, QMessageBox, QHeaderView, QGroupBox, QGridLayout
 )
 from PyQt6.QtCore import Qt
+from functools import partial
+from core.config import Config
+from api.client import service_for
+from core.events import PaymentRegistered, PaymentDeleted
+from models.member_model import MemberModel
 from services.member_service import MemberService
 from services.plan_service import PlanService
 from ui.payment_dialog import PaymentDialog
 from ui.member_360_view import Member360Dialog
+from ui.async_bridge import get_bridge
+from ui.event_relay import get_relay
+from ui.table_model import Column, ColumnTableModel, GridView
+
+# Color del estado de membresía según el bucket calculado en la consulta
+_COLORES_BUCKET = {
+    MemberModel.BUCKET_ACTIVE: "green",
+    MemberModel.BUCKET_EXPIRING: "orange",
+    MemberModel.BUCKET_EXPIRED: "red",
+}
 
 class MembersView(QWidget):
     """Vista principal de gestión de miembros con paginación"""
@@ -20,16 +34,15 @@ class MembersView(QWidget):
     
     def __init__(self):
         super().__init__()
-        self.service = MemberService()
-        self.plan_service = PlanService()
+        # 🔥 Servicios locales o del servidor POS (terminal): ver api/client.py
+        self.service = service_for(MemberService)
+        self.plan_service = service_for(PlanService)
+        self.bridge = get_bridge()
         self.layout = QVBoxLayout(self)
         
-        # Referencia a AttendanceView (se asigna desde MainWindow)
-        self.attendance_view = None
-        
-        # Variables de paginación
-        self.all_members = []
-        self.filtered_members = []
+        # Variables de paginación (keyset: la BD devuelve solo la página visible)
+        self.page = None
+        self.search_term = ""
         self.current_page = 1
         self.total_pages = 1
 
@@ -38,6 +51,11 @@ class MembersView(QWidget):
         self._setup_pagination_controls()
         self.load_members()
 
+        # 🔥 El estado de membresía cambia con los pagos (de cualquier vista o terminal)
+        relay = get_relay()
+        relay.subscribe(PaymentRegistered, self._on_pago)
+        relay.subscribe(PaymentDeleted, self._on_pago)
+
     def _setup_form_group(self):
         """Formulario de registro de nuevos miembros"""
         form_group = QGroupBox("➕ Nuevo Registro")
@@ -90,16 +108,20 @@ class MembersView(QWidget):
         self.search_input.textChanged.connect(self.filter_members)
         self.layout.addWidget(self.search_input)
 
-        self.table = QTableWidget()
-        self.table.setColumnCount(5)
-        self.table.setHorizontalHeaderLabels(["Código", "Nombre", "DNI", "Contacto", "Membresía"])
+        self.members_model = ColumnTableModel([
+            Column("Código", 'codigo'),
+            Column("Nombre", 'nombre'),
+            Column("DNI", 'dni'),
+            Column("Contacto", 'contacto'),
+            Column("Membresía", 'estado', color=lambda m: _COLORES_BUCKET.get(m.bucket, "gray")),
+        ], fields=('id', 'nombre', 'dni', 'contacto', 'codigo', 'estado', 'bucket'), key='id', parent=self)
+        # Sin orden local: las páginas vienen ordenadas por nombre desde la BD
+        self.table = GridView(self.members_model, sortable=False)
         self.table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
-        self.table.setSelectionBehavior(QTableWidget.SelectionBehavior.SelectRows)
-        self.table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
         self.layout.addWidget(self.table)
 
         # Doble clic abre perfil 360
-        self.table.cellDoubleClicked.connect(self.open_member_profile)
+        self.table.doubleClicked.connect(lambda index: self.open_member_profile(index.row()))
 
         action_layout = QHBoxLayout()
         
@@ -171,50 +193,66 @@ class MembersView(QWidget):
 
         self.load_members()
 
-    def load_members(self):
-        """Carga todos los miembros y muestra la página actual"""
-        self.all_members = self.service.get_all_members_with_status()
-        self.filtered_members = self.all_members.copy()
+    def load_members(self, delay_ms=0):
+        """
+        Recarga el listado desde la primera página con el filtro actual.
+
+        La consulta corre en segundo plano; una recarga nueva descarta la anterior.
+
+        Args:
+            delay_ms: Antirrebote (al tipear en el buscador)
+        """
         self.current_page = 1
-        self._calculate_pagination()
+        self._set_loading()
+        self.bridge.submit(self._read_first_page, self.search_term,
+                           on_result=self._on_first_page, key='page', delay_ms=delay_ms)
+
+    def _on_pago(self, evento):
+        """Recarga solo si el miembro del pago está en la página visible."""
+        if evento.miembro_id is None or self.members_model.contains(evento.miembro_id):
+            self.load_members(delay_ms=Config.UI_EVENT_DEBOUNCE_MS)
+
+    def _read_first_page(self, search):
+        """Total de coincidencias y primera página (corre en segundo plano)"""
+        total_members = self.service.count_members(search)
+        return total_members, self.service.get_members_page(search=search, limit=self.PAGE_SIZE)
+
+    def _on_first_page(self, data):
+        total_members, self.page = data
+        self._calculate_pagination(total_members)
         self._display_current_page()
 
-    def _calculate_pagination(self):
-        """Calcula el total de páginas según los miembros filtrados"""
-        total_members = len(self.filtered_members)
+    def _calculate_pagination(self, total_members):
+        """Calcula el total de páginas según los miembros que coinciden con el filtro"""
         self.total_pages = max(1, (total_members + self.PAGE_SIZE - 1) // self.PAGE_SIZE)
         
         # Ajustar página actual si está fuera de rango
         if self.current_page > self.total_pages:
             self.current_page = self.total_pages
 
+    def _load_page(self, after=None, before=None):
+        """Obtiene una página de la BD en segundo plano y la muestra"""
+        self._set_loading()
+        self.bridge.submit(
+            partial(self.service.get_members_page, search=self.search_term,
+                    after=after, before=before, limit=self.PAGE_SIZE),
+            on_result=self._on_page, key='page'
+        )
+
+    def _on_page(self, page):
+        self.page = page
+        self._display_current_page()
+
+    def _set_loading(self):
+        """Bloquea la navegación hasta que llegue la página (los cursores dependen de ella)"""
+        self.btn_prev.setEnabled(False)
+        self.btn_next.setEnabled(False)
+
     def _display_current_page(self):
-        """Muestra solo los miembros de la página actual"""
-        self.table.setRowCount(0)
-        
-        start_idx = (self.current_page - 1) * self.PAGE_SIZE
-        end_idx = start_idx + self.PAGE_SIZE
-        page_members = self.filtered_members[start_idx:end_idx]
-
-        for row_number, miembro in enumerate(page_members):
-            self.table.insertRow(row_number)
-            miembro_id, nombre, dni, contacto, codigo, estado = miembro
-
-            self.table.setItem(row_number, 0, QTableWidgetItem(codigo))
-            self.table.setItem(row_number, 1, QTableWidgetItem(nombre))
-            self.table.setItem(row_number, 2, QTableWidgetItem(dni))
-            self.table.setItem(row_number, 3, QTableWidgetItem(contacto))
-
-            item_estado = QTableWidgetItem(estado)
-            if "Válida" in estado:
-                item_estado.setForeground(Qt.GlobalColor.green)
-            elif "Vencida" in estado:
-                item_estado.setForeground(Qt.GlobalColor.red)
-            else:
-                item_estado.setForeground(Qt.GlobalColor.gray)
+        """Muestra los miembros de la página actual"""
+        self.members_model.set_rows(self.page['members'])
+        self.table.scrollToTop()
 
-            self.table.setItem(row_number, 4, item_estado)
-        
         self._update_pagination_controls()
 
     def _update_pagination_controls(self):
@@ -227,36 +265,23 @@ class MembersView(QWidget):
         """Navega a la página anterior"""
         if self.current_page > 1:
             self.current_page -= 1
-            self._display_current_page()
+            self._load_page(before=self.page['prev_cursor'])
 
     def next_page(self):
         """Navega a la página siguiente"""
         if self.current_page < self.total_pages:
             self.current_page += 1
-            self._display_current_page()
+            self._load_page(after=self.page['next_cursor'])
 
     def filter_members(self):
-        """Filtra miembros según búsqueda y actualiza paginación"""
-        filtro = self.search_input.text().lower()
-        
-        if not filtro:
-            self.filtered_members = self.all_members.copy()
-        else:
-            self.filtered_members = [
-                miembro for miembro in self.all_members
-                if filtro in miembro[4].lower() or  # código
-                   filtro in miembro[1].lower() or  # nombre
-                   filtro in miembro[2].lower()     # dni
-            ]
-        
-        self.current_page = 1
-        self._calculate_pagination()
-        self._display_current_page()
+        """Filtra miembros según búsqueda (en la BD) y actualiza paginación"""
+        self.search_term = self.search_input.text().strip()
+        self.load_members(delay_ms=Config.UI_SEARCH_DEBOUNCE_MS)
 
     def open_payment_dialog(self):
         """Abre diálogo de pago para miembro seleccionado"""
-        selected_rows = self.table.selectedIndexes()
-        if not selected_rows:
+        miembro = self.table.selected_record()
+        if miembro is None:
             QMessageBox.warning(
                 self, 
                 "Advertencia", 
@@ -264,8 +289,7 @@ class MembersView(QWidget):
             )
             return
 
-        row = selected_rows[0].row()
-        codigo_membresia = self.table.item(row, 0).text()
+        codigo_membresia = miembro.codigo
         miembro_data = self.service.find_member_by_identifier(codigo_membresia)
 
         if not miembro_data:
@@ -283,16 +307,13 @@ class MembersView(QWidget):
             codigo_membresia=codigo_membresia,
             parent=self
         )
-        
-        # 🔥 CONECTAR SEÑAL
-        dialog.pago_registrado.connect(self.load_members)
 
-        if dialog.exec() == dialog.DialogCode.Accepted:
-            self.load_members()
+        # La tabla se actualiza con el evento PaymentRegistered
+        dialog.exec()
 
     def open_member_profile(self, row, column=None):
         """Abre perfil 360 del miembro (desde doble clic)"""
-        codigo_membresia = self.table.item(row, 0).text()
+        codigo_membresia = self.members_model.value(row, 'codigo')
         miembro_data = self.service.find_member_by_identifier(codigo_membresia)
 
         if not miembro_data:
@@ -316,15 +337,13 @@ class MembersView(QWidget):
 
         dlg = Member360Dialog(member_data, self)
 
-        # 🔥 CONECTAR SEÑALES PARA SINCRONIZACIÓN COMPLETA
-        self._connect_member_360_signals(dlg)
-
+        # Pagos y asistencias del diálogo llegan a las vistas como eventos
         if dlg.exec() == dlg.DialogCode.Accepted:
             self.load_members()
 
     def open_member_profile_from_button(self):
         """Abre perfil 360 desde botón"""
-        selected_rows = self.table.selectedIndexes()
+        selected_rows = self.table.selectionModel().selectedRows()
         if not selected_rows:
             QMessageBox.warning(
                 self, 
@@ -333,23 +352,4 @@ class MembersView(QWidget):
             )
             return
 
-        row = selected_rows[0].row()
-        self.open_member_profile(row)
-
-    def _connect_member_360_signals(self, dlg):
-        """
-        Conecta todas las señales del Member360Dialog para sincronización.
-        MÉTODO CENTRALIZADO - Evita duplicación de código.
-        """
-        # Sincronizar asistencias
-        if hasattr(self, "attendance_view") and self.attendance_view:
-            # Member360 → AttendanceView
-            dlg.asistencia_registrada.connect(self.attendance_view.load_log)
-            # AttendanceView → Member360
-            self.attendance_view.asistencia_registrada.connect(dlg._filter_asistencias)
-        
-        # Sincronizar pagos y estado de membresía
-        dlg.pago_registrado.connect(self.load_members)
-        
-        # Actualizar tabla cuando se registra asistencia (afecta estado)
-        dlg.asistencia_registrada.connect(self.load_members)
+        self.open_member_profile(selected_rows[0].row())
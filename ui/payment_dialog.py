@@ -5,18 +5,29 @@ Diálogo para registro de pagos con sincronización por señales
 from PyQt6.QtWidgets import (
     QDialog, QVBoxLayout, QHBoxLayout, QLabel,
     QLineEdit, QPushButton, QComboBox, QMessageBox,
-    QTableWidget, QTableWidgetItem, QHeaderView,
+    QHeaderView,
     QDateEdit, QGridLayout
 )
 from PyQt6.QtCore import Qt, QDate, pyqtSignal
+from api.client import service_for
 from services.payment_service import PaymentService
 from services.plan_service import PlanService
 from datetime import datetime
 from core.config import Config
 from ui.combo_members_dialog import ComboMembersDialog
+from ui.table_model import Column, ColumnTableModel, GridView
 from services.combo_service import ComboService
 
 
+def _color_vence(pago):
+    """Rojo si el pago ya venció, verde si sigue vigente."""
+    try:
+        vencido = datetime.strptime(pago.vence, Config.DATE_FORMAT).date() < datetime.now().date()
+    except (TypeError, ValueError):
+        return None
+    return "red" if vencido else "darkgreen"
+
+
 class PaymentDialog(QDialog):
     """
     Diálogo para registrar pagos y ver historial.
@@ -33,11 +44,11 @@ class PaymentDialog(QDialog):
         self.miembro_nombre = miembro_nombre
         self.miembro_dni = miembro_dni
         self.codigo_membresia = codigo_membresia
-        self.combo_service = ComboService()
+        self.combo_service = service_for(ComboService)
         self.combo_member_ids = []  # IDs de miembros del combo        
 
-        self.payment_service = PaymentService()
-        self.plan_service = PlanService()
+        self.payment_service = service_for(PaymentService)
+        self.plan_service = service_for(PlanService)
         self.plans_data = {}
 
         self.table_history = None
@@ -148,14 +159,15 @@ class PaymentDialog(QDialog):
 
     def _setup_history_table(self):
         """Tabla de historial de pagos"""
-        self.table_history = QTableWidget()
-        self.table_history.setColumnCount(5)
-        self.table_history.setHorizontalHeaderLabels([
-            "ID Pago", "Plan", "Monto", "Fecha Pago", "Vence"
-        ])
+        self.history_model = ColumnTableModel([
+            Column("ID Pago", 'id'),
+            Column("Plan", 'plan'),
+            Column("Monto", 'monto', fmt=lambda v: f"S/ {v:.2f}"),
+            Column("Fecha Pago", 'fecha_pago'),
+            Column("Vence", 'vence', color=_color_vence),
+        ], fields=('id', 'plan', 'monto', 'fecha_pago', 'vence'), key='id', parent=self)
+        self.table_history = GridView(self.history_model)
         self.table_history.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
-        self.table_history.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
-        self.table_history.setSelectionBehavior(QTableWidget.SelectionBehavior.SelectRows)
         self.main_layout.addWidget(self.table_history)
 
     def load_plans_for_combo(self):
@@ -190,14 +202,12 @@ class PaymentDialog(QDialog):
             return
         
         # Obtener info del plan
-        from models.plan_model import PlanModel
-        plan_model = PlanModel()
-        plan = plan_model.get_plan_by_id(plan_id)
+        plan = self.plan_service.get_plan(plan_id)
         
-        if plan and plan[4] > 1:  # personas_combo > 1
+        if plan and plan.cantidad_personas > 1:
             # Es un plan combo
             self.combo_indicator_label.setText(
-                f"👥 Plan Combo: {plan[4]} personas"
+                f"👥 Plan Combo: {plan.cantidad_personas} personas"
             )
             self.combo_indicator_label.setVisible(True)
         else:
@@ -226,18 +236,16 @@ class PaymentDialog(QDialog):
             return
         
         # Verificar si es plan combo
-        from models.plan_model import PlanModel
-        plan_model = PlanModel()
-        plan = plan_model.get_plan_by_id(plan_id)
+        plan = self.plan_service.get_plan(plan_id)
 
         # Si es combo y aún no se seleccionaron miembros, abrir diálogo
-        if plan and plan[4] > 1:  # personas_combo > 1
+        if plan and plan.cantidad_personas > 1:
             if not self.combo_member_ids:
                 # Abrir diálogo de combo members
                 combo_dialog = ComboMembersDialog(
                     parent=self,
-                    plan_nombre=plan[1],  # nombre del plan
-                    plan_max_personas=plan[4],  # 🔥 FIX: cantidad_personas (era plan[5])
+                    plan_nombre=plan.nombre_plan,
+                    plan_max_personas=plan.cantidad_personas,
                     monto_total=float(monto_pagado_str) if monto_pagado_str else 0.0,
                     pagador_id=self.miembro_id,
                     pagador_nombre=self.miembro_nombre
@@ -262,7 +270,7 @@ class PaymentDialog(QDialog):
             # 🔥 NUEVO: Auto-registrar en cash_movements
             try:
                 from services.caja_service import CajaService
-                caja_service = CajaService()
+                caja_service = service_for(CajaService)
                 
                 # Obtener método de pago (puedes agregar un QComboBox en el futuro)
                 # Por ahora, usamos 'efectivo' como default
@@ -275,7 +283,7 @@ class PaymentDialog(QDialog):
                     monto=float(monto_pagado_str),
                     ref_tipo='payment',
                     ref_id=payment_id,
-                    desc=f"Pago membresía - {self.miembro_nombre} ({plan[1]})",
+                    desc=f"Pago membresía - {self.miembro_nombre} ({plan.nombre_plan})",
                     usuario_id=None  # TODO: Obtener usuario actual cuando implementemos login
                 )
             except Exception as e:
@@ -314,27 +322,7 @@ class PaymentDialog(QDialog):
     def load_payment_history(self):
         """Carga el historial de pagos en la tabla"""
         pagos = self.payment_service.get_member_payments(self.miembro_id)
-        self.table_history.setRowCount(0)
-
-        for row_number, pago in enumerate(pagos):
-            self.table_history.insertRow(row_number)
-            id_pago, nombre_plan, monto, f_pago, f_vence = pago
-
-            self.table_history.setItem(row_number, 0, QTableWidgetItem(str(id_pago)))
-            self.table_history.setItem(row_number, 1, QTableWidgetItem(nombre_plan))
-            self.table_history.setItem(row_number, 2, QTableWidgetItem(f"S/ {monto:.2f}"))
-            self.table_history.setItem(row_number, 3, QTableWidgetItem(f_pago))
-
-            item_vence = QTableWidgetItem(f_vence)
-            try:
-                if f_vence and datetime.strptime(f_vence, Config.DATE_FORMAT).date() < datetime.now().date():
-                    item_vence.setForeground(Qt.GlobalColor.red)
-                else:
-                    item_vence.setForeground(Qt.GlobalColor.darkGreen)
-            except:
-                pass
-
-            self.table_history.setItem(row_number, 4, item_vence)
+        self.history_model.set_rows(pagos)
 
     def ocultar_historial(self):
         """Oculta la tabla de historial"""
@@ -4,7 +4,9 @@ Vista de gestión de planes y tarifas
 """
 from PyQt6.QtWidgets import *
 from PyQt6.QtCore import Qt, QDate
+from api.client import service_for
 from services.plan_service import PlanService
+from services.category_service import CategoryService
 from PyQt6.QtWidgets import QTabWidget
 from ui.categories_tab import CategoriesTab
 
@@ -13,7 +15,8 @@ class PlansView(QWidget):
     
     def __init__(self):
         super().__init__()
-        self.service = PlanService()
+        self.service = service_for(PlanService)
+        self.category_service = service_for(CategoryService)
         self.editing_plan_id = None
         self.layout = QVBoxLayout(self)
         
@@ -69,10 +72,7 @@ class PlansView(QWidget):
 
     def _load_categories_combo(self):
         """Carga las categorías en el combobox"""
-        from services.category_service import CategoryService
-        
-        category_service = CategoryService()
-        categories = category_service.get_all_categories()
+        categories = self.category_service.get_all_categories()
         
         self.combo_categoria.clear()
         self.combo_categoria.addItem("Sin categoría", None)
@@ -222,7 +222,14 @@ class PlansView(QWidget):
 
     def load_plans(self):
         """Carga planes en la tabla"""
+        from PyQt6.QtGui import QColor, QFont
+        
         planes = self.service.get_all_plans(include_inactive=True) 
+        # Una sola lectura de categorías para toda la tabla (no una por plan)
+        categorias = {
+            cat['id']: cat
+            for cat in self.category_service.get_all_categories(include_inactive=True)
+        }
         self.table.setRowCount(0)
         
         for row_number, plan in enumerate(planes):
@@ -238,11 +245,7 @@ class PlansView(QWidget):
             self.table.setItem(row_number, 3, QTableWidgetItem(str(dias)))
             self.table.setItem(row_number, 4, QTableWidgetItem(str(personas)))
             if categoria_id:
-                from services.category_service import CategoryService
-                from PyQt6.QtGui import QColor, QFont
-                
-                cat_service = CategoryService()
-                cat = cat_service.get_category_by_id(categoria_id)
+                cat = categorias.get(categoria_id)
                 if cat:
                     cat_item = QTableWidgetItem(cat['nombre'])
                     cat_item.setForeground(QColor(cat['color_hex']))
@@ -3,6 +3,7 @@ from PyQt6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QTableWidget,
                              QTableWidgetItem, QPushButton, QLineEdit, QComboBox, 
                              QMessageBox, QHeaderView, QFormLayout, QLabel)
 from PyQt6.QtCore import Qt
+from api.client import service_for
 from services.proveedor_service import ProveedorService
 
 class ProveedoresDialog(QDialog):
@@ -10,7 +11,7 @@ class ProveedoresDialog(QDialog):
         super().__init__(parent)
         self.setWindowTitle("Gestión de Proveedores")
         self.setMinimumSize(900, 600)
-        self.service = ProveedorService()
+        self.service = service_for(ProveedorService)
         self._setup_ui()
         self._load_data()
         
@@ -188,7 +189,7 @@ class ProveedoresDialog(QDialog):
         
         # Verificar productos asociados
         from services.producto_service import ProductoService
-        prod_service = ProductoService()
+        prod_service = service_for(ProductoService)
         try:
             productos = prod_service.get_all_productos()
             productos_asociados = [p for p in productos if len(p) > 13 and p[13] == pid]
@@ -0,0 +1,475 @@
+# -*- coding: utf-8 -*-
+"""
+Modelo de tabla compartido para las grillas de la aplicación
+
+QTableWidget crea un QTableWidgetItem (y su wrapper Python) por celda y las
+vistas lo reconstruían completo con setRowCount(0)/insertRow. Con 10k
+productos o 100k asistencias eso congela la GUI y la memoria crece con cada
+celda. ColumnTableModel guarda los datos por columna (``array('q')`` /
+``array('d')`` para enteros y decimales, listas para el resto) y GridView
+(QTableView) solo pide las celdas visibles:
+
+- ``fetcher``: trae más filas de la BD cuando el scroll se acerca al final
+  (canFetchMore/fetchMore), en segundo plano vía ui/async_bridge.py.
+- ``apply_diff``: actualiza por clave solo las filas que cambiaron, sin
+  perder scroll ni selección.
+- ``sort``: ordena el modelo en sitio (sin QSortFilterProxyModel) y conserva
+  la selección.
+
+Uso:
+    model = ColumnTableModel([
+        Column("SKU", 'sku'),
+        Column("Precio", 'precio_venta', fmt=lambda v: f"S/ {v:.2f}"),
+    ], key='id')
+    view = GridView(model)
+    model.set_rows(productos)      # Filas con nombre (BaseModel) o tuplas + fields
+"""
+from array import array
+from operator import itemgetter
+from PyQt6.QtCore import Qt, QAbstractTableModel, QModelIndex
+from PyQt6.QtGui import QColor
+from PyQt6.QtWidgets import QTableView, QAbstractItemView, QHeaderView
+from core.base_model import row_type
+from core.config import Config
+from core.logger import logger
+from ui.async_bridge import get_bridge
+
+_TYPECODES = {int: 'q', float: 'd'}
+
+
+class Column:
+    """Columna visible de un ColumnTableModel"""
+
+    __slots__ = ('title', 'field', 'fmt', 'color', 'background', 'align', 'sort_key')
+
+    def __init__(self, title, field, fmt=None, color=None, background=None, align=None,
+                 sort_key=None):
+        """
+        Args:
+            title: Encabezado
+            field: Campo de la fila que muestra
+            fmt: ``fmt(valor) -> str`` (por defecto str, None como vacío)
+            color: ``color(fila) -> color | None`` para el texto (fila con nombre completa)
+            background: Color de fondo fijo (ej: columnas de acción)
+            align: Qt.AlignmentFlag del texto
+            sort_key: ``sort_key(valor)`` para ordenar (por defecto el valor)
+        """
+        self.title = title
+        self.field = field
+        self.fmt = fmt
+        self.color = color
+        self.background = background
+        self.align = align
+        self.sort_key = sort_key
+
+
+def _compact(values):
+    """Lista de valores → array tipado si todos son int (o float), si no lista."""
+    tipo = next((type(v) for v in values if v is not None), None)
+    code = _TYPECODES.get(tipo)
+    if code is not None:
+        try:
+            return array(code, values)
+        except (TypeError, OverflowError):
+            pass
+    return list(values)
+
+
+class ColumnTableModel(QAbstractTableModel):
+    """Modelo de solo lectura con almacenamiento por columnas"""
+
+    def __init__(self, columns, fields=None, key=None, parent=None):
+        """
+        Args:
+            columns: Lista de Column visibles
+            fields: Nombres de los campos de cada fila (por defecto los
+                    ``_fields`` de la primera fila con nombre recibida)
+            key: Campo que identifica una fila (requerido por apply_diff)
+        """
+        super().__init__(parent)
+        self.columns = list(columns)
+        self.key = key
+        self.batch_size = Config.UI_FETCH_BATCH
+        self._fields = None
+        self._data = []
+        self._count = 0
+        self._sort = None
+        self._colors = {}
+        self._fetcher = None
+        self._cursor = None   # Última fila del último lote traído (no la última mostrada)
+        self._fetching = False
+        self._exhausted = True
+        if fields is not None:
+            self._set_fields(tuple(fields))
+
+    # ------------------------------------------------------------------
+    # Interfaz Qt
+    # ------------------------------------------------------------------
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self._count
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.columns)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if orientation == Qt.Orientation.Horizontal and role == Qt.ItemDataRole.DisplayRole:
+            return self.columns[section].title
+        return None
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or self._fields is None:
+            return None
+        columna = self.columns[index.column()]
+        fila = index.row()
+
+        if role == Qt.ItemDataRole.DisplayRole:
+            valor = self._data[self._col_field[index.column()]][fila]
+            if columna.fmt is not None:
+                return columna.fmt(valor)
+            return '' if valor is None else str(valor)
+        if role == Qt.ItemDataRole.ForegroundRole and columna.color is not None:
+            return self._qcolor(columna.color(self.record(fila)))
+        if role == Qt.ItemDataRole.BackgroundRole and columna.background is not None:
+            return self._qcolor(columna.background)
+        if role == Qt.ItemDataRole.TextAlignmentRole and columna.align is not None:
+            return columna.align
+        if role == Qt.ItemDataRole.UserRole:
+            return self.record(fila)
+        return None
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return (not parent.isValid() and self._fetcher is not None
+                and not self._exhausted and not self._fetching)
+
+    def fetchMore(self, parent=QModelIndex()):
+        if not self.canFetchMore(parent):
+            return
+        self._fetching = True
+        # 🔥 El cursor es el del orden de la consulta: ordenar la grilla no lo mueve
+        get_bridge().submit(self._fetcher, self._cursor, self.batch_size, owner=self, key='fetch',
+                            on_result=self._on_fetched, on_error=self._on_fetch_error)
+
+    def sort(self, column, order=Qt.SortOrder.AscendingOrder):
+        if column < 0:
+            # Indicador de orden quitado: se conserva el orden actual
+            self._sort = None
+            return
+        self._sort = (column, order)
+        if self._count < 2:
+            return
+        self.layoutAboutToBeChanged.emit()
+        perm = self._permutation(column, order)
+        self._permute(perm)
+
+        # La selección y el ítem actual siguen a sus filas
+        nueva_pos = [0] * len(perm)
+        for nueva, vieja in enumerate(perm):
+            nueva_pos[vieja] = nueva
+        persistentes = self.persistentIndexList()
+        self.changePersistentIndexList(
+            persistentes, [self.index(nueva_pos[i.row()], i.column()) for i in persistentes]
+        )
+        self.layoutChanged.emit()
+
+    # ------------------------------------------------------------------
+    # Acceso a filas
+    # ------------------------------------------------------------------
+
+    def record(self, row):
+        """
+        Fila completa con nombre (mismo tipo de fila que devuelve BaseModel).
+
+        Args:
+            row: Índice de fila
+
+        Returns:
+            namedtuple: Todos los campos de la fila
+        """
+        return self._row_type._make(col[row] for col in self._data)
+
+    def value(self, row, field):
+        """Valor de un campo sin armar la fila completa."""
+        return self._data[self._index[field]][row]
+
+    def records(self):
+        """Todas las filas (en el orden mostrado)."""
+        return [self.record(r) for r in range(self._count)]
+
+    def contains(self, value, field=None):
+        """
+        True si alguna fila cargada tiene ``value`` en el campo.
+
+        Args:
+            value: Valor buscado (ej: id de un miembro)
+            field: Campo (por defecto la clave del modelo)
+        """
+        if self._fields is None:
+            return False
+        col = self._data[self._index[field or self.key]]
+        return any(col[r] == value for r in range(self._count))
+
+    # ------------------------------------------------------------------
+    # Carga de datos
+    # ------------------------------------------------------------------
+
+    def set_rows(self, rows, fetcher=None):
+        """
+        Reemplaza todas las filas.
+
+        Args:
+            rows: Filas (con nombre o tuplas en el orden de fields)
+            fetcher: ``fetcher(ultima_fila, limite) -> filas`` para traer las
+                     siguientes al hacer scroll (None = no hay más)
+        """
+        rows = list(rows)
+        self._cancel_fetch()
+        self.beginResetModel()
+        if rows and self._fields is None:
+            self._set_fields(tuple(rows[0]._fields))
+        if self._fields is not None:
+            self._data = self._columns_from(rows)
+        self._count = len(rows)
+        self._fetcher = fetcher
+        self._cursor = self._as_record(rows[-1]) if rows else None
+        self._exhausted = fetcher is None
+        if self._sort is not None and self._count > 1:
+            self._permute(self._permutation(*self._sort))
+        self.endResetModel()
+
+    def load(self, fetcher):
+        """
+        Vacía el modelo y carga por lotes con ``fetcher`` (el primero de inmediato).
+
+        Args:
+            fetcher: ``fetcher(ultima_fila, limite) -> filas``; ultima_fila es None
+                     en el primer lote
+        """
+        self.set_rows([], fetcher=fetcher)
+        self.fetchMore()
+
+    def insert_rows(self, position, rows):
+        """
+        Inserta filas en una posición (ej: 0 para las más recientes arriba).
+        Si el modelo está ordenado localmente, luego se reordena.
+
+        Args:
+            position: Índice donde insertar
+            rows: Filas nuevas
+        """
+        rows = list(rows)
+        if not rows:
+            return
+        if self._fields is None:
+            self._set_fields(tuple(rows[0]._fields))
+        nuevas = self._columns_from(rows)
+        self.beginInsertRows(QModelIndex(), position, position + len(rows) - 1)
+        for ci, valores in enumerate(nuevas):
+            self._splice(ci, position, valores)
+        self._count += len(rows)
+        self.endInsertRows()
+        if self._sort is not None:
+            self.sort(*self._sort)
+
+    def append_rows(self, rows):
+        """Agrega filas al final (se reordenan si el modelo está ordenado)."""
+        self.insert_rows(self._count, rows)
+
+    def remove_rows(self, position, count):
+        """Quita ``count`` filas desde ``position``."""
+        if count <= 0:
+            return
+        self.beginRemoveRows(QModelIndex(), position, position + count - 1)
+        for col in self._data:
+            del col[position:position + count]
+        self._count -= count
+        self.endRemoveRows()
+
+    def apply_diff(self, rows):
+        """
+        Lleva el modelo a ``rows`` tocando solo las filas que cambiaron.
+
+        Las filas que ya no están se quitan, las nuevas se insertan en su
+        lugar y las modificadas emiten dataChanged; scroll y selección se
+        conservan. Si cambió el orden de las existentes (o el modelo está
+        ordenado localmente) se recarga completo.
+
+        Args:
+            rows: Filas con el mismo formato que set_rows
+        """
+        rows = list(rows)
+        if self.key is None or self._fields is None or self._sort is not None:
+            self.set_rows(rows)
+            return
+        kf = self._index[self.key]
+        nuevas_claves = [r[kf] for r in rows]
+        nuevas = set(nuevas_claves)
+        if len(nuevas) != len(nuevas_claves):
+            self.set_rows(rows)
+            return
+
+        # 1. Quitar las que ya no están (de abajo hacia arriba, por tramos)
+        claves = self._data[kf]
+        fila = self._count - 1
+        while fila >= 0:
+            if claves[fila] not in nuevas:
+                fin = fila
+                while fila > 0 and claves[fila - 1] not in nuevas:
+                    fila -= 1
+                self.remove_rows(fila, fin - fila + 1)
+                claves = self._data[kf]
+            fila -= 1
+
+        # 2. Las que quedan deben estar en el mismo orden relativo
+        actuales = set(claves)
+        if [k for k in nuevas_claves if k in actuales] != list(claves):
+            self.set_rows(rows)
+            return
+
+        # 3. Insertar nuevas por tramos y actualizar las modificadas
+        n = len(self._fields)
+        ultima_col = len(self.columns) - 1
+        pos = 0
+        i = 0
+        while i < len(rows):
+            if nuevas_claves[i] in actuales:
+                valores = self._pad(rows[i])
+                if valores != tuple(col[pos] for col in self._data):
+                    for ci in range(n):
+                        self._set_value(ci, pos, valores[ci])
+                    self.dataChanged.emit(self.index(pos, 0), self.index(pos, ultima_col))
+                pos += 1
+                i += 1
+            else:
+                inicio = i
+                while i < len(rows) and nuevas_claves[i] not in actuales:
+                    i += 1
+                self.insert_rows(pos, rows[inicio:i])
+                pos += i - inicio
+
+    # ------------------------------------------------------------------
+    # Internos
+    # ------------------------------------------------------------------
+
+    def _set_fields(self, fields):
+        self._fields = fields
+        self._index = {f: i for i, f in enumerate(fields)}
+        self._col_field = [self._index[c.field] for c in self.columns]
+        self._row_type = row_type(fields)
+        self._data = [[] for _ in fields]
+
+    def _as_record(self, row):
+        if self._fields is None:
+            return row
+        return self._row_type._make(self._pad(row))
+
+    def _pad(self, row):
+        n = len(self._fields)
+        valores = tuple(row[:n])
+        return valores + (None,) * (n - len(valores))
+
+    def _columns_from(self, rows):
+        if not rows:
+            return [[] for _ in self._fields]
+        n = len(self._fields)
+        if any(len(r) < n for r in rows):
+            rows = [self._pad(r) for r in rows]
+        return [_compact(valores) for valores in list(zip(*rows))[:n]]
+
+    def _splice(self, ci, position, valores):
+        col = self._data[ci]
+        if isinstance(col, array):
+            try:
+                col[position:position] = array(col.typecode, valores)
+                return
+            except (TypeError, OverflowError):
+                col = self._data[ci] = list(col)
+        col[position:position] = list(valores)
+
+    def _set_value(self, ci, row, valor):
+        col = self._data[ci]
+        try:
+            col[row] = valor
+        except (TypeError, OverflowError):
+            col = self._data[ci] = list(col)
+            col[row] = valor
+
+    def _permutation(self, column, order):
+        col = self._data[self._col_field[column]]
+        sort_key = self.columns[column].sort_key
+
+        reverse = order == Qt.SortOrder.DescendingOrder
+
+        def clave(i):
+            v = col[i]
+            if sort_key is not None:
+                v = sort_key(v)
+            elif isinstance(v, str):
+                v = v.casefold()
+            # Los vacíos quedan al final en ambos sentidos
+            return ((v is None) != reverse, v)
+
+        try:
+            return sorted(range(self._count), key=clave, reverse=reverse)
+        except TypeError:
+            # Tipos mezclados en la columna: se ordena por el texto
+            return sorted(range(self._count), key=lambda i: str(col[i]), reverse=reverse)
+
+    def _permute(self, perm):
+        tomar = itemgetter(*perm)
+        for ci, col in enumerate(self._data):
+            valores = tomar(col) if len(perm) > 1 else (col[perm[0]],)
+            self._data[ci] = array(col.typecode, valores) if isinstance(col, array) else list(valores)
+
+    def _qcolor(self, color):
+        if color is None or isinstance(color, QColor):
+            return color
+        cacheado = self._colors.get(color)
+        if cacheado is None:
+            cacheado = self._colors[color] = QColor(color)
+        return cacheado
+
+    def _cancel_fetch(self):
+        if self._fetching:
+            get_bridge().cancel(self, 'fetch')
+            self._fetching = False
+
+    def _on_fetched(self, rows):
+        self._fetching = False
+        if len(rows) < self.batch_size:
+            self._exhausted = True
+        self.append_rows(rows)
+        if rows:
+            self._cursor = self._as_record(rows[-1])
+
+    def _on_fetch_error(self, error):
+        self._fetching = False
+        self._exhausted = True
+        logger.error(f"Error al traer más filas: {error}")
+
+
+class GridView(QTableView):
+    """QTableView con la configuración común de las grillas (filas fijas, selección por fila)"""
+
+    def __init__(self, model, sortable=True, parent=None):
+        super().__init__(parent)
+        self.setModel(model)
+        self.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.setWordWrap(False)
+        # Sin orden inicial: se respeta el de la consulta hasta que se hace clic
+        self.horizontalHeader().setSortIndicator(-1, Qt.SortOrder.AscendingOrder)
+        self.setSortingEnabled(sortable)
+        # 🔥 Alto de fila fijo: la vista no mide cada fila (clave con 100k filas)
+        self.verticalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
+        self.verticalHeader().setDefaultSectionSize(28)
+
+    def current_record(self):
+        """Fila actual (con nombre) o None."""
+        fila = self.currentIndex().row()
+        return self.model().record(fila) if fila >= 0 else None
+
+    def selected_record(self):
+        """Primera fila seleccionada (con nombre) o None."""
+        filas = self.selectionModel().selectedRows()
+        return self.model().record(filas[0].row()) if filas else None